@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+高德地图Web服务HTTP客户端模块
+
+天气、地理编码、IP定位等接口共用一个长连接池的aiohttp会话，避免每次请求重新建立TCP和TLS连接。
+失败时按指数退避加随机抖动重试，所有尝试共享一个总耗时上限。
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from app.config import settings
+from app.common.exception import ExternalAPIException
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("amap_client")
+
+# 值得重试的HTTP状态码：限流和服务端临时错误
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class AmapClient:
+    """高德地图接口客户端
+
+    会话在首次请求时于当前事件循环中创建，由应用生命周期在关闭时调用close释放。
+    """
+
+    def __init__(self, base_url: str = "https://restapi.amap.com", max_connections: int = 32,
+                 attempt_timeout: float = 2, total_timeout: float = 4, max_attempts: int = 3,
+                 backoff_base: float = 0.1, backoff_max: float = 1.0, verify_ssl: bool = True):
+        """初始化客户端
+
+        Args:
+            base_url (str, optional): 接口地址. 默认为"https://restapi.amap.com".
+            max_connections (int, optional): 连接池上限. 默认为32.
+            attempt_timeout (float, optional): 单次请求超时(秒). 默认为2.
+            total_timeout (float, optional): 含重试的总耗时上限(秒). 默认为4.
+            max_attempts (int, optional): 最多请求次数(含首次). 默认为3.
+            backoff_base (float, optional): 首次重试的退避上限(秒)，之后每次翻倍. 默认为0.1.
+            backoff_max (float, optional): 单次退避的最大值(秒). 默认为1.0.
+            verify_ssl (bool, optional): 是否校验服务端证书，仅在测试替身等自签名证书的环境中关闭. 默认为True.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.attempt_timeout = attempt_timeout
+        self.total_timeout = total_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.verify_ssl = verify_ssl
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，首次使用时在当前事件循环中创建
+
+        Returns:
+            aiohttp.ClientSession: 复用连接的HTTP会话
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                # True使用系统信任的证书校验，False不校验
+                ssl=self.verify_ssl,
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """关闭HTTP会话，释放连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("高德接口连接池已关闭")
+        self._session = None
+
+    def backoff_delay(self, retry: int) -> float:
+        """计算第retry次重试前的等待时间(全抖动)，在[0, min(上限, 基数 * 2^(retry-1))]内均匀分布
+
+        多个请求同时失败时随机错开重试时间，避免一起打到刚恢复的服务上。
+
+        Args:
+            retry (int): 第几次重试，从1开始
+
+        Returns:
+            float: 等待时间(秒)
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (retry - 1))))
+
+    async def get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """发送GET请求并解析JSON响应
+
+        连接错误、超时、限流和5xx响应会在总耗时上限内重试；其他HTTP错误不重试。
+        响应体中的业务状态(status字段)由调用方检查。
+
+        Args:
+            path (str): 接口路径，如"/v3/weather/weatherInfo"
+            params (Dict[str, Any]): 查询参数
+
+        Returns:
+            Dict[str, Any]: 响应JSON
+
+        Raises:
+            ExternalAPIException: 重试次数或总耗时用尽仍失败，或返回不可重试的HTTP错误时抛出
+        """
+        url = f"{self.base_url}{path}"
+        deadline = time.monotonic() + self.total_timeout
+        self.stats["requests"] += 1
+        last_error = ""
+
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                delay = self.backoff_delay(attempt - 1)
+                # 等待后剩余的时间不够再发一次请求，直接放弃
+                if time.monotonic() + delay >= deadline:
+                    break
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.stats["attempts"] += 1
+            timeout = aiohttp.ClientTimeout(total=min(self.attempt_timeout, remaining))
+            try:
+                async with self._get_session().get(url, params=params, timeout=timeout) as response:
+                    if response.status == 200:
+                        return await response.json(content_type=None)
+                    last_error = f"HTTP {response.status}"
+                    if response.status not in RETRYABLE_STATUS:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = f"{type(e).__name__} {str(e)}"
+            logger.warning(f"高德接口{path}请求失败 (尝试 {attempt}/{self.max_attempts}): {last_error}")
+
+        self.stats["failures"] += 1
+        raise ExternalAPIException(f"高德接口{path}请求失败: {last_error or '超出总耗时上限'}")
+
+
+# 创建全局客户端实例，由应用生命周期关闭
+amap_client = AmapClient(
+    base_url=settings.AMAP_BASE_URL,
+    max_connections=settings.AMAP_MAX_CONNECTIONS,
+    attempt_timeout=settings.AMAP_ATTEMPT_TIMEOUT,
+    total_timeout=settings.AMAP_TOTAL_TIMEOUT,
+    max_attempts=settings.AMAP_MAX_ATTEMPTS,
+    verify_ssl=settings.AMAP_SSL_VERIFY
+)
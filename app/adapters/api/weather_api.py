@@ -5,50 +5,46 @@
 天气API适配器模块，使用高德地图API
 """
 
-import aiohttp
-import asyncio
-import json
-import ssl
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
 from app.config import settings
+from app.common.exception import ExternalAPIException
 from app.common.logging.logger import log_manager
+from app.adapters.api.amap_client import AmapClient, amap_client
+from app.adapters.api.weather_cache import WeatherCache
+from app.adapters.geo.gazetteer import gazetteer
 
 # 创建日志器
 logger = log_manager.get_logger("weather_api")
 
-# 创建一个不验证SSL证书的SSL上下文
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
-
 class WeatherAPI:
     """天气API适配器，使用高德地图API"""
     
-    def __init__(self):
-        """初始化天气API适配器"""
+    WEATHER_PATH = "/v3/weather/weatherInfo"
+    GEO_PATH = "/v3/geocode/geo"
+    # 明确要求当前实况的日期描述，其余"今天"的查询可以用预报中的当天数据回答
+    LIVE_DATE_WORDS = ("当前", "现在")
+    
+    def __init__(self, client: Optional[AmapClient] = None, cache: Optional[WeatherCache] = None):
+        """初始化天气API适配器
+        
+        Args:
+            client (Optional[AmapClient], optional): 高德接口客户端，默认使用全局共享的客户端. 默认为None.
+            cache (Optional[WeatherCache], optional): 天气响应缓存，默认按配置创建. 默认为None.
+        """
         self.api_key = settings.AMAP_API_KEY
-        self.base_url = "https://restapi.amap.com/v3/weather/weatherInfo"
-        self.geo_url = "https://restapi.amap.com/v3/geocode/geo"
+        self.client = client or amap_client
+        self.cache = cache or WeatherCache(
+            maxsize=settings.WEATHER_CACHE_MAX_SIZE,
+            live_interval=settings.WEATHER_LIVE_UPDATE_INTERVAL,
+            forecast_interval=settings.WEATHER_FORECAST_UPDATE_INTERVAL,
+            min_ttl=settings.WEATHER_CACHE_MIN_TTL,
+            stale_ttl=settings.WEATHER_CACHE_STALE_TTL
+        )
         
-        # 缓存常用城市编码，避免重复请求
-        self.city_code_cache = {
-            "北京": "110000",
-            "上海": "310000",
-            "广州": "440100",
-            "深圳": "440300",
-            "杭州": "330100",
-            "南京": "320100",
-            "武汉": "420100",
-            "西安": "610100",
-            "成都": "510100",
-            "重庆": "500000",
-            "天津": "120000",
-            "长沙": "430100",
-            "苏州": "320500",
-            "厦门": "350200"
-        }
+        # 内置编码表中找不到的地名，地理编码接口的查询结果缓存在这里
+        self.city_code_cache: Dict[str, str] = {}
         
         if not self.api_key:
             logger.warning("未配置AMAP_API_KEY，将使用模拟天气数据")
@@ -83,6 +79,15 @@ class WeatherAPI:
                 logger.error(f"无法获取城市 {city} 的编码，使用模拟数据")
                 return self._get_mock_weather(city, date_str, is_forecast)
             
+            # 同城的多日预报已在缓存中而实时天气不在时，今天的天气直接取预报中的当天，不再请求上游
+            if not is_forecast and date not in self.LIVE_DATE_WORDS and (city_code, "base") not in self.cache:
+                cached_forecast = self.cache.peek((city_code, "all"))
+                if cached_forecast is not None:
+                    result = self._process_forecast(cached_forecast, city, target_date)
+                    if result["success"]:
+                        logger.info(f"{city}({city_code}) 今天的天气取自已缓存的多日预报")
+                        return result
+            
             logger.info(f"查询 {city}({city_code}) 的{'天气预报' if is_forecast else '实时天气'}")
             
             # 构建请求参数
@@ -93,47 +98,30 @@ class WeatherAPI:
                 "output": "JSON"
             }
             
-            # 发送请求，带重试机制
-            max_retries = 3
-            retry_count = 0
-            
-            while retry_count < max_retries:
-                try:
-                    # 使用不验证SSL的上下文
-                    conn = aiohttp.TCPConnector(ssl=ssl_context)
-                    async with aiohttp.ClientSession(connector=conn) as session:
-                        async with session.get(self.base_url, params=params, timeout=10) as response:
-                            if response.status != 200:
-                                logger.error(f"天气API请求失败 (尝试 {retry_count+1}/{max_retries}): HTTP {response.status}")
-                                retry_count += 1
-                                if retry_count >= max_retries:
-                                    return self._get_error_response(f"API请求失败: HTTP {response.status}")
-                                await asyncio.sleep(1)  # 等待1秒后重试
-                                continue
-                            
-                            data = await response.json()
-                            
-                            # 检查API返回状态
-                            if data.get("status") != "1":
-                                error_info = data.get("info", "未知错误")
-                                logger.error(f"天气API返回错误: {error_info}")
-                                return self._get_error_response(error_info)
-                            
-                            # 记录原始响应
-                            logger.debug(f"高德天气API响应: {data}")
-                            
-                            # 处理结果
-                            if is_forecast:
-                                return self._process_forecast(data, city, target_date)
-                            else:
-                                return self._process_live_weather(data, city)
-                    
-                except aiohttp.ClientError as e:
-                    logger.error(f"天气API请求异常 (尝试 {retry_count+1}/{max_retries}): {str(e)}")
-                    retry_count += 1
-                    if retry_count >= max_retries:
-                        return self._get_error_response(f"API请求异常: {str(e)}")
-                    await asyncio.sleep(1)  # 等待1秒后重试
+            # 优先读缓存；未命中时请求上游，连接失败、超时和5xx在总耗时上限内退避重试
+            try:
+                data = await self.cache.get(
+                    (city_code, params["extensions"]),
+                    lambda: self.client.get(self.WEATHER_PATH, params)
+                )
+            except ExternalAPIException as e:
+                logger.error(f"天气API请求失败: {e.message}")
+                return self._get_error_response(f"API请求失败: {e.message}")
+            
+            # 检查API返回状态
+            if data.get("status") != "1":
+                error_info = data.get("info", "未知错误")
+                logger.error(f"天气API返回错误: {error_info}")
+                return self._get_error_response(error_info)
+            
+            # 记录原始响应
+            logger.debug(f"高德天气API响应: {data}")
+            
+            # 处理结果
+            if is_forecast:
+                return self._process_forecast(data, city, target_date)
+            else:
+                return self._process_live_weather(data, city)
                     
         except Exception as e:
             logger.error(f"获取天气信息失败: {str(e)}")
@@ -155,11 +143,24 @@ class WeatherAPI:
             logger.error("城市名称无效")
             return None
         
+        # 优先查内置的行政区划编码表，已知地名不需要访问网络
+        place = gazetteer.lookup(city_name)
+        if place is not None:
+            logger.info(f"城市 {city_name} 的编码从行政区划表获取: {place.adcode}")
+            return place.adcode
+        
         # 检查缓存
         if city_name in self.city_code_cache:
             logger.info(f"城市 {city_name} 的编码从缓存获取: {self.city_code_cache[city_name]}")
             return self.city_code_cache[city_name]
         
+        # 语音识别的同音错字(如"西按")按拼音纠正，不再交给地理编码接口；
+        # 近音的可能是表中没有的地名(如"东京"近音"东营")，先交给地理编码接口
+        place = gazetteer.correct(city_name, max_distance=0)
+        if place is not None:
+            logger.info(f"城市 {city_name} 按拼音纠正为 {place.name}，编码: {place.adcode}")
+            return place.adcode
+        
         # 如果没有API密钥，无法查询城市编码
         if not self.api_key:
             logger.warning(f"未配置API密钥，无法查询城市 {city_name} 的编码")
@@ -173,30 +174,31 @@ class WeatherAPI:
                 "output": "JSON"
             }
             
-            # 使用不验证SSL的上下文
-            conn = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=conn) as session:
-                async with session.get(self.geo_url, params=params, timeout=10) as response:
-                    if response.status != 200:
-                        logger.error(f"地理编码API请求失败: HTTP {response.status}")
-                        return None
-                    
-                    data = await response.json()
-                    logger.debug(f"地理编码API响应: {data}")
-                    
-                    # 检查API返回状态
-                    if data.get("status") != "1" or not data.get("geocodes"):
-                        logger.error(f"地理编码API返回错误: {data.get('info', '未知错误')}")
-                        return None
-                    
-                    # 提取城市编码
-                    adcode = data["geocodes"][0]["adcode"]
-                    
-                    # 更新缓存
-                    self.city_code_cache[city_name] = adcode
-                    logger.info(f"城市 {city_name} 的编码为 {adcode}，已添加到缓存")
-                    
-                    return adcode
+            data = await self.client.get(self.GEO_PATH, params)
+            logger.debug(f"地理编码API响应: {data}")
+            
+            # 检查API返回状态
+            if data.get("status") != "1":
+                logger.error(f"地理编码API返回错误: {data.get('info', '未知错误')}")
+                return None
+            
+            # 地理编码接口也找不到时，再按近音纠正语音识别错字(如"宁坡")
+            if not data.get("geocodes"):
+                place = gazetteer.correct(city_name)
+                if place is None:
+                    logger.error(f"地理编码API找不到城市: {city_name}")
+                    return None
+                logger.info(f"城市 {city_name} 按拼音纠正为 {place.name}，编码: {place.adcode}")
+                return place.adcode
+            
+            # 提取城市编码
+            adcode = data["geocodes"][0]["adcode"]
+            
+            # 更新缓存
+            self.city_code_cache[city_name] = adcode
+            logger.info(f"城市 {city_name} 的编码为 {adcode}，已添加到缓存")
+            
+            return adcode
                     
         except Exception as e:
             logger.error(f"获取城市编码失败: {str(e)}")
@@ -321,17 +323,14 @@ class WeatherAPI:
             # 获取地理位置信息
             location = forecast.get("city", city)
             
-            # 计算目标日期与今天的天数差
-            today = datetime.now().date()
-            days_diff = (target_date.date() - today).days
+            # 按日期取目标日的预报：同一份多日预报回答范围内的任意一天，跨天缓存时也不会错位
+            date_str = target_date.strftime("%Y-%m-%d")
+            cast = next((item for item in casts if item.get("date") == date_str), None)
             
-            # 检查是否超出预报范围（通常为7天）
-            if days_diff >= len(casts):
+            # 检查是否超出预报范围（通常为今天起4天）
+            if cast is None:
                 return self._get_error_response("超出天气预报范围")
             
-            # 获取目标日期的预报
-            cast = casts[days_diff]
-            
             return {
                 "success": True,
                 "message": "获取天气预报成功",
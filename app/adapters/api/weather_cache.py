@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+天气接口响应缓存模块
+
+高德实时天气约每小时发布一次，预报每天发布几次，响应中的reporttime是发布时间。
+缓存按(城市编码, extensions)保存原始响应，新鲜期到下一次预计发布为止；过了新鲜期的一段时间内
+仍先返回旧数据，同时在后台刷新(stale-while-revalidate)，请求不必等待上游。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("weather_cache")
+
+# 缓存键：(城市编码, "base"或"all")
+WeatherKey = Tuple[str, str]
+
+
+class _Entry:
+    """缓存条目"""
+
+    __slots__ = ("data", "report_time", "fresh_until", "stale_until")
+
+    def __init__(self, data: Dict[str, Any], report_time: Optional[float], fresh_until: float, stale_until: float):
+        self.data = data
+        self.report_time = report_time
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+def parse_report_time(data: Dict[str, Any]) -> Optional[float]:
+    """读取响应中的发布时间
+
+    Args:
+        data (Dict[str, Any]): 高德天气接口响应
+
+    Returns:
+        Optional[float]: 发布时间戳(按本地时区解析)，缺失或格式不符时返回None
+    """
+    try:
+        if data.get("lives"):
+            text = data["lives"][0]["reporttime"]
+        else:
+            text = data["forecasts"][0]["reporttime"]
+        return datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+class WeatherCache:
+    """按发布时间过期、支持过期后后台刷新的天气响应缓存
+
+    同一个键同时只有一个上游请求：并发未命中共享同一次请求，后台刷新也不会重复发起。
+    只缓存status为"1"的响应。非线程安全，供单个事件循环内使用。
+    """
+
+    def __init__(self, maxsize: int = 512, live_interval: float = 3600, forecast_interval: float = 10800,
+                 min_ttl: float = 300, stale_ttl: float = 1800, clock: Callable[[], float] = time.time):
+        """初始化缓存
+
+        Args:
+            maxsize (int, optional): 最大条目数，0表示不缓存. 默认为512.
+            live_interval (float, optional): 实时天气的发布间隔(秒). 默认为3600.
+            forecast_interval (float, optional): 天气预报的发布间隔(秒). 默认为10800.
+            min_ttl (float, optional): 最短新鲜期(秒)，上游数据迟迟未更新时避免每次请求都访问上游. 默认为300.
+            stale_ttl (float, optional): 过了新鲜期后仍可返回旧数据并后台刷新的时长(秒). 默认为1800.
+            clock (Callable[[], float], optional): 时钟函数，需与发布时间使用同一时间基准. 默认为time.time.
+        """
+        self.maxsize = maxsize
+        self.live_interval = live_interval
+        self.forecast_interval = forecast_interval
+        self.min_ttl = min_ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data: "OrderedDict[WeatherKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[WeatherKey, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.refresh_failures = 0
+
+    async def get(self, key: WeatherKey, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """读取天气响应，未命中时调用loader
+
+        Args:
+            key (WeatherKey): (城市编码, extensions)
+            loader (Callable[[], Awaitable[Dict[str, Any]]]): 请求上游的协程函数
+
+        Returns:
+            Dict[str, Any]: 高德天气接口响应
+
+        Raises:
+            Exception: 未命中且loader失败时，原样抛出loader的异常
+        """
+        if self.maxsize <= 0:
+            self.misses += 1
+            self.upstream_calls += 1
+            return await loader()
+
+        now = self._clock()
+        entry = self._data.get(key)
+        if entry is not None and now < entry.stale_until:
+            self._data.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader, background=True)
+            return entry.data
+
+        self.misses += 1
+        task = self._inflight.get(key) or self._start_load(key, loader)
+        return await asyncio.shield(task)
+
+    def peek(self, key: WeatherKey) -> Optional[Dict[str, Any]]:
+        """只读缓存，不请求上游
+
+        条目在新鲜期或旧数据可用期内时返回数据并计入命中；不存在时返回None，不计入未命中，
+        由调用方决定是否改用其他数据源。
+
+        Args:
+            key (WeatherKey): (城市编码, extensions)
+
+        Returns:
+            Optional[Dict[str, Any]]: 缓存的响应
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        now = self._clock()
+        if now >= entry.stale_until:
+            return None
+        self._data.move_to_end(key)
+        if now < entry.fresh_until:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry.data
+
+    def __contains__(self, key: WeatherKey) -> bool:
+        """条目是否仍可返回(新鲜期或旧数据可用期内)，不影响统计和淘汰顺序"""
+        entry = self._data.get(key)
+        return entry is not None and self._clock() < entry.stale_until
+
+    def _start_load(self, key: WeatherKey, loader: Callable[[], Awaitable[Dict[str, Any]]],
+                    background: bool = False) -> asyncio.Task:
+        """发起上游请求，完成后写入缓存
+
+        Args:
+            key (WeatherKey): 缓存键
+            loader (Callable[[], Awaitable[Dict[str, Any]]]): 请求上游的协程函数
+            background (bool, optional): 是否为后台刷新，后台刷新失败只记录日志. 默认为False.
+
+        Returns:
+            asyncio.Task: 请求任务
+        """
+        async def load() -> Dict[str, Any]:
+            self.upstream_calls += 1
+            data = await loader()
+            if data.get("status") == "1":
+                self._store(key, data)
+            return data
+
+        task = asyncio.create_task(load())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._on_load_done(key, background, done))
+        return task
+
+    def _on_load_done(self, key: WeatherKey, background: bool, task: asyncio.Task) -> None:
+        """请求结束后移出进行中列表；后台刷新失败时保留旧数据，只记录日志
+
+        Args:
+            key (WeatherKey): 缓存键
+            background (bool): 是否为后台刷新
+            task (asyncio.Task): 请求任务
+        """
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            return
+        # 读取异常，等待方都已取消时也不会产生未读取异常的警告
+        error = task.exception()
+        if error is not None and background:
+            self.refresh_failures += 1
+            logger.warning(f"天气数据后台刷新失败，继续使用旧数据: {str(error)}")
+
+    def _store(self, key: WeatherKey, data: Dict[str, Any]) -> None:
+        """写入缓存，根据发布时间计算新鲜期
+
+        新鲜期到"发布时间 + 发布间隔"为止，至少min_ttl。预报按天数差取当天的数据，
+        新鲜期和旧数据可用期都不跨过本地零点。
+
+        Args:
+            key (WeatherKey): 缓存键
+            data (Dict[str, Any]): 高德天气接口响应
+        """
+        now = self._clock()
+        forecast = key[1] == "all"
+        interval = self.forecast_interval if forecast else self.live_interval
+        report_time = parse_report_time(data)
+
+        fresh_until = now + self.min_ttl
+        if report_time is not None:
+            # 发布时间晚于本机时间(时钟偏差)时，最多缓存一个发布间隔
+            fresh_until = max(fresh_until, min(report_time + interval, now + interval))
+        stale_until = fresh_until + self.stale_ttl
+        if forecast:
+            midnight = datetime.combine(datetime.fromtimestamp(now).date() + timedelta(days=1), datetime.min.time())
+            stale_until = min(stale_until, midnight.timestamp())
+            fresh_until = min(fresh_until, stale_until)
+
+        self._data[key] = _Entry(data, report_time, fresh_until, stale_until)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> int:
+        """清空缓存
+
+        Returns:
+            int: 清除的条目数
+        """
+        size = len(self._data)
+        self._data.clear()
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            Dict[str, Any]: 命中、旧数据命中、未命中、上游调用次数等
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "upstream_calls": self.upstream_calls,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": len(self._inflight),
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
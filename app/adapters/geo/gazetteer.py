@@ -0,0 +1,509 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行政区划编码表模块
+
+随代码发布的adcodes.csv包含省、地级、县级行政区的6位编码、名称、简称和坐标，
+城市名称到编码的解析不再依赖高德地理编码接口。表在首次查询时加载到内存字典中；
+按经纬度查找最近城市的网格索引、从文本中提取地名的字典树和纠正同音错字的拼音索引在首次使用时建立。
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from app.common.logging.logger import log_manager
+from app.common.utils.pinyin import PinyinIndex, PinyinMatch
+from app.adapters.geo.spatial_index import GridIndex
+
+# 创建日志器
+logger = log_manager.get_logger("gazetteer")
+
+# 随代码发布的编码表
+DEFAULT_PATH = Path(__file__).parent / "adcodes.csv"
+
+# 直辖市的省级编码前缀，其下的区县直接属于直辖市
+MUNICIPALITY_PREFIXES = ("11", "12", "31", "50")
+
+# 同时是常用词的简称，从文本中提取地名时只在紧跟上级时识别(如"天津和平")，全称不受限制
+COMMON_WORD_NAMES = {
+    "前进", "互助", "东方", "公安", "共和", "元宝", "东风", "大方", "合作", "友好", "永和",
+    "和平", "新华", "长安", "城区", "郊区", "矿区", "城中", "市中", "城关",
+}
+
+# 编码表中只有省级编码的地区下的城市和县：名称解析到省级编码，与高德地理编码接口的结果一致。
+# 简称与表中已有行政区重名的(常州市新北区、福州市连江县)只登记全称；金门县已在福建省下
+PLACE_ALIASES = {
+    "710000": [
+        "台北市", "台北", "新北市", "桃园市", "桃园", "台中市", "台中", "台南市", "台南", "高雄市", "高雄",
+        "基隆市", "基隆", "新竹市", "新竹县", "新竹", "嘉义市", "嘉义县", "嘉义", "苗栗县", "苗栗",
+        "彰化县", "彰化", "南投县", "南投", "云林县", "云林", "屏东县", "屏东", "宜兰县", "宜兰",
+        "花莲县", "花莲", "台东县", "台东", "澎湖县", "澎湖",
+    ],
+}
+
+# 常与地名首尾相连的普通词，作为非地名登记在字典树中，避免"明天宁波"中的"天宁"、"后天河北"中的"天河"
+NON_PLACE_WORDS = (
+    "今天", "明天", "后天", "大后天", "昨天", "前天", "当天", "每天", "天天", "白天", "半天", "几天",
+    "星期天", "礼拜天", "周天", "今日", "明日", "天气", "气温", "温度", "一下",
+)
+
+# 在文本中按拼音查找误识别地名时片段的最大字数，更长的多是带后缀的全称，很少整体误识别
+MAX_CORRECTION_LENGTH = 4
+
+# 字典树中标记名称结束的键，值为True时是地名，不会与单个字符冲突
+_TERMINAL = ""
+
+
+class Place(NamedTuple):
+    """行政区"""
+
+    adcode: str
+    name: str
+    short_name: str
+    longitude: Optional[float]
+    latitude: Optional[float]
+
+    @property
+    def level(self) -> int:
+        """行政级别：0省级，1地级，2县级"""
+        if self.adcode.endswith("0000"):
+            return 0
+        if self.adcode.endswith("00"):
+            return 1
+        return 2
+
+    def contains(self, adcode: str) -> bool:
+        """adcode是否为本行政区的下级"""
+        level = self.level
+        if level == 2 or adcode == self.adcode:
+            return False
+        prefix = 2 if level == 0 else 4
+        return adcode[:prefix] == self.adcode[:prefix]
+
+
+class PlaceMention(NamedTuple):
+    """文本中提到的行政区"""
+
+    place: Place
+    # 在文本中的位置，text[start:end]
+    start: int
+    end: int
+    # 名称：find_places中为原文；extract_place中为能唯一解析回该行政区的名称，
+    # 原文能解析时为原文(如"西安"、"北京朝阳")，否则为带上级的全称
+    name: str
+
+    @property
+    def adcode(self) -> str:
+        """行政区划编码"""
+        return self.place.adcode
+
+
+class Gazetteer:
+    """行政区划编码表
+
+    名称查询同时匹配全称(如"杭州市")、简称(如"杭州")和PLACE_ALIASES中的别名(如"台北")。
+    同名时全称优先于简称和别名、上级优先于下级，
+    仍无法区分的(如多个城市都有"鼓楼区")视为歧义；可以用上级名称限定，如"南京鼓楼"、"福州市鼓楼区"。
+    """
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        """初始化编码表，数据在首次查询时加载
+
+        Args:
+            path (Path, optional): 编码表文件路径. 默认为随代码发布的adcodes.csv.
+        """
+        self.path = path
+        self._places: Dict[str, Place] = {}
+        self._names: Dict[str, List[Place]] = {}
+        self._loaded = False
+        self._grid: Optional[GridIndex[Place]] = None
+        self._trie: Optional[Dict[str, Any]] = None
+        self._pinyin: Optional[PinyinIndex[Place]] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时加载编码表"""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _load(self) -> None:
+        """读取编码表并建立名称索引"""
+        places: Dict[str, Place] = {}
+        names: Dict[str, List[Place]] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                adcode, name, short_name, longitude, latitude = line.rstrip("\n").split(",")
+                place = Place(
+                    adcode, name, short_name,
+                    float(longitude) if longitude else None,
+                    float(latitude) if latitude else None
+                )
+                places[adcode] = place
+                names.setdefault(name, []).append(place)
+                if short_name:
+                    names.setdefault(short_name, []).append(place)
+        for adcode, aliases in PLACE_ALIASES.items():
+            for alias in aliases:
+                names.setdefault(alias, []).append(places[adcode])
+
+        # 每个名称下的候选按优先级排序：全称优先，再按级别从高到低
+        for key, candidates in names.items():
+            candidates.sort(key=lambda place: (place.name != key, place.level, place.adcode))
+        self._places = places
+        self._names = names
+        logger.info(f"行政区划编码表加载完成，共{len(places)}个行政区")
+
+    def get(self, adcode: str) -> Optional[Place]:
+        """按编码获取行政区
+
+        Args:
+            adcode (str): 6位行政区划编码
+
+        Returns:
+            Optional[Place]: 行政区，不存在时返回None
+        """
+        self._ensure_loaded()
+        return self._places.get(adcode)
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """按名称查找行政区
+
+        Args:
+            name (str): 行政区名称，可以带上级限定，如"杭州"、"浙江省杭州市"、"北京朝阳"
+
+        Returns:
+            Optional[Place]: 行政区，不存在或有歧义时返回None
+        """
+        self._ensure_loaded()
+        if not name:
+            return None
+        return self._resolve(name, None)
+
+    def _resolve(self, text: str, parent: Optional[Place]) -> Optional[Place]:
+        """解析名称，parent不为空时只在其下级中查找
+
+        整体匹配失败时，依次尝试把最长的前缀解析为上级行政区，再在其下级中解析剩余部分。
+
+        Args:
+            text (str): 待解析的名称
+            parent (Optional[Place]): 上级行政区
+
+        Returns:
+            Optional[Place]: 行政区，不存在或有歧义时返回None
+        """
+        place = self._best(text, parent)
+        if place is not None:
+            return place
+        for split in range(len(text) - 2, 1, -1):
+            head = self._best(text[:split], parent)
+            if head is not None and head.level < 2:
+                place = self._resolve(text[split:], head)
+                if place is not None:
+                    return place
+        return None
+
+    def _best(self, name: str, parent: Optional[Place]) -> Optional[Place]:
+        """取名称下优先级最高且唯一的候选
+
+        Args:
+            name (str): 全称或简称
+            parent (Optional[Place]): 上级行政区，不为空时只考虑其下级
+
+        Returns:
+            Optional[Place]: 行政区，没有候选或最高优先级有多个候选时返回None
+        """
+        candidates = self._names.get(name)
+        if not candidates:
+            return None
+        if parent is not None:
+            candidates = [place for place in candidates if parent.contains(place.adcode)]
+            if not candidates:
+                return None
+        best = candidates[0]
+        if len(candidates) > 1:
+            runner_up = candidates[1]
+            if (runner_up.name != name) == (best.name != name) and runner_up.level == best.level:
+                return None
+        return best
+
+    def city_of(self, place: Place) -> Place:
+        """获取行政区所属的地级行政区或直辖市
+
+        Args:
+            place (Place): 行政区
+
+        Returns:
+            Place: 县级行政区返回所属地级行政区或直辖市，省直辖的县级市等没有上级地级行政区的返回自身；
+                地级和省级行政区返回自身
+        """
+        self._ensure_loaded()
+        if place.level < 2:
+            return place
+        city = self._places.get(place.adcode[:4] + "00")
+        if city is not None:
+            return city
+        if place.adcode[:2] in MUNICIPALITY_PREFIXES:
+            return self._places.get(place.adcode[:2] + "0000", place)
+        return place
+
+    def nearest(self, latitude: float, longitude: float, max_distance_km: float = 250) -> Optional[Place]:
+        """查找中心点离坐标最近的最低一级行政区
+
+        参与比较的是有坐标的县级行政区，以及没有下级的地级、省级行政区(如东莞市、香港)。
+        县级行政区面积小，最近的县级中心比最近的地级中心更能代表坐标所在的城市。
+
+        Args:
+            latitude (float): 纬度
+            longitude (float): 经度
+            max_distance_km (float, optional): 最大距离(千米)，超过时认为不在国内. 默认为250.
+
+        Returns:
+            Optional[Place]: 行政区，超出最大距离时返回None
+        """
+        if self._grid is None:
+            self._build_grid()
+        found = self._grid.nearest(latitude, longitude, max_distance_km)
+        return found[0] if found else None
+
+    def nearest_city(self, latitude: float, longitude: float, max_distance_km: float = 250) -> Optional[Place]:
+        """查找坐标所在的城市(地级行政区或直辖市)
+
+        Args:
+            latitude (float): 纬度
+            longitude (float): 经度
+            max_distance_km (float, optional): 最大距离(千米)，超过时认为不在国内. 默认为250.
+
+        Returns:
+            Optional[Place]: 城市，超出最大距离时返回None
+        """
+        place = self.nearest(latitude, longitude, max_distance_km)
+        return self.city_of(place) if place is not None else None
+
+    def _build_grid(self) -> None:
+        """用没有下级的行政区中心点建立网格索引"""
+        self._ensure_loaded()
+        with self._lock:
+            if self._grid is not None:
+                return
+            located = [place for place in self._places.values() if place.latitude is not None]
+            parents = set()
+            for place in located:
+                if place.level == 2:
+                    parents.add(place.adcode[:4] + "00")
+                if place.level >= 1:
+                    parents.add(place.adcode[:2] + "0000")
+            self._grid = GridIndex(
+                (place.latitude, place.longitude, place) for place in located if place.adcode not in parents
+            )
+
+    def find_places(self, text: str) -> List[PlaceMention]:
+        """找出文本中提到的所有行政区
+
+        用全称、简称和常见的非地名词(见NON_PLACE_WORDS)建立的字典树从左到右扫描，每个位置取最长的词，
+        如"西安市"不会被拆成"西安"，"明天宁波"先切出"明天"。
+        紧跟在上级后面的名称先在上级的下级中解析，如"南京鼓楼"中的"鼓楼"解析为南京市鼓楼区；
+        仍有歧义的名称(如单独的"鼓楼")跳过。
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            List[PlaceMention]: 按出现顺序排列的行政区，每个的name为原文
+        """
+        if self._trie is None:
+            self._build_trie()
+        root = self._trie
+        mentions: List[PlaceMention] = []
+        parent: Optional[Place] = None
+        position, length = 0, len(text)
+        while position < length:
+            node = root.get(text[position])
+            if node is None:
+                position += 1
+                continue
+            end = None
+            cursor = position + 1
+            while node is not None:
+                flag = node.get(_TERMINAL)
+                if flag is not None:
+                    end, is_place = cursor, flag
+                if cursor >= length:
+                    break
+                node = node.get(text[cursor])
+                cursor += 1
+            if end is None:
+                position += 1
+                continue
+            place = None
+            if is_place:
+                name = text[position:end]
+                if parent is not None and mentions[-1].end == position:
+                    place = self._best(name, parent)
+                if place is None and name not in COMMON_WORD_NAMES:
+                    place = self._best(name, None)
+            if place is not None:
+                mentions.append(PlaceMention(place, position, end, name))
+            parent = place if place is not None and place.level < 2 else None
+            position = end
+        return mentions
+
+    def extract_place(self, text: str) -> Optional[PlaceMention]:
+        """提取文本中的地点
+
+        取第一个提到的行政区；其后紧接着提到的下级会替换它，如"北京朝阳"取朝阳区，"浙江杭州"取杭州市。
+
+        Args:
+            text (str): 文本，如"明天北京的天气怎么样"
+
+        Returns:
+            Optional[PlaceMention]: 地点，位置覆盖上级和下级的原文；没有地名时按拼音查找语音识别
+                错字(如"西按天气")，name为纠正后的名称；都没有时返回None
+        """
+        mentions = self.find_places(text)
+        if not mentions:
+            return self._correct_mention(text)
+        first = current = mentions[0]
+        for mention in mentions[1:]:
+            if not current.place.contains(mention.adcode):
+                break
+            current = mention
+        surface = text[first.start:current.end]
+        name = surface if self._resolve(surface, None) is current.place else self.qualified_name(current.place)
+        return PlaceMention(current.place, first.start, current.end, name)
+
+    def correct(self, name: str, max_distance: int = 1) -> Optional[Place]:
+        """按拼音纠正语音识别产生的同音、近音错字
+
+        名称能直接解析时不纠正；否则在字数相同的全称和简称中找模糊音最接近、且至少有一个字相同的，
+        如"西按"->西安市、"成度"->成都市、"宁坡"->宁波市。
+        近音纠正也会把表中没有的地名改成另一个地方(如"东京"->东营市)，只在确认名称不存在后使用。
+
+        Args:
+            name (str): 名称
+            max_distance (int, optional): 模糊音编辑距离上限，0只纠正同音字，1同时纠正近音字. 默认为1.
+
+        Returns:
+            Optional[Place]: 行政区，没有足够接近的名称或最接近的有多个时返回None
+        """
+        place = self.lookup(name)
+        if place is not None:
+            return place
+        if self._pinyin is None:
+            self._build_pinyin()
+        return self._closest(self._pinyin.lookup(name, max_distance=max_distance, min_shared=1))
+
+    def _correct_mention(self, text: str) -> Optional[PlaceMention]:
+        """按拼音在文本中查找误识别的地名
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            Optional[PlaceMention]: 第一个能唯一纠正的地名，没有时返回None
+        """
+        if self._pinyin is None:
+            self._build_pinyin()
+        # 普通词替换为非汉字，保持位置不变，片段不会跨越它们
+        for word in NON_PLACE_WORDS:
+            if word in text:
+                text = text.replace(word, " " * len(word))
+        for span in self._pinyin.search(text, max_length=MAX_CORRECTION_LENGTH):
+            place = self._closest(span.matches)
+            if place is not None:
+                return PlaceMention(place, span.start, span.end, self.qualified_name(place))
+        return None
+
+    @staticmethod
+    def _closest(matches: List[PinyinMatch]) -> Optional[Place]:
+        """取最接近且唯一的候选
+
+        Args:
+            matches (List[PinyinMatch]): 按接近程度排列的候选，值为行政区
+
+        Returns:
+            Optional[Place]: 同样接近时按全称优先、级别高优先，仍有多个时返回None
+        """
+        if not matches:
+            return None
+        first = matches[0]
+        tied = sorted(
+            (match for match in matches if (match.distance, match.shared) == (first.distance, first.shared)),
+            key=lambda match: (match.name != match.value.name, match.value.level)
+        )
+        best = tied[0]
+        for match in tied[1:]:
+            if match.value is best.value:
+                continue
+            if (match.name != match.value.name, match.value.level) == (best.name != best.value.name, best.value.level):
+                return None
+            break
+        return best.value
+
+    def qualified_name(self, place: Place) -> str:
+        """获取能唯一解析回该行政区的名称
+
+        Args:
+            place (Place): 行政区
+
+        Returns:
+            str: 全称能唯一解析时为全称，否则在前面加上所属城市或省份的全称，如"北京市朝阳区"
+        """
+        self._ensure_loaded()
+        if self._best(place.name, None) is place:
+            return place.name
+        for parent_code in (place.adcode[:4] + "00", place.adcode[:2] + "0000"):
+            parent = self._places.get(parent_code)
+            if parent is not None and parent is not place:
+                return parent.name + place.name
+        return place.name
+
+    def _build_trie(self) -> None:
+        """用全称、简称和非地名词建立字典树，节点为 字符 -> 子节点 的字典"""
+        self._ensure_loaded()
+        with self._lock:
+            if self._trie is not None:
+                return
+            trie: Dict[str, Any] = {}
+            for word in NON_PLACE_WORDS:
+                node = trie
+                for char in word:
+                    node = node.setdefault(char, {})
+                node[_TERMINAL] = False
+            for name in self._names:
+                node = trie
+                for char in name:
+                    node = node.setdefault(char, {})
+                node[_TERMINAL] = True
+            self._trie = trie
+
+    def _build_pinyin(self) -> None:
+        """用全称和简称建立拼音索引"""
+        self._ensure_loaded()
+        with self._lock:
+            if self._pinyin is not None:
+                return
+            self._pinyin = PinyinIndex(
+                (name, place) for name, candidates in self._names.items() for place in candidates
+            )
+            logger.info(f"地名拼音索引建立完成，共{len(self._pinyin)}个读音")
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._places)
+
+    def __iter__(self) -> Iterator[Place]:
+        """按编码顺序遍历所有行政区"""
+        self._ensure_loaded()
+        return iter(self._places.values())
+
+
+# 创建全局编码表实例
+gazetteer = Gazetteer()
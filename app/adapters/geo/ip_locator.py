@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+IP定位模块
+
+按客户端IP推断所在城市：先查按IP缓存的结果，再查可选的离线IP段库，最后请求高德IP定位接口。
+离线库是按起始地址排序的IP段表，加载为紧凑的整数数组，用二分查找定位，不需要访问网络。
+"""
+
+import asyncio
+import ipaddress
+import socket
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.common.exception import ExternalAPIException
+from app.common.logging.logger import log_manager
+from app.adapters.api.amap_client import AmapClient, amap_client
+
+# 创建日志器
+logger = log_manager.get_logger("ip_locator")
+
+IP_PATH = "/v3/ip"
+
+
+def ipv4_to_int(ip: str) -> Optional[int]:
+    """把点分十进制IPv4地址转换为整数
+
+    Args:
+        ip (str): IP地址
+
+    Returns:
+        Optional[int]: 整数形式的地址，不是IPv4地址时返回None
+    """
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except (OSError, ValueError):
+        return None
+
+
+class IPRangeIndex:
+    """离线IP段库
+
+    文件为UTF-8文本，每行"起始IP,结束IP,省份,城市"，起止地址可以是点分十进制或整数，闭区间；
+    城市为空时使用省份，#开头的行为注释。IP段之间不能重叠，按起始地址排好序时加载最快。
+    起止地址分别存入array('I')，城市名去重后按下标引用，百万级IP段只占十几MB内存。
+    百万级的库加载需要数秒，应在启动时通过IPLocator.start在线程中加载。
+    """
+
+    def __init__(self, path: str):
+        """初始化IP段库，数据在首次查询时加载
+
+        Args:
+            path (str): IP段库文件路径
+        """
+        self.path = path
+        self._starts = array("I")
+        self._ends = array("I")
+        self._cities = array("I")
+        self._names: List[str] = []
+        self.loaded = False
+
+    def load(self) -> None:
+        """读取IP段库
+
+        Raises:
+            ValueError: IP段格式错误或存在重叠时抛出
+        """
+        name_ids: Dict[str, int] = {}
+        starts, ends, cities = array("I"), array("I"), array("I")
+        in_order = True
+        with open(self.path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if line.startswith("#") or not line.strip():
+                    continue
+                parts = line.rstrip("\n").split(",")
+                if len(parts) < 4:
+                    raise ValueError(f"IP段库第{number}行格式错误: {line.strip()}")
+                start = int(parts[0]) if parts[0].isdigit() else ipv4_to_int(parts[0])
+                end = int(parts[1]) if parts[1].isdigit() else ipv4_to_int(parts[1])
+                if start is None or end is None or start > end or end > 0xFFFFFFFF:
+                    raise ValueError(f"IP段库第{number}行地址无效: {line.strip()}")
+                city = parts[3] or parts[2]
+                city_id = name_ids.get(city)
+                if city_id is None:
+                    city_id = name_ids[city] = len(name_ids)
+                if starts and start <= starts[-1]:
+                    in_order = False
+                starts.append(start)
+                ends.append(end)
+                cities.append(city_id)
+
+        if not in_order:
+            order = sorted(range(len(starts)), key=starts.__getitem__)
+            starts = array("I", (starts[i] for i in order))
+            ends = array("I", (ends[i] for i in order))
+            cities = array("I", (cities[i] for i in order))
+        for position in range(1, len(starts)):
+            if starts[position] <= ends[position - 1]:
+                raise ValueError(f"IP段库中存在重叠的IP段，起始地址: {starts[position]}")
+
+        self._starts, self._ends, self._cities = starts, ends, cities
+        self._names = list(name_ids)
+        self.loaded = True
+        logger.info(f"离线IP段库加载完成，共{len(starts)}个IP段，{len(self._names)}个城市")
+
+    def lookup(self, address: int) -> Optional[str]:
+        """查询整数形式的IPv4地址所在城市
+
+        Args:
+            address (int): 整数形式的IPv4地址
+
+        Returns:
+            Optional[str]: 城市名称，不在任何IP段内时返回None
+        """
+        if not self.loaded:
+            self.load()
+        position = bisect_right(self._starts, address) - 1
+        if position >= 0 and address <= self._ends[position]:
+            return self._names[self._cities[position]]
+        return None
+
+    def __len__(self) -> int:
+        if not self.loaded:
+            self.load()
+        return len(self._starts)
+
+
+class IPLocator:
+    """IP定位器
+
+    查询结果(包括"无法定位")按IP缓存ttl秒；接口请求失败不缓存。同一IP的并发查询共享一次接口请求。
+    离线IP段库由start在线程中加载，加载完成前的查询直接走缓存和接口。
+    """
+
+    def __init__(self, client: Optional[AmapClient] = None, api_key: Optional[str] = None,
+                 index: Optional[IPRangeIndex] = None, ttl: float = 86400, maxsize: int = 10000):
+        """初始化IP定位器
+
+        Args:
+            client (Optional[AmapClient], optional): 高德接口客户端，默认使用全局共享的客户端. 默认为None.
+            api_key (Optional[str], optional): 高德API密钥，为空时只使用离线IP段库. 默认为None.
+            index (Optional[IPRangeIndex], optional): 离线IP段库. 默认为None.
+            ttl (float, optional): 查询结果的缓存时间(秒). 默认为86400.
+            maxsize (int, optional): 最多缓存的IP数. 默认为10000.
+        """
+        self.client = client or amap_client
+        self.api_key = api_key
+        self.index = index
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._memo: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"lookups": 0, "memo_hits": 0, "index_hits": 0, "api_calls": 0}
+
+    async def start(self) -> None:
+        """在线程中加载离线IP段库，不阻塞事件循环；加载失败时只记录日志，继续使用高德接口"""
+        if self.index is None or self.index.loaded:
+            return
+        try:
+            await asyncio.to_thread(self.index.load)
+        except (OSError, ValueError) as e:
+            logger.error(f"离线IP段库加载失败，仅使用高德IP定位: {str(e)}")
+
+    async def locate(self, ip: str) -> Optional[str]:
+        """查询IP所在城市
+
+        Args:
+            ip (str): 客户端IP地址
+
+        Returns:
+            Optional[str]: 城市名称，内网地址或无法定位时返回None
+        """
+        self.stats["lookups"] += 1
+        now = time.monotonic()
+        cached = self._memo.get(ip)
+        if cached is not None and cached[0] > now:
+            self._memo.move_to_end(ip)
+            self.stats["memo_hits"] += 1
+            return cached[1]
+
+        address = ipv4_to_int(ip)
+        if address is None or not ipaddress.IPv4Address(address).is_global:
+            # 内网、本机、保留地址以及IPv6地址(高德IP定位只支持IPv4)
+            self._remember(ip, None, now)
+            return None
+
+        if self.index is not None and self.index.loaded:
+            city = self.index.lookup(address)
+            if city is not None:
+                self.stats["index_hits"] += 1
+                self._remember(ip, city, now)
+                return city
+
+        if not self.api_key:
+            return None
+        task = self._inflight.get(ip)
+        if task is None:
+            task = asyncio.create_task(self._locate_online(ip))
+            self._inflight[ip] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ip, None))
+        return await asyncio.shield(task)
+
+    async def _locate_online(self, ip: str) -> Optional[str]:
+        """请求高德IP定位接口
+
+        Args:
+            ip (str): IPv4地址
+
+        Returns:
+            Optional[str]: 城市名称，没有城市时使用省份；无法定位或请求失败时返回None
+        """
+        self.stats["api_calls"] += 1
+        params = {"key": self.api_key, "ip": ip, "output": "JSON"}
+        try:
+            data = await self.client.get(IP_PATH, params)
+        except ExternalAPIException as e:
+            logger.error(f"IP定位失败: {e.message}")
+            return None
+
+        if data.get("status") != "1":
+            logger.error(f"IP定位API返回错误: {data.get('info', '未知错误')}")
+            return None
+
+        # 无法定位时高德返回空列表而不是字符串
+        city = data.get("city") or data.get("province")
+        city = city if isinstance(city, str) and city else None
+        self._remember(ip, city, time.monotonic())
+        return city
+
+    def _remember(self, ip: str, city: Optional[str], now: float) -> None:
+        """缓存查询结果，超出容量时淘汰最久未使用的IP"""
+        self._memo[ip] = (now + self.ttl, city)
+        self._memo.move_to_end(ip)
+        while len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+
+
+# 创建全局IP定位器实例
+ip_locator = IPLocator(
+    api_key=settings.AMAP_API_KEY,
+    index=IPRangeIndex(settings.IP_DATABASE_PATH) if settings.IP_DATABASE_PATH else None,
+    ttl=settings.IP_LOCATION_CACHE_TTL,
+    maxsize=settings.IP_LOCATION_CACHE_SIZE
+)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+经纬度最近点查询模块
+
+把点按经纬度划入固定大小的网格，查询时从所在格子向外逐圈查找，
+已找到的最近距离小于下一圈可能的最小距离时即可停止，只需检查附近的少量点。
+"""
+
+import math
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+# 地球平均半径(千米)
+EARTH_RADIUS_KM = 6371.0088
+
+T = TypeVar("T")
+
+
+def distance_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """计算两点间的球面距离(haversine公式)
+
+    Args:
+        latitude1 (float): 第一个点的纬度
+        longitude1 (float): 第一个点的经度
+        latitude2 (float): 第二个点的纬度
+        longitude2 (float): 第二个点的经度
+
+    Returns:
+        float: 距离(千米)
+    """
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(longitude2 - longitude1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex(Generic[T]):
+    """经纬度网格索引
+
+    点按cell_degrees度划分网格。查询时从所在格子向外逐圈扩展，第r圈的点与查询点至少相隔(r - 1)个格子，
+    已找到的最近距离不超过这个下界时停止。候选点先用以查询点纬度缩放经度后的平面距离筛选，
+    与最近平面距离相差不到PLANAR_TOLERANCE的候选再用球面距离比较，结果与逐个计算球面距离一致。
+    """
+
+    # 几百千米内平面距离与球面距离的相对误差远小于该值
+    PLANAR_TOLERANCE = 1.03
+
+    def __init__(self, points: Iterable[Tuple[float, float, T]], cell_degrees: float = 0.5):
+        """建立索引
+
+        Args:
+            points (Iterable[Tuple[float, float, T]]): (纬度, 经度, 数据)
+            cell_degrees (float, optional): 格子大小(度). 默认为0.5.
+        """
+        self.cell_degrees = cell_degrees
+        # 行号 -> 列号 -> 格子内的点，空行直接跳过
+        self._rows: Dict[int, Dict[int, List[Tuple[float, float, T]]]] = {}
+        self._size = 0
+        for latitude, longitude, item in points:
+            row, column = self._cell(latitude, longitude)
+            self._rows.setdefault(row, {}).setdefault(column, []).append((latitude, longitude, item))
+            self._size += 1
+        # 有数据的格子的行列范围，决定查询最多需要扩展多少圈
+        rows = list(self._rows) or [0]
+        columns = [column for cells in self._rows.values() for column in cells] or [0]
+        self._bounds = (min(rows), max(rows), min(columns), max(columns))
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """点所在的格子"""
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def nearest(self, latitude: float, longitude: float,
+                max_distance_km: Optional[float] = None) -> Optional[Tuple[T, float]]:
+        """查找最近的点
+
+        Args:
+            latitude (float): 纬度
+            longitude (float): 经度
+            max_distance_km (Optional[float], optional): 最大距离(千米)，超过时视为没有. 默认为None表示不限.
+
+        Returns:
+            Optional[Tuple[T, float]]: (数据, 距离千米)，索引为空或超出最大距离时返回None
+        """
+        row, column = self._cell(latitude, longitude)
+        scale = max(math.cos(math.radians(latitude)), 0.01)
+        tolerance = self.PLANAR_TOLERANCE ** 2
+        # 距离上界和格子间隔都换算成缩放后的"度"
+        if max_distance_km is None:
+            limit_squared = math.inf
+        else:
+            limit_squared = (math.degrees(max_distance_km / EARTH_RADIUS_KM) * self.PLANAR_TOLERANCE) ** 2
+        ring_gap = self.cell_degrees * min(scale, 1.0)
+        best_squared = math.inf
+        candidates: List[Tuple[float, Tuple[float, float, T]]] = []
+        rows = self._rows
+
+        min_row, max_row, min_column, max_column = self._bounds
+        max_ring = max(abs(row - min_row), abs(row - max_row), abs(column - min_column), abs(column - max_column))
+        for ring in range(max_ring + 1):
+            if ring > 1 and ((ring - 1) * ring_gap) ** 2 >= min(best_squared * tolerance, limit_squared):
+                break
+            for current_row in range(row - ring, row + ring + 1):
+                cells = rows.get(current_row)
+                if cells is None:
+                    continue
+                if ring == 0 or current_row == row - ring or current_row == row + ring:
+                    columns = range(column - ring, column + ring + 1)
+                else:
+                    columns = (column - ring, column + ring)
+                for current_column in columns:
+                    cell = cells.get(current_column)
+                    if cell is None:
+                        continue
+                    for point in cell:
+                        dy = point[0] - latitude
+                        dx = (point[1] - longitude) * scale
+                        squared = dx * dx + dy * dy
+                        if squared <= best_squared * tolerance:
+                            candidates.append((squared, point))
+                            if squared < best_squared:
+                                best_squared = squared
+
+        best: Optional[Tuple[float, float, T]] = None
+        best_distance = math.inf
+        for squared, point in candidates:
+            if squared <= best_squared * tolerance:
+                distance = distance_km(latitude, longitude, point[0], point[1])
+                if distance < best_distance:
+                    best, best_distance = point, distance
+        if best is None or (max_distance_km is not None and best_distance > max_distance_km):
+            return None
+        return best[2], best_distance
+
+    def __len__(self) -> int:
+        return self._size
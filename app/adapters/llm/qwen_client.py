@@ -6,7 +6,11 @@
 """
 
 import json
-from typing import Dict, List, Any, Optional
+import asyncio
+from typing import Dict, List, Any, Optional, AsyncIterator
+
+import aiohttp
+
 from app.config import settings
 from app.common.exception import LLMException
 from app.common.logging.logger import log_manager
@@ -15,42 +19,23 @@ from app.adapters.prompts import load_prompt
 # 创建日志器
 logger = log_manager.get_logger("qwen_client")
 
-# 尝试导入dashscope，如果失败则使用模拟实现
-try:
-    from dashscope import Generation
-    DASHSCOPE_AVAILABLE = True
-    logger.info("成功导入dashscope库")
-except ImportError:
-    logger.warning("无法导入dashscope库，将使用模拟实现")
-    DASHSCOPE_AVAILABLE = False
-    
-    # 创建模拟的Generation类
-    class Generation:
-        @staticmethod
-        def call(model, **kwargs):
-            logger.warning("使用模拟的千问大模型实现")
-            # 返回模拟的响应
-            return {
-                "status_code": 200,
-                "output": {
-                    "text": json.dumps({
-                        "intent": "模拟意图",
-                        "confidence": 0.95,
-                        "action": "模拟动作",
-                        "slots": {
-                            "mock_slot": "模拟值"
-                        }
-                    }, ensure_ascii=False)
-                }
-            }
 
 class QwenClient:
-    """千问大模型客户端"""
+    """千问大模型客户端
+    
+    直接调用DashScope的HTTP接口，所有请求复用同一个长连接池的aiohttp会话，
+    不会阻塞事件循环。
+    """
     
     def __init__(self):
         """初始化千问客户端"""
         self.api_key = settings.DASHSCOPE_API_KEY
         self.model = settings.QWEN_MODEL_NAME
+        self.generation_url = (
+            f"{settings.DASHSCOPE_BASE_URL.rstrip('/')}/services/aigc/text-generation/generation"
+        )
+        self.timeout = aiohttp.ClientTimeout(total=settings.LLM_REQUEST_TIMEOUT)
+        self._session: Optional[aiohttp.ClientSession] = None
         
         if not self.api_key:
             logger.error("未配置DASHSCOPE_API_KEY，无法使用千问大模型服务")
@@ -58,6 +43,34 @@ class QwenClient:
         
         logger.info(f"千问大模型客户端初始化完成，使用模型: {self.model}")
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，首次使用时在当前事件循环中创建
+        
+        Returns:
+            aiohttp.ClientSession: 复用连接的HTTP会话
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.LLM_MAX_CONNECTIONS,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """关闭HTTP会话，释放连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("千问客户端连接池已关闭")
+        self._session = None
+    
     async def chat_completion(
         self, 
         messages: List[Dict[str, str]],
@@ -81,31 +94,34 @@ class QwenClient:
         """
         try:
             # 构建请求参数
-            request_params = {
+            payload = {
                 "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "result_format": result_format,
-                "api_key": self.api_key
+                "input": {"messages": messages},
+                "parameters": {
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "result_format": "text"
+                }
             }
             
             logger.debug(f"发送千问请求: {messages}")
             
             # 调用API
-            response = Generation.call(**request_params)
+            session = self._get_session()
+            async with session.post(self.generation_url, json=payload) as response:
+                body = await response.json(content_type=None)
             
             # 检查响应状态
-            if response.status_code != 200:
-                error_msg = f"千问API调用失败: {response.code}, {response.message}"
+            if response.status != 200:
+                error_msg = f"千问API调用失败: {body.get('code')}, {body.get('message')}"
                 logger.error(error_msg)
                 raise LLMException(error_msg)
             
             # 解析响应
             result = {
-                "content": response.output.text,
-                "usage": response.usage,
-                "request_id": response.request_id
+                "content": body.get("output", {}).get("text", ""),
+                "usage": body.get("usage", {}),
+                "request_id": body.get("request_id")
             }
             
             # 如果是JSON格式，尝试解析内容
@@ -129,11 +145,114 @@ class QwenClient:
             logger.debug(f"千问响应成功: {result}")
             return result
             
+        except LLMException:
+            raise
+        except asyncio.TimeoutError:
+            error_msg = f"调用千问API超时: 超过{settings.LLM_REQUEST_TIMEOUT}秒"
+            logger.error(error_msg)
+            raise LLMException(error_msg)
         except Exception as e:
             error_msg = f"调用千问API异常: {str(e)}"
             logger.error(error_msg)
             raise LLMException(error_msg)
     
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1500
+    ) -> AsyncIterator[str]:
+        """以SSE流式方式执行聊天补全请求，逐段返回增量文本
+        
+        Args:
+            messages (List[Dict[str, str]]): 消息列表
+            temperature (float, optional): 温度参数. 默认为0.7.
+            max_tokens (int, optional): 最大生成token数. 默认为1500.
+            
+        Yields:
+            str: 新生成的文本片段
+            
+        Raises:
+            LLMException: 调用大模型失败时抛出
+        """
+        payload = {
+            "model": self.model,
+            "input": {"messages": messages},
+            "parameters": {
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "result_format": "text",
+                "incremental_output": True
+            }
+        }
+        # 流式响应的总时长不可预知，只限制两次数据之间的间隔
+        stream_timeout = aiohttp.ClientTimeout(total=None, sock_read=settings.LLM_REQUEST_TIMEOUT)
+        
+        try:
+            logger.debug(f"发送千问流式请求: {messages}")
+            session = self._get_session()
+            async with session.post(
+                self.generation_url,
+                json=payload,
+                headers={"X-DashScope-SSE": "enable", "Accept": "text/event-stream"},
+                timeout=stream_timeout
+            ) as response:
+                if response.status != 200:
+                    body = await response.text()
+                    error_msg = f"千问流式API调用失败: HTTP {response.status}, {body[:200]}"
+                    logger.error(error_msg)
+                    raise LLMException(error_msg)
+                
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    chunk = json.loads(line[5:])
+                    if "output" not in chunk:
+                        error_msg = f"千问流式API返回错误: {chunk.get('code')}, {chunk.get('message')}"
+                        logger.error(error_msg)
+                        raise LLMException(error_msg)
+                    
+                    text = chunk["output"].get("text") or ""
+                    if text:
+                        yield text
+                        
+        except LLMException:
+            raise
+        except asyncio.TimeoutError:
+            error_msg = f"千问流式API超时: {settings.LLM_REQUEST_TIMEOUT}秒内未收到数据"
+            logger.error(error_msg)
+            raise LLMException(error_msg)
+        except Exception as e:
+            error_msg = f"调用千问流式API异常: {str(e)}"
+            logger.error(error_msg)
+            raise LLMException(error_msg)
+    
+    async def stream_chat_reply(
+        self,
+        text: str,
+        message_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """流式生成面向语音播报的对话回复
+        
+        Args:
+            text (str): 用户文本
+            message_history (Optional[List[Dict[str, str]]], optional): 消息历史，
+                如果最后一条已是当前用户消息则不再重复添加. 默认为None.
+            
+        Yields:
+            str: 回复文本片段
+        """
+        messages = [{"role": "system", "content": self._get_chat_system_prompt()}]
+        if message_history:
+            messages.extend(message_history)
+        if not message_history or message_history[-1].get("content") != text:
+            messages.append({"role": "user", "content": text})
+        
+        async for delta in self.stream_chat_completion(messages, temperature=0.7):
+            yield delta
+    
     async def intent_recognition(
         self, 
         text: str,
@@ -192,6 +311,8 @@ class QwenClient:
                     }
                 }
             
+            # 附带token用量，便于调用方统计成本
+            content.setdefault("usage", result.get("usage", {}))
             return content
         except Exception as e:
             logger.error(f"意图识别失败: {str(e)}")
@@ -220,6 +341,18 @@ class QwenClient:
             # 如果文件不存在，返回一个简化版的系统提示
             return "你是一个专业的语音助手意图识别系统。分析用户输入，识别意图类型并返回JSON格式的响应。"
     
+    def _get_chat_system_prompt(self) -> str:
+        """获取对话回复的系统提示
+        
+        Returns:
+            str: 系统提示文本
+        """
+        try:
+            return load_prompt("chat_prompt.txt")
+        except FileNotFoundError as e:
+            logger.error(f"加载对话回复系统提示模板失败: {str(e)}")
+            return "你是一个友好的语音助手，请用简洁自然的口语化中文回复用户。"
+    
     def _get_intent_user_prompt(
         self, 
         text: str, 
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+带进程内一级缓存的意图仓储模块
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.domain.entity.intent import Intent, IntentType
+from app.domain.repository.intent_repository import IntentRepository, SimilarIntent
+from app.common.utils.text_utils import normalize_text
+from app.common.utils.ttl_cache import TTLCache
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("cached_repository")
+
+# 缓存"数据库中不存在"的结果，避免热门的未收录文本每次都查询数据库
+_NOT_FOUND = object()
+
+
+class CachedIntentRepository(IntentRepository):
+    """在任意意图仓储前加一层LRU+TTL内存缓存
+
+    find_by_text优先读缓存，包括未找到的结果；save先写入下层仓储，再用新意图更新缓存。
+    多进程部署时其他进程写入的记录最迟在ttl后可见。
+    """
+
+    def __init__(self, repository: IntentRepository, maxsize: int = 10000, ttl: float = 600):
+        """初始化
+
+        Args:
+            repository (IntentRepository): 下层仓储
+            maxsize (int, optional): 缓存最大条目数. 默认为10000.
+            ttl (float, optional): 缓存条目存活时间(秒). 默认为600.
+        """
+        self.repository = repository
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        logger.info(f"意图仓储一级缓存已启用，容量: {maxsize}，TTL: {ttl}秒")
+
+    async def save(self, intent: Intent, context_key: str = "") -> None:
+        """保存意图记录并更新缓存
+
+        Args:
+            intent (Intent): 意图实体
+            context_key (str, optional): 上下文指纹. 默认为"".
+        """
+        await self.repository.save(intent, context_key)
+        # 大模型的完整结果(含回复)只属于本次请求，不能随缓存返回给其他会话
+        self.cache.set(self._cache_key(intent.text, context_key), intent.model_copy(update={"llm_result": None}))
+
+    async def find_by_text(self, text: str, context_key: str = "") -> Optional[Intent]:
+        """根据规范化文本和上下文指纹查找意图，优先读缓存
+
+        Args:
+            text (str): 文本内容
+            context_key (str, optional): 上下文指纹. 默认为"".
+
+        Returns:
+            Optional[Intent]: 意图实体，如果不存在则返回None
+        """
+        key = self._cache_key(text, context_key)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+
+        intent = await self.repository.find_by_text(text, context_key)
+        self.cache.set(key, intent if intent is not None else _NOT_FOUND)
+        return intent
+
+    async def find_recent(self, limit: int = 10) -> List[Intent]:
+        """查询最近的意图记录，直接读取下层仓储
+
+        Args:
+            limit (int, optional): 返回记录数量限制. 默认为10.
+
+        Returns:
+            List[Intent]: 意图记录列表
+        """
+        return await self.repository.find_recent(limit)
+
+    async def find_labelled(self, min_confidence: float, limit: int) -> List[Tuple[str, IntentType]]:
+        """查询与上下文无关、置信度不低于min_confidence的记录，直接读取下层仓储
+
+        Args:
+            min_confidence (float): 最低置信度
+            limit (int): 返回记录数量限制
+
+        Returns:
+            List[Tuple[str, IntentType]]: (文本, 意图类型)，最近出现的在前
+        """
+        return await self.repository.find_labelled(min_confidence, limit)
+
+    async def find_similar(self, text: str) -> Optional[SimilarIntent]:
+        """查找与文本最相似的历史记录，直接读取下层仓储
+
+        Args:
+            text (str): 文本内容
+
+        Returns:
+            Optional[SimilarIntent]: 最相似的记录文本、意图类型和相似度，没有时返回None
+        """
+        return await self.repository.find_similar(text)
+
+    async def close(self) -> None:
+        """释放下层仓储的资源"""
+        await self.repository.close()
+
+    def get_cache_info(self, sample_size: int = 20) -> Dict[str, Any]:
+        """获取缓存统计和最近使用的键
+
+        Args:
+            sample_size (int, optional): 返回的键数量. 默认为20.
+
+        Returns:
+            Dict[str, Any]: 缓存信息
+        """
+        info = self.cache.stats()
+        info["recent_keys"] = [
+            {"text": text, "context_key": context_key}
+            for text, context_key in self.cache.keys(sample_size)
+        ]
+        return info
+
+    def flush_cache(self) -> int:
+        """清空缓存
+
+        Returns:
+            int: 清除的条目数
+        """
+        flushed = self.cache.clear()
+        logger.info(f"意图仓储一级缓存已清空，共{flushed}条")
+        return flushed
+
+    @staticmethod
+    def _cache_key(text: str, context_key: str) -> tuple:
+        """计算缓存键，与数据库查找键一致
+
+        Args:
+            text (str): 文本内容
+            context_key (str): 上下文指纹
+
+        Returns:
+            tuple: (规范化文本, 上下文指纹)
+        """
+        return normalize_text(text), context_key
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+数据库专用线程池模块
+
+仓储使用同步驱动(pg8000、sqlite3)，直接在事件循环中执行查询会阻塞所有并发请求。
+这里为每个仓储提供独立的线程池和与之等大的连接池，同步的数据库操作在线程池中执行，
+事件循环只等待结果。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("db_executor")
+
+T = TypeVar("T")
+
+
+def create_pooled_engine(url: str, pool_size: int) -> Engine:
+    """创建连接池大小与线程池一致的数据库引擎
+    
+    连接数等于线程数，线程拿连接时不会排队，也不会超出数据库的连接配额。
+    
+    Args:
+        url (str): 数据库地址
+        pool_size (int): 连接池大小
+        
+    Returns:
+        Engine: 数据库引擎
+    """
+    return create_engine(url, pool_size=pool_size, max_overflow=0, pool_pre_ping=True)
+
+
+class DatabaseExecutor:
+    """在专用线程池中执行同步数据库操作"""
+    
+    def __init__(self, max_workers: int, name: str):
+        """初始化
+        
+        Args:
+            max_workers (int): 线程数
+            name (str): 线程名前缀
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        logger.info(f"数据库线程池已创建: {name}，线程数: {max_workers}")
+    
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在线程池中执行同步函数并等待结果
+        
+        Args:
+            func (Callable[..., T]): 同步函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+            
+        Returns:
+            T: 函数返回值
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+    
+    def shutdown(self) -> None:
+        """等待进行中的操作完成后关闭线程池"""
+        self._executor.shutdown(wait=True)
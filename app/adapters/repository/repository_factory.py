@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图仓储工厂模块
+"""
+
+from app.config import settings
+from app.domain.repository.intent_repository import IntentRepository
+
+
+def create_intent_repository() -> IntentRepository:
+    """根据DATABASE_URL创建对应的意图仓储实现
+    
+    INTENT_WRITE_BEHIND_ENABLED时，保存改为后台批量写入；INTENT_SIMILAR_ENABLED时，
+    加一个按相似说法查找的内存索引；INTENT_CACHE_MAX_SIZE大于0时，最外层再加一层进程内缓存。
+    
+    Returns:
+        IntentRepository: sqlite地址使用SQLite仓储，其他使用PostgreSQL仓储
+    """
+    if settings.DATABASE_URL.startswith("sqlite"):
+        from app.adapters.repository.sqlite_repository import SQLiteIntentRepository
+        repository: IntentRepository = SQLiteIntentRepository()
+    else:
+        from app.adapters.repository.postgres_repository import PostgresIntentRepository
+        repository = PostgresIntentRepository()
+    
+    if settings.INTENT_WRITE_BEHIND_ENABLED:
+        from app.adapters.repository.write_behind_repository import WriteBehindIntentRepository
+        repository = WriteBehindIntentRepository(
+            repository,
+            batch_size=settings.INTENT_WRITE_BATCH_SIZE,
+            flush_interval=settings.INTENT_WRITE_FLUSH_INTERVAL_MS / 1000,
+            max_pending=settings.INTENT_WRITE_QUEUE_SIZE
+        )
+    
+    if settings.INTENT_SIMILAR_ENABLED and settings.INTENT_SIMILAR_MAX_SIZE > 0:
+        from app.adapters.repository.similar_repository import SimilarIntentRepository
+        repository = SimilarIntentRepository(
+            repository,
+            maxsize=settings.INTENT_SIMILAR_MAX_SIZE,
+            min_confidence=settings.INTENT_SIMILAR_MIN_CONFIDENCE
+        )
+    
+    if settings.INTENT_CACHE_MAX_SIZE > 0:
+        from app.adapters.repository.cached_repository import CachedIntentRepository
+        repository = CachedIntentRepository(
+            repository,
+            maxsize=settings.INTENT_CACHE_MAX_SIZE,
+            ttl=settings.INTENT_CACHE_TTL
+        )
+    return repository
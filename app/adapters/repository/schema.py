@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图记录表结构升级模块
+
+create_all只会创建缺失的表，不会为已有的表补列和索引。这里在仓储初始化时
+补齐新增的列，为历史记录回填规范化文本和文本哈希，合并重复记录后再建唯一索引。
+"""
+
+from typing import List
+
+from sqlalchemy import Table, bindparam, delete, func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+
+from app.common.utils.text_utils import normalize_text, text_hash
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("repository_schema")
+
+# 回填的批大小
+BACKFILL_BATCH_SIZE = 1000
+
+# 已被(text_hash, context_key)唯一索引取代的旧索引
+OBSOLETE_INDEXES = ("ix_intent_records_lookup",)
+
+
+def upgrade_intent_table(engine: Engine, table: Table) -> List[str]:
+    """补齐意图记录表缺失的列和索引
+
+    唯一索引缺失时说明迁移尚未完成(包括上次迁移中途退出)，先回填查找键并合并重复记录，
+    否则建唯一索引会因历史重复记录失败。
+
+    Args:
+        engine (Engine): 数据库引擎
+        table (Table): 模型对应的表定义
+
+    Returns:
+        List[str]: 本次新增的列名
+    """
+    inspector = inspect(engine)
+    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+    existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+
+    added = []
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            default = ""
+            if column.server_default is not None:
+                default = f" DEFAULT '{column.server_default.arg}'"
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}"))
+            added.append(column.name)
+            logger.info(f"意图记录表新增列: {column.name}")
+
+    missing_indexes = [index for index in table.indexes if index.name not in existing_indexes]
+    if any(index.unique for index in missing_indexes):
+        backfill_lookup_keys(engine, table)
+        collapse_duplicates(engine, table)
+
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            if name in existing_indexes:
+                conn.execute(text(f"DROP INDEX {name}"))
+                logger.info(f"意图记录表删除旧索引: {name}")
+
+        for index in missing_indexes:
+            index.create(conn, checkfirst=True)
+            logger.info(f"意图记录表新增索引: {index.name}")
+
+    return added
+
+
+def backfill_lookup_keys(engine: Engine, table: Table) -> int:
+    """为缺少文本哈希的历史记录分批回填规范化文本、文本哈希和最后出现时间
+
+    Args:
+        engine (Engine): 数据库引擎
+        table (Table): 意图记录表
+
+    Returns:
+        int: 回填的记录数
+    """
+    columns = table.c
+    stmt = (
+        update(table)
+        .where(columns.id == bindparam("_id"))
+        .values(
+            normalized_text=bindparam("_normalized_text"),
+            text_hash=bindparam("_text_hash"),
+            last_seen=func.coalesce(columns.last_seen, columns.created_at)
+        )
+    )
+
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(columns.id, columns.text, columns.normalized_text)
+                .where(columns.text_hash.is_(None))
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+
+            params = []
+            for row in rows:
+                normalized = row.normalized_text if row.normalized_text is not None else normalize_text(row.text)
+                params.append({
+                    "_id": row.id,
+                    "_normalized_text": normalized,
+                    "_text_hash": text_hash(normalized)
+                })
+            conn.execute(stmt, params)
+            total += len(rows)
+
+    if total:
+        logger.info(f"已为{total}条历史意图记录回填查找键")
+    return total
+
+
+def collapse_duplicates(engine: Engine, table: Table) -> int:
+    """合并查找键(text_hash, context_key)相同的重复记录
+
+    每组保留最新的一条，命中次数累加，最后出现时间取最大值。
+
+    Args:
+        engine (Engine): 数据库引擎
+        table (Table): 意图记录表
+
+    Returns:
+        int: 删除的记录数
+    """
+    columns = table.c
+    removed = 0
+    with engine.begin() as conn:
+        groups = conn.execute(
+            select(
+                columns.text_hash,
+                columns.context_key,
+                func.max(columns.id).label("keep_id"),
+                func.sum(func.coalesce(columns.hit_count, 1)).label("hit_count"),
+                func.max(func.coalesce(columns.last_seen, columns.created_at)).label("last_seen")
+            )
+            .where(columns.text_hash.isnot(None))
+            .group_by(columns.text_hash, columns.context_key)
+            .having(func.count() > 1)
+        ).all()
+
+        for group in groups:
+            conn.execute(
+                update(table)
+                .where(columns.id == group.keep_id)
+                .values(hit_count=group.hit_count, last_seen=group.last_seen)
+            )
+            result = conn.execute(
+                delete(table).where(
+                    columns.text_hash == group.text_hash,
+                    columns.context_key == group.context_key,
+                    columns.id != group.keep_id
+                )
+            )
+            removed += result.rowcount
+
+    if removed:
+        logger.info(f"已合并{len(groups)}组重复意图记录，删除{removed}条")
+    return removed
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+支持近似查找的意图仓储模块
+"""
+
+import asyncio
+from typing import Iterable, List, Optional, Tuple
+
+from app.domain.entity.intent import Intent, IntentType
+from app.domain.repository.intent_repository import IntentRepository, SimilarIntent
+from app.common.config.intent_keywords import FILLER_WORDS
+from app.common.utils.minhash import MinHashIndex
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("similar_repository")
+
+# 从数据库加载索引时每批的条数，每批在线程池中计算，避免长时间占用事件循环
+LOAD_BATCH_SIZE = 10000
+
+
+class SimilarIntentRepository(IntentRepository):
+    """在任意意图仓储前加一个MinHash/LSH内存索引，按相似说法查找意图类型
+
+    索引只收录与上下文无关、置信度不低于min_confidence的记录。首次使用时在后台从下层仓储加载最近的
+    maxsize条记录，之后save的记录增量加入；超过maxsize后覆盖最早的，内存固定。
+    加载完成前find_similar只能查到已加入的部分。
+    """
+
+    def __init__(self, repository: IntentRepository, maxsize: int = 100000, min_confidence: float = 0.9,
+                 exclude: Iterable[IntentType] = (IntentType.CHAT, IntentType.UNKNOWN)):
+        """初始化
+
+        Args:
+            repository (IntentRepository): 下层仓储
+            maxsize (int, optional): 索引最大条目数. 默认为100000.
+            min_confidence (float, optional): 加入索引的最低置信度. 默认为0.9.
+            exclude (Iterable[IntentType], optional): 不加入索引的意图类型，默认为需要大模型生成回复的
+                闲聊和未知意图. 默认为(IntentType.CHAT, IntentType.UNKNOWN).
+        """
+        self.repository = repository
+        self.min_confidence = min_confidence
+        self.exclude = frozenset(exclude)
+        self.index = MinHashIndex(maxsize, ignore=FILLER_WORDS)
+        self._loader: Optional[asyncio.Task] = None
+        logger.info(f"意图近似查找已启用，索引容量: {maxsize}，最低置信度: {min_confidence}")
+
+    async def save(self, intent: Intent, context_key: str = "") -> None:
+        """保存意图记录，满足条件时加入索引
+
+        Args:
+            intent (Intent): 意图实体
+            context_key (str, optional): 上下文指纹. 默认为"".
+        """
+        await self.repository.save(intent, context_key)
+        self._ensure_loader()
+        if not context_key and intent.confidence >= self.min_confidence and intent.type not in self.exclude:
+            self.index.add(intent.text, intent.type)
+
+    async def save_many(self, items: List[Tuple[Intent, str]]) -> None:
+        """批量保存意图记录，满足条件的加入索引
+
+        Args:
+            items (List[Tuple[Intent, str]]): (意图实体, 上下文指纹)列表
+        """
+        await self.repository.save_many(items)
+        self._ensure_loader()
+        for intent, context_key in items:
+            if not context_key and intent.confidence >= self.min_confidence and intent.type not in self.exclude:
+                self.index.add(intent.text, intent.type)
+
+    async def find_by_text(self, text: str, context_key: str = "") -> Optional[Intent]:
+        """根据规范化文本和上下文指纹查找意图，直接读取下层仓储
+
+        Args:
+            text (str): 文本内容
+            context_key (str, optional): 上下文指纹. 默认为"".
+
+        Returns:
+            Optional[Intent]: 意图实体，如果不存在则返回None
+        """
+        return await self.repository.find_by_text(text, context_key)
+
+    async def find_recent(self, limit: int = 10) -> List[Intent]:
+        """查询最近的意图记录，直接读取下层仓储
+
+        Args:
+            limit (int, optional): 返回记录数量限制. 默认为10.
+
+        Returns:
+            List[Intent]: 意图记录列表
+        """
+        return await self.repository.find_recent(limit)
+
+    async def find_labelled(self, min_confidence: float, limit: int) -> List[Tuple[str, IntentType]]:
+        """查询与上下文无关、置信度不低于min_confidence的记录，直接读取下层仓储
+
+        Args:
+            min_confidence (float): 最低置信度
+            limit (int): 返回记录数量限制
+
+        Returns:
+            List[Tuple[str, IntentType]]: (文本, 意图类型)，最近出现的在前
+        """
+        return await self.repository.find_labelled(min_confidence, limit)
+
+    async def find_similar(self, text: str) -> Optional[SimilarIntent]:
+        """在索引中查找最相似的记录
+
+        Args:
+            text (str): 文本内容
+
+        Returns:
+            Optional[SimilarIntent]: 最相似的记录文本、意图类型和相似度，没有时返回None
+        """
+        self._ensure_loader()
+        match = self.index.query(text)
+        if match is None:
+            return None
+        return SimilarIntent(match.text, match.value, match.similarity)
+
+    async def close(self) -> None:
+        """停止后台加载，并释放下层仓储的资源"""
+        if self._loader is not None and not self._loader.done():
+            self._loader.cancel()
+            try:
+                await self._loader
+            except asyncio.CancelledError:
+                pass
+        await self.repository.close()
+
+    def _ensure_loader(self) -> None:
+        """首次使用时在当前事件循环中启动后台加载"""
+        if self._loader is None:
+            self._loader = asyncio.create_task(self._load())
+
+    async def _load(self) -> None:
+        """从下层仓储加载最近的记录，按从旧到新的顺序分批加入索引"""
+        try:
+            rows = await self.repository.find_labelled(self.min_confidence, self.index.capacity)
+        except Exception as e:
+            logger.error(f"加载近似查找索引失败: {str(e)}")
+            return
+
+        rows = [(text, intent_type) for text, intent_type in reversed(rows) if intent_type not in self.exclude]
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(rows), LOAD_BATCH_SIZE):
+            await loop.run_in_executor(None, self.index.add_many, rows[start:start + LOAD_BATCH_SIZE])
+        logger.info(f"近似查找索引已加载{len(rows)}条历史记录，当前共{len(self.index)}条")
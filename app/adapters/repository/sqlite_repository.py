@@ -5,22 +5,30 @@
 SQLite仓储实现模块
 """
 
+import asyncio
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Text, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.future import select
+from sqlalchemy.dialects.sqlite import insert
 
 from app.config import settings
 from app.domain.entity.intent import Intent, IntentType
 from app.domain.repository.intent_repository import IntentRepository
+from app.adapters.repository.schema import upgrade_intent_table
+from app.adapters.repository.db_executor import DatabaseExecutor, create_pooled_engine
+from app.common.utils.text_utils import normalize_text, text_hash
 from app.common.logging.logger import log_manager
 
 # 创建日志器
 logger = log_manager.get_logger("sqlite_repository")
 
+# 每条多行插入语句的最大行数，旧版SQLite单条语句最多999个参数
+MAX_ROWS_PER_STATEMENT = 80
+
 # 创建SQLAlchemy基类
 Base = declarative_base()
 
@@ -36,6 +44,15 @@ class IntentRecord(Base):
     text = Column(Text, nullable=False)
     entities = Column(Text, nullable=False)  # 存储为JSON字符串
     created_at = Column(DateTime, default=datetime.now)
+    normalized_text = Column(Text, nullable=True)  # 规范化文本，读取时校验哈希碰撞
+    context_key = Column(String(16), nullable=False, default="", server_default="")  # 上下文指纹
+    text_hash = Column(BigInteger, nullable=True)  # 规范化文本的64位哈希，缓存查找键
+    hit_count = Column(Integer, nullable=False, default=1, server_default="1")  # 同一查找键被保存的次数
+    last_seen = Column(DateTime, default=datetime.now)  # 最后一次保存的时间
+    
+    __table_args__ = (
+        Index("ux_intent_records_text_hash", "text_hash", "context_key", unique=True),
+    )
 
 
 class SQLiteIntentRepository(IntentRepository):
@@ -43,62 +60,51 @@ class SQLiteIntentRepository(IntentRepository):
     
     def __init__(self):
         """初始化SQLite仓储"""
-        # 创建数据库引擎
-        self.engine = create_engine(settings.DATABASE_URL)
+        # 创建数据库引擎，连接池与线程池等大
+        self.engine = create_pooled_engine(settings.DATABASE_URL, settings.DB_POOL_SIZE)
+        self.executor = DatabaseExecutor(settings.DB_POOL_SIZE, "sqlite-repository")
         
         # 创建表
         Base.metadata.create_all(self.engine)
+        upgrade_intent_table(self.engine, IntentRecord.__table__)
         
         # 创建会话工厂
         self.Session = sessionmaker(bind=self.engine)
         logger.info("SQLite意图仓储初始化完成")
     
-    async def save(self, intent: Intent) -> None:
+    async def save(self, intent: Intent, context_key: str = "") -> None:
         """保存意图记录
+        
+        查找键(text_hash, context_key)已存在时覆盖为最新的识别结果，命中次数加1并更新最后出现时间。
 
         Args:
             intent (Intent): 意图实体
+            context_key (str, optional): 上下文指纹. 默认为"".
         """
-        with self.Session() as session:
-            # 创建记录
-            record = IntentRecord(
-                intent_type=intent.type.value,
-                confidence=intent.confidence,
-                text=intent.text,
-                entities=json.dumps(intent.entities, ensure_ascii=False)
-            )
-            
-            # 添加并提交
-            session.add(record)
-            session.commit()
-            logger.debug(f"保存意图记录成功: {intent.text}")
+        await self.executor.run(self._save, intent, context_key)
+    
+    async def save_many(self, items: List[Tuple[Intent, str]]) -> None:
+        """在一个事务中用多行upsert批量保存意图记录
+
+        Args:
+            items (List[Tuple[Intent, str]]): (意图实体, 上下文指纹)列表
+        """
+        if items:
+            await self.executor.run(self._save_many, items)
     
-    async def find_by_text(self, text: str) -> Optional[Intent]:
-        """根据文本查找意图
+    async def find_by_text(self, text: str, context_key: str = "") -> Optional[Intent]:
+        """根据规范化文本和上下文指纹查找意图
+        
+        按(text_hash, context_key)唯一索引定位，耗时与表的大小无关；命中后校验规范化文本，排除哈希碰撞。
 
         Args:
             text (str): 文本内容
+            context_key (str, optional): 上下文指纹. 默认为"".
 
         Returns:
             Optional[Intent]: 意图实体，如果不存在则返回None
         """
-        with self.Session() as session:
-            # 查询记录
-            stmt = select(IntentRecord).where(IntentRecord.text == text)
-            result = session.execute(stmt).scalars().first()
-            
-            # 如果找到记录，转换为实体
-            if result:
-                logger.debug(f"找到匹配文本的意图记录: {text}")
-                return Intent(
-                    type=IntentType(result.intent_type),
-                    confidence=result.confidence,
-                    text=result.text,
-                    entities=json.loads(result.entities)
-                )
-            
-            logger.debug(f"未找到匹配文本的意图记录: {text}")
-            return None
+        return await self.executor.run(self._find_by_text, text, context_key)
     
     async def find_recent(self, limit: int = 10) -> List[Intent]:
         """查询最近的意图记录
@@ -109,113 +115,90 @@ class SQLiteIntentRepository(IntentRepository):
         Returns:
             List[Intent]: 意图记录列表
         """
-        with self.Session() as session:
-            # 查询最近记录
-            stmt = select(IntentRecord).order_by(IntentRecord.created_at.desc()).limit(limit)
-            results = session.execute(stmt).scalars().all()
-            
-            # 转换为实体列表
-            intents = [
-                Intent(
-                    type=IntentType(record.intent_type),
-                    confidence=record.confidence,
-                    text=record.text,
-                    entities=json.loads(record.entities)
-                )
-                for record in results
-            ]
-            
-            logger.debug(f"查询到{len(intents)}条最近意图记录")
-            return intents
-#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-
-"""
-SQLite仓储实现模块
-"""
-
-import json
-from typing import List, Optional
-from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, DateTime
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.future import select
-
-from app.config import settings
-from app.domain.entity.intent import Intent, IntentType
-from app.domain.repository.intent_repository import IntentRepository
-from app.common.logging.logger import log_manager
-
-# 创建日志器
-logger = log_manager.get_logger("sqlite_repository")
-
-# 创建SQLAlchemy基类
-Base = declarative_base()
+        return await self.executor.run(self._find_recent, limit)
+    
+    async def find_labelled(self, min_confidence: float, limit: int) -> List[Tuple[str, IntentType]]:
+        """查询与上下文无关、置信度不低于min_confidence的记录
 
+        Args:
+            min_confidence (float): 最低置信度
+            limit (int): 返回记录数量限制
 
-class IntentRecord(Base):
-    """意图记录表模型"""
+        Returns:
+            List[Tuple[str, IntentType]]: (文本, 意图类型)，最近出现的在前
+        """
+        return await self.executor.run(self._find_labelled, min_confidence, limit)
     
-    __tablename__ = "intent_records"
+    async def close(self) -> None:
+        """关闭数据库线程池和连接池"""
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        self.engine.dispose()
+        logger.info("SQLite意图仓储已关闭")
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    intent_type = Column(String(50), nullable=False, index=True)
-    confidence = Column(Float, nullable=False)
-    text = Column(Text, nullable=False)
-    entities = Column(Text, nullable=False)  # 存储为JSON字符串
-    created_at = Column(DateTime, default=datetime.now)
-
-
-class SQLiteIntentRepository(IntentRepository):
-    """SQLite意图仓储实现"""
+    def _save(self, intent: Intent, context_key: str = "") -> None:
+        """save的同步实现，在数据库线程池中执行"""
+        self._save_many([(intent, context_key)])
+        logger.debug(f"保存意图记录成功: {intent.text}")
     
-    def __init__(self):
-        """初始化SQLite仓储"""
-        # 创建数据库引擎
-        self.engine = create_engine(settings.DATABASE_URL)
-        
-        # 创建表
-        Base.metadata.create_all(self.engine)
+    def _save_many(self, items: List[Tuple[Intent, str]]) -> None:
+        """save_many的同步实现，在数据库线程池中执行
         
-        # 创建会话工厂
-        self.Session = sessionmaker(bind=self.engine)
-        logger.info("SQLite意图仓储初始化完成")
-    
-    async def save(self, intent: Intent) -> None:
-        """保存意图记录
-
-        Args:
-            intent (Intent): 意图实体
+        同一批中查找键相同的记录先在内存中合并(同一条upsert语句不能两次更新同一行)，
+        保留最后一条，命中次数取批内出现次数。
         """
-        with self.Session() as session:
-            # 创建记录
-            record = IntentRecord(
+        now = datetime.now()
+        rows: Dict[Tuple[int, str], dict] = {}
+        for intent, context_key in items:
+            normalized = normalize_text(intent.text)
+            key = (text_hash(normalized), context_key)
+            hit_count = rows[key]["hit_count"] + 1 if key in rows else 1
+            rows[key] = dict(
                 intent_type=intent.type.value,
                 confidence=intent.confidence,
                 text=intent.text,
-                entities=json.dumps(intent.entities, ensure_ascii=False)
+                normalized_text=normalized,
+                text_hash=key[0],
+                context_key=context_key,
+                entities=json.dumps(intent.entities, ensure_ascii=False),
+                created_at=now,
+                last_seen=now,
+                hit_count=hit_count
             )
-            
-            # 添加并提交
-            session.add(record)
+        
+        values = list(rows.values())
+        with self.Session() as session:
+            for offset in range(0, len(values), MAX_ROWS_PER_STATEMENT):
+                stmt = insert(IntentRecord).values(values[offset:offset + MAX_ROWS_PER_STATEMENT])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[IntentRecord.text_hash, IntentRecord.context_key],
+                    set_={
+                        "intent_type": stmt.excluded.intent_type,
+                        "confidence": stmt.excluded.confidence,
+                        "text": stmt.excluded.text,
+                        "normalized_text": stmt.excluded.normalized_text,
+                        "entities": stmt.excluded.entities,
+                        "last_seen": stmt.excluded.last_seen,
+                        "hit_count": IntentRecord.hit_count + stmt.excluded.hit_count
+                    }
+                )
+                session.execute(stmt)
             session.commit()
-            logger.debug(f"保存意图记录成功: {intent.text}")
     
-    async def find_by_text(self, text: str) -> Optional[Intent]:
-        """根据文本查找意图
-
-        Args:
-            text (str): 文本内容
-
-        Returns:
-            Optional[Intent]: 意图实体，如果不存在则返回None
-        """
+    def _find_by_text(self, text: str, context_key: str = "") -> Optional[Intent]:
+        """find_by_text的同步实现，在数据库线程池中执行"""
+        normalized = normalize_text(text)
         with self.Session() as session:
             # 查询记录
-            stmt = select(IntentRecord).where(IntentRecord.text == text)
+            stmt = select(IntentRecord).where(
+                IntentRecord.text_hash == text_hash(normalized),
+                IntentRecord.context_key == context_key
+            )
             result = session.execute(stmt).scalars().first()
             
+            if result and result.normalized_text != normalized:
+                logger.warning(f"意图记录哈希碰撞: {text} / {result.text}")
+                result = None
+            
             # 如果找到记录，转换为实体
             if result:
                 logger.debug(f"找到匹配文本的意图记录: {text}")
@@ -229,15 +212,8 @@ class SQLiteIntentRepository(IntentRepository):
             logger.debug(f"未找到匹配文本的意图记录: {text}")
             return None
     
-    async def find_recent(self, limit: int = 10) -> List[Intent]:
-        """查询最近的意图记录
-
-        Args:
-            limit (int, optional): 返回记录数量限制. 默认为10.
-
-        Returns:
-            List[Intent]: 意图记录列表
-        """
+    def _find_recent(self, limit: int = 10) -> List[Intent]:
+        """find_recent的同步实现，在数据库线程池中执行"""
         with self.Session() as session:
             # 查询最近记录
             stmt = select(IntentRecord).order_by(IntentRecord.created_at.desc()).limit(limit)
@@ -256,3 +232,16 @@ class SQLiteIntentRepository(IntentRepository):
             
             logger.debug(f"查询到{len(intents)}条最近意图记录")
             return intents
+    
+    def _find_labelled(self, min_confidence: float, limit: int) -> List[Tuple[str, IntentType]]:
+        """find_labelled的同步实现，在数据库线程池中执行"""
+        with self.Session() as session:
+            stmt = (
+                select(IntentRecord.text, IntentRecord.intent_type)
+                .where(IntentRecord.context_key == "", IntentRecord.confidence >= min_confidence)
+                .order_by(IntentRecord.last_seen.desc())
+                .limit(limit)
+            )
+            rows = session.execute(stmt).all()
+            logger.debug(f"查询到{len(rows)}条可用于近似查找的意图记录")
+            return [(text, IntentType(intent_type)) for text, intent_type in rows]
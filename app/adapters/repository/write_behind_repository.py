@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步批量写入的意图仓储模块
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.domain.entity.intent import Intent, IntentType
+from app.domain.repository.intent_repository import IntentRepository
+from app.common.utils.text_utils import normalize_text
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("write_behind_repository")
+
+
+class WriteBehindIntentRepository(IntentRepository):
+    """把save放入有界队列，由后台任务攒批后一次写入下层仓储
+
+    每攒够batch_size条或距本批第一条超过flush_interval秒就调用一次save_many。
+    队列满时save会等待，对请求形成背压，而不是无限占用内存。
+    尚未落库的记录可以通过find_by_text读到。
+    """
+
+    def __init__(self, repository: IntentRepository, batch_size: int = 100,
+                 flush_interval: float = 0.05, max_pending: int = 10000):
+        """初始化
+
+        Args:
+            repository (IntentRepository): 下层仓储
+            batch_size (int, optional): 每批最大条数. 默认为100.
+            flush_interval (float, optional): 最长攒批时间(秒). 默认为0.05.
+            max_pending (int, optional): 队列容量. 默认为10000.
+        """
+        self.repository = repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Dict[Tuple[str, str], Intent] = {}
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "failed": 0}
+        logger.info(f"意图异步批量写入已启用，批大小: {batch_size}，间隔: {flush_interval}秒，队列容量: {max_pending}")
+
+    async def save(self, intent: Intent, context_key: str = "") -> None:
+        """把意图记录放入写入队列，队列满时等待
+
+        Args:
+            intent (Intent): 意图实体
+            context_key (str, optional): 上下文指纹. 默认为"".
+        """
+        queue = self._ensure_worker()
+        # 未落库的记录会被其他请求读到，不保留本次请求的大模型结果
+        intent = intent.model_copy(update={"llm_result": None})
+        self._pending[self._pending_key(intent.text, context_key)] = intent
+        self.stats["enqueued"] += 1
+        await queue.put((intent, context_key))
+
+    async def find_by_text(self, text: str, context_key: str = "") -> Optional[Intent]:
+        """查找意图，优先返回尚未落库的记录
+
+        Args:
+            text (str): 文本内容
+            context_key (str, optional): 上下文指纹. 默认为"".
+
+        Returns:
+            Optional[Intent]: 意图实体，如果不存在则返回None
+        """
+        pending = self._pending.get(self._pending_key(text, context_key))
+        if pending is not None:
+            return pending
+        return await self.repository.find_by_text(text, context_key)
+
+    async def find_recent(self, limit: int = 10) -> List[Intent]:
+        """查询最近的意图记录，直接读取下层仓储
+
+        Args:
+            limit (int, optional): 返回记录数量限制. 默认为10.
+
+        Returns:
+            List[Intent]: 意图记录列表
+        """
+        return await self.repository.find_recent(limit)
+
+    async def find_labelled(self, min_confidence: float, limit: int) -> List[Tuple[str, IntentType]]:
+        """查询与上下文无关、置信度不低于min_confidence的记录，直接读取下层仓储
+
+        Args:
+            min_confidence (float): 最低置信度
+            limit (int): 返回记录数量限制
+
+        Returns:
+            List[Tuple[str, IntentType]]: (文本, 意图类型)，最近出现的在前
+        """
+        return await self.repository.find_labelled(min_confidence, limit)
+
+    async def flush(self) -> None:
+        """等待队列中已有的记录全部写入"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """写完队列中的记录后停止后台任务，并释放下层仓储的资源"""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        logger.info(f"意图异步批量写入已停止，统计: {self.get_write_stats()}")
+        await self.repository.close()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """获取写入统计
+
+        Returns:
+            Dict[str, Any]: 入队、写入、失败条数，批次数和当前积压条数
+        """
+        stats = dict(self.stats)
+        stats["pending"] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """在当前事件循环中创建队列并启动后台写入任务
+
+        Returns:
+            asyncio.Queue: 写入队列
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return self._queue
+
+    async def _run(self) -> None:
+        """后台写入循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[Tuple[Intent, str]]) -> None:
+        """写入一批记录，失败时记录日志后丢弃，不影响后续批次
+
+        Args:
+            batch (List[Tuple[Intent, str]]): (意图实体, 上下文指纹)列表
+        """
+        try:
+            await self.repository.save_many(batch)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.error(f"批量写入{len(batch)}条意图记录失败: {str(e)}")
+        finally:
+            for intent, context_key in batch:
+                key = self._pending_key(intent.text, context_key)
+                if self._pending.get(key) is intent:
+                    del self._pending[key]
+                self._queue.task_done()
+
+    @staticmethod
+    def _pending_key(text: str, context_key: str) -> Tuple[str, str]:
+        """计算待写入记录的键，与数据库查找键一致
+
+        Args:
+            text (str): 文本内容
+            context_key (str): 上下文指纹
+
+        Returns:
+            Tuple[str, str]: (规范化文本, 上下文指纹)
+        """
+        return normalize_text(text), context_key
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基于Redis的对话上下文共享存储模块
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from app.domain.repository.dialogue_context_store import DialogueContextStore
+from app.adapters.session.resp_client import RespClient, RespError
+from app.common.exception import SessionStoreException
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("redis_context_store")
+
+
+class RedisDialogueContextStore(DialogueContextStore):
+    """Redis对话上下文存储
+
+    每个会话两个键：{prefix}{session_id}:history为消息列表(每条消息一个JSON字符串)，
+    {prefix}{session_id}:meta为元数据和最后更新时间的JSON字符串，两者都设置过期时间。
+    读取和写入各用一次流水线完成。
+    """
+
+    def __init__(self, client: RespClient, key_prefix: str = "voice:ctx:"):
+        """初始化
+
+        Args:
+            client (RespClient): RESP客户端
+            key_prefix (str, optional): 键前缀. 默认为"voice:ctx:".
+        """
+        self.client = client
+        self.key_prefix = key_prefix
+        logger.info(f"对话上下文使用Redis共享存储: {client.host}:{client.port}/{client.db}")
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """读取会话，LRANGE和GET在一次往返中完成
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 会话数据，不存在或已过期时返回None
+        """
+        history_key, meta_key = self._keys(session_id)
+        history, meta = await self.client.pipeline([
+            ("LRANGE", history_key, 0, -1),
+            ("GET", meta_key)
+        ])
+        self._raise_for_errors(history, meta)
+        if meta is None and not history:
+            return None
+
+        meta = json.loads(meta) if meta is not None else {}
+        return {
+            "history": [json.loads(item) for item in history],
+            "metadata": meta.get("metadata", {}),
+            "last_updated": meta.get("last_updated")
+        }
+
+    async def save(self, session_id: str, changes: Dict[str, Any], max_history: int, ttl: int) -> None:
+        """追加新消息、裁剪历史并覆盖元数据，全部命令在一次往返中完成
+
+        Args:
+            session_id (str): 会话ID
+            changes (Dict[str, Any]): 会话变更
+            max_history (int): 保留的最大消息数
+            ttl (int): 会话超时时间(秒)
+        """
+        history_key, meta_key = self._keys(session_id)
+        commands = []
+        if changes.get("reset"):
+            commands.append(("DEL", history_key))
+        if changes.get("appended"):
+            commands.append(("RPUSH", history_key, *(
+                json.dumps(message, ensure_ascii=False) for message in changes["appended"]
+            )))
+            commands.append(("LTRIM", history_key, -max_history, -1))
+        commands.append(("EXPIRE", history_key, ttl))
+        commands.append(("SET", meta_key, json.dumps({
+            "metadata": changes.get("metadata", {}),
+            "last_updated": changes.get("last_updated")
+        }, ensure_ascii=False), "EX", ttl))
+
+        self._raise_for_errors(*await self.client.pipeline(commands))
+
+    async def delete(self, session_id: str) -> None:
+        """删除会话
+
+        Args:
+            session_id (str): 会话ID
+        """
+        await self.client.execute("DEL", *self._keys(session_id))
+
+    async def close(self) -> None:
+        """关闭连接"""
+        await self.client.close()
+
+    def _keys(self, session_id: str) -> tuple:
+        """计算会话的键
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            tuple: (历史键, 元数据键)
+        """
+        base = f"{self.key_prefix}{session_id}"
+        return f"{base}:history", f"{base}:meta"
+
+    @staticmethod
+    def _raise_for_errors(*replies: Any) -> None:
+        """流水线中任何一条命令出错时抛出异常
+
+        Raises:
+            SessionStoreException: 存在错误回复时抛出
+        """
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise SessionStoreException(f"会话存储命令执行失败: {reply}")
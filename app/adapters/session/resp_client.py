@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Redis协议(RESP2)异步客户端模块
+
+只实现会话存储需要的部分：连接池、单条命令和流水线(一次写入多条命令、一次读回全部结果)。
+兼容Redis及其他使用RESP协议的服务(如KeyDB、Dragonfly)。
+"""
+
+import asyncio
+from typing import Any, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse, unquote
+
+from app.common.exception import SessionStoreException
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("resp_client")
+
+
+class RespError(Exception):
+    """服务端返回的错误回复"""
+    pass
+
+
+def encode_command(args: Sequence[Any]) -> bytes:
+    """把命令编码为RESP数组
+
+    Args:
+        args (Sequence[Any]): 命令及参数，支持str、bytes、int、float
+
+    Returns:
+        bytes: 编码后的命令
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """读取一条RESP回复
+
+    Args:
+        reader (asyncio.StreamReader): 连接的读取端
+
+    Returns:
+        Any: 简单字符串为str，批量字符串为bytes或None，整数为int，数组为list，错误回复为RespError实例
+    """
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("连接已关闭")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        return RespError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"无法解析的回复: {line[:50]!r}")
+
+
+class RespClient:
+    """带连接池的RESP异步客户端"""
+
+    def __init__(self, url: str, max_connections: int = 10, timeout: float = 1.0):
+        """初始化客户端，连接在首次使用时建立
+
+        Args:
+            url (str): 连接地址，格式为redis://[:password@]host[:port][/db]
+            max_connections (int, optional): 最大连接数. 默认为10.
+            timeout (float, optional): 单次往返超时(秒). 默认为1.0.
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"round_trips": 0, "commands": 0}
+
+    async def execute(self, *args: Any) -> Any:
+        """执行单条命令
+
+        Args:
+            *args: 命令及参数
+
+        Returns:
+            Any: 回复
+
+        Raises:
+            SessionStoreException: 连接失败、超时或服务端返回错误时抛出
+        """
+        reply = (await self.pipeline([args]))[0]
+        if isinstance(reply, RespError):
+            raise SessionStoreException(f"会话存储命令执行失败: {reply}")
+        return reply
+
+    async def pipeline(self, commands: List[Sequence[Any]]) -> List[Any]:
+        """在一次网络往返中执行多条命令
+
+        Args:
+            commands (List[Sequence[Any]]): 命令列表
+
+        Returns:
+            List[Any]: 与命令一一对应的回复，单条命令的错误以RespError实例返回，不影响其他命令
+
+        Raises:
+            SessionStoreException: 连接失败或超时时抛出
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+
+        async with self._semaphore:
+            connection = None
+            try:
+                connection = self._idle.pop() if self._idle else await self._connect()
+                reader, writer = connection
+                writer.write(b"".join(encode_command(command) for command in commands))
+                replies = await asyncio.wait_for(self._read_replies(writer, reader, len(commands)), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+                if connection is not None:
+                    connection[1].close()
+                raise SessionStoreException(f"会话存储访问失败: {type(e).__name__} {str(e)}")
+            except BaseException:
+                # 被取消时连接上可能还有未读完的回复，不能放回连接池
+                if connection is not None:
+                    connection[1].close()
+                raise
+
+            self._idle.append(connection)
+            self.stats["round_trips"] += 1
+            self.stats["commands"] += len(commands)
+            return replies
+
+    async def close(self) -> None:
+        """关闭所有空闲连接"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    @staticmethod
+    async def _read_replies(writer: asyncio.StreamWriter, reader: asyncio.StreamReader, count: int) -> List[Any]:
+        """发送缓冲区中的命令并读取指定数量的回复
+
+        Args:
+            writer (asyncio.StreamWriter): 连接的写入端
+            reader (asyncio.StreamReader): 连接的读取端
+            count (int): 回复数量
+
+        Returns:
+            List[Any]: 回复列表
+        """
+        await writer.drain()
+        return [await read_reply(reader) for _ in range(count)]
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """建立新连接，按需认证和选择数据库
+
+        Returns:
+            Tuple[asyncio.StreamReader, asyncio.StreamWriter]: 连接
+        """
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            writer.write(b"".join(encode_command(command) for command in setup))
+            for reply in await asyncio.wait_for(self._read_replies(writer, reader, len(setup)), self.timeout):
+                if isinstance(reply, RespError):
+                    writer.close()
+                    raise ConnectionError(f"初始化连接失败: {reply}")
+        logger.debug(f"已建立会话存储连接: {self.host}:{self.port}/{self.db}")
+        return reader, writer
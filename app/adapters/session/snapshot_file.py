@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+会话快照文件模块
+
+在本地磁盘上保存进程内会话，用于重启(发布、崩溃)后恢复对话历史和设备位置。文件分两部分：
+- 快照文件(path)：某一时刻全部会话的完整副本，先写临时文件再原子替换
+- 日志文件(path + ".journal")：此后变更过的会话，按批追加，每批一行
+
+每行是一个JSON数组，首行为文件头。会话记录为[会话ID, 最后更新时间, [角色代码, 内容, ...], 元数据或null]，
+历史展开为一维列表以减少解析时创建的对象，角色用0/1表示；只有会话ID的记录表示会话已删除。快照文件头和日志文件头带相同的代号，
+代号不一致的日志(压缩快照后、截断日志前进程退出留下的)已包含在快照中，恢复时忽略。
+"""
+
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.common.logging.logger import log_manager
+
+# 创建日志器
+logger = log_manager.get_logger("session_snapshot")
+
+FORMAT_VERSION = 1
+
+# 快照文件每行最多包含的会话数：整行一次解析比逐条解析快；编码一行时持有GIL，行太大会让事件循环停顿
+RECORDS_PER_LINE = 1000
+
+# 会话记录：[会话ID, 最后更新时间, [角色代码, 内容, ...], 元数据]，删除记录只有会话ID
+SessionRecord = List[Any]
+
+
+def encode_records(records: List[SessionRecord]) -> str:
+    """把一批记录编码为快照文件中的一行
+
+    Args:
+        records (List[SessionRecord]): 记录，不超过RECORDS_PER_LINE条
+
+    Returns:
+        str: 以换行结尾的JSON数组
+    """
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class SessionSnapshotFile:
+    """会话快照文件，读写都是同步阻塞操作，应在线程中调用
+    
+    写入的内容是encode_records编码好的行，编码在调用方完成，本类只负责文件读写。
+    """
+
+    def __init__(self, path: str):
+        """初始化
+
+        Args:
+            path (str): 快照文件路径，日志文件为同目录下的path + ".journal"
+        """
+        self.path = path
+        self.journal_path = path + ".journal"
+        self._generation: Optional[str] = None
+
+    def write_full(self, lines: Iterable[str]) -> None:
+        """写入完整快照并开始新的日志
+
+        Args:
+            lines (Iterable[str]): 全部会话记录编码后的行
+        """
+        generation = uuid.uuid4().hex
+        header = {"version": FORMAT_VERSION, "generation": generation, "created_at": time.time()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        # 快照已包含日志中的全部内容，此后的变更写入新日志
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": FORMAT_VERSION, "generation": generation}) + "\n")
+        self._generation = generation
+
+    @property
+    def has_full_snapshot(self) -> bool:
+        """本进程是否已写入过完整快照，写入之前不能追加日志"""
+        return self._generation is not None
+
+    def append(self, lines: Iterable[str]) -> None:
+        """把一批变更追加到日志
+
+        Args:
+            lines (Iterable[str]): 变更的会话记录和删除记录编码后的行
+
+        Raises:
+            RuntimeError: 本进程尚未写入完整快照时抛出
+        """
+        if self._generation is None:
+            raise RuntimeError("尚未写入完整快照")
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self, now: Optional[float] = None, ttl: float = 1800) -> List[SessionRecord]:
+        """读取快照和日志，合并出每个会话的最新状态
+
+        Args:
+            now (Optional[float], optional): 当前时间戳，默认取time.time(). 默认为None.
+            ttl (float, optional): 会话超时时间(秒)，超时的会话不返回. 默认为1800.
+
+        Returns:
+            List[SessionRecord]: 未过期的会话记录，按最近访问顺序由远到近排列
+        """
+        sessions: Dict[str, SessionRecord] = {}
+        generation = self._read_file(self.path, sessions, None)
+        if generation is None:
+            return []
+        self._read_file(self.journal_path, sessions, generation)
+
+        deadline = (now or time.time()) - ttl
+        return [record for record in sessions.values() if record[1] > deadline]
+
+    @staticmethod
+    def _read_file(path: str, sessions: Dict[str, SessionRecord], generation: Optional[str]) -> Optional[str]:
+        """读取一个文件中的记录，后出现的记录覆盖先出现的
+
+        Args:
+            path (str): 文件路径
+            sessions (Dict[str, SessionRecord]): 会话ID到记录的映射，原地更新，插入顺序即访问顺序
+            generation (Optional[str]): 日志文件应有的代号，None表示读取快照文件
+
+        Returns:
+            Optional[str]: 文件头中的代号；文件不存在、格式不符或代号不一致时返回None
+        """
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                logger.warning(f"会话快照文件头无法解析，忽略: {path}")
+                return None
+            if not isinstance(header, dict) or header.get("version") != FORMAT_VERSION:
+                logger.warning(f"会话快照版本不兼容，忽略: {path}")
+                return None
+            if generation is not None and header.get("generation") != generation:
+                logger.info(f"会话日志已包含在快照中，忽略: {path}")
+                return None
+
+            for line_number, line in enumerate(f, start=2):
+                try:
+                    records = json.loads(line)
+                except ValueError:
+                    # 进程在追加过程中退出时，最后一行可能不完整
+                    logger.warning(f"会话快照第{line_number}行不完整，已跳过: {path}")
+                    continue
+                if generation is None:
+                    # 快照文件中没有删除记录，也没有重复的会话
+                    sessions.update({record[0]: record for record in records})
+                    continue
+                for record in records:
+                    # 日志中的会话是最近访问过的，移到末尾
+                    sessions.pop(record[0], None)
+                    if len(record) > 1:
+                        sessions[record[0]] = record
+        return header.get("generation")
+
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对话上下文存储工厂模块
+"""
+
+from typing import Optional
+
+from app.config import settings
+from app.domain.repository.dialogue_context_store import DialogueContextStore
+from app.adapters.session.snapshot_file import SessionSnapshotFile
+
+
+def create_dialogue_context_store() -> Optional[DialogueContextStore]:
+    """根据SESSION_STORE创建对话上下文共享存储
+    
+    Returns:
+        Optional[DialogueContextStore]: redis时返回Redis存储；memory时返回None，会话只保存在当前进程
+        
+    Raises:
+        ValueError: SESSION_STORE取值无效时抛出
+    """
+    if settings.SESSION_STORE == "memory":
+        return None
+    
+    if settings.SESSION_STORE == "redis":
+        from app.adapters.session.resp_client import RespClient
+        from app.adapters.session.redis_context_store import RedisDialogueContextStore
+        client = RespClient(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_TIMEOUT
+        )
+        return RedisDialogueContextStore(client, key_prefix=settings.SESSION_KEY_PREFIX)
+    
+    raise ValueError(f"不支持的SESSION_STORE: {settings.SESSION_STORE}")
+
+
+def create_session_snapshot_file() -> Optional[SessionSnapshotFile]:
+    """创建会话快照文件
+    
+    会话保存在共享存储中时不需要本地快照。
+    
+    Returns:
+        Optional[SessionSnapshotFile]: SESSION_STORE为memory且配置了SESSION_SNAPSHOT_PATH时返回快照文件，否则返回None
+    """
+    if settings.SESSION_STORE != "memory" or not settings.SESSION_SNAPSHOT_PATH:
+        return None
+    return SessionSnapshotFile(settings.SESSION_SNAPSHOT_PATH)
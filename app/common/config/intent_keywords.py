@@ -3,22 +3,41 @@
 
 """
 意图识别关键词配置
+
+规则用到的词表(疑问词、日期词)由规则引擎编译，见app.common.config.intent_rules；
+上下文相关标记由Aho-Corasick自动机context_matcher检测，一次扫描即可判断。
 """
 
-# 录音相关关键词
-RECORDING_KEYWORDS = ["录音", "record", "recording", "语音记录", "语音备忘录"]
+from app.common.utils.keyword_matcher import KeywordMatcher
 
 # 疑问词
 QUESTION_WORDS = ["为什么", "怎么", "为何", "是不是", "难道", "吗", "呢", "?", "？"]
 
-# 情感词
-SENTIMENT_WORDS = ["不应该", "应该", "不要", "要", "别", "停止", "开始", "继续"]
+# 日期词 -> 规范化的日期；多个日期词同时出现时取靠前的
+DATE_KEYWORDS = {
+    "今天": "今天", "今日": "今天", "当前": "今天",
+    "明天": "明天", "明日": "明天",
+    "后天": "后天",
+    "大后天": "大后天",
+    "周一": "周一", "星期一": "周一",
+    "周二": "周二", "星期二": "周二",
+    "周三": "周三", "星期三": "周三",
+    "周四": "周四", "星期四": "周四",
+    "周五": "周五", "星期五": "周五",
+    "周六": "周六", "星期六": "周六",
+    "周日": "周日", "周天": "周日", "星期日": "周日", "星期天": "周日",
+}
 
-# 设备控制关键词
-DEVICE_CONTROL_KEYWORDS = ["开", "关", "打开", "关闭", "启动", "关掉", "调高", "调低"]
+# 上下文相关标记：包含这些词的表达(指代、省略、追问、应答)需要结合上文才能确定意图
+CONTEXT_DEPENDENT_MARKERS = [
+    "它", "这个", "那个", "这些", "那些", "这里", "那里", "那边", "刚才", "刚刚", "上一个", "之前",
+    "呢", "也", "还", "再", "同样", "一样", "换成", "改成", "是的", "不是", "对的", "好的", "可以", "不用", "算了"
+]
 
-# 媒体控制关键词
-MEDIA_CONTROL_KEYWORDS = ["播放", "暂停", "停止", "继续", "音乐", "视频"]
+# 语气和客套词：近似查找历史说法时去掉，"帮我打开客厅的灯"与"打开客厅灯"视为同一说法
+FILLER_WORDS = [
+    "请", "麻烦", "帮我", "帮忙", "给我", "一下", "吧", "啊", "呀", "哦", "嗯", "的", "了", "把"
+]
 
-# 查询关键词
-QUERY_KEYWORDS = ["查询", "查一下", "告诉我", "是什么", "怎么样"] 
\ No newline at end of file
+# 上下文相关标记的匹配器
+context_matcher = KeywordMatcher({"context_dependent": CONTEXT_DEPENDENT_MARKERS})
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图识别规则配置
+
+每条规则是一个字典：
+- intent: 意图类型
+- patterns: 正则列表，任一在文本中出现即命中；命名分组(?P<名称>...)的内容成为同名实体
+- slots: 可选，实体名 -> 正则，命中后在整段文本中查找，找到则取第一个命名分组或整个匹配作为实体
+- extract: 可选，实体名 -> 提取器名，命中后正则没有得到该实体时用提取器从文本中提取(如地名用place)
+- exclude: 可选，否定条件，任一在文本中出现时规则不生效
+- priority: 可选，多条规则同时命中时取优先级最高的，相同时取靠前的. 默认为0
+- confidence: 可选，置信度. 默认为0.9
+- entities: 可选，命中时固定附带的实体
+
+正则中的{词表}引用RULE_VOCABULARIES中的词表，只匹配不提取；{实体名:词表}同时把匹配到的词作为实体，
+词表为字典时实体取规范化后的值。正则中不能使用反向引用，规则在启动时编译为一个组合正则，
+见app.domain.strategy.rule_engine。
+需要结合上文理解的表达(含指代、疑问、否定)不写规则，交给大模型。
+"""
+
+from app.domain.entity.intent import IntentType
+from app.common.config.intent_keywords import DATE_KEYWORDS, QUESTION_WORDS
+
+# 规则引用的词表：名称 -> 词列表，或 词 -> 规范化的值
+RULE_VOCABULARIES = {
+    "date": DATE_KEYWORDS,
+    "question": QUESTION_WORDS,
+    "device": [
+        "灯", "台灯", "吊灯", "灯带", "夜灯", "空调", "电视", "电视机", "风扇", "电风扇", "加湿器", "除湿机",
+        "空气净化器", "净化器", "窗帘", "热水器", "扫地机器人", "扫地机", "音箱", "插座", "电饭煲", "洗衣机",
+        "烘干机", "洗碗机", "暖气", "地暖", "新风", "投影仪", "电脑", "油烟机", "浴霸", "取暖器", "电暖器",
+    ],
+    "room": ["客厅", "卧室", "主卧", "次卧", "厨房", "书房", "卫生间", "洗手间", "浴室", "阳台", "餐厅", "儿童房", "玄关"],
+    "recording": ["录音", "录制", "语音记录", "语音备忘录", "recording", "record"],
+}
+
+# 提醒的时间：日期或"N分钟后"、时段、"N点(半)"的组合，至少有一项
+_DAY = r"(?:{date:date}|[\d一二三四五六七八九十两半]+(?:分钟|个小时|小时|天)[以之]?后)"
+_PERIOD = r"(?:早上|上午|中午|下午|傍晚|晚上|凌晨)"
+_CLOCK = r"(?:[\d一二三四五六七八九十两]+点(?:半|[\d一二三四五六七八九十]+分?)?)"
+REMINDER_TIME = (
+    r"(?P<time>" + _DAY + _PERIOD + "?" + _CLOCK + "?|" + _PERIOD + _CLOCK + "?|" + _CLOCK + ")"
+)
+
+# 句中出现即说明不是简单指令：疑问、否定、指代
+NOT_COMMAND_WORDS = ["不", "别", "没", "勿", "它", "这个", "那个", "这些", "那些", "刚才"]
+NOT_COMMAND = r"{question}|" + "|".join(NOT_COMMAND_WORDS)
+
+# 设备名前可以带房间，如"客厅的灯"
+DEVICE = r"(?:{room:room}的?)?{target:device}"
+
+INTENT_RULES = [
+    {
+        "intent": IntentType.SET_REMINDER,
+        "priority": 100,
+        "patterns": [
+            r"提醒我(?:一下)?(?:在)?(?:" + REMINDER_TIME + r")?(?:的时候)?(?:要|去)?(?P<content>[^，。！？,.!?]{1,30})",
+            r"(?:设置|设|定|建)(?:一)?个?(?:提醒|闹钟)",
+        ],
+        # 时间也可以在"提醒我"之前，如"明天上午提醒我开会"
+        "slots": {"time": REMINDER_TIME},
+        "exclude": [r"{question}|不要|别|不用|取消|删除|关闭|关掉"],
+    },
+    {
+        "intent": IntentType.STOPRECORDING,
+        "priority": 90,
+        "confidence": 0.95,
+        "patterns": [
+            r"(?:停止|结束|停掉|停下|关掉|关闭|关上|暂停|终止|完成|别再?|不要再?|不用再?|不想再?)(?:一下)?(?:第.{1,3}段)?{recording}",
+            r"{recording}(?:停止|结束|停一下|停下|停掉|关掉|暂停|完成)",
+        ],
+        # "不应该录音"之类的评价和"不要停止录音"之类的双重否定交给大模型
+        "exclude": [r"{question}|应该|不要停|别停|不想停|不用停|不能停"],
+        "entities": {"operation": "停止", "target": "录音"},
+    },
+    {
+        "intent": IntentType.STARTRECORDING,
+        "priority": 80,
+        "confidence": 0.95,
+        "patterns": [r"{recording}"],
+        "exclude": [r"{question}|应该|不|别|没|停|结束|完成|关|删|播放|听"],
+        "entities": {"operation": "开始", "target": "录音"},
+    },
+    {
+        "intent": IntentType.PAUSE_MUSIC,
+        "priority": 70,
+        "patterns": [
+            r"暂停(?:播放|一下|音乐|歌曲)?",
+            r"(?:停止|停掉|停下|关掉|关闭|关上|别放|不要放)(?:播放)?(?:音乐|歌曲|歌)",
+            r"(?:音乐|歌曲|歌)(?:先)?(?:暂停|停一下|停下|停了吧|停止|关掉)",
+        ],
+        "exclude": [r"{question}|录|视频|电影|电视剧|继续|别停|不要停"],
+    },
+    {
+        "intent": IntentType.PLAY_MUSIC,
+        "priority": 60,
+        "patterns": [
+            r"(?:播放|放|来|听)(?:一)?(?:首|点|些|个|下)?(?:(?P<artist>[\u4e00-\u9fa5A-Za-z]{1,8}?)的)?(?:歌|音乐|歌曲)",
+            r"(?:继续|接着|恢复)播放",
+        ],
+        "exclude": [NOT_COMMAND + r"|停|暂停|关|视频|电影|电视剧|录"],
+    },
+    {
+        "intent": IntentType.CONTROL_DEVICE_OFF,
+        "priority": 50,
+        "patterns": [
+            r"(?:关闭|关掉|关上|关了|关一下|关)" + DEVICE,
+            r"把" + DEVICE + r"(?:给我)?(?:关闭|关掉|关上|关了|关一下)",
+            DEVICE + r"(?:关闭|关掉|关上|关一下|关了吧)",
+        ],
+        "exclude": [NOT_COMMAND + r"|开关|也"],
+    },
+    {
+        "intent": IntentType.CONTROL_DEVICE_ON,
+        "priority": 40,
+        "patterns": [
+            r"(?:打开|开启|启动|开一下|开)" + DEVICE,
+            r"把" + DEVICE + r"(?:给我)?(?:打开|开启|开开|开一下|开了)",
+            DEVICE + r"(?:打开|开启|开一下|开开)",
+        ],
+        "exclude": [NOT_COMMAND + r"|开关|也|关"],
+    },
+    {
+        "intent": IntentType.QUERY_WEATHER,
+        "priority": 30,
+        "patterns": [r"天气"],
+        # "天气真好"之类的感叹是闲聊
+        "exclude": [r"天气(?:真|挺|很|太|不错)"],
+        "slots": {"date": r"{date:date}"},
+        # 城市用行政区划字典树提取，如"查一下明天北京朝阳的天气"
+        "extract": {"city": "place"},
+    },
+    {
+        "intent": IntentType.QUERY_TIME,
+        "priority": 20,
+        "patterns": [
+            r"(?:现在|目前|当前)(?:是)?(?:几点|什么时间|几点钟|多少点)",
+            r"几点了",
+            r"(?:现在|当前)的?时间",
+            r"报(?:个|一下)?时",
+            r"今天(?:是)?(?:几月几号|几号|星期几|周几|礼拜几)",
+        ],
+        "exclude": [r"提醒|闹钟|叫我|开会|上班|下班|开始|结束|航班|火车|高铁|比赛|营业|天气|不|别"],
+    },
+]
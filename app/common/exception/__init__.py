@@ -10,5 +10,8 @@ from app.common.exception.base_exception import (
     ResourceNotFoundException,
     ValidationException,
     AuthenticationException,
-    LLMException
+    PermissionDeniedException,
+    LLMException,
+    SessionStoreException,
+    ExternalAPIException
 )
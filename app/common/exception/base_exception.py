@@ -42,8 +42,29 @@ class AuthenticationException(AppException):
         super().__init__(message=message, code=401)
 
 
+class PermissionDeniedException(AppException):
+    """权限不足异常"""
+
+    def __init__(self, message="没有访问权限"):
+        super().__init__(message=message, code=403)
+
+
 class LLMException(AppException):
     """大模型调用异常"""
 
     def __init__(self, message="大模型调用失败"):
         super().__init__(message=message, code=500)
+
+
+class SessionStoreException(AppException):
+    """会话存储访问异常"""
+
+    def __init__(self, message="会话存储访问失败"):
+        super().__init__(message=message, code=503)
+
+
+class ExternalAPIException(AppException):
+    """第三方接口调用异常"""
+
+    def __init__(self, message="第三方接口调用失败"):
+        super().__init__(message=message, code=502)
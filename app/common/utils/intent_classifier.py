@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+字符n-gram意图分类器模块
+
+把规范化文本的1-3字片段哈希到固定维度，用多分类逻辑回归(softmax)打分。
+模型从意图记录表离线训练(见app.tools.train_intent_classifier)，保存为.npz文件，
+推理时一批文本只做一次向量化的查表求和，不需要逐个特征循环。
+"""
+
+import json
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.common.utils.text_utils import normalize_text
+
+# 模型文件格式版本，格式不兼容的改动需要递增
+FORMAT_VERSION = 1
+
+# 默认哈希维度(2的幂)，汉字短句的1-3字片段在这个维度下很少冲突
+DEFAULT_DIMENSION = 1 << 17
+DEFAULT_NGRAM_RANGE = (1, 3)
+
+# 文本首尾标记，让"暂停"在句首和句中得到不同的片段
+_BEGIN = "\x02"
+_END = "\x03"
+
+
+class IntentClassifier:
+    """字符n-gram哈希特征 + 多分类逻辑回归
+
+    每个片段用crc32哈希到dimension个桶中，同一文本的片段权重为1/sqrt(片段数)，
+    得分为各片段所在行的权重之和加偏置。训练只更新语料中出现过的桶，
+    保存时只保存这些行，加载时再展开为完整的权重表，推理时直接按下标取行。
+    """
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray,
+                 dimension: int = DEFAULT_DIMENSION, ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """初始化
+
+        Args:
+            labels (Sequence[str]): 意图标签，与权重的列一一对应
+            weights (np.ndarray): 权重表，形状为(dimension, 标签数)
+            bias (np.ndarray): 偏置，形状为(标签数,)
+            dimension (int, optional): 哈希维度，须为2的幂. 默认为DEFAULT_DIMENSION.
+            ngram_range (Tuple[int, int], optional): 片段的最短和最长字数. 默认为DEFAULT_NGRAM_RANGE.
+            metadata (Optional[Dict[str, Any]], optional): 版本、训练数据量、评估结果等元数据. 默认为None.
+
+        Raises:
+            ValueError: 维度不是2的幂或权重形状不匹配时抛出
+        """
+        if dimension <= 0 or dimension & (dimension - 1):
+            raise ValueError(f"哈希维度必须是2的幂: {dimension}")
+        if weights.shape != (dimension, len(labels)) or bias.shape != (len(labels),):
+            raise ValueError(f"权重形状{weights.shape}与维度{dimension}、标签数{len(labels)}不匹配")
+        self.labels = list(labels)
+        self.weights = weights.astype(np.float32, copy=False)
+        self.bias = bias.astype(np.float32, copy=False)
+        self.dimension = dimension
+        self.ngram_range = tuple(ngram_range)
+        self.metadata = dict(metadata or {})
+
+    @property
+    def version(self) -> str:
+        """模型版本，训练时生成"""
+        return str(self.metadata.get("version", ""))
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """计算每个文本属于各标签的概率
+
+        Args:
+            texts (Sequence[str]): 文本
+
+        Returns:
+            np.ndarray: 概率，形状为(文本数, 标签数)
+        """
+        if not len(texts):
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        indices, values, indptr = featurize(texts, self.dimension, self.ngram_range)
+        scores = np.add.reduceat(self.weights[indices] * values[:, None], indptr[:-1], axis=0) + self.bias
+        return softmax(scores)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """预测单个文本的意图
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            Tuple[str, float]: (概率最高的标签, 概率)
+        """
+        probabilities = self.predict_proba([text])[0]
+        best = int(probabilities.argmax())
+        # float32舍入可能略超过1
+        return self.labels[best], min(float(probabilities[best]), 1.0)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """保存模型，先写临时文件再替换，正在读取的进程不会读到半个文件
+
+        Args:
+            path (Union[str, Path]): 模型文件路径(.npz)
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = np.flatnonzero(np.any(self.weights != 0, axis=1)).astype(np.int64)
+        metadata = dict(self.metadata, format=FORMAT_VERSION, labels=self.labels,
+                        dimension=self.dimension, ngram_range=list(self.ngram_range))
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(f, rows=rows, weights=self.weights[rows], bias=self.bias,
+                                metadata=np.array(json.dumps(metadata, ensure_ascii=False)))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IntentClassifier":
+        """加载模型
+
+        Args:
+            path (Union[str, Path]): 模型文件路径(.npz)
+
+        Returns:
+            IntentClassifier: 分类器
+
+        Raises:
+            ValueError: 模型文件格式版本不兼容时抛出
+        """
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["metadata"]))
+            if metadata.get("format") != FORMAT_VERSION:
+                raise ValueError(f"不支持的模型文件格式版本: {metadata.get('format')}，当前为{FORMAT_VERSION}")
+            labels = metadata["labels"]
+            dimension = int(metadata["dimension"])
+            weights = np.zeros((dimension, len(labels)), dtype=np.float32)
+            weights[data["rows"]] = data["weights"]
+            bias = data["bias"]
+        return cls(labels, weights, bias, dimension, tuple(metadata["ngram_range"]), metadata)
+
+
+def featurize(texts: Sequence[str], dimension: int = DEFAULT_DIMENSION,
+              ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """把文本转为稀疏的哈希特征(CSR格式)
+
+    Args:
+        texts (Sequence[str]): 文本，先经normalize_text规范化
+        dimension (int, optional): 哈希维度，须为2的幂. 默认为DEFAULT_DIMENSION.
+        ngram_range (Tuple[int, int], optional): 片段的最短和最长字数. 默认为DEFAULT_NGRAM_RANGE.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (桶下标, 权重, 行起点)；第i个文本的特征为
+            indices[indptr[i]:indptr[i + 1]]，同一桶可出现多次，求和即可
+    """
+    mask = dimension - 1
+    low, high = ngram_range
+    indices: List[int] = []
+    indptr = [0]
+    counts = []
+    for text in texts:
+        padded = _BEGIN + normalize_text(text) + _END
+        start = len(indices)
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                indices.append(zlib.crc32(padded[i:i + n].encode("utf-8")) & mask)
+        # 首尾标记本身就是片段，每个文本至少有一个特征
+        counts.append(len(indices) - start)
+        indptr.append(len(indices))
+    count_array = np.asarray(counts, dtype=np.float32)
+    values = np.repeat(1.0 / np.sqrt(np.maximum(count_array, 1.0)), count_array.astype(np.int64))
+    return np.asarray(indices, dtype=np.int64), values.astype(np.float32), np.asarray(indptr, dtype=np.int64)
+
+
+def softmax(scores: np.ndarray) -> np.ndarray:
+    """按行计算softmax
+
+    Args:
+        scores (np.ndarray): 得分，形状为(样本数, 类别数)
+
+    Returns:
+        np.ndarray: 概率
+    """
+    exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def train(texts: Sequence[str], labels: Sequence[str], sample_weights: Optional[Sequence[float]] = None,
+          dimension: int = DEFAULT_DIMENSION, ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE,
+          epochs: int = 300, learning_rate: float = 0.1, l2: float = 1e-4) -> IntentClassifier:
+    """训练分类器
+
+    全批量梯度下降(Adam)。训练只在语料出现过的桶上进行：把桶下标压缩为连续编号后，
+    每轮的得分和梯度都是一次取行和一次分段求和(np.add.reduceat)。
+
+    Args:
+        texts (Sequence[str]): 文本
+        labels (Sequence[str]): 每个文本的意图标签
+        sample_weights (Optional[Sequence[float]], optional): 样本权重，默认均为1. 默认为None.
+        dimension (int, optional): 哈希维度，须为2的幂. 默认为DEFAULT_DIMENSION.
+        ngram_range (Tuple[int, int], optional): 片段的最短和最长字数. 默认为DEFAULT_NGRAM_RANGE.
+        epochs (int, optional): 迭代轮数. 默认为300.
+        learning_rate (float, optional): 学习率. 默认为0.1.
+        l2 (float, optional): L2正则系数. 默认为1e-4.
+
+    Returns:
+        IntentClassifier: 训练好的分类器，元数据中带版本和训练数据量
+
+    Raises:
+        ValueError: 没有训练数据或文本与标签数量不一致时抛出
+    """
+    if not texts or len(texts) != len(labels):
+        raise ValueError(f"训练数据为空或文本数({len(texts)})与标签数({len(labels)})不一致")
+    label_names = sorted(set(labels))
+    label_index = {label: i for i, label in enumerate(label_names)}
+    targets = np.zeros((len(texts), len(label_names)), dtype=np.float32)
+    targets[np.arange(len(texts)), [label_index[label] for label in labels]] = 1.0
+    weights = np.ones(len(texts), dtype=np.float32) if sample_weights is None else np.asarray(sample_weights, np.float32)
+    weights = weights / weights.sum()
+
+    indices, values, indptr = featurize(texts, dimension, ngram_range)
+    buckets, compact = np.unique(indices, return_inverse=True)
+    rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+    # 按桶排序后分段求和，得到每个桶的梯度
+    order = np.argsort(compact, kind="stable")
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(compact[order])) + 1))
+    sorted_values = values[order][:, None]
+    sorted_rows = rows[order]
+
+    table = np.zeros((len(buckets), len(label_names)), dtype=np.float32)
+    bias = np.zeros(len(label_names), dtype=np.float32)
+    moments = [np.zeros_like(table), np.zeros_like(table), np.zeros_like(bias), np.zeros_like(bias)]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        scores = np.add.reduceat(table[compact] * values[:, None], indptr[:-1], axis=0) + bias
+        delta = (softmax(scores) - targets) * weights[:, None]
+        grad_table = np.add.reduceat(delta[sorted_rows] * sorted_values, starts, axis=0) + l2 * table
+        grad_bias = delta.sum(axis=0)
+        for param, grad, m, v in ((table, grad_table, moments[0], moments[1]),
+                                  (bias, grad_bias, moments[2], moments[3])):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+    full = np.zeros((dimension, len(label_names)), dtype=np.float32)
+    full[buckets] = table
+    metadata = {
+        "version": datetime.now().strftime("%Y%m%d%H%M%S"),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "samples": len(texts),
+        "features": int(len(buckets)),
+    }
+    return IntentClassifier(label_names, full, bias, dimension, ngram_range, metadata)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多关键词匹配模块
+
+用Aho-Corasick自动机一次扫描文本，找出所有分组中出现的关键词，
+代替对每个关键词分别执行 keyword in text。
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick多关键词匹配器
+
+    关键词按分组登记，同一关键词可以属于多个分组(如"停止"既是情感词也是媒体控制词)。
+    建立时把失败指针展开为完整的状态转移表，扫描时每个字符只做一次字典查找，
+    重叠的关键词(如"后天"和"大后天")都会被找到。匹配区分大小写，与 in 运算一致。
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """建立自动机
+
+        Args:
+            groups (Dict[str, Iterable[str]]): 分组名 -> 关键词列表
+        """
+        self.groups = {name: list(keywords) for name, keywords in groups.items()}
+        # 状态 -> 字符 -> 下一状态；只保存不回到根状态的转移
+        self._transitions: List[Dict[str, int]] = [{}]
+        # 状态 -> 在该状态结束的(分组, 关键词)，包括沿失败指针可达的较短关键词
+        self._outputs: List[Optional[Tuple[Tuple[str, str], ...]]] = [None]
+
+        pending: List[List[Tuple[str, str]]] = [[]]
+        for name, keywords in self.groups.items():
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = self._transitions[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._transitions)
+                        self._transitions[state][char] = next_state
+                        self._transitions.append({})
+                        pending.append([])
+                    state = next_state
+                if (name, keyword) not in pending[state]:
+                    pending[state].append((name, keyword))
+        self._build(pending)
+
+    def _build(self, pending: List[List[Tuple[str, str]]]) -> None:
+        """按广度优先计算失败指针，合并输出并展开转移表
+
+        Args:
+            pending (List[List[Tuple[str, str]]]): 每个状态自身结束的(分组, 关键词)
+        """
+        transitions = self._transitions
+        trie = [dict(edges) for edges in transitions]
+        fail = [0] * len(trie)
+        outputs: List[List[Tuple[str, str]]] = [list(items) for items in pending]
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = fail[state]
+            outputs[state].extend(item for item in outputs[fallback] if item not in outputs[state])
+            # 失败状态的深度更小，已处理完毕，它的转移表已经完整
+            for char, next_state in transitions[fallback].items():
+                transitions[state].setdefault(char, next_state)
+            for char, child in trie[state].items():
+                fail[child] = transitions[fallback].get(char, 0)
+                queue.append(child)
+        self._outputs = [tuple(items) or None for items in outputs]
+        # 分组 -> 输出中含该组关键词的状态
+        self._group_states: Dict[str, Set[int]] = {name: set() for name in self.groups}
+        for state, items in enumerate(outputs):
+            for name, _ in items:
+                self._group_states[name].add(state)
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """扫描文本
+
+        Args:
+            text (str): 待扫描文本
+
+        Returns:
+            Dict[str, Set[str]]: 分组名 -> 文本中出现的该组关键词，没有命中的分组不出现
+        """
+        hits: Dict[str, Set[str]] = {}
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            found = outputs[state]
+            if found is not None:
+                for name, keyword in found:
+                    words = hits.get(name)
+                    if words is None:
+                        hits[name] = {keyword}
+                    else:
+                        words.add(keyword)
+        return hits
+
+    def contains(self, text: str, group: str) -> bool:
+        """文本中是否出现某分组的关键词，找到第一个即返回
+
+        Args:
+            text (str): 待扫描文本
+            group (str): 分组名
+
+        Returns:
+            bool: 是否出现
+        """
+        transitions = self._transitions
+        states = self._group_states.get(group)
+        if not states:
+            return False
+        state = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if state in states:
+                return True
+        return False
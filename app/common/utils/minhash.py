@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MinHash/LSH近似重复文本索引模块
+
+把文本切成单字和相邻两字的片段(shingle)，用MinHash签名的分段(band)做局部敏感哈希，
+只和分段相同的文本比较，在上百万条历史文本中找出与查询最相似的一条，耗时与索引大小无关。
+"""
+
+import re
+import threading
+import zlib
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.common.utils.text_utils import normalize_text
+
+# 梅森素数2^31-1，a * x + b(x < 2^32)在uint64内不会溢出
+_PRIME = (1 << 31) - 1
+
+# 文本首尾标记，让"灯"在句尾和句中得到不同的片段
+_BEGIN = "\x02"
+_END = "\x03"
+
+
+class NearMatch(NamedTuple):
+    """近似查找结果"""
+
+    # 索引中的原始文本
+    text: str
+    value: Any
+    # 片段集合的Jaccard相似度，0-1
+    similarity: float
+
+
+class MinHashIndex:
+    """MinHash/LSH近似重复文本索引
+
+    签名共num_perm个值，分为bands段，每段rows = num_perm / bands个值；某一段完全相同的文本成为候选，
+    再按片段集合计算精确的Jaccard相似度。相似度为s的两段文本成为候选的概率为1 - (1 - s^rows)^bands，
+    默认32个值分8段时，s=0.8约98%，s=0.5约40%，s=0.3约6%。
+
+    内存固定：条目保存在容量为capacity的环形数组中，满后覆盖最早的条目；每段一个分桶表，
+    每个桶保存最近写入的bucket_size个条目编号和该段哈希的16位标签，同一段相同的条目过多时只保留最近的。
+    标签不同的是落在同一个桶里的其他段，不参与比较。被覆盖的条目编号可能仍留在桶中，
+    查找时按相似度校验，不会返回错误的结果。
+    读写都在锁内进行，可以在后台线程中批量加载。
+    """
+
+    def __init__(self, capacity: int, num_perm: int = 32, bands: int = 8, bucket_size: int = 4,
+                 ignore: Iterable[str] = (), seed: int = 25):
+        """初始化
+
+        Args:
+            capacity (int): 最多保存的条目数
+            num_perm (int, optional): 签名长度. 默认为32.
+            bands (int, optional): 签名分段数，须整除num_perm. 默认为8.
+            bucket_size (int, optional): 每个桶保存的条目数. 默认为4.
+            ignore (Iterable[str], optional): 切片前从文本中去掉的词(如"帮我"、"一下"). 默认为().
+            seed (int, optional): 生成哈希参数的随机数种子. 默认为25.
+
+        Raises:
+            ValueError: 容量不是正数或分段数不能整除签名长度时抛出
+        """
+        if capacity <= 0 or num_perm % bands:
+            raise ValueError(f"容量须为正数且分段数须整除签名长度: capacity={capacity}, num_perm={num_perm}, bands={bands}")
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.bucket_size = bucket_size
+        words = sorted({word for word in ignore if word}, key=len, reverse=True)
+        self._ignore = re.compile("|".join(map(re.escape, words))) if words else None
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        # 合并一段中rows个值的乘数，取奇数
+        self._mix = rng.integers(1, 1 << 32, self.rows, dtype=np.uint64) | np.uint64(1)
+
+        # 桶数取2的幂，约为每段条目数的一半，平均每桶两个条目
+        self._mask = (1 << max(1, (capacity // 2).bit_length())) - 1
+        self._buckets = np.full((bands, self._mask + 1, bucket_size), -1, dtype=np.int32)
+        self._tags = np.zeros((bands, self._mask + 1, bucket_size), dtype=np.uint16)
+        # 每个桶下一个写入位置，写满后覆盖最早的
+        self._cursors = np.zeros((bands, self._mask + 1), dtype=np.uint8)
+        self._band_rows = np.arange(bands)
+
+        self._texts: List[Optional[str]] = [None] * capacity
+        self._values: List[Any] = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def shingles(self, text: str) -> Set[str]:
+        """把文本切成单字和相邻两字的片段
+
+        Args:
+            text (str): 文本，先规范化并去掉ignore中的词
+
+        Returns:
+            Set[str]: 片段集合，含首尾标记，不会为空
+        """
+        normalized = normalize_text(text)
+        if self._ignore is not None:
+            normalized = self._ignore.sub("", normalized)
+        padded = _BEGIN + normalized + _END
+        return set(normalized) | {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+    def _band_keys(self, shingle_sets: Sequence[Set[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """计算每个文本在各段的桶号和标签
+
+        Args:
+            shingle_sets (Sequence[Set[str]]): 每个文本的片段集合
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (桶号, 标签)，形状均为(文本数, bands)
+        """
+        hashes = np.array(
+            [zlib.crc32(shingle.encode("utf-8")) for shingles in shingle_sets for shingle in shingles],
+            dtype=np.uint64
+        )
+        # (片段数, num_perm)的哈希值，按文本分段取最小值即MinHash签名
+        values = (hashes[:, None] * self._a + self._b) % _PRIME
+        if len(shingle_sets) == 1:
+            signatures = values.min(axis=0, keepdims=True)
+        else:
+            starts = np.cumsum([0] + [len(shingles) for shingles in shingle_sets[:-1]])
+            signatures = np.minimum.reduceat(values, starts, axis=0)
+        keys = (signatures.reshape(len(shingle_sets), self.bands, self.rows) * self._mix).sum(axis=2)
+        keys ^= keys >> np.uint64(29)
+        buckets = (keys & np.uint64(self._mask)).astype(np.int64)
+        tags = (keys >> np.uint64(48)).astype(np.uint16)
+        return buckets, tags
+
+    def add(self, text: str, value: Any) -> None:
+        """加入一条文本；去掉ignore中的词后与已有文本的片段完全相同时，替换该条目
+
+        Args:
+            text (str): 文本
+            value (Any): 值，如意图类型
+        """
+        shingles = self.shingles(text)
+        buckets, tags = self._band_keys([shingles])
+        buckets, tags = buckets[0], tags[0]
+        with self._lock:
+            for slot in self._candidates(buckets, tags):
+                stored = self._texts[slot]
+                if stored is not None and self.shingles(stored) == shingles:
+                    self._texts[slot] = text
+                    self._values[slot] = value
+                    return
+            slot = self._allocate()
+            self._texts[slot] = text
+            self._values[slot] = value
+            cursors = self._cursors[self._band_rows, buckets]
+            self._buckets[self._band_rows, buckets, cursors] = slot
+            self._tags[self._band_rows, buckets, cursors] = tags
+            self._cursors[self._band_rows, buckets] = (cursors + 1) % self.bucket_size
+
+    def add_many(self, items: Sequence[Tuple[str, Any]]) -> None:
+        """批量加入文本，按顺序写入，靠后的视为较新；不检查重复，用于从数据库加载
+
+        Args:
+            items (Sequence[Tuple[str, Any]]): (文本, 值)
+        """
+        if not items:
+            return
+        all_buckets, all_tags = self._band_keys([self.shingles(text) for text, _ in items])
+        with self._lock:
+            slots = np.array([self._allocate() for _ in items], dtype=np.int32)
+            for (text, value), slot in zip(items, slots):
+                self._texts[slot] = text
+                self._values[slot] = value
+            for band in range(self.bands):
+                column = all_buckets[:, band]
+                order = np.argsort(column, kind="stable")
+                ordered = column[order]
+                starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+                counts = np.diff(np.concatenate((starts, [len(ordered)])))
+                # 每条在所属桶内的序号；一个桶超过bucket_size条时只写入最后的bucket_size条
+                ranks = np.arange(len(ordered)) - np.repeat(starts, counts)
+                keep = ranks >= np.repeat(counts, counts) - self.bucket_size
+                buckets = ordered[keep]
+                cursors = self._cursors[band, buckets].astype(np.int64)
+                positions = (cursors + ranks[keep]) % self.bucket_size
+                self._buckets[band, buckets, positions] = slots[order[keep]]
+                self._tags[band, buckets, positions] = all_tags[order[keep], band]
+                group_buckets = ordered[starts]
+                self._cursors[band, group_buckets] = (
+                    (self._cursors[band, group_buckets].astype(np.int64) + counts) % self.bucket_size
+                )
+
+    def query(self, text: str, min_similarity: float = 0.0) -> Optional[NearMatch]:
+        """查找最相似的文本
+
+        Args:
+            text (str): 文本
+            min_similarity (float, optional): 最低相似度. 默认为0.0.
+
+        Returns:
+            Optional[NearMatch]: 相似度最高的条目，没有候选或低于min_similarity时返回None
+        """
+        shingles = self.shingles(text)
+        buckets, tags = self._band_keys([shingles])
+        best: Optional[NearMatch] = None
+        with self._lock:
+            for slot in self._candidates(buckets[0], tags[0]):
+                stored = self._texts[slot]
+                if stored is None:
+                    continue
+                other = self.shingles(stored)
+                similarity = len(shingles & other) / len(shingles | other)
+                if similarity >= min_similarity and (best is None or similarity > best.similarity):
+                    best = NearMatch(stored, self._values[slot], similarity)
+        return best
+
+    def _candidates(self, buckets: np.ndarray, tags: np.ndarray) -> Set[int]:
+        """取出各段桶中标签相同的条目编号，调用方须持有锁
+
+        Args:
+            buckets (np.ndarray): 各段的桶号
+            tags (np.ndarray): 各段的标签
+
+        Returns:
+            Set[int]: 条目编号
+        """
+        slots = self._buckets[self._band_rows, buckets]
+        matched = (self._tags[self._band_rows, buckets] == tags[:, None]) & (slots >= 0)
+        return set(slots[matched].tolist())
+
+    def _allocate(self) -> int:
+        """分配一个条目位置，满后覆盖最早的条目，调用方须持有锁
+
+        Returns:
+            int: 条目编号
+        """
+        slot = self._next
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return slot
+
+    def __len__(self) -> int:
+        return self._size
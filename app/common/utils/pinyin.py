@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+汉字拼音与同音纠错模块
+
+用随代码发布的拼音表(pinyin.txt)把汉字转为不带声调的拼音，并按拼音建立名称索引，
+纠正语音识别产生的同音、近音错字，如"西按"->"西安"、"空跳"->"空调"、"宁坡"->"宁波"。
+拼音表在首次使用时加载。
+"""
+
+import threading
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, Generic, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple, TypeVar
+
+from app.common.logging.logger import log_manager
+
+logger = log_manager.get_logger("pinyin")
+
+DEFAULT_PATH = Path(__file__).parent / "pinyin.txt"
+
+# 模糊音：平翘舌、n/l和前后鼻音不区分，与输入法的模糊音设置一致
+FUZZY_INITIALS = (("zh", "z"), ("ch", "c"), ("sh", "s"), ("n", "l"))
+FUZZY_FINALS = (("ang", "an"), ("eng", "en"), ("ing", "in"))
+
+# 一个名称最多展开的读音组合数，多音字很多的名称只取前几种组合
+MAX_COMBINATIONS = 16
+
+T = TypeVar("T", bound=Hashable)
+
+
+class _Table(NamedTuple):
+    """拼音表"""
+
+    # 汉字 -> 最常用读音的模糊音
+    primary: Dict[str, str]
+    # 汉字 -> 所有读音的模糊音，最常用的在前
+    readings: Dict[str, Tuple[str, ...]]
+    # 模糊音 -> 相差一个字母的其他模糊音
+    neighbors: Dict[str, Tuple[str, ...]]
+
+
+_table: Optional[_Table] = None
+_lock = threading.Lock()
+
+
+def _load(path: Path = DEFAULT_PATH) -> _Table:
+    """加载拼音表
+
+    Args:
+        path (Path, optional): 拼音表路径. 默认为DEFAULT_PATH.
+
+    Returns:
+        _Table: 拼音表
+    """
+    global _table
+    with _lock:
+        if _table is None:
+            primary: Dict[str, str] = {}
+            others: Dict[str, List[str]] = {}
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    fields = line.split()
+                    syllable = fuzzy_syllable(fields[0])
+                    for char in fields[1].strip("-"):
+                        primary[char] = syllable
+                    for char in fields[2] if len(fields) > 2 else "":
+                        others.setdefault(char, []).append(syllable)
+            readings = {
+                char: tuple(dict.fromkeys([syllable] + others.get(char, []))) for char, syllable in primary.items()
+            }
+            _table = _Table(primary, readings, _neighbors(set(primary.values())))
+            logger.info(f"拼音表加载完成，共{len(primary)}个汉字")
+    return _table
+
+
+def _neighbors(syllables: Set[str]) -> Dict[str, Tuple[str, ...]]:
+    """找出每个音节相差一个字母的其他音节
+
+    Args:
+        syllables (Set[str]): 所有音节
+
+    Returns:
+        Dict[str, Tuple[str, ...]]: 音节 -> 相差一个字母的音节
+    """
+    # 删去至多一个字母后相同的音节才可能相差一个字母
+    buckets: Dict[str, Set[str]] = {}
+    for syllable in syllables:
+        for variant in {syllable} | {syllable[:i] + syllable[i + 1:] for i in range(len(syllable))}:
+            buckets.setdefault(variant, set()).add(syllable)
+    neighbors: Dict[str, Set[str]] = {syllable: set() for syllable in syllables}
+    for group in buckets.values():
+        for a in group:
+            for b in group:
+                if a != b and edit_distance(a, b, 1) <= 1:
+                    neighbors[a].add(b)
+    return {syllable: tuple(sorted(near)) for syllable, near in neighbors.items()}
+
+
+def fuzzy_syllable(syllable: str) -> str:
+    """把音节归并为模糊音，如"zhang"->"zan"、"ning"->"lin"
+
+    Args:
+        syllable (str): 不带声调的音节
+
+    Returns:
+        str: 模糊音
+    """
+    for source, target in FUZZY_INITIALS:
+        if syllable.startswith(source):
+            syllable = target + syllable[len(source):]
+            break
+    for source, target in FUZZY_FINALS:
+        if syllable.endswith(source):
+            return syllable[:-len(source)] + target
+    return syllable
+
+
+def pinyin(text: str) -> List[Optional[str]]:
+    """获取每个字最常用读音的模糊音
+
+    Args:
+        text (str): 文本
+
+    Returns:
+        List[Optional[str]]: 每个字的模糊音，不是汉字的字符为None
+    """
+    primary = (_table or _load()).primary
+    return [primary.get(char) for char in text]
+
+
+def reading_keys(name: str) -> List[Tuple[str, ...]]:
+    """获取名称所有读音组合的模糊音
+
+    Args:
+        name (str): 名称
+
+    Returns:
+        List[Tuple[str, ...]]: 读音组合，最常用的在前，最多MAX_COMBINATIONS种；含非汉字时返回空列表
+    """
+    readings = (_table or _load()).readings
+    options = []
+    for char in name:
+        syllables = readings.get(char)
+        if syllables is None:
+            return []
+        options.append(syllables)
+    keys = []
+    for combination in product(*options):
+        keys.append(combination)
+        if len(keys) >= MAX_COMBINATIONS:
+            break
+    return keys
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """计算编辑距离，超过limit时提前返回limit + 1
+
+    Args:
+        a (str): 字符串
+        b (str): 字符串
+        limit (int): 距离上限
+
+    Returns:
+        int: 编辑距离，不超过limit + 1
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class PinyinMatch(NamedTuple):
+    """拼音匹配结果"""
+
+    # 索引中的名称
+    name: str
+    value: Any
+    # 模糊音之间的编辑距离(按字母计)，0为同音
+    distance: int
+    # 与查询词相同位置上相同的字数
+    shared: int
+
+
+class PinyinSpan(NamedTuple):
+    """文本中与索引名称同音或近音的片段"""
+
+    start: int
+    end: int
+    # 按lookup的顺序排列的候选
+    matches: List[PinyinMatch]
+
+
+class PinyinIndex(Generic[T]):
+    """按拼音查找名称的模糊索引
+
+    名称的每种读音组合都登记，查询词只取每个字最常用的读音(语音识别选出的字一般按常用读音发音)。
+    近音要求字数相同、只有一个字的模糊音不同且相差一个字母，如"ning po"和"ning bo"：
+    依次把每个音节换成相差一个字母的音节(每个音节预先算好，一般不到二十个)后查表，不需要和所有名称比较。
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, T]]):
+        """建立索引
+
+        Args:
+            items (Iterable[Tuple[str, T]]): (名称, 值)，值须可哈希；名称含非汉字时跳过
+        """
+        # 读音 -> 该读音的(名称, 值)
+        self._entries: Dict[Tuple[str, ...], List[Tuple[str, T]]] = {}
+        # 字 -> 名称中出现该字的(字数, 位置)，在文本中查找时先排除没有一个字相同的片段
+        self._slots: Dict[str, Set[Tuple[int, int]]] = {}
+        self.lengths: Set[int] = set()
+        for name, value in items:
+            keys = reading_keys(name)
+            if not keys:
+                continue
+            self.lengths.add(len(name))
+            for position, char in enumerate(name):
+                self._slots.setdefault(char, set()).add((len(name), position))
+            for key in keys:
+                entries = self._entries.setdefault(key, [])
+                if (name, value) not in entries:
+                    entries.append((name, value))
+
+    def lookup(self, word: str, max_distance: int = 1, min_shared: int = 0) -> List[PinyinMatch]:
+        """查找与词同音或近音的名称
+
+        只返回最接近的一档：有同音的名称时不再查找近音的。
+
+        Args:
+            word (str): 词
+            max_distance (int, optional): 模糊音编辑距离上限，0只找同音，最大为1. 默认为1.
+            min_shared (int, optional): 名称至少有几个字与词相同. 默认为0.
+
+        Returns:
+            List[PinyinMatch]: 字数相同的名称，按相同字数从多到少排列
+        """
+        syllables = pinyin(word)
+        if not syllables or None in syllables:
+            return []
+        return self._lookup(word, tuple(syllables), max_distance, min_shared)
+
+    def _lookup(self, word: str, key: Tuple[str, ...], max_distance: int, min_shared: int) -> List[PinyinMatch]:
+        """按读音查找
+
+        Args:
+            word (str): 词
+            key (Tuple[str, ...]): 词的读音
+            max_distance (int): 模糊音编辑距离上限
+            min_shared (int): 名称至少有几个字与词相同
+
+        Returns:
+            List[PinyinMatch]: 同lookup
+        """
+        entries = self._entries
+        found: Dict[Tuple[str, T], PinyinMatch] = {}
+
+        def collect(candidate: Tuple[str, ...], distance: int) -> None:
+            for name, value in entries[candidate]:
+                if (name, value) not in found:
+                    shared = sum(1 for a, b in zip(name, word) if a == b)
+                    if shared >= min_shared:
+                        found[(name, value)] = PinyinMatch(name, value, distance, shared)
+
+        if key in entries:
+            collect(key, 0)
+        if not found and max_distance > 0:
+            neighbors = (_table or _load()).neighbors
+            for position, syllable in enumerate(key):
+                for near in neighbors.get(syllable, ()):
+                    candidate = key[:position] + (near,) + key[position + 1:]
+                    if candidate in entries:
+                        collect(candidate, 1)
+        if len(found) < 2:
+            return list(found.values())
+        return sorted(found.values(), key=lambda match: -match.shared)
+
+    def search(self, text: str, max_distance: int = 1, min_shared: int = 1,
+               max_length: Optional[int] = None) -> List[PinyinSpan]:
+        """在文本中查找与名称同音或近音的片段
+
+        先从左到右找同音的片段，每个位置取最长的；再在没有覆盖的文字中找三个字以上的近音片段，片段互不重叠。
+        两个字的片段只接受同音，避免随意两个字都能凑出近音名称。
+
+        Args:
+            text (str): 文本
+            max_distance (int, optional): 三个字以上片段的模糊音编辑距离上限. 默认为1.
+            min_shared (int, optional): 片段至少有几个字与名称相同. 默认为1.
+            max_length (Optional[int], optional): 片段的最大字数，默认不限. 默认为None.
+
+        Returns:
+            List[PinyinSpan]: 按位置排列的片段
+        """
+        lengths = [length for length in self.lengths if max_length is None or length <= max_length]
+        # 可能匹配的片段：起点 -> 字数
+        windows: Dict[int, Set[int]] = {}
+        if min_shared > 0:
+            for index, char in enumerate(text):
+                for length, offset in self._slots.get(char, ()):
+                    start = index - offset
+                    if start >= 0 and start + length <= len(text) and (max_length is None or length <= max_length):
+                        windows.setdefault(start, set()).add(length)
+        else:
+            for start in range(len(text)):
+                windows[start] = {length for length in lengths if start + length <= len(text)}
+        if not windows:
+            return []
+
+        syllables = pinyin(text)
+        spans: List[PinyinSpan] = []
+        covered = [False] * len(text)
+        # 先找同音的片段，再在剩下的文字中找近音的，避免近音片段跨过相邻的词抢先匹配
+        for distance in range(max_distance + 1):
+            position = min(windows)
+            while position < len(text):
+                span = None
+                for length in sorted(windows.get(position, ()), reverse=True):
+                    if distance and length < 3:
+                        continue
+                    key = syllables[position:position + length]
+                    if None in key or any(covered[position:position + length]):
+                        continue
+                    matches = self._lookup(text[position:position + length], tuple(key), distance, min_shared)
+                    if matches:
+                        span = PinyinSpan(position, position + length, matches)
+                        break
+                if span is None:
+                    position += 1
+                    continue
+                spans.append(span)
+                covered[span.start:span.end] = [True] * (span.end - span.start)
+                position = span.end
+        spans.sort()
+        return spans
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文本规范化与指纹工具模块
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any
+
+# 句末不影响语义的标点；问号会改变语义(如"开始录音了?")，予以保留
+_TRAILING_PUNCTUATION = "。.!！~～…"
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """规范化用户文本，用于缓存键和请求合并
+    
+    全角转半角、英文转小写、去除空白和句末标点。
+    
+    Args:
+        text (str): 原始文本
+        
+    Returns:
+        str: 规范化后的文本
+    """
+    if not text:
+        return ""
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    normalized = _WHITESPACE_PATTERN.sub("", normalized)
+    return normalized.rstrip(_TRAILING_PUNCTUATION)
+
+
+def fingerprint(value: Any) -> str:
+    """计算任意可JSON序列化数据的稳定指纹
+    
+    Args:
+        value (Any): 待计算的数据，字典按键排序后序列化
+        
+    Returns:
+        str: 16位十六进制指纹
+    """
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def text_hash(normalized: str) -> int:
+    """计算规范化文本的64位哈希，用作意图记录表的定长索引键
+    
+    Args:
+        normalized (str): 规范化后的文本(normalize_text的结果)
+        
+    Returns:
+        int: 有符号64位整数，可直接存入BIGINT列
+    """
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+带过期时间的LRU缓存模块
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# 区分"未命中"和"缓存了None"
+_MISSING = object()
+
+
+class TTLCache:
+    """容量有界、按最近使用淘汰、条目带过期时间的内存缓存
+
+    所有操作均为O(1)。过期条目在被访问时惰性清除，超出容量时淘汰最久未使用的条目。
+    非线程安全，供单个事件循环内使用。
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """初始化缓存
+
+        Args:
+            maxsize (int): 最大条目数
+            ttl (float): 条目存活时间(秒)
+            clock (Callable[[], float], optional): 时钟函数. 默认为time.monotonic.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存
+
+        Args:
+            key (Hashable): 缓存键
+            default (Any, optional): 未命中时的返回值. 默认为None.
+
+        Returns:
+            Any: 缓存值，未命中或已过期时返回default
+        """
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        """判断键是否存在且未过期，不影响统计和淘汰顺序
+
+        Args:
+            key (Hashable): 缓存键
+
+        Returns:
+            bool: 是否存在
+        """
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and entry[0] > self._clock()
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存
+
+        Args:
+            key (Hashable): 缓存键
+            value (Any): 缓存值
+            ttl (Optional[float], optional): 本条目的存活时间，默认使用缓存的ttl. 默认为None.
+        """
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """删除条目
+
+        Args:
+            key (Hashable): 缓存键
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> int:
+        """清空缓存
+
+        Returns:
+            int: 清除的条目数
+        """
+        size = len(self._data)
+        self._data.clear()
+        return size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self, limit: int = 20) -> List[Hashable]:
+        """按最近使用顺序(最新在前)列出部分键
+
+        Args:
+            limit (int, optional): 最多返回的键数. 默认为20.
+
+        Returns:
+            List[Hashable]: 键列表
+        """
+        result = []
+        for key in reversed(self._data):
+            if len(result) >= limit:
+                break
+            result.append(key)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            Dict[str, Any]: 命中、未命中、淘汰、过期次数及容量信息
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
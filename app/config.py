@@ -28,12 +28,59 @@ class Settings:
         # 大模型配置
         self.DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY", "")
         self.QWEN_MODEL_NAME = os.getenv("QWEN_MODEL_NAME", "qwen-max")
+        self.DASHSCOPE_BASE_URL = os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/api/v1")
+        self.LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))  # 单次调用超时(秒)
+        self.LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))  # 连接池上限，同时限制并发调用数
+        self.LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "True").lower() in ("true", "1", "t")  # 合并相同的并发识别请求
         
         # 第三方API配置
         self.AMAP_API_KEY = os.getenv("AMAP_API_KEY", "")  # 高德地图API密钥
+        self.AMAP_BASE_URL = os.getenv("AMAP_BASE_URL", "https://restapi.amap.com")
+        self.AMAP_MAX_CONNECTIONS = int(os.getenv("AMAP_MAX_CONNECTIONS", "32"))  # 高德接口连接池上限
+        self.AMAP_ATTEMPT_TIMEOUT = float(os.getenv("AMAP_ATTEMPT_TIMEOUT", "2"))  # 单次请求超时(秒)
+        self.AMAP_TOTAL_TIMEOUT = float(os.getenv("AMAP_TOTAL_TIMEOUT", "4"))  # 含重试的总耗时上限(秒)
+        self.AMAP_MAX_ATTEMPTS = int(os.getenv("AMAP_MAX_ATTEMPTS", "3"))  # 最多请求次数(含首次)
+        self.AMAP_SSL_VERIFY = os.getenv("AMAP_SSL_VERIFY", "True").lower() in ("true", "1", "t")  # 校验高德接口的服务端证书，请求中带有API密钥，生产环境不要关闭
+        self.WEATHER_CACHE_MAX_SIZE = int(os.getenv("WEATHER_CACHE_MAX_SIZE", "512"))  # 天气响应缓存容量，0表示关闭
+        self.WEATHER_LIVE_UPDATE_INTERVAL = float(os.getenv("WEATHER_LIVE_UPDATE_INTERVAL", "3600"))  # 实时天气发布间隔(秒)
+        self.WEATHER_FORECAST_UPDATE_INTERVAL = float(os.getenv("WEATHER_FORECAST_UPDATE_INTERVAL", "10800"))  # 天气预报发布间隔(秒)
+        self.WEATHER_CACHE_MIN_TTL = float(os.getenv("WEATHER_CACHE_MIN_TTL", "300"))  # 数据未按时更新时的最短缓存时间(秒)
+        self.WEATHER_CACHE_STALE_TTL = float(os.getenv("WEATHER_CACHE_STALE_TTL", "1800"))  # 过期后仍返回旧数据并后台刷新的时长(秒)
+        self.IP_LOCATION_CACHE_TTL = float(os.getenv("IP_LOCATION_CACHE_TTL", "86400"))  # IP定位结果缓存时间(秒)
+        self.IP_LOCATION_CACHE_SIZE = int(os.getenv("IP_LOCATION_CACHE_SIZE", "10000"))  # 最多缓存的IP数
+        self.IP_DATABASE_PATH = os.getenv("IP_DATABASE_PATH", "")  # 离线IP段库文件路径，为空表示只使用高德IP定位
         
         # 数据库配置
         self.DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./voice_service.db")
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # 数据库线程池和连接池大小
+        self.INTENT_CACHE_MAX_SIZE = int(os.getenv("INTENT_CACHE_MAX_SIZE", "10000"))  # 意图一级缓存容量，0表示关闭
+        self.INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", "600"))  # 意图一级缓存条目存活时间(秒)
+        self.INTENT_WRITE_BEHIND_ENABLED = os.getenv("INTENT_WRITE_BEHIND_ENABLED", "True").lower() in ("true", "1", "t")  # 意图记录异步批量写入
+        self.INTENT_WRITE_BATCH_SIZE = int(os.getenv("INTENT_WRITE_BATCH_SIZE", "100"))  # 每批最大写入条数
+        self.INTENT_WRITE_FLUSH_INTERVAL_MS = int(os.getenv("INTENT_WRITE_FLUSH_INTERVAL_MS", "50"))  # 最长攒批时间(毫秒)
+        self.INTENT_WRITE_QUEUE_SIZE = int(os.getenv("INTENT_WRITE_QUEUE_SIZE", "10000"))  # 写入队列容量，满时请求等待
+        self.INTENT_CLASSIFIER_ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "True").lower() in ("true", "1", "t")  # 规则之后、大模型之前使用本地意图分类器
+        self.INTENT_CLASSIFIER_MODEL_PATH = os.getenv("INTENT_CLASSIFIER_MODEL_PATH", "./models/intent_classifier.npz")  # 分类器模型文件，不存在时跳过
+        self.INTENT_CLASSIFIER_THRESHOLD = float(os.getenv("INTENT_CLASSIFIER_THRESHOLD", "0.9"))  # 分类器概率达到该值才不调用大模型
+        self.INTENT_SIMILAR_ENABLED = os.getenv("INTENT_SIMILAR_ENABLED", "True").lower() in ("true", "1", "t")  # 精确缓存未命中时按相似说法查找历史意图
+        self.INTENT_SIMILAR_MAX_SIZE = int(os.getenv("INTENT_SIMILAR_MAX_SIZE", "100000"))  # 近似查找索引容量，满后覆盖最早的记录
+        self.INTENT_SIMILAR_THRESHOLD = float(os.getenv("INTENT_SIMILAR_THRESHOLD", "0.8"))  # 相似度达到该值才沿用历史意图
+        self.INTENT_SIMILAR_MIN_CONFIDENCE = float(os.getenv("INTENT_SIMILAR_MIN_CONFIDENCE", "0.9"))  # 加入近似查找索引的最低置信度
+        
+        # 对话上下文配置
+        self.DIALOGUE_MAX_CONTEXTS = int(os.getenv("DIALOGUE_MAX_CONTEXTS", "1000"))  # 最多保留的会话数
+        self.DIALOGUE_CONTEXT_TTL = int(os.getenv("DIALOGUE_CONTEXT_TTL", "1800"))  # 会话超时时间(秒)
+        self.DIALOGUE_SWEEP_INTERVAL = float(os.getenv("DIALOGUE_SWEEP_INTERVAL", "30"))  # 清理过期会话的间隔(秒)
+        self.SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()  # 会话共享存储: memory(仅当前进程)或redis
+        self.REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+        self.REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", "1.0"))  # 单次往返超时(秒)
+        self.SESSION_KEY_PREFIX = os.getenv("SESSION_KEY_PREFIX", "voice:ctx:")
+        self.SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "")  # 本地会话快照文件(如/var/lib/voice-service/sessions.snap)，为空表示不保存
+        self.SESSION_SNAPSHOT_INTERVAL = float(os.getenv("SESSION_SNAPSHOT_INTERVAL", "10"))  # 写入增量快照的间隔(秒)
+        
+        # 管理接口配置
+        self.ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")  # 管理接口令牌，请求需携带X-Admin-Token请求头；为空时管理接口返回403
         
         # 日志配置
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
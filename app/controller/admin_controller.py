@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+管理控制器模块
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import Depends, Header
+
+from app.config import settings
+from app.common.exception import AuthenticationException, PermissionDeniedException
+from app.common.logging.logger import log_manager
+from app.common.utils.response import ResponseUtil
+from app.controller.base_controller import BaseController
+from app.controller.intent_controller import controller as intent_controller
+from app.adapters.repository.cached_repository import CachedIntentRepository
+from app.service.intent_service import IntentService
+
+
+async def verify_admin_token(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """校验管理接口令牌，未配置ADMIN_API_TOKEN时拒绝所有管理请求
+    
+    Args:
+        x_admin_token (Optional[str]): X-Admin-Token请求头
+        
+    Raises:
+        PermissionDeniedException: 未配置ADMIN_API_TOKEN时抛出
+        AuthenticationException: 令牌不匹配时抛出
+    """
+    if not settings.ADMIN_API_TOKEN:
+        raise PermissionDeniedException("未配置ADMIN_API_TOKEN，管理接口已禁用")
+    if not hmac.compare_digest((x_admin_token or "").encode("utf-8"), settings.ADMIN_API_TOKEN.encode("utf-8")):
+        raise AuthenticationException("管理接口令牌无效")
+
+
+class AdminController(BaseController):
+    """管理控制器，提供缓存、调用统计等运维接口"""
+    
+    def __init__(self, intent_service: IntentService):
+        """初始化管理控制器
+        
+        Args:
+            intent_service (IntentService): 意图识别服务
+        """
+        super().__init__("/admin")
+        self.router.dependencies.append(Depends(verify_admin_token))
+        self.intent_service = intent_service
+        self.logger = log_manager.get_logger("admin_controller")
+        self._register_routes()
+    
+    def _register_routes(self):
+        """注册路由"""
+        
+        @self.router.get("/intent-cache")
+        async def get_intent_cache(sample_size: int = 20):
+            """查看意图一级缓存的统计信息和最近使用的键
+            
+            Args:
+                sample_size (int, optional): 返回的键数量. 默认为20.
+                
+            Returns:
+                dict: 缓存信息
+            """
+            repository = self.intent_service.intent_repository
+            if not isinstance(repository, CachedIntentRepository):
+                return ResponseUtil.success({"enabled": False}, "意图一级缓存未启用")
+            
+            info = repository.get_cache_info(sample_size)
+            info["enabled"] = True
+            return ResponseUtil.success(info, "获取意图缓存信息成功")
+        
+        @self.router.delete("/intent-cache")
+        async def flush_intent_cache():
+            """清空意图一级缓存
+            
+            Returns:
+                dict: 清除的条目数
+            """
+            repository = self.intent_service.intent_repository
+            if not isinstance(repository, CachedIntentRepository):
+                return ResponseUtil.success({"enabled": False, "flushed": 0}, "意图一级缓存未启用")
+            
+            flushed = repository.flush_cache()
+            self.logger.info(f"通过管理接口清空意图缓存，共{flushed}条")
+            return ResponseUtil.success({"enabled": True, "flushed": flushed}, "意图缓存已清空")
+        
+        @self.router.get("/weather-cache")
+        async def get_weather_cache():
+            """查看天气响应缓存的命中和上游调用统计
+            
+            Returns:
+                dict: 缓存统计
+            """
+            cache = self.intent_service.weather_service.weather_api.cache
+            return ResponseUtil.success(cache.stats(), "获取天气缓存信息成功")
+        
+        @self.router.delete("/weather-cache")
+        async def flush_weather_cache():
+            """清空天气响应缓存
+            
+            Returns:
+                dict: 清除的条目数
+            """
+            flushed = self.intent_service.weather_service.weather_api.cache.clear()
+            self.logger.info(f"通过管理接口清空天气缓存，共{flushed}条")
+            return ResponseUtil.success({"flushed": flushed}, "天气缓存已清空")
+        
+        @self.router.get("/llm-stats")
+        async def get_llm_stats():
+            """查看大模型调用统计和请求合并统计
+            
+            Returns:
+                dict: 统计信息
+            """
+            llm_service = self.intent_service.llm_service
+            return ResponseUtil.success({
+                "calls": llm_service.call_stats,
+                "coalescing": llm_service.get_coalesce_stats()
+            }, "获取大模型调用统计成功")
+
+
+# 实例化控制器并获取路由
+controller = AdminController(intent_controller.intent_service)
+router = controller.router
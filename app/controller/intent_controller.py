@@ -5,22 +5,25 @@
 意图控制器模块
 """
 
+import json
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from app.common.logging.logger import log_manager
 from app.controller.base_controller import BaseController
 from app.service.intent_service import IntentService
 from app.service.dialogue_context_service import dialogue_context_service
+from app.adapters.geo.gazetteer import gazetteer
 from app.domain.value_object.request_response import IntentRecognizeRequest
 from app.common.utils.response import ResponseUtil
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, Any
 from fastapi import Request
 
 
 # 定义设备位置请求模型
 class DeviceLocationRequest(BaseModel):
-    """设备位置请求模型"""
-    city: str
+    """设备位置请求模型，city和经纬度至少提供一项，只有经纬度时按最近的城市补全"""
+    city: Optional[str] = None
     province: Optional[str] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
@@ -51,15 +54,7 @@ class IntentController(BaseController):
                 dict: 意图识别响应
             """
             try:
-                # 获取客户端IP地址
-                client_ip = request.client.host if request.client else "127.0.0.1"
-                self.logger.info(f"接收到来自 {client_ip} 的意图识别请求，文本: '{data.text}', 会话ID: {data.session_id}")
-                
-                # 添加IP地址到上下文
-                context = data.context or {}
-                if "metadata" not in context:
-                    context["metadata"] = {}
-                context["metadata"]["client_ip"] = client_ip
+                context = self._build_request_context(request, data)
                 
                 # 调用意图服务进行识别
                 response = await self.intent_service.recognize_intent(
@@ -108,6 +103,44 @@ class IntentController(BaseController):
                     }
                 }
                 
+        @self.router.post("/recognize/stream")
+        async def recognize_intent_stream(request: Request, data: IntentRecognizeRequest):
+            """流式识别意图接口(Server-Sent Events)
+            
+            依次推送intent事件(意图和动作)、若干delta事件(对话回复文本片段)
+            和result事件(与/recognize响应格式一致)，出错时推送error事件。
+            
+            Args:
+                request (Request): FastAPI请求对象，用于获取客户端IP
+                data (IntentRecognizeRequest): 意图识别请求
+                
+            Returns:
+                StreamingResponse: text/event-stream响应
+            """
+            context = self._build_request_context(request, data)
+            
+            async def event_stream():
+                try:
+                    async for frame in self.intent_service.recognize_intent_stream(
+                        text=data.text,
+                        context=context,
+                        session_id=data.session_id
+                    ):
+                        yield self._format_sse(frame["event"], frame["data"])
+                except Exception as e:
+                    self.logger.error(f"处理流式意图识别请求失败: {str(e)}")
+                    yield self._format_sse("error", {
+                        "success": False,
+                        "message": f"处理失败: {str(e)}",
+                        "data": {"query": data.text or ""}
+                    })
+            
+            return StreamingResponse(
+                event_stream(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
         @self.router.post("/location")
         async def update_device_location(request: DeviceLocationRequest, session_id: str = "default"):
             """更新设备位置信息
@@ -120,24 +153,39 @@ class IntentController(BaseController):
                 dict: 更新结果
             """
             try:
+                city, province = request.city, request.province
+                if not city and request.latitude is not None and request.longitude is not None:
+                    # 只上报了经纬度，用内置行政区划表找最近的城市
+                    place = gazetteer.nearest_city(request.latitude, request.longitude)
+                    if place is None:
+                        raise ValueError(f"坐标({request.latitude}, {request.longitude})附近没有已知城市")
+                    city = place.name
+                    if province is None:
+                        province_place = gazetteer.get(place.adcode[:2] + "0000")
+                        province = province_place.name if province_place else None
+                if not city:
+                    raise ValueError("需要提供城市名称或经纬度")
+                
                 # 设置设备位置
+                await dialogue_context_service.load(session_id)
                 dialogue_context_service.set_device_location(
                     session_id=session_id,
-                    city=request.city,
-                    province=request.province,
+                    city=city,
+                    province=province,
                     latitude=request.latitude,
                     longitude=request.longitude
                 )
+                await dialogue_context_service.commit(session_id)
                 
                 # 返回成功响应
                 return {
                     "success": True,
-                    "message": f"设备位置已更新: {request.city}",
+                    "message": f"设备位置已更新: {city}",
                     "data": {
                         "session_id": session_id,
                         "location": {
-                            "city": request.city,
-                            "province": request.province,
+                            "city": city,
+                            "province": province,
                             "latitude": request.latitude,
                             "longitude": request.longitude
                         }
@@ -166,6 +214,7 @@ class IntentController(BaseController):
             """
             try:
                 # 获取设备位置
+                await dialogue_context_service.load(session_id)
                 location = dialogue_context_service.get_device_location(session_id)
                 
                 # 返回成功响应
@@ -188,6 +237,40 @@ class IntentController(BaseController):
                     }
                 }
 
+    
+    def _build_request_context(self, request: Request, data: IntentRecognizeRequest) -> Dict[str, Any]:
+        """构建意图识别上下文，附加客户端IP
+        
+        Args:
+            request (Request): FastAPI请求对象
+            data (IntentRecognizeRequest): 意图识别请求
+            
+        Returns:
+            Dict[str, Any]: 上下文信息
+        """
+        # 获取客户端IP地址
+        client_ip = request.client.host if request.client else "127.0.0.1"
+        self.logger.info(f"接收到来自 {client_ip} 的意图识别请求，文本: '{data.text}', 会话ID: {data.session_id}")
+        
+        # 添加IP地址到上下文
+        context = data.context or {}
+        if "metadata" not in context:
+            context["metadata"] = {}
+        context["metadata"]["client_ip"] = client_ip
+        return context
+    
+    @staticmethod
+    def _format_sse(event: str, data: Dict[str, Any]) -> str:
+        """格式化SSE事件帧
+        
+        Args:
+            event (str): 事件名
+            data (Dict[str, Any]): 事件数据
+            
+        Returns:
+            str: SSE文本帧
+        """
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 # 创建全局路由实例
 router = APIRouter(prefix="/intent", tags=["意图识别"])
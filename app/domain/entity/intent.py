@@ -53,6 +53,11 @@ class Intent(BaseModel):
         default_factory=dict,
         description="识别出的实体信息"
     )
+    llm_result: Optional[Dict[str, Any]] = Field(
+        default=None,
+        exclude=True,
+        description="大模型返回的完整识别结果(回复、实体、用量)，仅在请求内传递，不持久化"
+    )
 
     class Config:
         """Pydantic配置"""
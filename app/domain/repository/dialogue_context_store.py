@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对话上下文共享存储接口模块
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class DialogueContextStore(ABC):
+    """对话上下文共享存储接口
+
+    多个worker或节点共享会话时，每个请求开始时load一次、结束时save一次，
+    实现应保证这两个操作各只需一次网络往返。
+    """
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """读取会话
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            Optional[Dict[str, Any]]: {"history": 消息列表, "metadata": 元数据, "last_updated": 时间戳}，
+                不存在或已过期时返回None
+        """
+        pass
+
+    @abstractmethod
+    async def save(self, session_id: str, changes: Dict[str, Any], max_history: int, ttl: int) -> None:
+        """写入会话自上次读取以来的变更
+
+        只追加新消息而不是整体覆盖历史，不同worker同时处理同一会话时不会互相覆盖。
+
+        Args:
+            session_id (str): 会话ID
+            changes (Dict[str, Any]): {"appended": 新增消息列表, "reset": 是否先清空历史,
+                "metadata": 元数据, "last_updated": 时间戳}
+            max_history (int): 保留的最大消息数
+            ttl (int): 会话超时时间(秒)
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """删除会话
+
+        Args:
+            session_id (str): 会话ID
+        """
+        pass
+
+    async def close(self) -> None:
+        """释放连接等资源，默认无需释放"""
+        pass
@@ -6,29 +6,50 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Tuple
 
-from app.domain.entity.intent import Intent
+from app.domain.entity.intent import Intent, IntentType
+
+
+class SimilarIntent(NamedTuple):
+    """近似查找到的历史记录"""
+
+    # 历史记录的原始文本
+    text: str
+    intent_type: IntentType
+    # 与查询文本的相似度，0-1
+    similarity: float
 
 
 class IntentRepository(ABC):
     """意图仓储接口"""
 
     @abstractmethod
-    async def save(self, intent: Intent) -> None:
+    async def save(self, intent: Intent, context_key: str = "") -> None:
         """保存意图记录
 
         Args:
             intent (Intent): 意图实体
+            context_key (str, optional): 上下文指纹，与上下文无关的表达为空字符串. 默认为"".
         """
         pass
 
+    async def save_many(self, items: List[Tuple[Intent, str]]) -> None:
+        """批量保存意图记录，默认逐条保存，数据库实现应覆盖为单条多行语句
+
+        Args:
+            items (List[Tuple[Intent, str]]): (意图实体, 上下文指纹)列表
+        """
+        for intent, context_key in items:
+            await self.save(intent, context_key)
+
     @abstractmethod
-    async def find_by_text(self, text: str) -> Optional[Intent]:
-        """根据文本查找意图
+    async def find_by_text(self, text: str, context_key: str = "") -> Optional[Intent]:
+        """根据规范化文本和上下文指纹查找意图
 
         Args:
             text (str): 文本内容
+            context_key (str, optional): 上下文指纹. 默认为"".
 
         Returns:
             Optional[Intent]: 意图实体，如果不存在则返回None
@@ -46,3 +67,31 @@ class IntentRepository(ABC):
             List[Intent]: 意图记录列表
         """
         pass
+
+    @abstractmethod
+    async def find_labelled(self, min_confidence: float, limit: int) -> List[Tuple[str, IntentType]]:
+        """查询与上下文无关、置信度不低于min_confidence的记录，用于建立近似查找索引
+
+        Args:
+            min_confidence (float): 最低置信度
+            limit (int): 返回记录数量限制
+
+        Returns:
+            List[Tuple[str, IntentType]]: (文本, 意图类型)，最近出现的在前
+        """
+        pass
+
+    async def find_similar(self, text: str) -> Optional[SimilarIntent]:
+        """查找与文本最相似的、与上下文无关的历史记录，默认不支持近似查找
+
+        Args:
+            text (str): 文本内容
+
+        Returns:
+            Optional[SimilarIntent]: 最相似的记录文本、意图类型和相似度，没有时返回None
+        """
+        return None
+
+    async def close(self) -> None:
+        """释放仓储持有的连接池、线程池等资源，默认无需释放"""
+        pass
@@ -5,46 +5,154 @@
 基于缓存的意图识别策略
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 
+from app.config import settings
 from app.domain.strategy.base_strategy import IntentStrategy
+from app.domain.strategy.rule_strategy import DEVICE_INTENTS, correct_device_names, device_entities
 from app.domain.entity.intent import Intent
 from app.domain.repository.intent_repository import IntentRepository
+from app.common.config.intent_keywords import QUESTION_WORDS, context_matcher
+from app.common.config.intent_rules import NOT_COMMAND_WORDS
+from app.common.utils.keyword_matcher import KeywordMatcher
+from app.common.utils.text_utils import normalize_text, fingerprint
+
+# 不超过该长度的短句(如"好"、"是的"、"明天")通常是对上文的应答
+SHORT_REPLY_MAX_LENGTH = 2
+
+# 上下文相关表达参与缓存键计算的上文消息数(上一轮的用户消息和助手回复)
+CONTEXT_WINDOW = 2
+
+# 疑问、否定、指代词，与规则引擎的NOT_COMMAND相同；相似说法中这些词不一致时意思可能相反，不沿用
+_not_command_matcher = KeywordMatcher({"not_command": QUESTION_WORDS + NOT_COMMAND_WORDS})
+
+
+def build_context_key(text: str, history: Optional[List[Dict[str, Any]]]) -> str:
+    """计算缓存键中的上下文指纹
+
+    独立的指令(如"暂停音乐")与上下文无关，返回空字符串，在对话任意轮次都能命中缓存；
+    含指代、省略或应答的表达，返回上一轮对话的指纹，上文变化时自然落到不同的缓存键。
+
+    Args:
+        text (str): 用户输入文本
+        history (Optional[List[Dict[str, Any]]]): 对话历史，可以已包含当前这句用户消息
+
+    Returns:
+        str: 上下文指纹，与上下文无关时为空字符串
+    """
+    normalized = normalize_text(text)
+    is_context_dependent = (
+        len(normalized) <= SHORT_REPLY_MAX_LENGTH
+        or context_matcher.contains(normalized, "context_dependent")
+    )
+    if not is_context_dependent:
+        return ""
+
+    previous = list(history or [])
+    if previous and previous[-1].get("role") == "user" and previous[-1].get("content") == text:
+        previous = previous[:-1]
+    window = [
+        (msg.get("role"), normalize_text(msg.get("content", "")))
+        for msg in previous[-CONTEXT_WINDOW:]
+    ]
+    return fingerprint(window)
+
+
+def _not_command_words(text: str) -> Set[str]:
+    """文本中出现的疑问、否定、指代词
+
+    Args:
+        text (str): 文本
+
+    Returns:
+        Set[str]: 出现的词，没有时为空集合
+    """
+    return _not_command_matcher.scan(normalize_text(text)).get("not_command", set())
 
 
 class CacheBasedStrategy(IntentStrategy):
-    """基于缓存的意图识别策略"""
-    
-    def __init__(self, intent_repository: IntentRepository):
+    """基于缓存的意图识别策略
+
+    先按(规范化文本, 上下文指纹)精确查找；与上下文无关的表达没有找到时，再在历史记录中查找相似的说法
+    (如"打开客厅灯"找到"帮我打开客厅的灯")，相似度达到阈值且疑问、否定、指代词一致时沿用其意图类型，
+    置信度为相似度，"别打开客厅的空调"、"打开客厅的空调吗"不会沿用"打开客厅的空调"。
+    实体只在说法相同(去掉语气词后片段一致)时沿用；设备控制意图从本次文本中重新查找设备和房间，
+    其他带实体的意图交给后续策略，避免把"北京"的天气套用到"上海"。
+    """
+
+    def __init__(self, intent_repository: IntentRepository, similarity_threshold: Optional[float] = None):
         """初始化
-        
+
         Args:
             intent_repository (IntentRepository): 意图仓储
+            similarity_threshold (Optional[float], optional): 沿用相似说法意图的最低相似度，
+                默认使用INTENT_SIMILAR_THRESHOLD. 默认为None.
         """
         self.intent_repository = intent_repository
-    
-    async def recognize(self, text: str, context: Optional[Dict[str, Any]], 
+        self.similarity_threshold = (
+            settings.INTENT_SIMILAR_THRESHOLD if similarity_threshold is None else similarity_threshold
+        )
+
+    async def recognize(self, text: str, context: Optional[Dict[str, Any]],
                       history: Optional[List[Dict[str, Any]]]) -> Optional[Intent]:
         """基于缓存识别意图
-        
+
+        缓存键为(规范化文本, 上下文指纹)，见build_context_key。
+
         Args:
             text (str): 用户输入文本
             context (Optional[Dict[str, Any]]): 上下文信息
             history (Optional[List[Dict[str, Any]]]): 对话历史
-            
+
         Returns:
             Optional[Intent]: 识别出的意图，如果无法识别则返回None
         """
         # 查询缓存
-        cached_intent = await self.intent_repository.find_by_text(text)
-        
+        context_key = build_context_key(text, history)
+        cached_intent = await self.intent_repository.find_by_text(text, context_key)
+
+        # 相似说法只用于与上下文无关的表达
+        if cached_intent is None and not context_key:
+            return await self._recognize_similar(text)
+
         # 如果没有缓存结果或置信度不够高，返回None
         if not cached_intent or cached_intent.confidence < 0.9:
             return None
-            
-        # 如果对话历史过长，可能上下文已经变化，不使用缓存
-        if history and len(history) > 2:
-            # 未来可以实现更复杂的上下文相似度计算
+
+        # 规范化后相同的文本可能在标点、空白上不同，返回本次的原始文本；
+        # 不带上大模型的结果，回复由本次请求重新生成
+        return cached_intent.model_copy(update={"text": text, "llm_result": None})
+
+    async def _recognize_similar(self, text: str) -> Optional[Intent]:
+        """沿用最相似的历史说法的意图
+
+        Args:
+            text (str): 用户输入文本
+
+        Returns:
+            Optional[Intent]: 识别出的意图，没有足够相似的说法或无法确定实体时返回None
+        """
+        match = await self.intent_repository.find_similar(text)
+        if match is None or match.similarity < self.similarity_threshold:
+            return None
+        if _not_command_words(text) != _not_command_words(match.text):
             return None
-            
-        return cached_intent 
\ No newline at end of file
+
+        if match.intent_type in DEVICE_INTENTS:
+            entities = device_entities(correct_device_names(text))
+            if "target" not in entities:
+                return None
+        else:
+            labelled = await self.intent_repository.find_by_text(match.text)
+            if labelled is None or labelled.type != match.intent_type:
+                return None
+            if labelled.entities and match.similarity < 1.0:
+                return None
+            entities = dict(labelled.entities)
+
+        return Intent(
+            type=match.intent_type,
+            confidence=match.similarity,
+            text=text,
+            entities=entities
+        )
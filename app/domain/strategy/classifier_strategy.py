@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基于本地分类器的意图识别策略
+"""
+
+from typing import Dict, Any, List, Optional
+
+from app.config import settings
+from app.common.logging.logger import log_manager
+from app.common.utils.intent_classifier import IntentClassifier
+from app.domain.strategy.base_strategy import IntentStrategy
+from app.domain.strategy.cache_strategy import build_context_key
+from app.domain.strategy.rule_strategy import DEVICE_INTENTS, correct_device_names, device_entities
+from app.domain.entity.intent import Intent, IntentType
+
+# 创建日志器
+logger = log_manager.get_logger("classifier_strategy")
+
+# 需要大模型生成回复的意图，分类器识别出来也交给大模型，否则结果生成阶段还要再调用一次
+REPLY_INTENTS = (IntentType.CHAT, IntentType.UNKNOWN)
+
+
+def load_classifier(path: Optional[str] = None) -> Optional[IntentClassifier]:
+    """加载分类器模型
+
+    Args:
+        path (Optional[str], optional): 模型文件路径，默认使用INTENT_CLASSIFIER_MODEL_PATH. 默认为None.
+
+    Returns:
+        Optional[IntentClassifier]: 分类器；未启用、模型文件不存在或无法加载时返回None
+    """
+    if not settings.INTENT_CLASSIFIER_ENABLED:
+        return None
+    path = path or settings.INTENT_CLASSIFIER_MODEL_PATH
+    try:
+        classifier = IntentClassifier.load(path)
+    except FileNotFoundError:
+        logger.info(f"意图分类器模型不存在，跳过本地分类: {path}")
+        return None
+    except Exception as e:
+        logger.warning(f"加载意图分类器模型失败，跳过本地分类: {path}, {str(e)}")
+        return None
+    logger.info(f"意图分类器模型已加载: {path}，版本: {classifier.version}，意图: {classifier.labels}")
+    return classifier
+
+
+class ClassifierBasedStrategy(IntentStrategy):
+    """基于本地分类器的意图识别策略
+
+    位于规则策略和大模型策略之间：规则没有覆盖的说法(如"屋里太暗了把灯打开")由字符n-gram分类器识别，
+    概率达到阈值时直接返回，不调用大模型。依赖上文的表达和闲聊不由分类器回答；
+    设备控制意图找不到唯一的设备名时也交给大模型。模型由app.tools.train_intent_classifier离线训练。
+    """
+
+    def __init__(self, classifier: Optional[IntentClassifier] = None, threshold: Optional[float] = None):
+        """初始化
+
+        Args:
+            classifier (Optional[IntentClassifier], optional): 分类器，默认按配置加载模型文件. 默认为None.
+            threshold (Optional[float], optional): 概率阈值，默认使用INTENT_CLASSIFIER_THRESHOLD. 默认为None.
+        """
+        self.classifier = classifier if classifier is not None else load_classifier()
+        self.threshold = settings.INTENT_CLASSIFIER_THRESHOLD if threshold is None else threshold
+
+    def classify(self, text: str) -> Optional[Intent]:
+        """用分类器识别意图，不检查阈值和上下文
+
+        Args:
+            text (str): 用户输入文本
+
+        Returns:
+            Optional[Intent]: 识别出的意图，置信度为分类器给出的概率；没有模型、需要大模型回复
+                或缺少设备名时返回None
+        """
+        if self.classifier is None:
+            return None
+        corrected = correct_device_names(text)
+        label, probability = self.classifier.predict(corrected)
+        # 标签为意图记录表中的intent_type，即意图类型的值
+        try:
+            intent_type = IntentType(label)
+        except ValueError:
+            return None
+        if intent_type in REPLY_INTENTS:
+            return None
+        entities: Dict[str, Any] = {}
+        if intent_type in DEVICE_INTENTS:
+            entities = device_entities(corrected)
+            if "target" not in entities:
+                return None
+        return Intent(
+            type=intent_type,
+            confidence=probability,
+            text=text,
+            entities=entities
+        )
+
+    async def recognize(self, text: str, context: Optional[Dict[str, Any]],
+                      history: Optional[List[Dict[str, Any]]]) -> Optional[Intent]:
+        """基于本地分类器识别意图
+
+        Args:
+            text (str): 用户输入文本
+            context (Optional[Dict[str, Any]]): 上下文信息
+            history (Optional[List[Dict[str, Any]]]): 对话历史
+
+        Returns:
+            Optional[Intent]: 识别出的意图，如果无法识别或概率低于阈值则返回None
+        """
+        if self.classifier is None:
+            return None
+        # 分类器看不到上文，"那明天呢"、"把它关掉"之类的表达交给大模型
+        if build_context_key(text, history):
+            return None
+        intent = self.classify(text)
+        if intent is None or intent.confidence < self.threshold:
+            return None
+        return intent
@@ -43,21 +43,29 @@ class LLMBasedStrategy(IntentStrategy):
         )
         
         # 处理大模型返回结果
-        intent_type_str = llm_result.get("data", {}).get("intent", "UNKNOWN")
-        confidence = float(llm_result.get("data", {}).get("confidence", 0.7))
+        data = llm_result.get("data", {})
+        intent_type_str = data.get("intent", "UNKNOWN")
+        confidence = float(data.get("confidence", 0.7))
         
-        # 尝试将字符串转换为枚举类型
+        # 尝试将字符串转换为枚举类型，大模型返回的是大写名称(如CHAT)，部分枚举值为小写
         try:
             intent_type = IntentType(intent_type_str)
         except ValueError:
-            intent_type = IntentType.UNKNOWN
+            intent_type = IntentType.__members__.get(str(intent_type_str).upper(), IntentType.UNKNOWN)
+        
+        # 只保留有值的实体，大模型常对不相关的字段返回空字符串
+        entities = data.get("entities") or {}
+        if not isinstance(entities, dict):
+            entities = {}
+        entities = {k: v for k, v in entities.items() if v not in (None, "")}
             
-        # 创建意图对象
+        # 创建意图对象，完整结果随意图传递，避免结果生成阶段再次调用大模型
         intent = Intent(
             type=intent_type,
             confidence=confidence,
             text=text,
-            entities={}  # 简化版没有实体信息
+            entities=entities,
+            llm_result=llm_result
         )
         
-        return intent 
\ No newline at end of file
+        return intent
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+声明式意图规则引擎
+
+把规则配置(见app.common.config.intent_rules)编译为一个组合正则，每条规则对应一个可选分支：
+
+    (?:(?=.*?(?P<r0>模式))(?!.*?否定条件)(?:(?=.*?实体)|)...|)
+
+模式命中且否定条件不命中时才继续查找实体，否则该分支匹配空串。一次match即可得到所有规则的
+命中情况和实体，不需要逐条规则、逐个正则地扫描文本。正则写不好的实体(如地名)由规则声明的
+提取器在命中后补充。
+"""
+
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from app.domain.entity.intent import IntentType
+
+# 词表引用：{词表} 或 {实体名:词表}；正则量词 {2,6} 不以字母开头，不会被误认
+_PLACEHOLDER = re.compile(r"\{(?:([A-Za-z_]\w*):)?([A-Za-z_]\w*)\}")
+_NAMED_GROUP = re.compile(r"\(\?P<([A-Za-z_]\w*)>")
+
+Vocabulary = Union[Sequence[str], Dict[str, str]]
+# 实体提取器：文本 -> 实体的值，没有时返回None
+Extractor = Callable[[str], Optional[str]]
+
+
+class RuleMatch(NamedTuple):
+    """规则匹配结果"""
+
+    intent: IntentType
+    confidence: float
+    entities: Dict[str, Any]
+    # 命中规则在配置中的序号
+    rule: int
+
+
+class _CompiledRule(NamedTuple):
+    """编译后的规则"""
+
+    index: int
+    intent: IntentType
+    confidence: float
+    entities: Dict[str, Any]
+    # 规则模式在组合正则中的分组序号，有捕获即为命中
+    match_group: int
+    # (分组序号, 实体名, 词表)，按在正则中出现的顺序排列，同名实体取第一个有值的
+    slot_groups: Tuple[Tuple[int, str, Optional[Dict[str, str]]], ...]
+    # (实体名, 提取器)，正则没有得到该实体时调用
+    extractors: Tuple[Tuple[str, Extractor], ...]
+
+
+class RuleEngine:
+    """声明式意图规则引擎
+
+    多条规则同时命中时取优先级最高的，优先级相同时取配置中靠前的；命中了否定条件的规则视为未命中。
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], vocabularies: Optional[Dict[str, Vocabulary]] = None,
+                 extractors: Optional[Dict[str, Extractor]] = None):
+        """编译规则
+
+        Args:
+            rules (List[Dict[str, Any]]): 规则配置，格式见app.common.config.intent_rules
+            vocabularies (Optional[Dict[str, Vocabulary]], optional): 规则引用的词表. 默认为None.
+            extractors (Optional[Dict[str, Extractor]], optional): 规则引用的实体提取器. 默认为None.
+
+        Raises:
+            ValueError: 规则缺少模式、引用了不存在的词表或提取器、正则无效时抛出
+        """
+        extractors = extractors or {}
+        self._vocabularies: Dict[str, Dict[str, str]] = {}
+        self._alternations: Dict[str, str] = {}
+        for name, words in (vocabularies or {}).items():
+            values = dict(words) if isinstance(words, dict) else {word: word for word in words}
+            self._vocabularies[name] = values
+            # 长词在前，避免"后天"抢先匹配"大后天"
+            self._alternations[name] = "|".join(re.escape(word) for word in sorted(values, key=len, reverse=True))
+
+        # 分组名 -> (实体名, 词表)
+        self._groups: Dict[str, Tuple[str, Optional[Dict[str, str]]]] = {}
+        branches = []
+        for index, rule in enumerate(rules):
+            patterns = rule.get("patterns") or []
+            if not patterns:
+                raise ValueError(f"第{index}条规则({rule.get('intent')})没有模式")
+            tag = f"r{index}"
+            body = "|".join(self._translate(pattern, f"{tag}p{number}_") for number, pattern in enumerate(patterns))
+            branch = f"(?=.*?(?P<{tag}>{body}))"
+            if rule.get("exclude"):
+                branch += f"(?!.*?(?:{'|'.join(self._translate(pattern, None) for pattern in rule['exclude'])}))"
+            for number, (slot, pattern) in enumerate((rule.get("slots") or {}).items()):
+                prefix = f"{tag}s{number}_"
+                translated = self._translate(pattern, prefix)
+                if not any(group.startswith(prefix) for group in self._groups):
+                    # 没有命名分组时整个匹配就是实体的值
+                    translated = f"(?P<{prefix}{slot}>{translated})"
+                    self._groups[f"{prefix}{slot}"] = (slot, None)
+                branch += f"(?:(?=.*?{translated})|)"
+            branches.append(f"(?:{branch}|)")
+
+        try:
+            self._regex = re.compile("".join(branches), re.DOTALL)
+        except re.error as e:
+            raise ValueError(f"规则编译失败: {str(e)}")
+
+        group_index = self._regex.groupindex
+        compiled = []
+        for index, rule in enumerate(rules):
+            for slot, name in (rule.get("extract") or {}).items():
+                if name not in extractors:
+                    raise ValueError(f"第{index}条规则({rule.get('intent')})引用了不存在的提取器: {name}")
+            tag = f"r{index}"
+            names = sorted(
+                (name for name in self._groups if name.startswith((f"{tag}p", f"{tag}s"))),
+                key=group_index.__getitem__
+            )
+            compiled.append(_CompiledRule(
+                index=index,
+                intent=rule["intent"],
+                confidence=rule.get("confidence", 0.9),
+                entities=dict(rule.get("entities") or {}),
+                match_group=group_index[tag],
+                slot_groups=tuple((group_index[name],) + self._groups[name] for name in names),
+                extractors=tuple((slot, extractors[name]) for slot, name in (rule.get("extract") or {}).items()),
+            ))
+        # 按优先级从高到低排列，相同时保持配置顺序
+        self._rules = sorted(compiled, key=lambda item: -rules[item.index].get("priority", 0))
+
+    def _translate(self, pattern: str, prefix: Optional[str]) -> str:
+        """给命名分组加上前缀并展开词表引用，保证组合正则中的分组名唯一
+
+        Args:
+            pattern (str): 规则中的正则
+            prefix (Optional[str]): 分组名前缀，为None时所有分组改为非捕获分组(用于否定条件)
+
+        Returns:
+            str: 转换后的正则，已用非捕获分组包裹
+
+        Raises:
+            ValueError: 引用了不存在的词表时抛出
+        """
+        # 同一个正则中可能有多个同名实体(如两处引用日期)，分组依次编号
+        counter = [0]
+
+        def register(slot: str, vocabulary: Optional[Dict[str, str]]) -> str:
+            counter[0] += 1
+            group = f"{prefix}{counter[0]}_{slot}"
+            self._groups[group] = (slot, vocabulary)
+            return group
+
+        def rename(match: "re.Match[str]") -> str:
+            if prefix is None:
+                return "(?:"
+            return f"(?P<{register(match.group(1), None)}>"
+
+        def expand(match: "re.Match[str]") -> str:
+            slot, name = match.group(1), match.group(2)
+            if name not in self._alternations:
+                raise ValueError(f"规则引用了不存在的词表: {name}")
+            if slot is None or prefix is None:
+                return f"(?:{self._alternations[name]})"
+            return f"(?P<{register(slot, self._vocabularies[name])}>{self._alternations[name]})"
+
+        # 先处理规则中手写的命名分组，展开词表时生成的分组不再重命名
+        return f"(?:{_PLACEHOLDER.sub(expand, _NAMED_GROUP.sub(rename, pattern))})"
+
+    def match(self, text: str) -> Optional[RuleMatch]:
+        """匹配文本
+
+        Args:
+            text (str): 用户输入文本
+
+        Returns:
+            Optional[RuleMatch]: 优先级最高的命中规则，没有命中时返回None
+        """
+        found = self._regex.match(text)
+        for rule in self._rules:
+            if found.start(rule.match_group) < 0:
+                continue
+            entities = dict(rule.entities)
+            for group, slot, vocabulary in rule.slot_groups:
+                if slot in entities:
+                    continue
+                value = found.group(group)
+                if value:
+                    entities[slot] = vocabulary.get(value, value) if vocabulary else value
+            for slot, extractor in rule.extractors:
+                if slot not in entities:
+                    value = extractor(text)
+                    if value:
+                        entities[slot] = value
+            return RuleMatch(rule.intent, rule.confidence, entities, rule.index)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._rules)
@@ -6,19 +6,107 @@
 """
 
 from typing import Dict, Any, List, Optional
-import re
 
+from app.adapters.geo.gazetteer import gazetteer
+from app.common.utils.keyword_matcher import KeywordMatcher
+from app.common.utils.pinyin import PinyinIndex
 from app.domain.strategy.base_strategy import IntentStrategy
+from app.domain.strategy.rule_engine import RuleEngine
 from app.domain.entity.intent import Intent, IntentType
-from app.common.config.intent_keywords import (
-    RECORDING_KEYWORDS, 
-    QUESTION_WORDS, 
-    SENTIMENT_WORDS
-)
+from app.common.config.intent_rules import INTENT_RULES, RULE_VOCABULARIES
+
+
+def extract_place_name(text: str) -> Optional[str]:
+    """从文本中提取地名，返回能唯一解析回该行政区的名称
+
+    Args:
+        text (str): 用户输入文本
+
+    Returns:
+        Optional[str]: 地名，如"西安"、"北京朝阳"；没有时返回None
+    """
+    mention = gazetteer.extract_place(text)
+    return mention.name if mention is not None else None
+
+
+# 设备和房间名称的拼音索引，首次纠正时建立
+_device_index: Optional[PinyinIndex[str]] = None
+
+
+def correct_device_names(text: str) -> str:
+    """把文本中与设备、房间名称同音或近音的片段替换为该名称
+
+    纠正语音识别的错字，如"打开空跳"->"打开空调"、"关掉客听的灯"->"关掉客厅的灯"。
+    单字名称(如"灯")不参与，避免"等一下"之类的误纠正；同样接近的名称有多个时不纠正。
+
+    Args:
+        text (str): 用户输入文本
+
+    Returns:
+        str: 纠正后的文本，没有需要纠正的片段时返回原文本
+    """
+    global _device_index
+    if _device_index is None:
+        _device_index = PinyinIndex(
+            (name, name) for vocabulary in ("device", "room") for name in RULE_VOCABULARIES[vocabulary] if len(name) > 1
+        )
+    parts = []
+    last = 0
+    for span in _device_index.search(text):
+        best = span.matches[0]
+        if len(span.matches) > 1 and (span.matches[1].distance, span.matches[1].shared) == (best.distance, best.shared):
+            continue
+        parts.append(text[last:span.start])
+        parts.append(best.name)
+        last = span.end
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+# 设备控制意图的实体从文本中按词表查找
+DEVICE_INTENTS = (IntentType.CONTROL_DEVICE_ON, IntentType.CONTROL_DEVICE_OFF)
+_device_matcher = KeywordMatcher({"target": RULE_VOCABULARIES["device"], "room": RULE_VOCABULARIES["room"]})
+
+
+def device_entities(text: str) -> Dict[str, str]:
+    """从文本中查找设备和房间
+
+    Args:
+        text (str): 文本
+
+    Returns:
+        Dict[str, str]: target为设备、room为房间，各取最长的一个；提到多个不同设备时不含target
+    """
+    hits = _device_matcher.scan(text)
+    entities = {}
+    for name, words in hits.items():
+        # 较短的词是较长的词的一部分时(如"灯"和"台灯")只算一个
+        words = [word for word in words if not any(word != other and word in other for other in words)]
+        if len(words) == 1:
+            entities[name] = words[0]
+    return entities
+
+
+# 启动时编译的规则引擎
+rule_engine = RuleEngine(INTENT_RULES, RULE_VOCABULARIES, {"place": extract_place_name})
 
 
 class RuleBasedStrategy(IntentStrategy):
-    """基于规则的意图识别策略"""
+    """基于规则的意图识别策略
+    
+    规则见app.common.config.intent_rules，覆盖录音、媒体、设备开关、天气、时间和提醒等常见指令；
+    含疑问、否定或指代的表达不命中规则，交给后续策略。匹配前先纠正设备、房间名称的同音错字。
+    """
+    
+    def __init__(self, engine: Optional[RuleEngine] = None):
+        """初始化
+        
+        Args:
+            engine (Optional[RuleEngine], optional): 规则引擎，默认使用按配置编译的全局实例. 默认为None.
+        """
+        self.engine = engine or rule_engine
     
     async def recognize(self, text: str, context: Optional[Dict[str, Any]], 
                       history: Optional[List[Dict[str, Any]]]) -> Optional[Intent]:
@@ -32,82 +120,13 @@ class RuleBasedStrategy(IntentStrategy):
         Returns:
             Optional[Intent]: 识别出的意图，如果无法识别则返回None
         """
-        # 检查是否是录音相关的意图
-        has_recording = any(keyword in text for keyword in RECORDING_KEYWORDS)
-        has_question = any(word in text for word in QUESTION_WORDS)
-        has_sentiment = any(word in text for word in SENTIMENT_WORDS)
-        
-        # 复杂的录音相关表达，不应用简单规则
-        is_complex_recording_expression = has_recording and (has_question or has_sentiment)
-        if is_complex_recording_expression:
+        # 先纠正设备名称，否则"嚈灯"这样的错字会按"灯"命中
+        match = self.engine.match(correct_device_names(text))
+        if match is None:
             return None
-            
-        # 简单的录音开始指令
-        if has_recording and ("开始" in text or "录" in text) and not "停" in text:
-            return Intent(
-                type=IntentType.STARTRECORDING, 
-                confidence=0.95,
-                text=text,
-                entities={"operation": "开始", "target": "录音"}
-            )
-            
-        # 简单的录音停止指令
-        if has_recording and ("停" in text or "结束" in text or "完成" in text):
-            return Intent(
-                type=IntentType.STOPRECORDING,
-                confidence=0.95,
-                text=text,
-                entities={"operation": "停止", "target": "录音"}
-            )
-        
-        # 天气查询意图识别
-        weather_patterns = [
-            r'(今天|明天|后天|周[一二三四五六日天]|星期[一二三四五六日天]|[\u4e00-\u9fa5]{2,6})(的)?天气(怎么样|如何|预报|情况)?',
-            r'天气(怎么样|如何|预报|情况)?',
-            r'(查询|查看|知道)(今天|明天|后天|周[一二三四五六日天]|星期[一二三四五六日天]|[\u4e00-\u9fa5]{2,6})?(的)?天气'
-        ]
-        
-        # 检查文本是否匹配天气查询模式
-        for pattern in weather_patterns:
-            if re.search(pattern, text):
-                # 尝试提取城市和日期
-                entities = {}
-                
-                # 尝试提取城市
-                city_match = re.search(r'([\u4e00-\u9fa5]{2,6})(的天气|天气)', text)
-                if city_match:
-                    potential_city = city_match.group(1)
-                    if potential_city not in ["今天", "明天", "后天", "当前", "今日", "明日"]:
-                        entities["city"] = potential_city
-                
-                # 尝试提取日期
-                date_patterns = {
-                    "今天|今日|当前": "今天",
-                    "明天|明日": "明天",
-                    "后天": "后天",
-                    "大后天": "大后天",
-                    "周一|星期一": "周一",
-                    "周二|星期二": "周二",
-                    "周三|星期三": "周三",
-                    "周四|星期四": "周四",
-                    "周五|星期五": "周五",
-                    "周六|星期六": "周六",
-                    "周日|周天|星期日|星期天": "周日"
-                }
-                
-                for pattern, date_value in date_patterns.items():
-                    if re.search(pattern, text):
-                        entities["date"] = date_value
-                        break
-                
-                return Intent(
-                    type=IntentType.QUERY_WEATHER,
-                    confidence=0.9,
-                    text=text,
-                    entities=entities
-                )
-            
-        # 其他简单规则可以在这里添加
-        
-        # 未匹配到任何规则
-        return None 
\ No newline at end of file
+        return Intent(
+            type=match.intent,
+            confidence=match.confidence,
+            text=text,
+            entities=match.entities
+        )
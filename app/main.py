@@ -5,6 +5,7 @@
 应用程序主入口
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -14,14 +15,32 @@ from pathlib import Path
 
 from app.config import settings
 from app.controller.intent_controller import router as intent_router
+from app.controller.intent_controller import controller as intent_controller
+from app.controller.admin_controller import router as admin_router
+from app.service.dialogue_context_service import dialogue_context_service
+from app.adapters.api.amap_client import amap_client
+from app.adapters.geo.ip_locator import ip_locator
 from app.controller.base_controller import BaseController
 from app.common.exception import AppException
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理，启动时恢复会话、加载离线IP段库并启动后台任务，关闭时保存会话快照、释放连接池等资源"""
+    await dialogue_context_service.start()
+    await ip_locator.start()
+    yield
+    await dialogue_context_service.close()
+    await intent_controller.intent_service.close()
+    await amap_client.close()
+
+
 # 创建FastAPI应用实例
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="语音意图识别服务API",
+    lifespan=lifespan,
 )
 
 # 添加CORS中间件
@@ -39,6 +58,7 @@ app.add_exception_handler(Exception, BaseController.general_exception_handler)
 
 # 注册路由
 app.include_router(intent_router, prefix="/api")
+app.include_router(admin_router, prefix="/api", tags=["管理"])
 
 # 静态文件目录
 static_dir = Path(__file__).parent / "static"
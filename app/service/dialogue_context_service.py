@@ -5,15 +5,53 @@
 对话上下文管理服务
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import OrderedDict
+import asyncio
+import gc
+import heapq
+import sys
 import time
+from app.config import settings
+from app.domain.repository.dialogue_context_store import DialogueContextStore
+from app.adapters.session.snapshot_file import RECORDS_PER_LINE, SessionRecord, SessionSnapshotFile, encode_records
+from app.adapters.session.store_factory import create_dialogue_context_store, create_session_snapshot_file
 from app.common.logging.logger import log_manager
 
 # 创建日志器
 logger = log_manager.get_logger("dialogue_context")
 
+# 消息角色，从共享存储读回的角色字符串通过sys.intern复用这两个对象
+ROLE_USER = sys.intern("user")
+ROLE_ASSISTANT = sys.intern("assistant")
+
+# 快照记录中的角色代码，下标即代码
+SNAPSHOT_ROLES = (ROLE_USER, ROLE_ASSISTANT)
+
+
+def _default_location() -> Dict[str, Any]:
+    """未设置位置时的位置信息"""
+    return {
+        "city": None,
+        "province": None,
+        "country": "中国",
+        "latitude": None,
+        "longitude": None,
+        "last_updated": None
+    }
+
+
 class DialogueContext:
-    """对话上下文类"""
+    """对话上下文类
+    
+    为大量空闲会话常驻内存而设计：使用__slots__；消息存为(角色, 内容)二元组，角色字符串复用同一对象；
+    元数据在首次访问时才创建；格式化的历史在两次追加之间缓存，请求结束时释放。
+    """
+    
+    __slots__ = (
+        "session_id", "max_history", "ttl", "history", "last_updated",
+        "_metadata", "_formatted", "_appended", "_reset"
+    )
     
     def __init__(self, session_id: str, max_history: int = 5, ttl: int = 1800):
         """初始化对话上下文
@@ -26,19 +64,24 @@ class DialogueContext:
         self.session_id = session_id
         self.max_history = max_history
         self.ttl = ttl
-        self.history: List[Dict[str, Any]] = []
+        self.history: List[Tuple[str, str]] = []
         self.last_updated = time.time()
-        self.metadata: Dict[str, Any] = {
-            # 初始化元数据，包括位置信息
-            "location": {
-                "city": None,
-                "province": None,
-                "country": "中国",
-                "latitude": None,
-                "longitude": None,
-                "last_updated": None
-            }
-        }
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._formatted: Optional[List[Dict[str, str]]] = None
+        # 自上次同步到共享存储以来新增的消息，以及是否清空过历史
+        self._appended: Optional[List[Tuple[str, str]]] = None
+        self._reset = False
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """会话元数据，包括位置信息，首次访问时创建"""
+        if self._metadata is None:
+            self._metadata = {"location": _default_location()}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value
     
     def add_user_message(self, text: str) -> None:
         """添加用户消息
@@ -46,13 +89,7 @@ class DialogueContext:
         Args:
             text (str): 用户消息文本
         """
-        self.history.append({
-            "role": "user",
-            "content": text,
-            "timestamp": time.time()
-        })
-        self._trim_history()
-        self.last_updated = time.time()
+        self._append((ROLE_USER, text))
     
     def add_assistant_message(self, text: str) -> None:
         """添加助手消息
@@ -60,38 +97,69 @@ class DialogueContext:
         Args:
             text (str): 助手消息文本
         """
-        self.history.append({
-            "role": "assistant",
-            "content": text,
-            "timestamp": time.time()
-        })
-        self._trim_history()
-        self.last_updated = time.time()
+        self._append((ROLE_ASSISTANT, text))
     
-    def _trim_history(self) -> None:
-        """裁剪历史记录，确保不超过最大长度"""
+    def _append(self, message: Tuple[str, str]) -> None:
+        """追加消息，超出最大长度时原地删除最早的消息
+        
+        Args:
+            message (Tuple[str, str]): (角色, 内容)
+        """
+        self.history.append(message)
         if len(self.history) > self.max_history:
-            self.history = self.history[-self.max_history:]
+            del self.history[:len(self.history) - self.max_history]
+        
+        if self._appended is None:
+            self._appended = []
+        self._appended.append(message)
+        # 共享存储同样只保留最近max_history条，更早的新增消息无需写入
+        if len(self._appended) > self.max_history:
+            del self._appended[:len(self._appended) - self.max_history]
+        
+        self._formatted = None
+        self.last_updated = time.time()
     
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """检查会话是否已过期
         
+        Args:
+            now (Optional[float], optional): 当前时间戳，默认取time.time(). 默认为None.
+        
         Returns:
             bool: 如果会话已过期，返回True
         """
-        return (time.time() - self.last_updated) > self.ttl
+        return ((now or time.time()) - self.last_updated) > self.ttl
+    
+    def expires_at(self) -> float:
+        """获取会话的过期时间戳
+        
+        Returns:
+            float: 过期时间戳
+        """
+        return self.last_updated + self.ttl
     
     def get_formatted_history(self) -> List[Dict[str, str]]:
         """获取格式化的历史记录，用于发送给大模型
         
+        返回的列表在下次追加消息前会被复用，调用方不应修改。
+        
         Returns:
             List[Dict[str, str]]: 格式化的历史记录
         """
-        return [{"role": msg["role"], "content": msg["content"]} for msg in self.history]
+        if self._formatted is None:
+            self._formatted = [{"role": role, "content": content} for role, content in self.history]
+        return self._formatted
+    
+    def release_formatted_history(self) -> None:
+        """释放格式化历史的缓存，请求结束后调用，使空闲会话不占用这部分内存"""
+        self._formatted = None
     
     def clear(self) -> None:
         """清空对话历史"""
         self.history = []
+        self._formatted = None
+        self._appended = None
+        self._reset = True
         self.last_updated = time.time()
     
     def set_location(self, city: str, province: Optional[str] = None, 
@@ -120,20 +188,142 @@ class DialogueContext:
         Returns:
             Dict[str, Any]: 位置信息
         """
-        return self.metadata.get("location", {})
+        if self._metadata is None:
+            return _default_location()
+        return self._metadata.get("location", {})
+    
+    def collect_changes(self) -> Dict[str, Any]:
+        """取出自上次调用以来的变更，用于写入共享存储
+        
+        Returns:
+            Dict[str, Any]: {"appended": 新增消息, "reset": 是否清空过历史, "metadata": 元数据, "last_updated": 时间戳}
+        """
+        changes = {
+            "appended": [{"role": role, "content": content} for role, content in self._appended or ()],
+            "reset": self._reset,
+            "metadata": self._metadata or {},
+            "last_updated": self.last_updated
+        }
+        self._appended = None
+        self._reset = False
+        return changes
+    
+    def discard_changes(self) -> None:
+        """丢弃变更记录，未配置共享存储时使用"""
+        self._appended = None
+        self._reset = False
+    
+    def has_pending_changes(self) -> bool:
+        """是否有尚未写入共享存储的消息
+        
+        Returns:
+            bool: 有未写入的消息或清空操作时返回True
+        """
+        return bool(self._appended) or self._reset
+    
+    @classmethod
+    def from_dict(cls, session_id: str, data: Dict[str, Any], max_history: int = 5, ttl: int = 1800) -> "DialogueContext":
+        """从共享存储读取的数据重建上下文
+        
+        Args:
+            session_id (str): 会话ID
+            data (Dict[str, Any]): DialogueContextStore.load返回的数据
+            max_history (int, optional): 最大历史记录数. 默认为5.
+            ttl (int, optional): 会话超时时间(秒). 默认为1800.
+            
+        Returns:
+            DialogueContext: 对话上下文
+        """
+        context = cls(session_id, max_history=max_history, ttl=ttl)
+        context.history = [
+            (sys.intern(message["role"]), message["content"])
+            for message in (data.get("history") or [])[-max_history:]
+        ]
+        if data.get("metadata"):
+            context._metadata = data["metadata"]
+        if data.get("last_updated"):
+            context.last_updated = data["last_updated"]
+        return context
+    
+    def to_record(self) -> SessionRecord:
+        """转换为快照记录，历史展开为一维列表，角色编码为0(用户)/1(助手)
+        
+        Returns:
+            SessionRecord: [会话ID, 最后更新时间, [角色代码, 内容, 角色代码, 内容, ...], 元数据或None]
+        """
+        history = []
+        for role, content in self.history:
+            history.append(0 if role is ROLE_USER else 1)
+            history.append(content)
+        metadata = dict(self._metadata) if self._metadata is not None else None
+        return [self.session_id, self.last_updated, history, metadata]
+    
+    @classmethod
+    def from_record(cls, record: SessionRecord, max_history: int = 5, ttl: int = 1800) -> "DialogueContext":
+        """从快照记录重建上下文
+        
+        Args:
+            record (SessionRecord): to_record生成的记录
+            max_history (int, optional): 最大历史记录数. 默认为5.
+            ttl (int, optional): 会话超时时间(秒). 默认为1800.
+            
+        Returns:
+            DialogueContext: 对话上下文
+        """
+        session_id, last_updated, history, metadata = record
+        context = cls(session_id, max_history, ttl)
+        messages = iter(history[-2 * max_history:])
+        context.history = [(SNAPSHOT_ROLES[role], content) for role, content in zip(messages, messages)]
+        context._metadata = metadata
+        context.last_updated = last_updated
+        return context
 
 
 class DialogueContextService:
-    """对话上下文管理服务"""
+    """对话上下文管理服务
     
-    def __init__(self, max_contexts: int = 1000):
+    会话按最近访问顺序存放在OrderedDict中，访问和超出容量时的淘汰都是O(1)。
+    过期时间放在最小堆中，由后台任务定期清理；访问时也会检查过期，清理间隔内不会读到过期会话。
+    单次访问的开销与会话总数无关。
+    
+    配置了共享存储(store)时，进程内的会话只是工作副本：请求开始时调用load从共享存储读取，
+    结束时调用commit写回，多个worker或节点之间共享对话历史和设备位置。
+    
+    会话只保存在当前进程时，可以配置本地快照(snapshot)：启动时恢复未过期的会话，运行期间定期把
+    变更过的会话追加到快照日志，日志超过会话总数时重写完整快照，关闭时写入最后一批变更。
+    """
+    
+    def __init__(self, max_contexts: int = 1000, ttl: int = 1800, sweep_interval: float = 30,
+                 store: Optional[DialogueContextStore] = None,
+                 snapshot: Optional[SessionSnapshotFile] = None, snapshot_interval: float = 10):
         """初始化对话上下文管理服务
         
         Args:
             max_contexts (int, optional): 最大上下文数量. 默认为1000.
+            ttl (int, optional): 会话超时时间(秒). 默认为1800.
+            sweep_interval (float, optional): 后台清理过期会话的间隔(秒). 默认为30.
+            store (Optional[DialogueContextStore], optional): 共享存储，None表示会话只保存在当前进程. 默认为None.
+            snapshot (Optional[SessionSnapshotFile], optional): 本地快照文件，None表示不保存快照. 默认为None.
+            snapshot_interval (float, optional): 写入增量快照的间隔(秒). 默认为10.
         """
-        self.contexts: Dict[str, DialogueContext] = {}
+        self.store = store
+        self.snapshot = snapshot
+        self.snapshot_interval = snapshot_interval
+        # 自上次写快照以来变更或删除过的会话
+        self._dirty: Set[str] = set()
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._snapshot_lock: Optional[asyncio.Lock] = None
+        self._snapshot_failed = False
+        # 当前快照日志中的记录数
+        self._journal_records = 0
+        self.contexts: "OrderedDict[str, DialogueContext]" = OrderedDict()
         self.max_contexts = max_contexts
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        # (计划检查时间, 会话ID)最小堆，每个会话只有_scheduled中记录的那一条是有效的
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._scheduled: Dict[str, float] = {}
+        self._sweeper: Optional[asyncio.Task] = None
         self.logger = logger
         self.logger.info("对话上下文管理服务初始化成功")
     
@@ -146,24 +336,236 @@ class DialogueContextService:
         Returns:
             DialogueContext: 对话上下文
         """
-        # 清理过期的上下文
-        self._cleanup_expired_contexts()
+        context = self.contexts.get(session_id)
+        if context is not None and context.is_expired():
+            self.logger.info(f"会话 {session_id} 已过期，移除上下文")
+            self._remove(session_id)
+            context = None
         
         # 如果上下文不存在，创建新的
-        if session_id not in self.contexts:
+        if context is None:
             self.logger.info(f"为会话 {session_id} 创建新的对话上下文")
-            self.contexts[session_id] = DialogueContext(session_id)
+            context = DialogueContext(session_id, ttl=self.ttl)
+            self.contexts[session_id] = context
+            self._schedule(session_id, context.expires_at())
             
-            # 如果上下文数量超过限制，移除最旧的
+            # 如果上下文数量超过限制，移除最久未访问的
             if len(self.contexts) > self.max_contexts:
-                oldest_session_id = min(
-                    self.contexts.keys(),
-                    key=lambda sid: self.contexts[sid].last_updated
-                )
+                oldest_session_id = next(iter(self.contexts))
                 self.logger.info(f"上下文数量超过限制，移除最旧的会话 {oldest_session_id}")
-                del self.contexts[oldest_session_id]
+                self._remove(oldest_session_id)
+        else:
+            self.contexts.move_to_end(session_id)
+        
+        return context
+    
+    async def load(self, session_id: str) -> DialogueContext:
+        """在请求开始时从共享存储读取会话，作为本进程的工作副本
+        
+        未配置共享存储时等同于get_context。本进程中同一会话还有未写回的变更(并发请求)时
+        保留本地副本，避免丢失这些变更。共享存储不可用时降级为使用本地副本。
         
-        return self.contexts[session_id]
+        Args:
+            session_id (str): 会话ID
+            
+        Returns:
+            DialogueContext: 对话上下文
+        """
+        if self.store is None:
+            return self.get_context(session_id)
+        
+        local = self.contexts.get(session_id)
+        if local is not None and local.has_pending_changes():
+            return self.get_context(session_id)
+        
+        try:
+            data = await self.store.load(session_id)
+        except Exception as e:
+            self.logger.warning(f"从共享存储读取会话 {session_id} 失败，使用本地上下文: {str(e)}")
+            return self.get_context(session_id)
+        
+        if data is None:
+            if local is not None:
+                self._remove(session_id)
+            return self.get_context(session_id)
+        
+        context = DialogueContext.from_dict(session_id, data, ttl=self.ttl)
+        scheduled = self._scheduled.get(session_id)
+        self.contexts[session_id] = context
+        self.contexts.move_to_end(session_id)
+        # 已登记的检查时间不晚于新的过期时间时沿用，到期时清理任务按新的过期时间重新入堆；
+        # 每次读取都入堆的话，堆的大小会随请求量增长
+        if scheduled is None or context.expires_at() < scheduled:
+            self._schedule(session_id, context.expires_at())
+        if local is None and len(self.contexts) > self.max_contexts:
+            self._remove(next(iter(self.contexts)))
+        return self.get_context(session_id)
+    
+    async def commit(self, session_id: str) -> None:
+        """在请求结束时把会话的变更写回共享存储，并释放请求期间的缓存
+        
+        Args:
+            session_id (str): 会话ID
+        """
+        context = self.contexts.get(session_id)
+        if context is None:
+            return
+        
+        context.release_formatted_history()
+        if self.store is None:
+            context.discard_changes()
+            self._mark_dirty(session_id)
+            return
+        
+        changes = context.collect_changes()
+        try:
+            await self.store.save(session_id, changes, context.max_history, context.ttl)
+        except Exception as e:
+            self.logger.error(f"会话 {session_id} 写回共享存储失败: {str(e)}")
+    
+    async def start(self) -> None:
+        """应用启动时调用：从快照恢复会话，启动后台清理和快照任务"""
+        if self.snapshot is not None:
+            await self.restore_snapshot()
+            await self.save_snapshot(full=True)
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+        self.start_sweeper()
+    
+    async def close(self) -> None:
+        """停止后台任务，写入最后一批快照，关闭共享存储连接"""
+        await self.stop_sweeper()
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+            await self.save_snapshot()
+        if self.store is not None:
+            await self.store.close()
+    
+    async def restore_snapshot(self) -> int:
+        """从快照恢复未过期的会话，超出容量时保留最近更新的会话
+        
+        文件读取和解析在线程中执行，不阻塞事件循环。已在内存中的会话不会被覆盖。
+        
+        Returns:
+            int: 恢复的会话数
+        """
+        if self.snapshot is None:
+            return 0
+        
+        started = time.perf_counter()
+        # 恢复期间只新建对象、不产生循环引用，暂停分代回收可省去大量无用的回收扫描
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            try:
+                records = await asyncio.to_thread(self.snapshot.read, None, self.ttl)
+            except Exception as e:
+                self.logger.error(f"读取会话快照失败，不恢复会话: {str(e)}")
+                return 0
+            
+            # 记录按访问顺序由远到近排列，依次插入即为LRU顺序
+            restored = 0
+            for record in records[-self.max_contexts:]:
+                session_id = record[0]
+                if session_id in self.contexts:
+                    continue
+                context = DialogueContext.from_record(record, ttl=self.ttl)
+                expires_at = context.last_updated + self.ttl
+                self.contexts[session_id] = context
+                self._scheduled[session_id] = expires_at
+                self._expiry_heap.append((expires_at, session_id))
+                restored += 1
+            heapq.heapify(self._expiry_heap)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        while len(self.contexts) > self.max_contexts:
+            self._remove(next(iter(self.contexts)))
+        
+        self.logger.info(f"已从快照恢复{restored}个会话，耗时{(time.perf_counter() - started) * 1000:.0f}ms")
+        return restored
+    
+    async def save_snapshot(self, full: bool = False) -> None:
+        """写入快照
+        
+        默认只把变更过的会话追加到日志；日志记录数超过会话总数、尚未写过完整快照或上次写入失败时，
+        改为重写完整快照。会话在事件循环中每RECORDS_PER_LINE个编码为一行，每行之间让出事件循环，
+        写文件在线程中执行；编码期间发生的变更记入下一次增量快照。同一时间只有一次写入。
+        
+        Args:
+            full (bool, optional): 是否强制写入完整快照. 默认为False.
+        """
+        if self.snapshot is None:
+            return
+        if self._snapshot_lock is None:
+            self._snapshot_lock = asyncio.Lock()
+        async with self._snapshot_lock:
+            await self._write_snapshot(full)
+    
+    async def _write_snapshot(self, full: bool) -> None:
+        """写入快照，由save_snapshot在持有锁时调用
+        
+        Args:
+            full (bool): 是否强制写入完整快照
+        """
+        full = (full or self._snapshot_failed or not self.snapshot.has_full_snapshot
+                or self._journal_records + len(self._dirty) > max(len(self.contexts), 1000))
+        if not full and not self._dirty:
+            return
+        
+        dirty, self._dirty = self._dirty, set()
+        if full:
+            now = time.time()
+            items = [context for context in self.contexts.values() if not context.is_expired(now)]
+        else:
+            # 删除记录在前，其余按更新时间排列，恢复时依次移到末尾即得到访问顺序
+            items = [session_id for session_id in dirty if session_id not in self.contexts]
+            items.extend(sorted(
+                (self.contexts[session_id] for session_id in dirty if session_id in self.contexts),
+                key=lambda context: context.last_updated
+            ))
+        
+        started = time.perf_counter()
+        lines = []
+        for start in range(0, len(items), RECORDS_PER_LINE):
+            lines.append(encode_records([
+                [item] if isinstance(item, str) else item.to_record()
+                for item in items[start:start + RECORDS_PER_LINE]
+            ]))
+            await asyncio.sleep(0)
+        
+        try:
+            if full:
+                await asyncio.to_thread(self.snapshot.write_full, lines)
+                self._journal_records = 0
+            else:
+                await asyncio.to_thread(self.snapshot.append, lines)
+                self._journal_records += len(items)
+            self._snapshot_failed = False
+        except Exception as e:
+            # 本批变更已从_dirty取出，下次改写完整快照以免丢失
+            self._snapshot_failed = True
+            self.logger.error(f"写入会话快照失败: {str(e)}")
+            return
+        self.logger.debug(
+            f"已写入{'完整' if full else '增量'}会话快照: {len(items)}条记录，"
+            f"耗时{(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+    
+    async def _snapshot_loop(self) -> None:
+        """定期写入增量快照，停止时正在进行的写入会继续完成"""
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await asyncio.shield(self.save_snapshot())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"写入会话快照失败: {str(e)}")
     
     def add_user_message(self, session_id: str, text: str) -> None:
         """添加用户消息
@@ -174,6 +576,7 @@ class DialogueContextService:
         """
         context = self.get_context(session_id)
         context.add_user_message(text)
+        self._mark_dirty(session_id)
     
     def add_assistant_message(self, session_id: str, text: str) -> None:
         """添加助手消息
@@ -184,6 +587,7 @@ class DialogueContextService:
         """
         context = self.get_context(session_id)
         context.add_assistant_message(text)
+        self._mark_dirty(session_id)
     
     def get_history(self, session_id: str) -> List[Dict[str, str]]:
         """获取对话历史
@@ -206,6 +610,7 @@ class DialogueContextService:
         if session_id in self.contexts:
             self.logger.info(f"清空会话 {session_id} 的对话上下文")
             self.contexts[session_id].clear()
+            self._mark_dirty(session_id)
     
     def delete_context(self, session_id: str) -> None:
         """删除对话上下文
@@ -215,7 +620,7 @@ class DialogueContextService:
         """
         if session_id in self.contexts:
             self.logger.info(f"删除会话 {session_id} 的对话上下文")
-            del self.contexts[session_id]
+            self._remove(session_id)
             
     def set_device_location(self, session_id: str, city: str, province: Optional[str] = None,
                           latitude: Optional[float] = None, longitude: Optional[float] = None) -> None:
@@ -230,6 +635,7 @@ class DialogueContextService:
         """
         context = self.get_context(session_id)
         context.set_location(city, province, latitude, longitude)
+        self._mark_dirty(session_id)
         self.logger.info(f"已设置会话 {session_id} 的设备位置: {city}")
         
     def get_device_location(self, session_id: str) -> Dict[str, Any]:
@@ -244,16 +650,104 @@ class DialogueContextService:
         context = self.get_context(session_id)
         return context.get_location()
     
-    def _cleanup_expired_contexts(self) -> None:
-        """清理过期的上下文"""
-        expired_sessions = [
-            session_id for session_id, context in self.contexts.items()
-            if context.is_expired()
-        ]
+    def sweep_expired(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """清理到期的会话
         
-        for session_id in expired_sessions:
-            self.logger.info(f"会话 {session_id} 已过期，移除上下文")
-            del self.contexts[session_id]
+        从堆顶依次检查到期的会话：期间有过更新的会话按新的过期时间重新入堆，确已过期的移除。
+        每个会话在一个ttl周期内最多重新入堆一次，摊还开销为O(log n)。
+        
+        Args:
+            now (Optional[float], optional): 当前时间戳，默认取time.time(). 默认为None.
+            limit (Optional[int], optional): 本次最多移除的会话数，None表示不限. 默认为None.
+            
+        Returns:
+            int: 移除的会话数
+        """
+        now = now or time.time()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            scheduled_at, session_id = heapq.heappop(heap)
+            if self._scheduled.get(session_id) != scheduled_at:
+                continue  # 会话已删除或已重建，这是过时的条目
+            
+            context = self.contexts[session_id]
+            if context.is_expired(now):
+                self._remove(session_id)
+                removed += 1
+            else:
+                self._schedule(session_id, context.expires_at())
+        return removed
+    
+    def start_sweeper(self) -> None:
+        """在当前事件循环中启动后台清理任务"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+            self.logger.info(f"会话过期清理任务已启动，间隔: {self.sweep_interval}秒")
+    
+    async def stop_sweeper(self) -> None:
+        """停止后台清理任务"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+    
+    async def _sweep_loop(self) -> None:
+        """后台清理循环，大批会话同时到期时分批清理，避免长时间占用事件循环"""
+        batch = 1000
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                total = 0
+                while True:
+                    removed = self.sweep_expired(limit=batch)
+                    total += removed
+                    if removed < batch:
+                        break
+                    await asyncio.sleep(0)
+                if total:
+                    self.logger.info(f"已清理{total}个过期会话，剩余{len(self.contexts)}个")
+            except Exception as e:
+                self.logger.error(f"清理过期会话失败: {str(e)}")
+    
+    def _schedule(self, session_id: str, check_at: float) -> None:
+        """登记会话的过期检查时间
+        
+        Args:
+            session_id (str): 会话ID
+            check_at (float): 检查时间戳
+        """
+        self._scheduled[session_id] = check_at
+        heapq.heappush(self._expiry_heap, (check_at, session_id))
+    
+    def _remove(self, session_id: str) -> None:
+        """移除会话，堆中的条目在弹出时作为过时条目跳过
+        
+        Args:
+            session_id (str): 会话ID
+        """
+        del self.contexts[session_id]
+        self._scheduled.pop(session_id, None)
+        self._mark_dirty(session_id)
+    
+    def _mark_dirty(self, session_id: str) -> None:
+        """记录会话有变更，下次写快照时写入
+        
+        Args:
+            session_id (str): 会话ID
+        """
+        if self.snapshot is not None:
+            self._dirty.add(session_id)
 
 # 创建全局服务实例
-dialogue_context_service = DialogueContextService() 
\ No newline at end of file
+dialogue_context_service = DialogueContextService(
+    max_contexts=settings.DIALOGUE_MAX_CONTEXTS,
+    ttl=settings.DIALOGUE_CONTEXT_TTL,
+    sweep_interval=settings.DIALOGUE_SWEEP_INTERVAL,
+    store=create_dialogue_context_store(),
+    snapshot=create_session_snapshot_file(),
+    snapshot_interval=settings.SESSION_SNAPSHOT_INTERVAL
+) 
\ No newline at end of file
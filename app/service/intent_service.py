@@ -5,16 +5,18 @@
 意图识别服务模块
 """
 
-from typing import Dict, Any, Optional, List, Pattern, Match
+from typing import Dict, Any, Optional, List, Pattern, Match, AsyncIterator
 import re
 from app.service.base_service import BaseService
 from app.service.llm_service import LLMService
 from app.service.dialogue_context_service import dialogue_context_service
 from app.service.weather_service import WeatherService
+from app.adapters.geo.gazetteer import gazetteer
+from app.adapters.geo.ip_locator import IPLocator, ip_locator as default_ip_locator
 from app.domain.entity.intent import Intent, IntentType
 from app.domain.entity.action import Action, ActionType
 from app.domain.repository.intent_repository import IntentRepository
-from app.adapters.repository.postgres_repository import PostgresIntentRepository
+from app.adapters.repository.repository_factory import create_intent_repository
 from app.domain.value_object.request_response import IntentRecognizeResponse
 from app.common.exception import AppException
 from app.common.exception.intent_exceptions import (
@@ -26,12 +28,17 @@ from app.common.exception.intent_exceptions import (
 
 # 导入策略
 from app.domain.strategy.base_strategy import IntentStrategy
-from app.domain.strategy.cache_strategy import CacheBasedStrategy
+from app.domain.strategy.cache_strategy import CacheBasedStrategy, build_context_key
 from app.domain.strategy.rule_strategy import RuleBasedStrategy
+from app.domain.strategy.classifier_strategy import ClassifierBasedStrategy
 from app.domain.strategy.llm_strategy import LLMBasedStrategy
 
 # 导入配置
 from app.common.config.intent_action_mapping import INTENT_TO_ACTION_MAPPING
+from app.common.config.intent_keywords import DATE_KEYWORDS
+
+# 天气查询文本中的日期词，启动时编译；长词在前，"大后天"不会被当作"后天"，多个日期词取靠前的
+DATE_PATTERN = re.compile("|".join(re.escape(word) for word in sorted(DATE_KEYWORDS, key=len, reverse=True)))
 
 
 class IntentService(BaseService):
@@ -40,30 +47,39 @@ class IntentService(BaseService):
     def __init__(self, 
                 llm_service: Optional[LLMService] = None,
                 intent_repository: Optional[IntentRepository] = None,
-                weather_service: Optional[WeatherService] = None):
+                weather_service: Optional[WeatherService] = None,
+                ip_locator: Optional[IPLocator] = None):
         """初始化意图识别服务
         
         Args:
             llm_service (Optional[LLMService], optional): 大模型服务. 默认为None.
             intent_repository (Optional[IntentRepository], optional): 意图仓储. 默认为None.
             weather_service (Optional[WeatherService], optional): 天气服务. 默认为None.
+            ip_locator (Optional[IPLocator], optional): IP定位器，默认使用全局实例. 默认为None.
         """
         super().__init__("intent_service")
         
         # 初始化依赖服务和仓储
         self.llm_service = llm_service or LLMService()
-        self.intent_repository = intent_repository or PostgresIntentRepository()
+        self.intent_repository = intent_repository or create_intent_repository()
         self.weather_service = weather_service or WeatherService()
+        self.ip_locator = ip_locator or default_ip_locator
         
         # 初始化策略
         self.strategies: List[IntentStrategy] = [
             CacheBasedStrategy(self.intent_repository),
             RuleBasedStrategy(),
+            ClassifierBasedStrategy(),
             LLMBasedStrategy(self.llm_service)
         ]
         
         self.logger.info("意图识别服务初始化成功")
     
+    async def close(self) -> None:
+        """释放服务持有的外部资源，在应用关闭时调用"""
+        await self.llm_service.close()
+        await self.intent_repository.close()
+    
     async def recognize_intent(
         self, 
         text: str, 
@@ -83,23 +99,25 @@ class IntentService(BaseService):
         Raises:
             AppException: 处理失败时抛出
         """
+        self.llm_service.begin_request()
         try:
             self.logger.info(f"开始处理意图识别请求，文本: {text}, 会话ID: {session_id}")
             
             # 1. 准备上下文
-            await self._prepare_context(text, session_id)
+            message_history = await self._prepare_context(text, session_id)
+            context_key = build_context_key(text, message_history)
             
             # 2. 识别意图
-            intent = await self._identify_intent(text, context, session_id)
+            intent = await self._identify_intent(text, context, message_history)
             
             # 3. 生成动作
             action = await self._generate_action(intent)
             
             # 4. 生成结果
-            result = await self._generate_result(intent, action, session_id)
+            result = await self._generate_result(intent, action, session_id, context)
             
             # 5. 保存意图
-            await self._save_intent(intent)
+            await self._save_intent(intent, context_key)
             
             self.logger.info(f"意图识别完成，类型: {intent.type}，动作类型: {action.type}")
             return IntentRecognizeResponse(intent=intent, action=action, result=result)
@@ -112,29 +130,124 @@ class IntentService(BaseService):
             error_msg = f"意图识别发生未预期错误: {str(e)}"
             self.logger.error(error_msg)
             raise AppException(error_msg)
+        finally:
+            await dialogue_context_service.commit(session_id)
+            llm_calls = self.llm_service.end_request()
+            self.logger.info(f"本次请求调用大模型{llm_calls}次")
+    
+    async def recognize_intent_stream(
+        self,
+        text: str,
+        context: Optional[Dict[str, Any]] = None,
+        session_id: str = "default"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """识别文本意图并以事件流的形式返回结果
+        
+        意图和动作确定后立即产出intent事件；对于UNKNOWN和CHAT意图，随后逐段产出
+        大模型生成的回复(delta事件)；最后产出与非流式接口格式一致的result事件。
+        
+        Args:
+            text (str): 待识别的文本
+            context (Optional[Dict[str, Any]], optional): 上下文信息. 默认为None.
+            session_id (str, optional): 会话ID. 默认为"default".
+            
+        Yields:
+            Dict[str, Any]: 事件，格式为{"event": 事件名, "data": 事件数据}
+            
+        Raises:
+            AppException: 处理失败时抛出
+        """
+        self.llm_service.begin_request()
+        try:
+            self.logger.info(f"开始处理流式意图识别请求，文本: {text}, 会话ID: {session_id}")
+            
+            message_history = await self._prepare_context(text, session_id)
+            context_key = build_context_key(text, message_history)
+            intent = await self._identify_intent(text, context, message_history)
+            action = await self._generate_action(intent)
+            
+            yield {
+                "event": "intent",
+                "data": {
+                    "intent": str(intent.type.value).upper(),
+                    "confidence": str(round(intent.confidence, 2)),
+                    "query": intent.text,
+                    "action": action.to_dict()
+                }
+            }
+            
+            reply = self._get_llm_reply(intent)
+            if intent.type in (IntentType.UNKNOWN, IntentType.CHAT) and reply:
+                # 识别阶段的大模型结果已包含完整回复，直接下发，无需再次调用
+                yield {"event": "delta", "data": {"text": reply}}
+                result = self._build_chat_result(intent, reply)
+                dialogue_context_service.add_assistant_message(session_id, reply)
+            elif intent.type in (IntentType.UNKNOWN, IntentType.CHAT):
+                chunks: List[str] = []
+                # 本次请求已调用过大模型(如识别结果没有回复)时不再调用，保证每个请求至多调用一次
+                if self.llm_service.get_request_call_count() == 0:
+                    try:
+                        async for delta in self.llm_service.stream_reply(intent.text, message_history):
+                            chunks.append(delta)
+                            yield {"event": "delta", "data": {"text": delta}}
+                    except Exception as e:
+                        self.logger.error(f"流式生成回复失败: {str(e)}")
+                
+                message = "".join(chunks)
+                if not message:
+                    message = "我可能没有完全理解您的意思，能否请您换种方式表达？"
+                    yield {"event": "delta", "data": {"text": message}}
+                result = self._build_chat_result(intent, message)
+                dialogue_context_service.add_assistant_message(session_id, message)
+            else:
+                result = await self._generate_result(intent, action, session_id, context)
+            
+            await self._save_intent(intent, context_key)
+            
+            self.logger.info(f"流式意图识别完成，类型: {intent.type}，动作类型: {action.type}")
+            response = IntentRecognizeResponse(intent=intent, action=action, result=result)
+            yield {"event": "result", "data": response.to_dict()}
+            
+        except IntentRecognitionError as e:
+            error_msg = f"意图识别处理失败: {str(e)}"
+            self.logger.error(error_msg)
+            raise AppException(error_msg)
+        except Exception as e:
+            error_msg = f"意图识别发生未预期错误: {str(e)}"
+            self.logger.error(error_msg)
+            raise AppException(error_msg)
+        finally:
+            await dialogue_context_service.commit(session_id)
+            llm_calls = self.llm_service.end_request()
+            self.logger.info(f"本次流式请求调用大模型{llm_calls}次")
     
-    async def _prepare_context(self, text: str, session_id: str) -> None:
+    async def _prepare_context(self, text: str, session_id: str) -> List[Dict[str, str]]:
         """准备上下文
         
         Args:
             text (str): 用户输入文本
             session_id (str): 会话ID
+            
+        Returns:
+            List[Dict[str, str]]: 包含本条用户消息的对话历史
         """
-        # 将用户消息添加到对话上下文
+        # 从共享存储读取会话(每个请求一次)，并将用户消息添加到对话上下文
+        await dialogue_context_service.load(session_id)
         dialogue_context_service.add_user_message(session_id, text)
+        return dialogue_context_service.get_history(session_id)
     
     async def _identify_intent(
         self, 
         text: str, 
         context: Optional[Dict[str, Any]], 
-        session_id: str
+        message_history: List[Dict[str, str]]
     ) -> Intent:
         """识别意图
         
         Args:
             text (str): 用户输入文本
             context (Optional[Dict[str, Any]]): 上下文信息
-            session_id (str): 会话ID
+            message_history (List[Dict[str, str]]): 对话历史
             
         Returns:
             Intent: 识别出的意图
@@ -143,9 +256,6 @@ class IntentService(BaseService):
             ModelCallError: 调用模型失败时抛出
         """
         try:
-            # 获取历史消息
-            message_history = dialogue_context_service.get_history(session_id)
-            
             # 依次尝试每个策略
             for strategy in self.strategies:
                 intent = await strategy.recognize(text, context, message_history)
@@ -203,7 +313,8 @@ class IntentService(BaseService):
         self, 
         intent: Intent, 
         action: Action,
-        session_id: str
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """生成结果
         
@@ -211,6 +322,7 @@ class IntentService(BaseService):
             intent (Intent): 意图
             action (Action): 动作
             session_id (str): 会话ID
+            context (Optional[Dict[str, Any]], optional): 请求上下文，metadata中可带client_ip. 默认为None.
             
         Returns:
             Dict[str, Any]: 结果数据
@@ -223,57 +335,16 @@ class IntentService(BaseService):
             
             # 根据意图类型生成不同的结果
             if intent.type == IntentType.UNKNOWN:
-                # 使用大模型生成回复，而不是硬编码
-                try:
-                    # 获取LLM生成的回复
-                    llm_response = await self.llm_service.recognize_intent(intent.text, context={
-                        "session_id": session_id,
-                        "intent_type": "UNKNOWN"
-                    })
-                    
-                    # 从LLM响应中提取回复文本
-                    if llm_response and "data" in llm_response and "reply" in llm_response["data"]:
-                        message = llm_response["data"]["reply"]
-                    else:
-                        # 如果LLM没有返回有效回复，使用更友好的默认回复
-                        message = "我可能没有完全理解您的意思，能否请您换种方式表达？"
-                        
-                    result = {
-                        "status": "unknown_intent",
-                        "message": message,
-                        "code": 200,
-                        "data": {
-                            "command": "chat_reply",
-                            "params": {}
-                        }
-                    }
-                    dialogue_context_service.add_assistant_message(session_id, message)
-                except Exception as e:
-                    # 如果LLM调用失败，记录错误并使用备用回复
-                    self.logger.error(f"使用LLM生成未知意图回复失败: {str(e)}")
-                    message = "我可能没有完全理解您的意思，能否请您换种方式表达？"
-                    result = {
-                        "status": "unknown_intent",
-                        "message": message,
-                        "code": 200,
-                        "data": {
-                            "command": "chat_reply",
-                            "params": {}
-                        }
-                    }
-                    dialogue_context_service.add_assistant_message(session_id, message)
+                # 优先复用识别阶段大模型给出的回复，而不是硬编码
+                message = await self._get_chat_reply(
+                    intent, session_id, "我可能没有完全理解您的意思，能否请您换种方式表达？"
+                )
+                result = self._build_chat_result(intent, message)
+                dialogue_context_service.add_assistant_message(session_id, message)
             elif intent.type == IntentType.CHAT:
-                # 闲聊意图，提供对话回复
-                message = "很高兴与您聊天。"
-                result = {
-                    "status": "chat",
-                    "message": message,
-                    "code": 200,
-                    "data": {
-                        "command": "chat_reply",
-                        "params": {}
-                    }
-                }
+                # 闲聊意图，提供对话回复；缓存命中时没有大模型结果，由本次请求生成回复
+                message = await self._get_chat_reply(intent, session_id, "很高兴与您聊天。")
+                result = self._build_chat_result(intent, message)
                 dialogue_context_service.add_assistant_message(session_id, message)
             # 录音相关意图
             elif intent.type == IntentType.STARTRECORDING:
@@ -358,63 +429,25 @@ class IntentService(BaseService):
                 self.logger.info(f"处理天气查询意图，原始文本: '{intent.text}'")
                 self.logger.info(f"提取的实体: 城市='{city}', 日期='{date}'")
                 
-                # 如果没有提取到城市，使用正则表达式尝试从文本中提取
+                # 如果没有提取到城市(如大模型识别的意图)，用行政区划字典树从文本中提取
                 if not city:
-                    # 预定义的城市列表，包括主要城市和省会城市
-                    common_cities = [
-                        "北京", "上海", "广州", "深圳", "杭州", "南京", "武汉", "西安", "成都", "重庆", 
-                        "天津", "长沙", "苏州", "厦门", "哈尔滨", "大连", "青岛", "济南", "郑州", "长春",
-                        "沈阳", "南宁", "昆明", "贵阳", "太原", "石家庄", "乌鲁木齐", "兰州", "西宁", "银川",
-                        "呼和浩特", "拉萨", "南昌", "合肥", "福州", "台北", "海口", "三亚"
-                    ]
-                    
-                    # 1. 直接文本匹配
-                    for potential_city in common_cities:
-                        if potential_city in intent.text:
-                            city = potential_city
-                            self.logger.info(f"从文本中匹配到城市: {city}")
-                            break
-                    
-                    # 2. 如果仍未找到，使用正则表达式尝试匹配更复杂的模式
-                    if not city:
-                        # 匹配"XX的天气"或"XX天气"模式
-                        city_pattern = re.compile(r'([\u4e00-\u9fa5]{2,6})(的天气|天气)')
-                        match = city_pattern.search(intent.text)
-                        if match:
-                            potential_city = match.group(1)
-                            # 验证提取的是否为有效城市名
-                            if len(potential_city) >= 2 and potential_city not in ["今天", "明天", "后天", "当前", "今日", "明日"]:
-                                city = potential_city
-                                self.logger.info(f"通过正则表达式匹配到城市: {city}")
+                    mention = gazetteer.extract_place(intent.text)
+                    if mention is not None:
+                        city = mention.name
+                        self.logger.info(f"从文本中匹配到城市: {city}({mention.adcode})")
                 
-                # 如果仍未找到城市，使用默认位置（设备当前所在位置）
+                # 如果仍未找到城市，使用设备上报的位置，没有时按客户端IP定位
                 if not city:
-                    # TODO: 未来可以从设备获取实际位置信息
-                    # 这里先使用默认城市"北京"，后续可以替换为实际的定位逻辑
-                    city = self._get_device_location(session_id)
+                    metadata = (context or {}).get("metadata") or {}
+                    city = await self._get_device_location(session_id, metadata.get("client_ip"))
                     self.logger.info(f"未指定城市，使用设备当前位置: {city}")
                 
-                # 如果没有提取到日期，尝试从文本中提取
+                # 如果没有提取到日期(如大模型识别的意图)，尝试从文本中提取
                 if not date:
-                    date_patterns = {
-                        "今天|今日|当前|现在": "今天",
-                        "明天|明日": "明天",
-                        "后天": "后天",
-                        "大后天": "大后天",
-                        "周一|星期一": "周一",
-                        "周二|星期二": "周二",
-                        "周三|星期三": "周三",
-                        "周四|星期四": "周四",
-                        "周五|星期五": "周五",
-                        "周六|星期六": "周六",
-                        "周日|周天|星期日|星期天": "周日"
-                    }
-                    
-                    for pattern, date_value in date_patterns.items():
-                        if re.search(pattern, intent.text):
-                            date = date_value
-                            self.logger.info(f"从文本中匹配到日期: {date}")
-                            break
+                    match = DATE_PATTERN.search(intent.text)
+                    if match:
+                        date = DATE_KEYWORDS[match.group()]
+                        self.logger.info(f"从文本中匹配到日期: {date}")
                 
                 # 如果仍未找到日期，默认为"今天"
                 if not date:
@@ -471,132 +504,116 @@ class IntentService(BaseService):
             self.logger.error(f"生成结果数据失败: {str(e)}")
             raise ResultGenerationError(f"生成结果数据失败: {str(e)}")
     
-    async def _save_intent(self, intent: Intent) -> None:
+    @staticmethod
+    def _get_llm_reply(intent: Intent) -> Optional[str]:
+        """从意图携带的大模型识别结果中取出回复
+        
+        Args:
+            intent (Intent): 意图
+            
+        Returns:
+            Optional[str]: 回复文本，意图不是由大模型识别或没有回复时返回None
+        """
+        if not intent.llm_result:
+            return None
+        reply = intent.llm_result.get("data", {}).get("reply")
+        return reply if isinstance(reply, str) and reply.strip() else None
+    
+    async def _get_chat_reply(self, intent: Intent, session_id: str, fallback: str) -> str:
+        """获取未知意图或闲聊意图的回复
+        
+        识别阶段已调用过大模型时直接复用其回复；只有本次请求尚未调用过大模型时(如闲聊意图命中缓存)
+        才单独请求一次，保证每个请求至多调用一次大模型。
+        
+        Args:
+            intent (Intent): 意图
+            session_id (str): 会话ID
+            fallback (str): 大模型没有返回有效回复时的备用回复
+            
+        Returns:
+            str: 回复文本
+        """
+        reply = self._get_llm_reply(intent)
+        if reply:
+            return reply
+        
+        if self.llm_service.get_request_call_count() == 0:
+            try:
+                llm_response = await self.llm_service.recognize_intent(intent.text, context={
+                    "session_id": session_id,
+                    "intent_type": intent.type.name
+                })
+                reply = llm_response.get("data", {}).get("reply") if llm_response else None
+            except Exception as e:
+                # 如果LLM调用失败，记录错误并使用备用回复
+                self.logger.error(f"使用LLM生成{intent.type.name}意图回复失败: {str(e)}")
+        
+        # 如果LLM没有返回有效回复，使用备用回复
+        return reply or fallback
+    
+    def _build_chat_result(self, intent: Intent, message: str) -> Dict[str, Any]:
+        """构建对话类意图(UNKNOWN/CHAT)的结果数据
+        
+        Args:
+            intent (Intent): 意图
+            message (str): 回复文本
+            
+        Returns:
+            Dict[str, Any]: 结果数据
+        """
+        return {
+            "status": "unknown_intent" if intent.type == IntentType.UNKNOWN else "chat",
+            "message": message,
+            "code": 200,
+            "data": {
+                "command": "chat_reply",
+                "params": {}
+            }
+        }
+    
+    async def _save_intent(self, intent: Intent, context_key: str = "") -> None:
         """保存意图
         
         Args:
             intent (Intent): 要保存的意图
+            context_key (str, optional): 上下文指纹，与缓存查找使用的键一致. 默认为"".
         """
         if intent.type != IntentType.UNKNOWN and intent.confidence > 0.7:
-            await self.intent_repository.save(intent)
+            await self.intent_repository.save(intent, context_key)
             
-    def _get_device_location(self, session_id: str = "default") -> str:
+    async def _get_device_location(self, session_id: str = "default", client_ip: Optional[str] = None) -> str:
         """获取设备当前位置
         
         Args:
             session_id (str, optional): 会话ID，用于从会话上下文中获取位置信息. 默认为"default".
+            client_ip (Optional[str], optional): 客户端IP地址，会话中没有位置时用于IP定位. 默认为None.
             
         Returns:
             str: 设备当前所在城市名称
         """
-        # 1. 尝试从会话上下文中获取位置信息
-        try:
-            context = dialogue_context_service.get_context(session_id)
-            if context and "metadata" in context and "location" in context.metadata and "city" in context.metadata["location"] and context.metadata["location"]["city"]:
-                city = context.metadata["location"]["city"]
-                self.logger.info(f"从会话上下文获取到设备位置: {city}")
-                return city
-        except Exception as e:
-            self.logger.warning(f"从会话上下文获取位置失败: {str(e)}")
+        # 1. 尝试从会话上下文中获取设备上报的位置
+        location = dialogue_context_service.get_device_location(session_id)
+        city = location.get("city")
+        if city:
+            self.logger.info(f"从会话上下文获取到设备位置: {city}")
+            return city
         
-        # 2. 尝试从客户端IP地址获取位置
-        try:
-            context = dialogue_context_service.get_context(session_id)
-            if context and "metadata" in context and "client_ip" in context.metadata:
-                client_ip = context.metadata["client_ip"]
-                self.logger.info(f"尝试从IP地址 {client_ip} 获取位置")
-                
-                # 异步获取IP地址位置需要在异步函数中调用，这里使用一个简单的同步方法
-                import asyncio
-                location = asyncio.run_coroutine_threadsafe(
-                    self._get_location_from_ip(client_ip),
-                    asyncio.get_event_loop()
-                ).result()
-                
-                if location:
-                    self.logger.info(f"从IP地址获取到位置: {location}")
-                    
-                    # 保存到会话上下文中
-                    if not hasattr(context, "metadata"):
-                        context.metadata = {}
-                    if "location" not in context.metadata:
-                        context.metadata["location"] = {}
-                    context.metadata["location"]["city"] = location
-                    context.metadata["location"]["source"] = "ip"
-                    
-                    return location
-        except Exception as e:
-            self.logger.warning(f"从IP地址获取位置失败: {str(e)}")
+        # 设备只上报了经纬度时，从行政区划表中找最近的城市
+        latitude, longitude = location.get("latitude"), location.get("longitude")
+        if latitude is not None and longitude is not None:
+            place = gazetteer.nearest_city(latitude, longitude)
+            if place is not None:
+                self.logger.info(f"根据设备坐标({latitude}, {longitude})定位到城市: {place.name}")
+                return place.name
+        
+        # 2. 尝试从客户端IP地址获取位置，结果按IP缓存
+        if client_ip:
+            city = await self.ip_locator.locate(client_ip)
+            if city:
+                self.logger.info(f"从IP地址 {client_ip} 获取到位置: {city}")
+                return city
         
         # 3. 如果以上方法都失败，使用默认位置
-        default_city = "北京"  # 演示时使用西安作为默认位置
+        default_city = "北京"
         self.logger.info(f"无法获取设备实际位置，使用默认位置: {default_city}")
         return default_city
-        
-    async def _get_location_from_ip(self, ip_address: str) -> Optional[str]:
-        """通过IP地址获取位置信息
-        
-        Args:
-            ip_address (str): IP地址
-            
-        Returns:
-            Optional[str]: 城市名称，如果无法获取则返回None
-        """
-        # 如果是内网IP或本地IP，返回None
-        if ip_address.startswith(("192.168.", "10.", "127.")):
-            self.logger.info(f"IP地址 {ip_address} 为内网IP，无法获取位置")
-            return None
-        
-        # 使用高德地图IP定位API
-        if not self.weather_service.weather_api.api_key:
-            self.logger.warning("未配置高德地图API密钥，无法进行IP定位")
-            return None
-        
-        try:
-            # 高德地图IP定位API
-            ip_api_url = "https://restapi.amap.com/v3/ip"
-            
-            # 创建不验证SSL的上下文
-            import ssl
-            import aiohttp
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            conn = aiohttp.TCPConnector(ssl=ssl_context)
-            
-            params = {
-                "key": self.weather_service.weather_api.api_key,
-                "ip": ip_address,
-                "output": "JSON"
-            }
-            
-            async with aiohttp.ClientSession(connector=conn) as session:
-                async with session.get(ip_api_url, params=params, timeout=5) as response:
-                    if response.status != 200:
-                        self.logger.error(f"IP定位API请求失败: HTTP {response.status}")
-                        return None
-                    
-                    data = await response.json()
-                    self.logger.debug(f"IP定位API响应: {data}")
-                    
-                    # 检查API返回状态
-                    if data.get("status") != "1":
-                        self.logger.error(f"IP定位API返回错误: {data.get('info', '未知错误')}")
-                        return None
-                    
-                    # 提取城市信息
-                    city = data.get("city", "")
-                    if not city and data.get("province"):
-                        # 如果没有城市但有省份，使用省会城市
-                        city = data.get("province")
-                        
-                    if city:
-                        self.logger.info(f"通过IP地址 {ip_address} 获取到位置: {city}")
-                        return city
-                    else:
-                        self.logger.warning(f"IP地址 {ip_address} 未能解析到具体城市")
-                        return None
-                    
-        except Exception as e:
-            self.logger.error(f"IP定位失败: {str(e)}")
-            return None
@@ -5,11 +5,19 @@
 大模型服务模块
 """
 
-from typing import Dict, Any, Optional, List
+import asyncio
+import copy
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, List, AsyncIterator
 
+from app.config import settings
 from app.service.base_service import BaseService
 from app.adapters.llm.qwen_client import QwenClient
 from app.common.exception import LLMException
+from app.common.utils.text_utils import normalize_text, fingerprint
+
+# 当前请求内的大模型调用次数，每个请求(协程任务)独立计数
+_request_call_count: ContextVar[Optional[List[int]]] = ContextVar("llm_request_call_count", default=None)
 
 
 class LLMService(BaseService):
@@ -19,6 +27,22 @@ class LLMService(BaseService):
         """初始化大模型服务"""
         super().__init__("llm_service")
         
+        # 调用统计
+        self.call_stats: Dict[str, int] = {
+            "requests": 0,
+            "llm_calls": 0,
+            "max_calls_per_request": 0,
+            "requests_over_budget": 0
+        }
+        
+        # 进行中的意图识别调用，相同请求共享同一个上游调用
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.coalesce_stats: Dict[str, int] = {
+            "calls": 0,
+            "upstream_calls": 0,
+            "coalesced_calls": 0
+        }
+        
         try:
             # 初始化千问客户端
             self.qwen_client = QwenClient()
@@ -35,6 +59,8 @@ class LLMService(BaseService):
     ) -> Dict[str, Any]:
         """识别文本的意图
         
+        规范化文本和相关上下文都相同的并发请求共享同一次上游调用。
+        
         Args:
             text (str): 待识别的文本
             context (Optional[Dict[str, Any]], optional): 上下文信息. 默认为None.
@@ -46,12 +72,147 @@ class LLMService(BaseService):
         Raises:
             LLMException: 调用大模型失败时抛出
         """
+        self._count_call()
         try:
-            # 调用千问大模型进行意图识别
-            result = await self.qwen_client.intent_recognition(text, context, message_history)
-            return result
+            if not settings.LLM_COALESCE_ENABLED:
+                # 调用千问大模型进行意图识别
+                return await self.qwen_client.intent_recognition(text, context, message_history)
+            
+            key = self._coalesce_key(text, context, message_history)
+            task = self._in_flight.get(key)
+            self.coalesce_stats["calls"] += 1
+            if task is None:
+                # 上游调用放在独立任务中，发起方被取消时不影响其他等待者
+                task = asyncio.ensure_future(
+                    self.qwen_client.intent_recognition(text, context, message_history)
+                )
+                self._in_flight[key] = task
+                task.add_done_callback(lambda done, k=key: self._on_call_done(k, done))
+                self.coalesce_stats["upstream_calls"] += 1
+            else:
+                self.coalesce_stats["coalesced_calls"] += 1
+                self.logger.debug(f"合并相同的进行中识别请求: {text}")
+            
+            result = await asyncio.shield(task)
+            # 每个调用方拿到独立副本，避免共享结果被修改
+            return copy.deepcopy(result)
                 
         except Exception as e:
             error_msg = f"意图识别失败: {str(e)}"
             self.logger.error(error_msg)
             raise LLMException(error_msg)
+    
+    def get_coalesce_stats(self) -> Dict[str, Any]:
+        """获取请求合并统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息，coalesce_ratio为被合并调用占全部调用的比例
+        """
+        stats: Dict[str, Any] = dict(self.coalesce_stats)
+        stats["in_flight"] = len(self._in_flight)
+        stats["coalesce_ratio"] = (
+            round(stats["coalesced_calls"] / stats["calls"], 4) if stats["calls"] else 0.0
+        )
+        return stats
+    
+    @staticmethod
+    def _coalesce_key(
+        text: str,
+        context: Optional[Dict[str, Any]],
+        message_history: Optional[List[Dict[str, str]]]
+    ) -> str:
+        """计算请求合并键：规范化文本 + 影响识别结果的上下文指纹
+        
+        客户端IP只用于定位，不影响意图，不参与指纹计算。
+        
+        Args:
+            text (str): 待识别的文本
+            context (Optional[Dict[str, Any]]): 上下文信息
+            message_history (Optional[List[Dict[str, str]]]): 消息历史
+            
+        Returns:
+            str: 合并键
+        """
+        relevant_context = dict(context or {})
+        metadata = relevant_context.get("metadata")
+        if isinstance(metadata, dict) and "client_ip" in metadata:
+            relevant_context["metadata"] = {k: v for k, v in metadata.items() if k != "client_ip"}
+        history = [
+            (msg.get("role"), normalize_text(msg.get("content", "")))
+            for msg in (message_history or [])
+        ]
+        return f"{normalize_text(text)}|{fingerprint([relevant_context, history])}"
+    
+    def _on_call_done(self, key: str, task: asyncio.Task) -> None:
+        """上游调用结束后移出进行中列表
+        
+        Args:
+            key (str): 合并键
+            task (asyncio.Task): 已结束的调用任务
+        """
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # 取出异常，避免所有等待者都已取消时产生未检索异常的警告
+        if not task.cancelled():
+            task.exception()
+    
+    async def close(self) -> None:
+        """释放大模型客户端持有的连接资源"""
+        await self.qwen_client.close()
+    
+    async def stream_reply(
+        self,
+        text: str,
+        message_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """流式生成对话回复
+        
+        Args:
+            text (str): 用户文本
+            message_history (Optional[List[Dict[str, str]]], optional): 消息历史. 默认为None.
+            
+        Yields:
+            str: 回复文本片段
+            
+        Raises:
+            LLMException: 调用大模型失败时抛出
+        """
+        self._count_call()
+        async for delta in self.qwen_client.stream_chat_reply(text, message_history):
+            yield delta
+    
+    def begin_request(self) -> None:
+        """开始统计当前请求的大模型调用次数"""
+        _request_call_count.set([0])
+    
+    def get_request_call_count(self) -> int:
+        """获取当前请求已发起的大模型调用次数
+        
+        Returns:
+            int: 调用次数，未开始统计时返回0
+        """
+        counter = _request_call_count.get()
+        return counter[0] if counter else 0
+    
+    def end_request(self) -> int:
+        """结束当前请求的统计并汇总到全局统计
+        
+        Returns:
+            int: 本次请求的大模型调用次数
+        """
+        calls = self.get_request_call_count()
+        _request_call_count.set(None)
+        
+        self.call_stats["requests"] += 1
+        self.call_stats["max_calls_per_request"] = max(self.call_stats["max_calls_per_request"], calls)
+        if calls > 1:
+            self.call_stats["requests_over_budget"] += 1
+            self.logger.warning(f"单次请求调用了{calls}次大模型")
+        return calls
+    
+    def _count_call(self) -> None:
+        """记录一次大模型调用"""
+        self.call_stats["llm_calls"] += 1
+        counter = _request_call_count.get()
+        if counter is not None:
+            counter[0] += 1
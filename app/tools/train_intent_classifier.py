@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图分类器训练工具
+
+从意图记录表(intent_records)读取置信度足够高、与上下文无关的记录，留出一部分做评估，
+用其余记录训练字符n-gram分类器并保存。评估报告包括留出集上的准确率，以及规则没有命中的记录
+(原本每条都要调用一次大模型)中分类器在各阈值下能回答的比例和回答的准确率。
+
+模型按训练时间生成版本号，保存为"<模型文件名>-<版本>.npz"，同时覆盖INTENT_CLASSIFIER_MODEL_PATH，
+回滚时把旧版本文件复制回该路径后重启服务即可。
+
+用法: python -m app.tools.train_intent_classifier [--min-confidence 0.9] [--holdout 0.2] [--dry-run]
+"""
+
+import argparse
+import math
+import random
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.common.utils.intent_classifier import DEFAULT_DIMENSION, IntentClassifier, train
+from app.domain.entity.intent import IntentType
+from app.domain.strategy.classifier_strategy import ClassifierBasedStrategy
+from app.domain.strategy.rule_strategy import correct_device_names, rule_engine
+
+# 报告中列出的阈值
+REPORT_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+
+class TrainingRecord(NamedTuple):
+    """训练记录"""
+
+    text: str
+    # 意图类型的值
+    label: str
+    # 同一文本被保存的次数
+    hit_count: int
+
+
+def load_records(database_url: str, min_confidence: float) -> List[TrainingRecord]:
+    """读取可用于训练的意图记录
+
+    依赖上文的记录(context_key非空)和UNKNOWN不参与训练；大模型低置信度的结果可能是错的，也不参与。
+
+    Args:
+        database_url (str): 数据库地址
+        min_confidence (float): 最低置信度
+
+    Returns:
+        List[TrainingRecord]: 训练记录
+    """
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT text, intent_type, hit_count FROM intent_records "
+                    "WHERE context_key = '' AND intent_type != :unknown AND confidence >= :min_confidence"
+                ),
+                {"unknown": IntentType.UNKNOWN.value, "min_confidence": min_confidence}
+            ).all()
+    finally:
+        engine.dispose()
+    return [TrainingRecord(row[0], row[1], int(row[2] or 1)) for row in rows if row[0]]
+
+
+def evaluate(classifier: IntentClassifier, records: Sequence[TrainingRecord],
+             thresholds: Sequence[float] = REPORT_THRESHOLDS) -> Dict[str, Any]:
+    """在留出的记录上评估分类器
+
+    规则命中的记录不会走到分类器，"大模型调用"指规则没有命中的记录，每条原本调用一次大模型。
+    分类器按服务中的逻辑回答(闲聊和缺少设备名的不回答)，回答正确指意图与记录一致。
+
+    Args:
+        classifier (IntentClassifier): 分类器
+        records (Sequence[TrainingRecord]): 留出的记录
+        thresholds (Sequence[float], optional): 要统计的阈值. 默认为REPORT_THRESHOLDS.
+
+    Returns:
+        Dict[str, Any]: accuracy为全部记录上的准确率，llm_calls为规则没有命中的记录数，
+            thresholds为各阈值下的回答数(answered)和回答正确数(correct)
+    """
+    texts = [record.text for record in records]
+    labels = [record.label for record in records]
+    probabilities = classifier.predict_proba([correct_device_names(text) for text in texts])
+    predicted = [classifier.labels[index] for index in probabilities.argmax(axis=1)]
+    accuracy = sum(1 for a, b in zip(predicted, labels) if a == b) / len(records) if records else 0.0
+
+    strategy = ClassifierBasedStrategy(classifier, threshold=0.0)
+    answers = []
+    for record in records:
+        if rule_engine.match(correct_device_names(record.text)) is not None:
+            continue
+        intent = strategy.classify(record.text)
+        answers.append((intent.confidence, intent.type.value == record.label) if intent else None)
+
+    report = []
+    for threshold in thresholds:
+        answered = [correct for confidence, correct in filter(None, answers) if confidence >= threshold]
+        report.append({"threshold": threshold, "answered": len(answered), "correct": sum(answered)})
+    return {"holdout": len(records), "accuracy": accuracy, "llm_calls": len(answers), "thresholds": report}
+
+
+def print_report(evaluation: Dict[str, Any], threshold: float) -> None:
+    """打印评估报告
+
+    Args:
+        evaluation (Dict[str, Any]): evaluate的结果
+        threshold (float): 服务当前使用的阈值，在报告中标出
+    """
+    llm_calls = evaluation["llm_calls"]
+    print(f"留出记录: {evaluation['holdout']}，准确率: {evaluation['accuracy']:.1%}")
+    print(f"其中规则没有命中(每条调用一次大模型): {llm_calls}")
+    print(f"{'阈值':>6} {'减少的大模型调用':>10} {'回答准确率':>8}")
+    for row in evaluation["thresholds"]:
+        reduction = row["answered"] / llm_calls if llm_calls else 0.0
+        precision = row["correct"] / row["answered"] if row["answered"] else 0.0
+        marker = "  <- INTENT_CLASSIFIER_THRESHOLD" if math.isclose(row["threshold"], threshold) else ""
+        print(f"{row['threshold']:>8.2f} {row['answered']:>8} ({reduction:6.1%}) {precision:>10.1%}{marker}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="从意图记录训练本地意图分类器")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="数据库地址，默认为DATABASE_URL")
+    parser.add_argument("--output", default=settings.INTENT_CLASSIFIER_MODEL_PATH,
+                        help="模型文件路径，默认为INTENT_CLASSIFIER_MODEL_PATH")
+    parser.add_argument("--min-confidence", type=float, default=0.9, help="参与训练的记录的最低置信度")
+    parser.add_argument("--holdout", type=float, default=0.2, help="留出评估的记录比例，0表示全部用于训练")
+    parser.add_argument("--dimension", type=int, default=DEFAULT_DIMENSION, help="哈希维度，须为2的幂")
+    parser.add_argument("--epochs", type=int, default=300, help="迭代轮数")
+    parser.add_argument("--seed", type=int, default=24, help="划分留出集的随机数种子")
+    parser.add_argument("--dry-run", action="store_true", help="只训练和评估，不保存模型")
+    args = parser.parse_args(argv)
+
+    records = load_records(args.database_url, args.min_confidence)
+    if not records:
+        raise SystemExit("没有可用于训练的意图记录")
+    random.Random(args.seed).shuffle(records)
+    holdout_size = int(len(records) * args.holdout)
+    holdout, training = records[:holdout_size], records[holdout_size:]
+    print(f"可用记录: {len(records)}，训练: {len(training)}，留出: {len(holdout)}")
+
+    # 反复出现的说法权重更高，取对数避免高频指令压过其他说法
+    classifier = train(
+        [record.text for record in training],
+        [record.label for record in training],
+        [1.0 + math.log(record.hit_count) for record in training],
+        dimension=args.dimension,
+        epochs=args.epochs
+    )
+    classifier.metadata.update(min_confidence=args.min_confidence)
+    if holdout:
+        evaluation = evaluate(classifier, holdout)
+        classifier.metadata["evaluation"] = evaluation
+        print_report(evaluation, settings.INTENT_CLASSIFIER_THRESHOLD)
+
+    if args.dry_run:
+        return
+    output = Path(args.output)
+    versioned = output.with_name(f"{output.stem}-{classifier.version}{output.suffix}")
+    classifier.save(versioned)
+    classifier.save(output)
+    print(f"模型版本 {classifier.version} 已保存: {versioned}，并更新 {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+上下文感知意图缓存命中率基准
+
+在合成的多轮对话负载上回放两种缓存策略：
+- legacy: 按原始文本精确匹配，对话历史超过2条即跳过缓存(原实现)
+- context_key: 按(规范化文本, 上下文指纹)匹配(CacheBasedStrategy)
+未命中时以负载中的标注作为"大模型"结果写回缓存，统计命中率和错误命中数。
+
+用法: python -m benchmarks.bench_context_cache [会话数]
+"""
+
+import asyncio
+import os
+import sys
+from typing import Dict
+
+from benchmarks.common import setup_env, print_table, BENCH_DIR
+from benchmarks.workloads import generate_sessions, ASSISTANT_REPLIES
+
+
+async def main(session_count: int) -> None:
+    db_path = os.path.join(BENCH_DIR, "context_cache.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    setup_env(DATABASE_URL=f"sqlite:///{db_path}")
+    
+    from app.domain.entity.intent import Intent, IntentType
+    from app.domain.strategy.cache_strategy import CacheBasedStrategy, build_context_key
+    from app.adapters.repository.sqlite_repository import SQLiteIntentRepository
+    from app.service.dialogue_context_service import DialogueContext
+    
+    sessions = generate_sessions(session_count)
+    strategy = CacheBasedStrategy(SQLiteIntentRepository())
+    legacy_cache: Dict[str, str] = {}
+    stats = {
+        "legacy": {"turns": 0, "hits": 0, "wrong_hits": 0},
+        "context_key": {"turns": 0, "hits": 0, "wrong_hits": 0},
+    }
+    depth_hits: Dict[int, list] = {}
+    
+    for index, turns in enumerate(sessions):
+        context = DialogueContext(f"bench-{index}")
+        for depth, (text, label) in enumerate(turns):
+            context.add_user_message(text)
+            history = context.get_formatted_history()
+            
+            # 原实现：精确文本 + 历史超过2条不使用缓存
+            legacy = stats["legacy"]
+            legacy["turns"] += 1
+            if text in legacy_cache and len(history) <= 2:
+                legacy["hits"] += 1
+                legacy["wrong_hits"] += legacy_cache[text] != label
+            else:
+                legacy_cache[text] = label
+            
+            # 上下文感知缓存
+            current = stats["context_key"]
+            current["turns"] += 1
+            cached = await strategy.recognize(text, None, history)
+            hit = cached is not None
+            if hit:
+                current["hits"] += 1
+                current["wrong_hits"] += cached.type.name != label
+            else:
+                intent = Intent(type=IntentType[label], confidence=0.95, text=text)
+                await strategy.intent_repository.save(intent, build_context_key(text, history))
+            depth_hits.setdefault(depth, []).append(hit)
+            
+            context.add_assistant_message(ASSISTANT_REPLIES[label])
+    
+    rows = [
+        {
+            "policy": name,
+            "turns": s["turns"],
+            "hits": s["hits"],
+            "hit_rate": f"{s['hits'] / s['turns']:.1%}",
+            "wrong_hits": s["wrong_hits"]
+        }
+        for name, s in stats.items()
+    ]
+    print_table(f"多轮对话缓存命中率 ({session_count}个会话)", rows)
+    print_table("context_key策略按轮次的命中率", [
+        {"turn": depth + 1, "samples": len(hits), "hit_rate": f"{sum(hits) / len(hits):.1%}"}
+        for depth, hits in sorted(depth_hits.items())
+    ])
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    asyncio.run(main(count))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并发仓储访问下的事件循环延迟基准
+
+并发客户端以8:2的比例调用find_by_text和save，同时用一个每5ms醒来一次的协程测量事件循环延迟
+(实际醒来时间比预期晚多少)。对比两种执行方式：
+- inline: 在事件循环中直接执行同步的数据库操作(原实现)
+- executor: 通过仓储的async方法在数据库线程池中执行
+SQLite在本机，每条语句执行前sleep一段时间模拟访问PostgreSQL的网络往返。
+
+用法: python -m benchmarks.bench_event_loop_lag [并发数] [往返毫秒]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List
+
+from benchmarks.common import setup_env, percentile, print_table, BENCH_DIR
+
+# 每个客户端的操作数
+OPERATIONS_PER_CLIENT = 40
+
+# 延迟探针的唤醒间隔(秒)
+PROBE_INTERVAL = 0.005
+
+
+async def probe_lag(stop: asyncio.Event, samples: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append(max(0.0, (time.perf_counter() - started - PROBE_INTERVAL) * 1000))
+
+
+async def run_mode(repository, mode: str, clients: int) -> dict:
+    from app.domain.entity.intent import Intent, IntentType
+
+    async def find(text: str):
+        if mode == "inline":
+            return repository._find_by_text(text, "")
+        return await repository.find_by_text(text)
+
+    async def save(intent: Intent):
+        if mode == "inline":
+            return repository._save(intent, "")
+        return await repository.save(intent)
+
+    async def client(index: int) -> None:
+        rng = random.Random(index)
+        for _ in range(OPERATIONS_PER_CLIENT):
+            text = f"打开{rng.randrange(500)}号灯"
+            if rng.random() < 0.8:
+                await find(text)
+            else:
+                await save(Intent(type=IntentType.CONTROL_DEVICE_ON, confidence=0.95, text=text))
+
+    samples: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(stop, samples))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    operations = clients * OPERATIONS_PER_CLIENT
+    return {
+        "mode": mode,
+        "ops": operations,
+        "wall_s": f"{elapsed:.2f}",
+        "ops_per_s": f"{operations / elapsed:.0f}",
+        "lag_p50_ms": f"{percentile(samples, 50):.1f}",
+        "lag_p99_ms": f"{percentile(samples, 99):.1f}",
+        "lag_max_ms": f"{max(samples):.1f}",
+    }
+
+
+async def main(clients: int, round_trip_ms: float) -> None:
+    db_path = os.path.join(BENCH_DIR, "event_loop_lag.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    setup_env(DATABASE_URL=f"sqlite:///{db_path}")
+
+    from sqlalchemy import event
+    from app.adapters.repository.sqlite_repository import SQLiteIntentRepository
+
+    repository = SQLiteIntentRepository()
+
+    @event.listens_for(repository.engine, "before_cursor_execute")
+    def simulate_round_trip(*args):
+        time.sleep(round_trip_ms / 1000)
+
+    rows = [await run_mode(repository, mode, clients) for mode in ("inline", "executor")]
+    await repository.close()
+    print_table(f"event loop lag, {clients} clients, {round_trip_ms}ms simulated DB round trip", rows)
+
+
+if __name__ == "__main__":
+    client_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    round_trip = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    asyncio.run(main(client_count, round_trip))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行政区划编码表基准
+
+测量：
+- 首次查询时加载编码表的耗时和内存占用(在新进程中测量，取5次中位数)
+- 名称查询耗时：简称、全称、带上级限定的名称、不存在的名称
+- 覆盖率：所有地级和县级行政区的简称中，原来14个内置城市能覆盖多少，
+  其余都要请求高德地理编码接口；编码表能覆盖多少
+
+用法: python -m benchmarks.bench_gazetteer
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+from benchmarks.common import setup_env, print_table
+
+LOAD_SCRIPT = """
+import json, time, tracemalloc
+from benchmarks.common import setup_env
+setup_env()
+from app.adapters.geo.gazetteer import Gazetteer, gazetteer
+started = time.perf_counter()
+gazetteer.lookup("杭州")
+seconds = time.perf_counter() - started
+started = time.perf_counter()
+gazetteer.lookup("杭州")
+second_lookup = time.perf_counter() - started
+# 另建一个实例测内存，tracemalloc会拖慢加载，不与计时混在一起
+tracemalloc.start()
+measured = Gazetteer()
+measured.lookup("杭州")
+current, peak = tracemalloc.get_traced_memory()
+print(json.dumps({"seconds": seconds, "bytes": current, "peak": peak, "second_lookup": second_lookup}))
+"""
+
+# 原WeatherAPI中硬编码的城市
+LEGACY_CITIES = {"北京", "上海", "广州", "深圳", "杭州", "南京", "武汉", "西安", "成都", "重庆", "天津", "长沙", "苏州", "厦门"}
+
+
+def load_in_subprocess() -> dict:
+    """在新进程中加载编码表，返回耗时和内存"""
+    output = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT], check=True, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=os.getcwd())
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_lookups(gazetteer, names: List[str], rounds: int = 20) -> float:
+    """返回平均每次查询的耗时(微秒)"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            gazetteer.lookup(name)
+    return (time.perf_counter() - started) / (rounds * len(names)) * 1e6
+
+
+def main() -> None:
+    setup_env()
+    from app.adapters.geo.gazetteer import DEFAULT_PATH, gazetteer
+
+    runs = sorted((load_in_subprocess() for _ in range(5)), key=lambda run: run["seconds"])
+    load = runs[2]
+
+    places = [gazetteer.get(line.split(",")[0]) for line in DEFAULT_PATH.read_text(encoding="utf-8").splitlines()
+              if not line.startswith("#")]
+    short_names = [place.short_name for place in places if place.short_name and place.level > 0]
+    full_names = [place.name for place in places]
+    qualified = []
+    for place in places:
+        if place.level == 2:
+            city = gazetteer.get(place.adcode[:4] + "00") or gazetteer.get(place.adcode[:2] + "0000")
+            qualified.append(f"{city.short_name or city.name}{place.short_name or place.name}")
+    missing = [f"{name}路" for name in full_names[:500]]
+
+    resolved_short = sum(1 for name in short_names if gazetteer.lookup(name) is not None)
+    resolved_qualified = sum(1 for name in qualified if gazetteer.lookup(name) is not None)
+
+    print_table("gazetteer load (fresh process, median of 5)", [{
+        "places": len(gazetteer),
+        "file_bytes": os.path.getsize(DEFAULT_PATH),
+        "load_ms": f"{load['seconds'] * 1000:.1f}",
+        "memory_kb": f"{load['bytes'] / 1024:.0f}",
+        "peak_kb": f"{load['peak'] / 1024:.0f}",
+        "next_lookup_us": f"{load['second_lookup'] * 1e6:.1f}",
+    }])
+    print_table("lookup latency", [
+        {"names": "short names (杭州)", "count": len(short_names), "us_per_lookup": f"{time_lookups(gazetteer, short_names):.2f}"},
+        {"names": "full names (杭州市)", "count": len(full_names), "us_per_lookup": f"{time_lookups(gazetteer, full_names):.2f}"},
+        {"names": "qualified (杭州西湖)", "count": len(qualified), "us_per_lookup": f"{time_lookups(gazetteer, qualified):.2f}"},
+        {"names": "unknown (…路)", "count": len(missing), "us_per_lookup": f"{time_lookups(gazetteer, missing):.2f}"},
+    ])
+    print_table("offline coverage of city/district short names", [
+        {"source": "legacy 14 hardcoded cities", "resolved": sum(1 for name in short_names if name in LEGACY_CITIES),
+         "of": len(short_names)},
+        {"source": "gazetteer, bare short name", "resolved": resolved_short, "of": len(short_names)},
+        {"source": "gazetteer, qualified by parent", "resolved": resolved_qualified, "of": len(qualified)},
+    ])
+
+
+if __name__ == "__main__":
+    main()
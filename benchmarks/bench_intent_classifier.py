@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地意图分类器基准
+
+按常见说法的句式生成带标注的意图记录(设备、房间、城市、歌手等随机填充，多数句式规则覆盖不到)，
+写入临时数据库的intent_records表，再用训练工具读取、划分留出集、训练和评估：
+- 留出集上的准确率
+- 规则没有命中的记录(每条原本调用一次大模型)中，分类器在各阈值下回答的比例和回答的准确率
+随机留出的记录与训练记录共用句式，结果偏乐观；另按句式留出(每个意图最后两个句式只出现在评估中)，
+近似上线后遇到的新说法。另测训练耗时、模型文件大小和推理耗时(单条和批量)。
+
+用法: python -m benchmarks.bench_intent_classifier [每个意图的记录数]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import BENCH_DIR, setup_env, print_table, percentile
+
+DEVICES = ["灯", "台灯", "空调", "电视", "风扇", "加湿器", "空气净化器", "窗帘", "热水器", "扫地机器人", "音箱", "地暖", "浴霸"]
+ROOMS = ["", "客厅", "卧室", "厨房", "书房", "主卧", "儿童房", "阳台"]
+CITIES = ["北京", "上海", "广州", "深圳", "杭州", "成都", "武汉", "西安", "南京", "重庆", "苏州", "长沙", "郑州", "青岛"]
+DATES = ["", "今天", "明天", "后天", "周末", "周五", "这两天"]
+SINGERS = ["周杰伦", "陈奕迅", "邓紫棋", "林俊杰", "王菲", "李健", "五月天", "孙燕姿"]
+GENRES = ["轻音乐", "摇滚", "民谣", "儿歌", "古典音乐", "爵士乐", "流行歌"]
+TOPICS = ["人工智能", "量子力学", "宇宙", "恐龙", "历史", "咖啡", "猫", "足球", "旅行", "电影"]
+TASKS = ["开会", "吃药", "取快递", "交电费", "接孩子", "给妈妈打电话", "浇花", "健身"]
+TIMES = ["明天早上八点", "十分钟后", "下午三点", "晚上九点", "半小时后", "周六上午", "后天中午"]
+
+# 意图 -> 句式；{room}{device}{city}{date}{singer}{genre}{topic}{task}{time}随机填充
+TEMPLATES = {
+    "CONTROL_DEVICE_ON": [
+        "{room}太暗了帮忙把{device}弄亮", "麻烦让{room}{device}运行起来", "{room}{device}给我启动一下",
+        "能帮我把{room}的{device}开起来吗", "我回家了把{device}打开", "{room}有点闷打开{device}吧",
+        "请帮我开启{room}{device}", "{device}开一下谢谢", "把{room}{device}给开了", "让{device}工作",
+    ],
+    "CONTROL_DEVICE_OFF": [
+        "{room}的{device}可以关了", "麻烦把{room}{device}停掉", "{device}给我关上吧",
+        "我要睡觉了把{device}关了吧", "出门了关掉{room}{device}", "能帮我把{room}的{device}关掉吗",
+        "{room}{device}停一下", "请关闭{room}{device}", "把{device}给关了", "{device}先别开着了",
+    ],
+    "QUERY_WEATHER": [
+        "{date}{city}冷不冷", "{city}{date}需要穿外套吗", "{date}{city}会不会下雨", "{city}{date}气温多少度",
+        "{date}出门要带伞吗", "{city}{date}有雾霾吗", "{date}{city}适合晒被子吗", "{city}{date}刮大风吗",
+        "帮我看看{city}{date}的气温", "{date}{city}热不热",
+    ],
+    "QUERY_TIME": [
+        "现在是几点钟", "帮我看一下时间", "今天是周几", "现在什么时候了", "几点钟了现在",
+        "告诉我今天的日期", "今天是几月几日", "现在几点几分", "报一下时间", "今天礼拜几",
+    ],
+    "PLAY_MUSIC": [
+        "我想听{singer}的歌", "放点{genre}来听", "来一首{singer}的", "给我播点{genre}",
+        "有没有{singer}的歌放一首", "想听{genre}", "播放{singer}的新歌", "随便来点{genre}",
+        "放一首{singer}的歌给我听", "整点{genre}",
+    ],
+    "PAUSE_MUSIC": [
+        "歌先停一停", "音乐停一下吧", "先别唱了", "歌声太吵了停下", "把歌暂停",
+        "暂停一下这首歌", "音乐先停下来", "不听歌了暂停吧", "先暂停播放", "停一下音乐",
+    ],
+    "STARTRECORDING": [
+        "帮我开始录一段音", "开始记录我说的话", "把我说的录下来", "开始录制语音", "开一下录音功能",
+        "启动录音", "现在开始录", "帮我录一段", "开始语音记录", "录一下我说的",
+    ],
+    "STOPRECORDING": [
+        "录音可以停了", "录完了停止吧", "结束这段录制", "把录音关了", "录制结束",
+        "录音到此为止", "停止录制语音", "录好了结束吧", "不用再录了", "语音记录结束",
+    ],
+    "SET_REMINDER": [
+        "{time}记得叫我{task}", "{time}提醒一下{task}", "帮我记一下{time}要{task}", "{time}喊我{task}",
+        "别让我忘了{time}{task}", "{time}通知我{task}", "记得{time}提醒我{task}", "给我定个{time}的闹钟",
+        "{time}叫我一声{task}", "帮我设个{time}{task}的提醒",
+    ],
+    "CHAT": [
+        "你知道{topic}吗", "给我讲讲{topic}", "你觉得{topic}有意思吗", "聊聊{topic}吧", "{topic}是什么",
+        "你喜欢{topic}吗", "我最近对{topic}很感兴趣", "说一个关于{topic}的冷知识", "你会{task}吗", "你好呀",
+    ],
+}
+
+
+def fill(template: str, rng: random.Random) -> str:
+    """随机填充句式"""
+    return template.format(
+        room=rng.choice(ROOMS), device=rng.choice(DEVICES), city=rng.choice(CITIES), date=rng.choice(DATES),
+        singer=rng.choice(SINGERS), genre=rng.choice(GENRES), topic=rng.choice(TOPICS),
+        task=rng.choice(TASKS), time=rng.choice(TIMES),
+    )
+
+
+def make_records(per_intent: int, seed: int = 24, templates: slice = slice(None)) -> List[Tuple[str, str]]:
+    """生成(文本, 意图标签)，同一意图内文本不重复"""
+    rng = random.Random(seed)
+    records = []
+    for label, choices in TEMPLATES.items():
+        choices = choices[templates]
+        texts = set()
+        for _ in range(per_intent * 20):
+            if len(texts) >= per_intent:
+                break
+            texts.add(fill(rng.choice(choices), rng))
+        records.extend((text, label) for text in sorted(texts))
+    return records
+
+
+def threshold_rows(evaluation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """把评估结果整理为表格行"""
+    llm_calls = evaluation["llm_calls"]
+    rows = []
+    for row in evaluation["thresholds"]:
+        rows.append({
+            "threshold": row["threshold"], "answered": row["answered"],
+            "llm_call_reduction": f"{row['answered'] / llm_calls:.1%}" if llm_calls else "-",
+            "precision": f"{row['correct'] / row['answered']:.1%}" if row["answered"] else "-",
+        })
+    return rows
+
+
+def main(per_intent: int) -> None:
+    db_path = os.path.join(BENCH_DIR, "intent_classifier.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    setup_env(DATABASE_URL=f"sqlite:///{db_path}", INTENT_WRITE_BEHIND_ENABLED="False", INTENT_CACHE_MAX_SIZE="0")
+    from app.adapters.repository.sqlite_repository import SQLiteIntentRepository
+    from app.common.utils.intent_classifier import IntentClassifier, train
+    from app.config import settings
+    from app.domain.entity.intent import Intent, IntentType
+    from app.tools.train_intent_classifier import TrainingRecord, evaluate, main as train_main
+
+    records = make_records(per_intent)
+    repository = SQLiteIntentRepository()
+    intents = [(Intent(type=IntentType[label], confidence=0.95, text=text), "") for text, label in records]
+    asyncio.run(repository.save_many(intents))
+    asyncio.run(repository.close())
+
+    model_path = os.path.join(BENCH_DIR, "models", "intent_classifier.npz")
+    started = time.perf_counter()
+    train_main(["--database-url", settings.DATABASE_URL, "--output", model_path])
+    train_seconds = time.perf_counter() - started
+
+    classifier = IntentClassifier.load(model_path)
+    evaluation = classifier.metadata["evaluation"]
+    print_table(
+        f"random held-out: {evaluation['holdout']} records (accuracy {evaluation['accuracy']:.1%}), "
+        f"{evaluation['llm_calls']} not matched by rules", threshold_rows(evaluation)
+    )
+
+    seen = make_records(per_intent, templates=slice(None, -2))
+    unseen = [TrainingRecord(text, IntentType[label].value, 1)
+              for text, label in make_records(per_intent // 4, seed=25, templates=slice(-2, None))]
+    evaluation = evaluate(train([text for text, _ in seen], [IntentType[label].value for _, label in seen]), unseen)
+    print_table(
+        f"unseen phrasings: {evaluation['holdout']} records (accuracy {evaluation['accuracy']:.1%}), "
+        f"{evaluation['llm_calls']} not matched by rules", threshold_rows(evaluation)
+    )
+
+    texts = [text for text, _ in records]
+    timings = []
+    for text in texts[:2000]:
+        started = time.perf_counter()
+        classifier.predict(text)
+        timings.append((time.perf_counter() - started) * 1e6)
+    started = time.perf_counter()
+    classifier.predict_proba(texts)
+    batch_us = (time.perf_counter() - started) / len(texts) * 1e6
+    print_table("classifier cost", [{
+        "records": len(records), "train_and_eval_s": f"{train_seconds:.2f}",
+        "features": classifier.metadata["features"], "model_kb": f"{os.path.getsize(model_path) / 1024:.0f}",
+        "single_p50_us": f"{percentile(timings, 50):.1f}", "single_p99_us": f"{percentile(timings, 99):.1f}",
+        "batch_us_per_text": f"{batch_us:.1f}",
+    }])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
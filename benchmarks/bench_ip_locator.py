@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+IP定位基准
+
+生成一个合成的离线IP段库(默认100万个不重叠的IP段，分布到约340个地级城市)，测量：
+- 加载耗时和内存占用
+- 单次查询耗时：离线库二分查找、按IP缓存命中
+- 天气查询负载(1万次请求，2500个客户端IP按Zipf分布)中请求高德IP定位接口的次数和延迟，
+  接口替身为本地HTTPS服务，处理耗时5ms。对比：
+  - per request: 原实现的意图，每次查询都请求IP定位接口
+  - memo: 按IP缓存结果
+  - memo + offline index: 先查缓存，再查离线库，都没有时才请求接口
+
+用法: python -m benchmarks.bench_ip_locator [IP段数]
+"""
+
+import asyncio
+import ipaddress
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from aiohttp import web
+
+from benchmarks.common import BENCH_DIR, setup_env, percentile, print_table, self_signed_ssl_context, start_stub_server
+
+REQUESTS = 10000
+CLIENTS = 2500
+ZIPF_EXPONENT = 1.0
+SERVER_SECONDS = 0.005
+
+
+def write_database(path: str, ranges: int, cities: List[str], seed: int = 3) -> List[int]:
+    """生成合成IP段库，返回每个IP段的起始地址"""
+    rng = random.Random(seed)
+    # 在公网地址空间(1.0.0.0起)内取不重叠的IP段，段之间留有空隙
+    span = (223 << 24) // ranges
+    starts = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# 合成IP段库\n")
+        for index in range(ranges):
+            start = (1 << 24) + index * span
+            end = start + rng.randint(span // 2, span - 1)
+            city = cities[rng.randrange(len(cities))]
+            f.write(f"{start},{end},,{city}\n")
+            starts.append(start)
+    return starts
+
+
+def int_to_ip(address: int) -> str:
+    """整数转点分十进制IPv4地址"""
+    return ".".join(str((address >> shift) & 255) for shift in (24, 16, 8, 0))
+
+
+async def replay(locator, client_ips: List[str]) -> Dict[str, str]:
+    """按顺序回放查询，统计延迟"""
+    latencies = []
+    for ip in client_ips:
+        started = time.perf_counter()
+        await locator.locate(ip)
+        latencies.append(time.perf_counter() - started)
+    return {
+        "p50_us": f"{percentile(latencies, 50) * 1e6:.1f}",
+        "p99_us": f"{percentile(latencies, 99) * 1e6:.0f}",
+        "total_ms": f"{sum(latencies) * 1000:.0f}",
+    }
+
+
+async def run(ranges: int) -> None:
+    from app.adapters.api.amap_client import AmapClient
+    from app.adapters.geo.gazetteer import gazetteer
+    from app.adapters.geo.ip_locator import IPLocator, IPRangeIndex, ipv4_to_int
+
+    # 地级行政区和直辖市
+    cities = [place.name for place in gazetteer
+              if place.level == 1 or place.adcode[:2] in ("11", "12", "31", "50") and place.level == 0]
+    path = os.path.join(BENCH_DIR, "bench_ip_ranges.csv")
+    starts = write_database(path, ranges, cities)
+
+    index = IPRangeIndex(path)
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.load()
+    load_seconds = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # 不在tracemalloc下再计一次加载耗时
+    started = time.perf_counter()
+    IPRangeIndex(path).load()
+    load_seconds = time.perf_counter() - started
+
+    rng = random.Random(9)
+    addresses = [starts[rng.randrange(ranges)] + 7 for _ in range(100000)]
+    started = time.perf_counter()
+    for address in addresses:
+        index.lookup(address)
+    bisect_us = (time.perf_counter() - started) / len(addresses) * 1e6
+    ip_strings = [int_to_ip(address) for address in addresses]
+    started = time.perf_counter()
+    for ip in ip_strings:
+        index.lookup(ipv4_to_int(ip))
+    parse_us = (time.perf_counter() - started) / len(ip_strings) * 1e6
+
+    print_table(f"offline index, {ranges} ranges, {len(cities)} cities", [{
+        "file_mb": f"{os.path.getsize(path) / 1e6:.1f}",
+        "load_s": f"{load_seconds:.2f}",
+        "memory_mb": f"{memory / 1e6:.1f}",
+        "lookup_us (int)": f"{bisect_us:.2f}",
+        "lookup_us (from ip string)": f"{parse_us:.2f}",
+    }])
+
+    # 客户端IP：公网地址，Zipf分布，其中10%不在离线库覆盖的IP段内，需要请求接口
+    weights = [1 / (rank ** ZIPF_EXPONENT) for rank in range(1, CLIENTS + 1)]
+    pool = []
+    while len(pool) < CLIENTS:
+        start = starts[rng.randrange(ranges)]
+        address = start - 1 if len(pool) % 10 == 0 else start + 3
+        if ipaddress.IPv4Address(address).is_global:
+            pool.append(int_to_ip(address))
+    client_ips = rng.choices(pool, weights, k=REQUESTS)
+
+    api_calls = 0
+
+    async def ip_handler(request: web.Request) -> web.Response:
+        nonlocal api_calls
+        api_calls += 1
+        await asyncio.sleep(SERVER_SECONDS)
+        return web.json_response({"status": "1", "province": "浙江省", "city": "杭州市"})
+
+    runner, base_url = await start_stub_server({("GET", "/v3/ip"): ip_handler}, self_signed_ssl_context())
+    # 替身服务使用自签名证书，只在基准中关闭证书校验
+    client = AmapClient(base_url=base_url, verify_ssl=False)
+    rows = []
+    try:
+        variants = [
+            ("per request", IPLocator(client, "bench-key", ttl=0)),
+            ("memo", IPLocator(client, "bench-key")),
+            ("memo + offline index", IPLocator(client, "bench-key", index=index)),
+        ]
+        for name, locator in variants:
+            api_calls = 0
+            result = await replay(locator, client_ips)
+            rows.append({"strategy": name, "requests": REQUESTS, "api_calls": api_calls, **result})
+    finally:
+        await client.close()
+        await runner.cleanup()
+    print_table(f"{REQUESTS} weather queries from {CLIENTS} Zipf-distributed client IPs "
+                f"(10% outside the offline ranges), AMap stand-in {SERVER_SECONDS * 1000:.0f} ms", rows)
+
+
+def main(ranges: int) -> None:
+    setup_env()
+    asyncio.run(run(ranges))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+单请求大模型调用次数基准
+
+用模拟DashScope服务回放包含UNKNOWN、CHAT、设备控制和上游故障的请求，
+分别统计替身服务实际收到的调用数和LLMService的请求级计数，
+验证每个请求至多调用一次大模型，且回复与预期一致。每次运行使用新的临时数据库，
+缓存命中的CHAT(生成或流式回复)只出现在本次运行先识别过的文本上。
+
+用法: python -m benchmarks.bench_llm_calls_per_request
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from aiohttp import web
+
+from benchmarks.common import BENCH_DIR, setup_env, start_stub_server, print_table
+
+# 文本片段 -> 模拟的大模型识别结果
+SCRIPTED_RESULTS = {
+    "你好": {"intent": "CHAT", "confidence": 0.95, "entities": {}, "reply": "你好，有什么可以帮您？"},
+    "啦啦啦": {"intent": "UNKNOWN", "confidence": 0.3, "entities": {}, "reply": "没太听懂，能换个说法吗？"},
+    "随便聊聊": {"intent": "CHAT", "confidence": 0.95, "entities": {}, "reply": ""},
+    "打开客厅的灯": {
+        "intent": "CONTROL_DEVICE_ON", "confidence": 0.92,
+        "entities": {"target": "客厅的灯", "operation": "开启", "city": ""}, "reply": ""
+    },
+}
+
+# 流式回复的片段，只有识别阶段没有调用大模型(如CHAT缓存命中)时才会请求
+STREAM_DELTAS = ["流式回复，", "请讲。"]
+
+FALLBACK_REPLY = "我可能没有完全理解您的意思，能否请您换种方式表达？"
+
+# (模式, 文本, 预期的上游调用数, 预期回复的开头)
+WORKLOAD = [
+    ("recognize", "你好", 1, "你好，有什么可以帮您？"),
+    ("recognize", "啦啦啦", 1, "没太听懂，能换个说法吗？"),
+    ("recognize", "打开客厅的灯", 0, "灯已开启"),
+    # 命中第一条保存的CHAT，识别阶段没有调用大模型，单独请求一次生成回复
+    ("recognize", "你好", 1, "你好，有什么可以帮您？"),
+    # 上游失败时千问客户端返回的降级结果，不再重试
+    ("recognize", "上游故障", 1, "抱歉，我遇到了一些技术问题"),
+    ("stream", "你好呀", 1, "你好，有什么可以帮您？"),
+    ("stream", "啦啦啦", 1, "没太听懂，能换个说法吗？"),
+    # 命中第一条保存的CHAT，识别阶段没有调用大模型，流式生成回复
+    ("stream", "你好", 1, "".join(STREAM_DELTAS)),
+    # 识别阶段已调用过大模型但没有回复，不再流式请求，使用备用回复
+    ("stream", "随便聊聊", 1, FALLBACK_REPLY),
+]
+
+
+class DashScopeStub:
+    """按请求文本返回预设结果的DashScope替身"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.calls += 1
+        body = await request.json()
+        if request.headers.get("X-DashScope-SSE") == "enable":
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for delta in STREAM_DELTAS:
+                chunk = {"output": {"text": delta}, "request_id": f"stub-{self.calls}"}
+                await response.write(f"data:{json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await response.write_eof()
+            return response
+        prompt = body["input"]["messages"][-1]["content"]
+        if "上游故障" in prompt:
+            return web.json_response({"code": "InternalError", "message": "stub failure"}, status=500)
+        for key, data in SCRIPTED_RESULTS.items():
+            if key in prompt:
+                content = {"success": True, "message": "Success", "data": data}
+                break
+        else:
+            content = {"success": True, "message": "Success", "data": SCRIPTED_RESULTS["啦啦啦"]}
+        return web.json_response({
+            "output": {"text": json.dumps(content, ensure_ascii=False)},
+            "usage": {"input_tokens": 100, "output_tokens": 20},
+            "request_id": f"stub-{self.calls}"
+        })
+
+
+async def main() -> None:
+    stub = DashScopeStub()
+    runner, base_url = await start_stub_server({
+        ("POST", "/api/v1/services/aigc/text-generation/generation"): stub.handle
+    })
+    # 每次运行使用新的数据库和会话快照，上次运行保存的意图不会让请求命中缓存
+    run_dir = tempfile.mkdtemp(prefix="llm_calls_", dir=BENCH_DIR)
+    setup_env(
+        DASHSCOPE_BASE_URL=f"{base_url}/api/v1",
+        DATABASE_URL=f"sqlite:///{os.path.join(run_dir, 'bench.db')}",
+        SESSION_SNAPSHOT_PATH=os.path.join(run_dir, "dialogue_sessions.snap"),
+    )
+    
+    from app.controller.intent_controller import controller
+    service = controller.intent_service
+    
+    rows = []
+    for i, (mode, text, expected_calls, expected_reply) in enumerate(WORKLOAD):
+        before = stub.calls
+        session_id = f"bench-calls-{i}"
+        if mode == "stream":
+            async for frame in service.recognize_intent_stream(text, {}, session_id):
+                if frame["event"] == "result":
+                    data = frame["data"]["data"]
+        else:
+            data = (await service.recognize_intent(text, {}, session_id)).to_dict()["data"]
+        reply = data["result"].get("message", "")
+        rows.append({
+            "mode": mode,
+            "text": text,
+            "intent": data["intent"],
+            "upstream_calls": stub.calls - before,
+            "reply": reply[:16],
+            "ok": stub.calls - before == expected_calls and reply.startswith(expected_reply)
+        })
+    
+    await service.close()
+    await runner.cleanup()
+    
+    print_table("单请求大模型调用次数", rows)
+    stats = service.llm_service.call_stats
+    print(f"call_stats: {stats}")
+    assert stats["max_calls_per_request"] <= 1, "存在调用大模型超过一次的请求"
+    failed = [row["text"] for row in rows if not row["ok"]]
+    assert not failed, f"调用次数或回复与预期不一致: {failed}"
+    print("每个请求至多调用一次大模型，回复符合预期: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
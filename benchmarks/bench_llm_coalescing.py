@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+大模型请求合并基准
+
+模拟会议开始时N台设备同时说出同一句话(每台设备各自的新会话)，
+分别在关闭和开启请求合并时统计上游调用数、合并比例和总耗时。
+
+用法: python -m benchmarks.bench_llm_coalescing [设备数] [延迟毫秒]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from aiohttp import web
+
+from benchmarks.common import setup_env, start_stub_server, print_table
+
+BURST_TEXTS = ["开始录音", "开始录音。", "开 始 录 音", "今天有什么安排"]
+
+
+class DashScopeStub:
+    """固定延迟的DashScope替身"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        content = {"success": True, "data": {
+            "intent": "STARTRECORDING", "confidence": 0.95, "entities": {}, "reply": ""
+        }}
+        return web.json_response({
+            "output": {"text": json.dumps(content, ensure_ascii=False)},
+            "usage": {}, "request_id": f"stub-{self.calls}"
+        })
+
+
+async def main(devices: int, delay_ms: int) -> None:
+    stub = DashScopeStub(delay_ms / 1000)
+    runner, base_url = await start_stub_server({
+        ("POST", "/api/v1/services/aigc/text-generation/generation"): stub.handle
+    })
+    setup_env(DASHSCOPE_BASE_URL=f"{base_url}/api/v1")
+    
+    from app.config import settings
+    from app.service.llm_service import LLMService
+    
+    llm_service = LLMService()
+    rows = []
+    for enabled in (False, True):
+        settings.LLM_COALESCE_ENABLED = enabled
+        before = stub.calls
+        
+        async def device(i: int) -> None:
+            # 每台设备都是新会话，历史中只有本句
+            text = BURST_TEXTS[i % len(BURST_TEXTS)]
+            history = [{"role": "user", "content": text}]
+            context = {"metadata": {"client_ip": f"10.0.{i // 256}.{i % 256}"}}
+            await llm_service.recognize_intent(text, context, history)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(device(i) for i in range(devices)))
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "coalesce": enabled,
+            "requests": devices,
+            "upstream_calls": stub.calls - before,
+            "wall_s": f"{elapsed:.3f}"
+        })
+    
+    await llm_service.close()
+    await runner.cleanup()
+    
+    print_table(f"请求合并 ({devices}台设备, 模拟延迟{delay_ms}ms)", rows)
+    print(f"coalesce stats: {llm_service.get_coalesce_stats()}")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    delay = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    asyncio.run(main(count, delay))
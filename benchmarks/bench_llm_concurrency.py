@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+大模型调用并发基准
+
+启动一个模拟DashScope的本地服务(每次调用固定延迟)，通过ASGI直接向
+/api/intent/recognize 发送N个请求，对比顺序发送与并发发送的总耗时，
+并统计替身服务观察到的最大并发数，验证LLM调用不会阻塞事件循环。
+
+用法: python -m benchmarks.bench_llm_concurrency [N] [延迟毫秒]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from aiohttp import web
+
+from benchmarks.common import setup_env, start_stub_server, print_table
+
+
+class DashScopeStub:
+    """DashScope文本生成接口替身"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            content = {
+                "success": True,
+                "message": "Success",
+                "data": {"intent": "CHAT", "confidence": 0.95, "entities": {}, "reply": "好的"}
+            }
+            return web.json_response({
+                "output": {"text": json.dumps(content, ensure_ascii=False), "finish_reason": "stop"},
+                "usage": {"input_tokens": 10, "output_tokens": 10},
+                "request_id": f"stub-{self.calls}"
+            })
+        finally:
+            self.in_flight -= 1
+
+
+async def main(n: int, delay_ms: int) -> None:
+    stub = DashScopeStub(delay_ms / 1000)
+    runner, base_url = await start_stub_server({
+        ("POST", "/api/v1/services/aigc/text-generation/generation"): stub.handle
+    })
+    setup_env(DASHSCOPE_BASE_URL=f"{base_url}/api/v1")
+    
+    import httpx
+    from app.main import app, intent_controller
+    
+    async def call(client: httpx.AsyncClient, i: int, tag: str) -> None:
+        response = await client.post("/api/intent/recognize", json={
+            "text": f"给我讲个笑话{tag}{i}", "session_id": f"bench-{tag}-{i}"
+        })
+        assert response.json()["success"], response.text
+    
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # 预热连接池
+        await call(client, 0, "warmup")
+        
+        stub.peak = 0
+        start = time.perf_counter()
+        for i in range(n):
+            await call(client, i, f"seq{start}")
+        sequential = time.perf_counter() - start
+        rows.append({"mode": "sequential", "requests": n, "wall_s": f"{sequential:.3f}",
+                     "peak_in_flight": stub.peak})
+        
+        stub.peak = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(call(client, i, f"par{start}") for i in range(n)))
+        parallel = time.perf_counter() - start
+        rows.append({"mode": "concurrent", "requests": n, "wall_s": f"{parallel:.3f}",
+                     "peak_in_flight": stub.peak})
+    
+    await intent_controller.intent_service.close()
+    await runner.cleanup()
+    
+    print_table(f"LLM并发基准 (模拟延迟 {delay_ms}ms)", rows)
+    print(f"speedup: {sequential / parallel:.1f}x (理想值 {n}x)")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    delay = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(main(count, delay))
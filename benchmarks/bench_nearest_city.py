@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按经纬度查找最近城市的基准
+
+随机生成查询点：一半在县级行政区中心附近(半径约50千米，模拟设备上报的GPS)，
+一半均匀分布在中国经纬度范围内(含海上和境外，超出250千米的返回None)。测量：
+- 网格索引的建立耗时
+- 网格索引的单次查询耗时(默认200万个点)
+- 线性扫描全部中心点的单次查询耗时
+- 抽样与精确结果(对全部中心点逐个计算球面距离)的一致率
+
+用法: python -m benchmarks.bench_nearest_city [查询点数]
+"""
+
+import random
+import sys
+import time
+from typing import List, Tuple
+
+from benchmarks.common import setup_env, print_table
+
+MAX_DISTANCE_KM = 250
+CHECK_SAMPLE = 5000
+
+
+def make_points(count: int, centers: List[Tuple[float, float]], seed: int = 19) -> List[Tuple[float, float]]:
+    """生成查询点"""
+    rng = random.Random(seed)
+    points = []
+    for index in range(count):
+        if index % 2 == 0:
+            latitude, longitude = centers[rng.randrange(len(centers))]
+            points.append((latitude + rng.uniform(-0.45, 0.45), longitude + rng.uniform(-0.5, 0.5)))
+        else:
+            points.append((rng.uniform(18.0, 54.0), rng.uniform(73.0, 135.0)))
+    return points
+
+
+def main(count: int) -> None:
+    setup_env()
+    from app.adapters.geo.gazetteer import gazetteer
+    from app.adapters.geo.spatial_index import distance_km
+
+    gazetteer.lookup("杭州")
+    started = time.perf_counter()
+    gazetteer.nearest(30.0, 120.0)
+    build_ms = (time.perf_counter() - started) * 1000
+    grid = gazetteer._grid
+    leaves = [point for cells in grid._rows.values() for cell in cells.values() for point in cell]
+    centers = [(latitude, longitude) for latitude, longitude, _ in leaves]
+    points = make_points(count, centers)
+
+    started = time.perf_counter()
+    found = 0
+    for latitude, longitude in points:
+        if grid.nearest(latitude, longitude, MAX_DISTANCE_KM) is not None:
+            found += 1
+    grid_seconds = time.perf_counter() - started
+
+    def brute_force(latitude: float, longitude: float):
+        best, best_distance = None, float("inf")
+        for point_latitude, point_longitude, place in leaves:
+            distance = distance_km(latitude, longitude, point_latitude, point_longitude)
+            if distance < best_distance:
+                best, best_distance = place, distance
+        return (best, best_distance) if best_distance <= MAX_DISTANCE_KM else None
+
+    sample = points[:CHECK_SAMPLE]
+    started = time.perf_counter()
+    expected = [brute_force(latitude, longitude) for latitude, longitude in sample]
+    brute_seconds = time.perf_counter() - started
+    agree = 0
+    for (latitude, longitude), exact in zip(sample, expected):
+        result = grid.nearest(latitude, longitude, MAX_DISTANCE_KM)
+        if result is None or exact is None:
+            agree += result is None and exact is None
+        elif result[0] is exact[0] or abs(result[1] - exact[1]) < 1e-6:
+            agree += 1
+
+    print_table(f"nearest place among {len(grid)} county-level centroids", [
+        {"method": "grid index (0.5 deg cells)", "queries": count, "us_per_query": f"{grid_seconds / count * 1e6:.1f}",
+         "queries_per_s": f"{count / grid_seconds:,.0f}", "build_ms": f"{build_ms:.1f}"},
+        {"method": "linear scan (haversine)", "queries": len(sample),
+         "us_per_query": f"{brute_seconds / len(sample) * 1e6:.0f}",
+         "queries_per_s": f"{len(sample) / brute_seconds:,.0f}", "build_ms": "-"},
+    ])
+    print(f"within {MAX_DISTANCE_KM} km of a known place: {found / count:.1%} of queries")
+    print(f"agreement with exact nearest on {len(sample)} sampled queries: {agree}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000)
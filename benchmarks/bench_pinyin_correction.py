@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+同音错字纠正基准
+
+模拟语音识别错字生成带噪声的地名和设备名：
+- homophone: 随机一个字换成同音字(不计声调，如"西安"->"西按")
+- near: 随机一个字换成近音字(模糊音相差一个字母，如"宁波"->"宁坡")
+- both: 每个字都换成同音字，没有一个字相同，按设计不纠正
+地名取能按名称唯一解析的地级和县级简称；设备名套用"打开{设备}"等指令，经规则策略识别。
+统计纠正正确、纠正错误和未纠正的比例，没有噪声的文本被误纠正的比例，以及单次耗时。
+纠正之前这些名称全部解析不了，地名会交给高德地理编码接口，指令会交给大模型。
+最后用模拟的地理编码接口检查天气查询的城市编码：表中没有的地名(如"东京"，近音"东营")按接口结果查询，
+不会被纠正成另一个城市；近音错字(如"宁坡")在接口找不到时才纠正。
+
+用法: python -m benchmarks.bench_pinyin_correction
+"""
+
+import asyncio
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from benchmarks.common import setup_env, print_table, percentile, start_stub_server
+from benchmarks.workloads import LABELLED_CORPUS
+
+KINDS = ("homophone", "near", "both")
+COMMANDS = ["打开{device}", "关掉{device}", "把{device}打开", "{device}关一下", "开一下{device}"]
+
+# 行政区划表中没有、模拟的地理编码接口能找到的地名 -> 接口返回的编码(虚构)
+OUTSIDE_PLACES = {"东京": "JP0001", "首尔": "KR0001", "纽约": "US0001", "大阪": "JP0002", "曼谷": "TH0001"}
+
+# 接口也找不到的语音识别错字 -> 应纠正到的行政区编码
+GEOCODE_MISSES = {"宁坡": "330200", "成度": "510100"}
+
+
+def make_noise(name: str, kind: str, rng: random.Random, primary: Dict[str, str],
+               chars_by_syllable: Dict[str, List[str]], neighbors: Dict[str, Tuple[str, ...]]) -> Optional[str]:
+    """按噪声类型改写名称，改写不了时返回None"""
+    chars = list(name)
+    positions = range(len(chars)) if kind == "both" else [rng.randrange(len(chars))]
+    for position in positions:
+        syllable = primary.get(chars[position])
+        if syllable is None:
+            return None
+        if kind == "near":
+            options = [near for near in neighbors.get(syllable, ()) if chars_by_syllable.get(near)]
+            if not options:
+                return None
+            syllable = rng.choice(options)
+        replacements = [char for char in chars_by_syllable.get(syllable, []) if char != chars[position]]
+        if not replacements:
+            return None
+        chars[position] = rng.choice(replacements)
+    return "".join(chars)
+
+
+def timed(function: Callable[[str], object], texts: List[str]) -> Tuple[List[object], List[float]]:
+    """逐个调用并记录耗时(微秒)"""
+    results, timings = [], []
+    for text in texts:
+        started = time.perf_counter()
+        results.append(function(text))
+        timings.append((time.perf_counter() - started) * 1e6)
+    return results, timings
+
+
+async def check_city_adcodes() -> None:
+    """用模拟的地理编码接口查询天气城市编码，与预期不一致时退出"""
+    from app.adapters.api.amap_client import AmapClient
+    from app.adapters.api.weather_api import WeatherAPI
+    from app.adapters.geo.gazetteer import gazetteer
+
+    requested: List[str] = []
+
+    async def geocode(request: web.Request) -> web.Response:
+        address = request.query["address"]
+        requested.append(address)
+        adcode = OUTSIDE_PLACES.get(address)
+        geocodes = [{"formatted_address": address, "adcode": adcode}] if adcode else []
+        return web.json_response({"status": "1", "info": "OK", "count": str(len(geocodes)), "geocodes": geocodes})
+
+    runner, base_url = await start_stub_server({("GET", WeatherAPI.GEO_PATH): geocode})
+    client = AmapClient(base_url)
+    weather_api = WeatherAPI(client)
+    rows = []
+    for name, expected in list(OUTSIDE_PLACES.items()) + list(GEOCODE_MISSES.items()):
+        near = gazetteer.correct(name)
+        adcode = await weather_api._get_city_adcode(name)
+        rows.append({
+            "name": name, "near_correction": near.name if near else "-", "geocoded": name in requested,
+            "adcode": adcode, "ok": adcode == expected,
+        })
+    await client.close()
+    await runner.cleanup()
+
+    print_table("weather city adcodes (stub geocoder)", rows)
+    failed = [row["name"] for row in rows if not row["ok"]]
+    if failed:
+        raise SystemExit(f"城市编码与预期不一致: {failed}")
+
+
+def main() -> None:
+    setup_env(AMAP_API_KEY="bench-key")
+    from app.adapters.geo.gazetteer import gazetteer
+    from app.common.config.intent_rules import RULE_VOCABULARIES
+    from app.common.utils.pinyin import _load
+    from app.domain.strategy.rule_strategy import correct_device_names, rule_engine
+
+    table = _load()
+    chars_by_syllable: Dict[str, List[str]] = {}
+    for char, syllable in table.primary.items():
+        chars_by_syllable.setdefault(syllable, []).append(char)
+    rng = random.Random(23)
+
+    def noisy(name: str, kind: str) -> Optional[str]:
+        return make_noise(name, kind, rng, table.primary, chars_by_syllable, table.neighbors)
+
+    started = time.perf_counter()
+    gazetteer.correct("西按")
+    build_ms = (time.perf_counter() - started) * 1000
+
+    places = [place for place in gazetteer if place.level > 0 and gazetteer.lookup(place.short_name) is place]
+    rows = []
+    for kind in KINDS:
+        cases = []
+        for place in places:
+            text = noisy(place.short_name, kind)
+            if text is not None and gazetteer.lookup(text) is None:
+                cases.append((text, place))
+        results, timings = timed(gazetteer.correct, [text for text, _ in cases])
+        right = sum(1 for result, (_, place) in zip(results, cases) if result is place)
+        missed = sum(1 for result in results if result is None)
+        rows.append({
+            "names": "places", "noise": kind, "cases": len(cases), "corrected": f"{right / len(cases):.1%}",
+            "wrong": f"{(len(cases) - right - missed) / len(cases):.1%}", "uncorrected": f"{missed / len(cases):.1%}",
+            "p50_us": f"{percentile(timings, 50):.1f}", "p99_us": f"{percentile(timings, 99):.1f}",
+        })
+
+    devices = [name for name in RULE_VOCABULARIES["device"] if len(name) > 1]
+
+    def recognize_device(text: str) -> Optional[str]:
+        match = rule_engine.match(correct_device_names(text))
+        return match.entities.get("target") if match else None
+
+    for kind in KINDS:
+        cases = []
+        for device in devices * 20:
+            text = noisy(device, kind)
+            if text is not None and text not in devices:
+                cases.append((rng.choice(COMMANDS).format(device=text), device))
+        results, timings = timed(recognize_device, [text for text, _ in cases])
+        right = sum(1 for result, (_, device) in zip(results, cases) if result == device)
+        missed = sum(1 for result in results if result is None)
+        rows.append({
+            "names": "devices", "noise": kind, "cases": len(cases), "corrected": f"{right / len(cases):.1%}",
+            "wrong": f"{(len(cases) - right - missed) / len(cases):.1%}", "uncorrected": f"{missed / len(cases):.1%}",
+            "p50_us": f"{percentile(timings, 50):.1f}", "p99_us": f"{percentile(timings, 99):.1f}",
+        })
+    print_table(f"correction of ASR errors ({len(places)} place names, {len(devices)} device names)", rows)
+
+    # 没有噪声的文本：不应纠正出地名，设备纠正不应改动文本
+    clean = [text for text, _ in LABELLED_CORPUS]
+    weather = [text for text, label in LABELLED_CORPUS if label == "QUERY_WEATHER"]
+    no_place = [text for text in weather if not gazetteer.find_places(text)]
+    place_results, place_timings = timed(gazetteer.extract_place, no_place)
+    device_results, device_timings = timed(correct_device_names, clean)
+    print_table("false corrections on clean utterances", [
+        {"check": "extract_place on weather queries without a place", "texts": len(no_place),
+         "changed": sum(1 for result in place_results if result is not None),
+         "p50_us": f"{percentile(place_timings, 50):.1f}", "p99_us": f"{percentile(place_timings, 99):.1f}"},
+        {"check": "correct_device_names on the labelled corpus", "texts": len(clean),
+         "changed": sum(1 for result, text in zip(device_results, clean) if result != text),
+         "p50_us": f"{percentile(device_timings, 50):.1f}", "p99_us": f"{percentile(device_timings, 99):.1f}"},
+    ])
+
+    print(f"place pinyin index build: {build_ms:.0f} ms (including pinyin table load)")
+
+    asyncio.run(check_city_adcodes())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+天气查询中城市提取的基准
+
+用行政区划编码表生成天气查询：每个能按名称唯一解析的行政区(全称、简称交替)套用一个句式，
+有歧义的区县加上所属城市的简称(如"北京朝阳")，另加不含地名的查询。比较两种提取方式：
+- legacy: 规则中的城市正则 -> 38个常用城市列表 -> "XX天气"正则(字典树之前的写法)
+- trie: Gazetteer.extract_place，一次扫描得到行政区、编码和位置
+统计提取结果解析到正确行政区的比例、解析不了(会调用高德地理编码接口)的比例和单次耗时。
+另外检查原38个常用城市都能从"XX天气"中提取并解析，有解析不了的时退出。
+
+用法: python -m benchmarks.bench_place_extraction
+"""
+
+import random
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.common import setup_env, print_table, percentile
+
+TEMPLATES = [
+    "{place}天气怎么样", "{date}{place}的天气", "查一下{date}{place}的天气", "{place}{date}天气预报",
+    "请问{place}{date}天气如何", "帮我查询{place}{date}的天气情况", "{date}{place}天气", "看看{place}天气",
+]
+DATES = ["", "今天", "明天", "后天", "大后天", "周五", "星期天"]
+NO_PLACE = [
+    "今天天气怎么样", "明天天气好吗", "天气预报", "现在外面天气怎么样", "后天的天气", "查一下天气",
+    "这周末天气如何", "周末出去玩天气怎么样", "我这边天气怎么样", "帮我看看今天的天气",
+]
+
+# 字典树之前硬编码的38个常用城市
+COMMON_CITIES = [
+    "北京", "上海", "广州", "深圳", "杭州", "南京", "武汉", "西安", "成都", "重庆",
+    "天津", "长沙", "苏州", "厦门", "哈尔滨", "大连", "青岛", "济南", "郑州", "长春",
+    "沈阳", "南宁", "昆明", "贵阳", "太原", "石家庄", "乌鲁木齐", "兰州", "西宁", "银川",
+    "呼和浩特", "拉萨", "南昌", "合肥", "福州", "台北", "海口", "三亚",
+]
+
+
+def make_queries(gazetteer, seed: int = 22) -> List[Tuple[str, Optional[str]]]:
+    """生成(查询, 期望的行政区编码)"""
+    rng = random.Random(seed)
+    queries: List[Tuple[str, Optional[str]]] = []
+    for index, place in enumerate(gazetteer):
+        surfaces = [place.short_name, place.name] if index % 2 else [place.name, place.short_name]
+        surface = next((name for name in surfaces if gazetteer.lookup(name) is place), None)
+        if surface is None and place.level == 2:
+            city = gazetteer.get(place.adcode[:4] + "00") or gazetteer.get(place.adcode[:2] + "0000")
+            if city is not None and gazetteer.lookup(city.short_name + place.short_name) is place:
+                surface = city.short_name + place.short_name
+        if surface is None:
+            continue
+        template = TEMPLATES[rng.randrange(len(TEMPLATES))]
+        queries.append((template.format(place=surface, date=rng.choice(DATES)), place.adcode))
+    queries.extend((text, None) for text in NO_PLACE * 50)
+    return queries
+
+
+def make_legacy_extract(date_words: List[str]) -> Callable[[str], Optional[str]]:
+    """字典树之前的提取方式"""
+    dates = "|".join(sorted(date_words, key=len, reverse=True))
+    slot = re.compile(
+        r"(?:查询一下|查一下|查询|查查|查看|看一下|看看|告诉我|知道|请问)?(?:" + dates + r")?"
+        r"(?P<city>(?!今天|明天|后天|今日|明日|当前|现在)[\u4e00-\u9fa5]{2,6}?)(?:" + dates + r")?的?天气"
+    )
+    fallback = re.compile(r"([\u4e00-\u9fa5]{2,6})(的天气|天气)")
+
+    def extract(text: str) -> Optional[str]:
+        found = slot.search(text)
+        if found:
+            return found.group("city")
+        for city in COMMON_CITIES:
+            if city in text:
+                return city
+        found = fallback.search(text)
+        if found and found.group(1) not in ["今天", "明天", "后天", "当前", "今日", "明日"]:
+            return found.group(1)
+        return None
+
+    return extract
+
+
+def main() -> None:
+    setup_env()
+    from app.adapters.geo.gazetteer import gazetteer
+    from app.common.config.intent_keywords import DATE_KEYWORDS
+
+    gazetteer.lookup("杭州")
+    started = time.perf_counter()
+    gazetteer.extract_place("北京天气")
+    build_ms = (time.perf_counter() - started) * 1000
+    queries = make_queries(gazetteer)
+
+    def trie_extract(text: str) -> Optional[str]:
+        mention = gazetteer.extract_place(text)
+        return mention.name if mention is not None else None
+
+    rows = []
+    for name, extract in [("legacy regex + city list", make_legacy_extract(list(DATE_KEYWORDS))),
+                          ("trie (extract_place)", trie_extract)]:
+        correct = geocode_calls = wrong = 0
+        timings = []
+        for text, adcode in queries:
+            started = time.perf_counter()
+            city = extract(text)
+            timings.append((time.perf_counter() - started) * 1e6)
+            place = gazetteer.lookup(city) if city else None
+            if city and place is None:
+                # 离线表解析不了的字符串会交给高德地理编码
+                geocode_calls += 1
+            elif (place.adcode if place else None) == adcode:
+                correct += 1
+            else:
+                wrong += 1
+        total = len(queries)
+        rows.append({
+            "method": name, "queries": total, "correct": f"{correct / total:.1%}",
+            "wrong_place": f"{wrong / total:.1%}", "geocode_calls": f"{geocode_calls / total:.1%}",
+            "p50_us": f"{percentile(timings, 50):.1f}", "p99_us": f"{percentile(timings, 99):.1f}",
+        })
+    with_place = sum(1 for _, adcode in queries if adcode)
+    print_table(f"{with_place} queries naming a place, {len(queries) - with_place} without", rows)
+    print(f"trie build: {build_ms:.1f} ms")
+
+    unresolved = []
+    for city in COMMON_CITIES:
+        mention = gazetteer.extract_place(f"{city}天气")
+        if mention is None or gazetteer.lookup(city) is not mention.place:
+            unresolved.append(city)
+    if unresolved:
+        raise SystemExit(f"原常用城市列表中有解析不了的城市: {unresolved}")
+    print(f"all {len(COMMON_CITIES)} legacy common cities resolve: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图记录表查找延迟随表规模变化的基准
+
+逐级向SQLite意图记录表批量写入不重复的语句，每一级测量：
+- legacy: 原实现的查询，按未建索引的text列过滤并按id倒序取第一条
+- text_hash: SQLiteIntentRepository.find_by_text，走(text_hash, context_key)唯一索引
+一半查询命中已存在的语句，一半查询不存在的语句。
+
+用法: python -m benchmarks.bench_repository_lookup [规模1,规模2,...]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+from benchmarks.common import setup_env, percentile, print_table, BENCH_DIR
+
+# 每一级的查询次数
+LOOKUPS = 200
+
+# 原实现只对较小的表测量，全表扫描在大表上过慢
+LEGACY_MAX_ROWS = 1_000_000
+
+
+def make_text(index: int) -> str:
+    return f"帮我把第{index}号设备的温度调到{index % 30 + 16}度"
+
+
+async def main(sizes: List[int]) -> None:
+    db_path = os.path.join(BENCH_DIR, "repository_lookup.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    setup_env(DATABASE_URL=f"sqlite:///{db_path}")
+
+    from sqlalchemy import insert, text
+    from app.adapters.repository.sqlite_repository import SQLiteIntentRepository, IntentRecord
+    from app.common.utils.text_utils import normalize_text, text_hash
+
+    repository = SQLiteIntentRepository()
+    legacy_sql = text("SELECT * FROM intent_records WHERE text = :text ORDER BY id DESC LIMIT 1")
+    rng = random.Random(7)
+    rows = []
+    loaded = 0
+
+    for size in sizes:
+        now = datetime.now()
+        with repository.engine.begin() as conn:
+            batch = []
+            for index in range(loaded, size):
+                content = make_text(index)
+                normalized = normalize_text(content)
+                batch.append({
+                    "intent_type": "CONTROL_DEVICE_ON", "confidence": 0.95, "text": content,
+                    "entities": "{}", "created_at": now, "normalized_text": normalized,
+                    "text_hash": text_hash(normalized), "context_key": "", "hit_count": 1, "last_seen": now
+                })
+                if len(batch) >= 10000:
+                    conn.execute(insert(IntentRecord), batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(IntentRecord), batch)
+        loaded = size
+
+        queries = [
+            make_text(rng.randrange(size)) if i % 2 == 0 else make_text(size + rng.randrange(size))
+            for i in range(LOOKUPS)
+        ]
+
+        hashed_latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            await repository.find_by_text(query)
+            hashed_latencies.append((time.perf_counter() - started) * 1000)
+
+        legacy_latencies = []
+        if size <= LEGACY_MAX_ROWS:
+            with repository.engine.connect() as conn:
+                for query in queries[:20]:
+                    started = time.perf_counter()
+                    conn.execute(legacy_sql, {"text": query}).first()
+                    legacy_latencies.append((time.perf_counter() - started) * 1000)
+
+        rows.append({
+            "rows": size,
+            "legacy_p50_ms": f"{percentile(legacy_latencies, 50):.3f}" if legacy_latencies else "-",
+            "legacy_p99_ms": f"{percentile(legacy_latencies, 99):.3f}" if legacy_latencies else "-",
+            "text_hash_p50_ms": f"{percentile(hashed_latencies, 50):.3f}",
+            "text_hash_p99_ms": f"{percentile(hashed_latencies, 99):.3f}",
+        })
+
+    print_table("find_by_text latency vs table size (SQLite)", rows)
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000"
+    asyncio.run(main([int(value) for value in arg.split(",")]))
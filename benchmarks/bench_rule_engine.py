@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+规则引擎覆盖率与延迟基准
+
+用带标注的语料(workloads.LABELLED_CORPUS)评估规则策略：
+- 覆盖率：规则直接给出结果、不需要请求大模型的比例
+- 准确率：规则给出的结果中与标注一致的比例(含疑问、否定、指代的句子规则应放行给大模型)
+对比原RuleBasedStrategy(只有录音和天气规则)与现在的声明式规则，并统计合成对话负载中
+能在本地解决的轮次。延迟为单线程逐句调用RuleEngine.match的耗时。
+
+用法: python -m benchmarks.bench_rule_engine
+"""
+
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import setup_env, percentile, print_table
+from benchmarks.workloads import LABELLED_CORPUS, generate_sessions
+
+ROUNDS = 200
+
+# 原RuleBasedStrategy使用的录音关键词和情感词，规则引擎中已由规则的模式和否定条件代替
+LEGACY_RECORDING_KEYWORDS = ["录音", "record", "recording", "语音记录", "语音备忘录"]
+LEGACY_SENTIMENT_WORDS = ["不应该", "应该", "不要", "要", "别", "停止", "开始", "继续"]
+
+
+def legacy_recognize(text: str, recording_keywords: List[str], question_words: List[str],
+                     sentiment_words: List[str]):
+    """原RuleBasedStrategy.recognize的匹配逻辑，返回(意图类型, 实体)或None"""
+    has_recording = any(keyword in text for keyword in recording_keywords)
+    has_question = any(word in text for word in question_words)
+    has_sentiment = any(word in text for word in sentiment_words)
+    if has_recording and (has_question or has_sentiment):
+        return None
+    if has_recording and ("开始" in text or "录" in text) and not "停" in text:
+        return ("STARTRECORDING", {"operation": "开始", "target": "录音"})
+    if has_recording and ("停" in text or "结束" in text or "完成" in text):
+        return ("STOPRECORDING", {"operation": "停止", "target": "录音"})
+    weather_patterns = [
+        r'(今天|明天|后天|周[一二三四五六日天]|星期[一二三四五六日天]|[\u4e00-\u9fa5]{2,6})(的)?天气(怎么样|如何|预报|情况)?',
+        r'天气(怎么样|如何|预报|情况)?',
+        r'(查询|查看|知道)(今天|明天|后天|周[一二三四五六日天]|星期[一二三四五六日天]|[\u4e00-\u9fa5]{2,6})?(的)?天气'
+    ]
+    for pattern in weather_patterns:
+        if re.search(pattern, text):
+            entities = {}
+            city_match = re.search(r'([\u4e00-\u9fa5]{2,6})(的天气|天气)', text)
+            if city_match:
+                potential_city = city_match.group(1)
+                if potential_city not in ["今天", "明天", "后天", "当前", "今日", "明日"]:
+                    entities["city"] = potential_city
+            date_patterns = {
+                "今天|今日|当前": "今天", "明天|明日": "明天", "后天": "后天", "大后天": "大后天",
+                "周一|星期一": "周一", "周二|星期二": "周二", "周三|星期三": "周三", "周四|星期四": "周四",
+                "周五|星期五": "周五", "周六|星期六": "周六", "周日|周天|星期日|星期天": "周日"
+            }
+            for date_pattern, date_value in date_patterns.items():
+                if re.search(date_pattern, text):
+                    entities["date"] = date_value
+                    break
+            return ("QUERY_WEATHER", entities)
+    return None
+
+
+def evaluate(recognize, corpus: List[Tuple[str, str]]) -> Dict[str, Dict[str, int]]:
+    """按标注统计每个意图的样本数、规则给出结果数、正确数"""
+    stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"total": 0, "resolved": 0, "correct": 0})
+    for text, label in corpus:
+        result = recognize(text)
+        row = stats[label]
+        row["total"] += 1
+        if result is not None:
+            row["resolved"] += 1
+            row["correct"] += result == label
+    return stats
+
+
+def main() -> None:
+    setup_env()
+    from app.common.config.intent_keywords import QUESTION_WORDS
+    from app.common.config.intent_rules import INTENT_RULES, RULE_VOCABULARIES
+    from app.domain.strategy.rule_engine import RuleEngine
+    from app.domain.strategy.rule_strategy import extract_place_name
+
+    started = time.perf_counter()
+    engine = RuleEngine(INTENT_RULES, RULE_VOCABULARIES, {"place": extract_place_name})
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    def legacy(text: str) -> Optional[str]:
+        result = legacy_recognize(text, LEGACY_RECORDING_KEYWORDS, QUESTION_WORDS, LEGACY_SENTIMENT_WORDS)
+        return result[0] if result else None
+
+    def current(text: str) -> Optional[str]:
+        match = engine.match(text)
+        return match.intent.value if match else None
+
+    old_stats, new_stats = evaluate(legacy, LABELLED_CORPUS), evaluate(current, LABELLED_CORPUS)
+    rows = []
+    for label in sorted(new_stats, key=lambda name: -new_stats[name]["total"]):
+        old, new = old_stats[label], new_stats[label]
+        rows.append({
+            "intent": label, "samples": new["total"],
+            "legacy resolved/correct": f"{old['resolved']}/{old['correct']}",
+            "engine resolved/correct": f"{new['resolved']}/{new['correct']}",
+        })
+    total = len(LABELLED_CORPUS)
+    print_table(f"labelled corpus, {total} utterances, {len(engine)} rules (compiled in {compile_ms:.1f} ms)", rows)
+    summary = []
+    for name, stats in (("legacy rules", old_stats), ("rule engine", new_stats)):
+        resolved = sum(row["resolved"] for row in stats.values())
+        correct = sum(row["correct"] for row in stats.values())
+        summary.append({"strategy": name, "coverage": f"{resolved / total:.1%}",
+                        "precision": f"{correct / max(resolved, 1):.1%}", "correct": correct})
+    print_table("overall", summary)
+    wrong = [(text, label, current(text)) for text, label in LABELLED_CORPUS
+             if current(text) not in (None, label)]
+    for text, label, got in wrong:
+        print(f"  mismatch: {text!r} labelled {label}, rules said {got}")
+
+    # 合成对话负载：每轮先走规则，规则放行的才需要缓存或大模型
+    turns = [text for session in generate_sessions(2000) for text, _ in session]
+    local = sum(current(text) is not None for text in turns)
+    legacy_local = sum(legacy(text) is not None for text in turns)
+    print(f"synthetic sessions: {len(turns)} turns, resolved by rules: legacy {legacy_local / len(turns):.1%}, "
+          f"engine {local / len(turns):.1%}")
+
+    latencies: Dict[str, List[float]] = {"resolved": [], "passed to LLM": []}
+    for text, _ in LABELLED_CORPUS:
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            match = engine.match(text)
+        elapsed = (time.perf_counter() - started) / ROUNDS
+        latencies["resolved" if match else "passed to LLM"].append(elapsed)
+    legacy_times = []
+    for text, _ in LABELLED_CORPUS:
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            legacy(text)
+        legacy_times.append((time.perf_counter() - started) / ROUNDS)
+    every = latencies["resolved"] + latencies["passed to LLM"]
+    print_table("RuleEngine.match latency per utterance (single thread)", [
+        {"utterances": name, "count": len(values), "p50_us": f"{percentile(values, 50) * 1e6:.1f}",
+         "p99_us": f"{percentile(values, 99) * 1e6:.1f}",
+         "calls_per_s_per_core": f"{len(values) / sum(values):,.0f}"}
+        for name, values in (("resolved", latencies["resolved"]), ("passed to LLM", latencies["passed to LLM"]),
+                             ("all", every), ("all, legacy rules", legacy_times))
+    ])
+
+
+if __name__ == "__main__":
+    main()
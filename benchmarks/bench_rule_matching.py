@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+上下文相关标记检测吞吐量基准
+
+单线程回放合成对话负载中的用户文本(另加若干录音、天气和较长的闲聊句子)，测量每核每秒能完成的
+上下文相关标记检测(build_context_key判断表达是否依赖上文)次数：
+- legacy: 逐个标记执行 marker in text
+- automaton: Aho-Corasick自动机context_matcher，命中第一个标记即返回
+并核对两种写法的检测结果一致。规则引擎的覆盖率和延迟见bench_rule_engine。
+
+用法: python -m benchmarks.bench_rule_matching [会话数]
+"""
+
+import sys
+import time
+from typing import Callable, List
+
+from benchmarks.common import setup_env, print_table
+from benchmarks.workloads import generate_sessions
+
+EXTRA_TEXTS = [
+    "开始第二段录音", "结束录音", "录音为什么停了", "不要录音", "record", "语音备忘录",
+    "大后天杭州的天气怎么样", "星期天北京天气预报", "查询一下明天深圳的天气情况", "当前天气",
+    "今天心情不太好你能陪我聊聊天吗", "帮我把客厅的空调调高两度然后打开加湿器",
+    "我想听一首周杰伦的歌", "这个东西到底是什么", "那个地方怎么样",
+]
+
+
+def throughput(function: Callable[[str], object], texts: List[str], rounds: int) -> float:
+    """返回每秒调用次数"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            function(text)
+    return rounds * len(texts) / (time.perf_counter() - started)
+
+
+def main(session_count: int) -> None:
+    setup_env()
+    from app.common.config.intent_keywords import CONTEXT_DEPENDENT_MARKERS, context_matcher
+
+    texts = [text for session in generate_sessions(session_count) for text, _ in session] + EXTRA_TEXTS
+
+    def legacy_markers(text: str) -> bool:
+        return any(marker in text for marker in CONTEXT_DEPENDENT_MARKERS)
+
+    def automaton_markers(text: str) -> bool:
+        return context_matcher.contains(text, "context_dependent")
+
+    mismatches = [text for text in set(texts) if legacy_markers(text) != automaton_markers(text)]
+    if mismatches:
+        raise SystemExit(f"检测结果不一致: {mismatches[:5]}")
+
+    rounds = max(1, 200000 // len(texts))
+    rows = []
+    for name, function in [
+        ("legacy marker in text", legacy_markers),
+        ("automaton contains", automaton_markers),
+    ]:
+        rate = throughput(function, texts, rounds)
+        rows.append({"method": name, "calls_per_s_per_core": f"{rate:,.0f}", "us_per_call": f"{1e6 / rate:.2f}"})
+    average_length = sum(len(text) for text in texts) / len(texts)
+    print_table(f"{len(texts)} utterances (avg {average_length:.1f} chars), {rounds} rounds, single thread", rows)
+    print(f"results identical on {len(set(texts))} distinct utterances")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
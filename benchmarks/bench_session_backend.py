@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享会话存储基准
+
+1. 跨worker接力：两个DialogueContextService实例(模拟两个uvicorn worker)共享同一个RESP替身服务，
+   worker A处理第一句并设置位置，worker B处理追问时应能读到历史和位置。
+2. 单次请求开销：通过IntentService.recognize_intent发送请求(规则策略识别，不调用大模型)，
+   统计每个请求访问会话存储的往返次数、命令数和延迟，并与仅进程内存储对比。
+替身服务每次往返加入模拟网络延迟。
+
+用法: python -m benchmarks.bench_session_backend [请求数] [往返毫秒]
+"""
+
+import asyncio
+import sys
+import time
+
+from benchmarks.common import setup_env, percentile, print_table
+from benchmarks.resp_stub import start_resp_stub
+
+
+async def check_handoff(url: str) -> bool:
+    from app.adapters.session.resp_client import RespClient
+    from app.adapters.session.redis_context_store import RedisDialogueContextStore
+    from app.service.dialogue_context_service import DialogueContextService
+
+    worker_a = DialogueContextService(store=RedisDialogueContextStore(RespClient(url)))
+    worker_b = DialogueContextService(store=RedisDialogueContextStore(RespClient(url)))
+
+    await worker_a.load("device-1")
+    worker_a.add_user_message("device-1", "北京明天天气怎么样")
+    worker_a.set_device_location("device-1", "北京市", "北京市")
+    worker_a.add_assistant_message("device-1", "北京明天晴，18到25度")
+    await worker_a.commit("device-1")
+
+    await worker_b.load("device-1")
+    worker_b.add_user_message("device-1", "那后天呢")
+    history = worker_b.get_history("device-1")
+    location = worker_b.get_device_location("device-1")
+    await worker_b.commit("device-1")
+
+    await worker_a.load("device-1")
+    final = worker_a.get_history("device-1")
+
+    ok = (
+        [m["content"] for m in history] == ["北京明天天气怎么样", "北京明天晴，18到25度", "那后天呢"]
+        and location.get("city") == "北京市"
+        and len(final) == 3
+    )
+    await worker_a.close()
+    await worker_b.close()
+    return ok
+
+
+async def main(requests: int, round_trip_ms: float) -> None:
+    stub, url = await start_resp_stub(latency=round_trip_ms / 1000)
+    setup_env(SESSION_STORE="redis", REDIS_URL=url)
+
+    from app.service.intent_service import IntentService
+    from app.service.dialogue_context_service import dialogue_context_service
+
+    handoff_ok = await check_handoff(url)
+    print(f"cross-worker handoff (history + location visible on worker B): {'OK' if handoff_ok else 'FAILED'}")
+
+    service = IntentService()
+    shared_store = dialogue_context_service.store
+    rows = []
+    for mode in ("memory", "redis"):
+        dialogue_context_service.store = shared_store if mode == "redis" else None
+        round_trips, commands = stub.round_trips, stub.commands
+        latencies = []
+        for index in range(requests):
+            started = time.perf_counter()
+            await service.recognize_intent(f"结束第{index}段录音", session_id=f"{mode}-device-{index % 50}")
+            latencies.append((time.perf_counter() - started) * 1000)
+        rows.append({
+            "store": mode,
+            "requests": requests,
+            "round_trips_per_req": f"{(stub.round_trips - round_trips) / requests:.2f}",
+            "commands_per_req": f"{(stub.commands - commands) / requests:.2f}",
+            "p50_ms": f"{percentile(latencies, 50):.2f}",
+            "p99_ms": f"{percentile(latencies, 99):.2f}",
+        })
+
+    dialogue_context_service.store = shared_store
+    await dialogue_context_service.close()
+    await service.close()
+    await stub.stop()
+    print_table(f"session store cost per request, {round_trip_ms}ms simulated round trip", rows)
+
+
+if __name__ == "__main__":
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    round_trip = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    asyncio.run(main(request_count, round_trip))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+会话内存占用基准
+
+用tracemalloc测量N个会话常驻内存时每个会话的字节数(含会话存储自身的索引结构)。对比：
+- legacy: 原DialogueContext(消息为带timestamp的字典、每个会话都创建元数据和位置字典)放在普通dict中
+- compact: 当前DialogueContext放在DialogueContextService中(含LRU顺序和过期堆)
+场景：只建立会话未对话、完成两轮对话(4条消息)、对话超过最大历史数(5条消息)。
+消息文本在开始测量前生成，结果只包含会话结构本身的开销。
+
+用法: python -m benchmarks.bench_session_memory [会话数]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from benchmarks.common import setup_env, print_table
+
+TURNS = {
+    "idle": 0,
+    "2_turns": 2,
+    "5_turns": 5,
+}
+
+
+class LegacyDialogueContext:
+    """原DialogueContext的数据结构"""
+
+    def __init__(self, session_id: str, max_history: int = 5, ttl: int = 1800):
+        self.session_id = session_id
+        self.max_history = max_history
+        self.ttl = ttl
+        self.history: List[Dict[str, Any]] = []
+        self.last_updated = time.time()
+        self.metadata: Dict[str, Any] = {
+            "location": {
+                "city": None,
+                "province": None,
+                "country": "中国",
+                "latitude": None,
+                "longitude": None,
+                "last_updated": None
+            }
+        }
+
+    def _add(self, role: str, text: str) -> None:
+        self.history.append({"role": role, "content": text, "timestamp": time.time()})
+        if len(self.history) > self.max_history:
+            self.history = self.history[-self.max_history:]
+        self.last_updated = time.time()
+
+    def add_user_message(self, text: str) -> None:
+        self._add("user", text)
+
+    def add_assistant_message(self, text: str) -> None:
+        self._add("assistant", text)
+
+
+def utterances(index: int, turn: int) -> tuple:
+    return f"设备{index}第{turn}句：明天天气怎么样", f"设备{index}第{turn}句回复：明天晴，18到25度"
+
+
+def measure(mode: str, sessions: int, turns: int) -> Dict[str, float]:
+    from app.service.dialogue_context_service import DialogueContextService
+
+    # 先生成文本并计入基线，两种实现只比较结构开销
+    texts = [[utterances(index, turn) for turn in range(turns)] for index in range(sessions)]
+    session_ids = [f"device-{index}" for index in range(sessions)]
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    if mode == "legacy":
+        store: Dict[str, LegacyDialogueContext] = {}
+        for session_id, session_texts in zip(session_ids, texts):
+            context = LegacyDialogueContext(session_id)
+            for user_text, reply in session_texts:
+                context.add_user_message(user_text)
+                context.add_assistant_message(reply)
+            store[session_id] = context
+    else:
+        store = DialogueContextService(max_contexts=sessions)
+        for session_id, session_texts in zip(session_ids, texts):
+            context = store.get_context(session_id)
+            for user_text, reply in session_texts:
+                context.add_user_message(user_text)
+                context.get_formatted_history()
+                context.add_assistant_message(reply)
+            context.discard_changes()
+            context.release_formatted_history()
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del store
+    return {"bytes_per_session": used / sessions}
+
+
+def main(sessions: int) -> None:
+    setup_env()
+    rows = []
+    for scenario, turns in TURNS.items():
+        result = {mode: measure(mode, sessions, turns)["bytes_per_session"] for mode in ("legacy", "compact")}
+        rows.append({
+            "scenario": scenario,
+            "messages": min(turns * 2, 5),
+            "legacy_bytes": f"{result['legacy']:.0f}",
+            "compact_bytes": f"{result['compact']:.0f}",
+            "saved": f"{1 - result['compact'] / result['legacy']:.0%}",
+        })
+    print_table(f"resident memory per session, {sessions} sessions (python {sys.version.split()[0]})", rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
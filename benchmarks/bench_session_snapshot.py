@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+会话快照与重启恢复基准
+
+创建N个会话(不同对话轮数，部分设置了设备位置，10%已过期)，测量：
+- 完整快照的写入耗时、文件大小、期间事件循环的最长停顿
+- 1%会话变更后的增量快照耗时
+- 新进程启动时的恢复耗时(读取、解析、重建会话和过期堆)，在子进程中测量，与真实重启一致
+- 恢复结果与原会话一致(历史、位置、更新时间、LRU顺序)，过期和已删除的会话被跳过
+
+用法: python -m benchmarks.bench_session_snapshot [会话数]
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BENCH_DIR, setup_env, print_table
+
+TTL = 1800
+
+
+RESTORE_SCRIPT = """
+import asyncio, json, sys, time
+from benchmarks.common import setup_env
+setup_env()
+from app.adapters.session.snapshot_file import SessionSnapshotFile
+from app.service.dialogue_context_service import DialogueContextService
+service = DialogueContextService(max_contexts=int(sys.argv[2]), ttl=int(sys.argv[3]), snapshot=SessionSnapshotFile(sys.argv[1]))
+started = time.perf_counter()
+restored = asyncio.run(service.restore_snapshot())
+print(json.dumps({"restored": restored, "seconds": time.perf_counter() - started}))
+"""
+
+
+def restore_in_subprocess(path: str, sessions: int) -> dict:
+    """在新进程中从快照恢复，返回恢复数量和耗时"""
+    output = subprocess.run(
+        [sys.executable, "-c", RESTORE_SCRIPT, path, str(sessions), str(TTL)],
+        check=True, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=os.getcwd())
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def measure_lag(stop: asyncio.Event) -> float:
+    """测量事件循环的最长停顿(秒)"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - started - 0.001)
+    return worst
+
+
+def populate(service, sessions: int) -> int:
+    """创建会话，返回其中已过期的会话数"""
+    now = time.time()
+    expired = 0
+    for index in range(sessions):
+        session_id = f"device-{index}"
+        context = service.get_context(session_id)
+        for turn in range(index % 4):
+            context.add_user_message(f"设备{index}第{turn}句：明天天气怎么样")
+            context.add_assistant_message(f"明天晴，18到25度，第{turn}次回复")
+        if index % 3 == 0:
+            context.set_location("杭州市", "浙江省", 30.27, 120.15)
+        context.discard_changes()
+        if index % 10 == 9:
+            context.last_updated = now - TTL - 60
+            expired += 1
+        else:
+            context.last_updated = now - (sessions - index) * 0.001
+    return expired
+
+
+async def run(sessions: int) -> None:
+    from app.adapters.session.snapshot_file import SessionSnapshotFile
+    from app.service.dialogue_context_service import DialogueContextService
+
+    path = os.path.join(BENCH_DIR, "bench_sessions.snap")
+    for suffix in ("", ".journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    source = DialogueContextService(max_contexts=sessions, ttl=TTL, snapshot=SessionSnapshotFile(path))
+    expired = populate(source, sessions)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    started = time.perf_counter()
+    await source.save_snapshot(full=True)
+    full_seconds = time.perf_counter() - started
+    stop.set()
+    full_lag = await lag_task
+    full_size = os.path.getsize(path)
+
+    # 1%的会话发生变更或被删除
+    for index in range(0, sessions, 100):
+        session_id = f"device-{index}"
+        if index % 200 == 0:
+            source.delete_context(session_id)
+        else:
+            source.add_user_message(session_id, "播放音乐")
+    dirty = len(source._dirty)
+    started = time.perf_counter()
+    await source.save_snapshot()
+    incremental_seconds = time.perf_counter() - started
+    journal_size = os.path.getsize(path + ".journal")
+
+    # 模拟重启：新进程从同一文件恢复并计时；再在本进程恢复一份用于逐个校验
+    runs = [restore_in_subprocess(path, sessions) for _ in range(3)]
+    restore_seconds = sorted(run["seconds"] for run in runs)[1]
+    restored_service = DialogueContextService(max_contexts=sessions, ttl=TTL, snapshot=SessionSnapshotFile(path))
+    restored = await restored_service.restore_snapshot()
+    assert all(run["restored"] == restored for run in runs)
+
+    expected = {
+        session_id: context for session_id, context in source.contexts.items() if not context.is_expired()
+    }
+    assert restored == len(expected), (restored, len(expected))
+    for session_id, context in expected.items():
+        copy = restored_service.contexts[session_id]
+        assert copy.history == context.history, session_id
+        assert copy.get_location() == context.get_location(), session_id
+        assert copy.last_updated == context.last_updated, session_id
+    assert list(restored_service.contexts) == list(expected)
+
+    print_table(f"session snapshot, {sessions} sessions ({expired} expired)", [
+        {"step": "full snapshot", "sessions": len(expected), "ms": f"{full_seconds * 1000:.0f}",
+         "max_loop_stall_ms": f"{full_lag * 1000:.1f}", "bytes": full_size},
+        {"step": "incremental (1% changed)", "sessions": dirty, "ms": f"{incremental_seconds * 1000:.1f}",
+         "max_loop_stall_ms": "-", "bytes": journal_size},
+        {"step": "restore on startup (median of 3)", "sessions": restored, "ms": f"{restore_seconds * 1000:.0f}",
+         "max_loop_stall_ms": "-", "bytes": full_size + journal_size},
+    ])
+    print(f"restore verified: {restored} sessions identical, {expired} expired sessions skipped")
+
+
+def main(sessions: int) -> None:
+    setup_env()
+    asyncio.run(run(sessions))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+会话存储单次请求开销基准
+
+预先创建N个活跃会话，然后模拟请求：每个请求按IntentService的访问模式调用4次get_context
+(add_user_message、get_history、add_assistant_message、获取设备位置)。对比：
+- legacy: 原实现，每次get_context全量扫描过期会话，超出容量时用min()找最旧会话
+- lru_heap: DialogueContextService，OrderedDict + 过期时间最小堆
+另外测量N个会话同时到期时后台清理的耗时。
+
+用法: python -m benchmarks.bench_session_store [规模1,规模2,...]
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.common import setup_env, percentile, print_table
+
+# 每个规模下模拟的请求数
+REQUESTS = 2000
+
+# legacy在大规模下过慢，只模拟这么多请求
+LEGACY_MAX_WORK = 20_000_000
+
+
+def make_legacy_service(max_contexts: int):
+    from app.service.dialogue_context_service import DialogueContext
+
+    class LegacyDialogueContextService:
+        """原实现的get_context逻辑"""
+
+        def __init__(self):
+            self.contexts: Dict[str, DialogueContext] = {}
+
+        def get_context(self, session_id: str) -> DialogueContext:
+            expired = [sid for sid, context in self.contexts.items() if context.is_expired()]
+            for sid in expired:
+                del self.contexts[sid]
+            if session_id not in self.contexts:
+                self.contexts[session_id] = DialogueContext(session_id)
+                if len(self.contexts) > max_contexts:
+                    oldest = min(self.contexts.keys(), key=lambda sid: self.contexts[sid].last_updated)
+                    del self.contexts[oldest]
+            return self.contexts[session_id]
+
+    return LegacyDialogueContextService()
+
+
+def populate(service, sessions: int) -> None:
+    from app.service.dialogue_context_service import DialogueContext
+
+    for index in range(sessions):
+        session_id = f"device-{index}"
+        if hasattr(service, "sweep_expired"):
+            service.get_context(session_id).add_user_message("你好")
+        else:
+            # 原实现逐个get_context建立会话本身是O(n²)，直接写入字典
+            service.contexts[session_id] = DialogueContext(session_id)
+            service.contexts[session_id].add_user_message("你好")
+
+
+def simulate(service, sessions: int, requests: int) -> List[float]:
+    rng = random.Random(3)
+    latencies = []
+    for _ in range(requests):
+        session_id = f"device-{rng.randrange(sessions * 2)}"  # 一半请求落在新会话上
+        started = time.perf_counter()
+        service.get_context(session_id).add_user_message("明天天气怎么样")
+        service.get_context(session_id).get_formatted_history()
+        service.get_context(session_id).add_assistant_message("明天晴，气温18到25度")
+        service.get_context(session_id).get_location()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main(sizes: List[int]) -> None:
+    setup_env()
+    from app.service.dialogue_context_service import DialogueContextService
+
+    rows = []
+    for size in sizes:
+        for mode in ("legacy", "lru_heap"):
+            if mode == "legacy":
+                service = make_legacy_service(size)
+                requests = min(REQUESTS, max(20, LEGACY_MAX_WORK // (size * 4)))
+            else:
+                service = DialogueContextService(max_contexts=size)
+                requests = REQUESTS
+            populate(service, size)
+
+            latencies = simulate(service, size, requests)
+            rows.append({
+                "sessions": size,
+                "mode": mode,
+                "requests": requests,
+                "p50_us": f"{percentile(latencies, 50) * 1000:.1f}",
+                "p99_us": f"{percentile(latencies, 99) * 1000:.1f}",
+            })
+
+        # 全部会话同时到期时的清理耗时
+        service = DialogueContextService(max_contexts=size)
+        for index in range(size):
+            service.get_context(f"device-{index}")
+        started = time.perf_counter()
+        removed = service.sweep_expired(now=time.time() + service.ttl + 1)
+        rows[-1]["sweep_all_ms"] = f"{(time.perf_counter() - started) * 1000:.1f} ({removed})"
+        rows[-2]["sweep_all_ms"] = "-"
+
+    print_table("per-request session store cost (4 get_context calls)", rows)
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "1000,10000,100000"
+    main([int(value) for value in arg.split(",")])
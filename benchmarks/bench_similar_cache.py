@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图近似查找(MinHash/LSH)基准
+
+生成随机的历史说法(默认100万条，4-12个常用汉字)，按服务加载时的方式分批写入索引，测量：
+- 建索引耗时和进程内存增量(常驻内存峰值的差，含索引保存的文本)
+- 近似重复的查询(在历史说法上加语气词、删一个字、换一个字、加一个字)能否找回原说法，
+  找回时的相似度和达到INTENT_SIMILAR_THRESHOLD的比例
+- 与历史说法无关的查询误判达到阈值的比例
+- 单次查询和增量加入的耗时
+- 经CacheBasedStrategy查找时，加了否定、疑问的说法不沿用原说法的意图，只差语气词的仍然沿用
+
+用法: python -m benchmarks.bench_similar_cache [历史说法条数]
+"""
+
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import setup_env, print_table, percentile, BENCH_DIR
+
+# 查询的条数
+QUERIES = 2000
+
+# 历史说法 -> 意图类型，用于检查相似说法的沿用
+LABELLED = {
+    "帮我打开客厅和卧室的空调": "CONTROL_DEVICE_ON",
+    "把客厅空调温度调到二十六度": "CONTROL_DEVICE_ON",
+    "提醒我明天早上八点去机场接人": "SET_REMINDER",
+}
+
+# (查询, 应沿用的意图类型)，None表示不应沿用：否定、疑问与历史说法意思相反，不能执行原指令
+SIMILAR_CASES = [
+    ("打开客厅和卧室空调", "CONTROL_DEVICE_ON"),
+    ("请打开客厅和卧室的空调吧", "CONTROL_DEVICE_ON"),
+    ("别打开客厅和卧室的空调", None),
+    ("不要打开客厅和卧室的空调", None),
+    ("没打开客厅和卧室的空调", None),
+    ("打开客厅和卧室的空调吗", None),
+    ("打开客厅和卧室的空调？", None),
+    ("别把客厅空调温度调到二十六度", None),
+    ("把客厅空调温度调到二十六度了吗", None),
+    ("不用提醒我明天早上八点去机场接人", None),
+    ("别提醒我明天早上八点去机场接人", None),
+]
+
+# 常用汉字区间，随机说法之间几乎不重复
+CHARS = [chr(code) for code in range(0x4e00, 0x4e00 + 3000)]
+
+
+def random_text(rng: random.Random) -> str:
+    """生成一条随机说法"""
+    return "".join(rng.choice(CHARS) for _ in range(rng.randint(4, 12)))
+
+
+def mutations(rng: random.Random) -> Dict[str, Callable[[str], str]]:
+    """近似重复的改写方式"""
+    def position(text: str) -> int:
+        return rng.randrange(len(text))
+
+    def delete(text: str) -> str:
+        i = position(text)
+        return text[:i] + text[i + 1:]
+
+    def replace(text: str) -> str:
+        i = position(text)
+        return text[:i] + rng.choice(CHARS) + text[i + 1:]
+
+    def insert(text: str) -> str:
+        i = position(text)
+        return text[:i] + rng.choice(CHARS) + text[i:]
+
+    return {
+        "filler": lambda text: "帮我" + text + "一下吧",
+        "delete_one": delete,
+        "replace_one": replace,
+        "insert_one": insert,
+    }
+
+
+def max_rss_mb() -> float:
+    """进程常驻内存峰值(MB)，Linux下ru_maxrss单位为KB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def check_similar_reuse() -> None:
+    """用真实的SimilarIntentRepository和CacheBasedStrategy回放SIMILAR_CASES，结果与预期不一致时退出"""
+    from app.adapters.repository.similar_repository import SimilarIntentRepository
+    from app.adapters.repository.sqlite_repository import SQLiteIntentRepository
+    from app.domain.entity.intent import Intent, IntentType
+    from app.domain.strategy.cache_strategy import CacheBasedStrategy
+
+    repository = SimilarIntentRepository(SQLiteIntentRepository())
+    strategy = CacheBasedStrategy(repository)
+    for text, label in LABELLED.items():
+        await repository.save(Intent(type=IntentType[label], confidence=0.95, text=text))
+
+    rows = []
+    for query, expected in SIMILAR_CASES:
+        match = await repository.find_similar(query)
+        intent = await strategy.recognize(query, None, [])
+        reused: Optional[str] = intent.type.name if intent is not None else None
+        rows.append({
+            "query": query, "nearest": match.text if match else "-",
+            "similarity": f"{match.similarity:.3f}" if match else "-",
+            "reused": reused or "-", "ok": reused == expected,
+        })
+    await repository.close()
+
+    print_table("similar reuse: negation and question", rows)
+    failed = [row["query"] for row in rows if not row["ok"]]
+    if failed:
+        raise SystemExit(f"相似说法的沿用与预期不一致: {failed}")
+
+
+def main(size: int) -> None:
+    # 每次运行使用新的数据库，上次运行保存的意图不会影响沿用检查
+    run_dir = tempfile.mkdtemp(prefix="similar_cache_", dir=BENCH_DIR)
+    setup_env(DATABASE_URL=f"sqlite:///{os.path.join(run_dir, 'bench.db')}")
+    asyncio.run(check_similar_reuse())
+
+    from app.adapters.repository.similar_repository import LOAD_BATCH_SIZE
+    from app.common.config.intent_keywords import FILLER_WORDS
+    from app.common.utils.minhash import MinHashIndex
+    from app.config import settings
+
+    threshold = settings.INTENT_SIMILAR_THRESHOLD
+    rng = random.Random(25)
+    texts = list(dict.fromkeys(random_text(rng) for _ in range(size)))
+    rows = [(text, "LABEL") for text in texts]
+
+    rss_before = max_rss_mb()
+    index = MinHashIndex(len(rows), ignore=FILLER_WORDS)
+    started = time.perf_counter()
+    for start in range(0, len(rows), LOAD_BATCH_SIZE):
+        index.add_many(rows[start:start + LOAD_BATCH_SIZE])
+    build_seconds = time.perf_counter() - started
+    print_table(f"build: {len(index)} utterances", [{
+        "build_s": f"{build_seconds:.1f}",
+        "us_per_utterance": f"{build_seconds / len(rows) * 1e6:.1f}",
+        "rss_delta_mb": f"{max_rss_mb() - rss_before:.0f}",
+        "bucket_tables_mb": f"{(index._buckets.nbytes + index._tags.nbytes + index._cursors.nbytes) / 2 ** 20:.0f}",
+    }])
+
+    rows = []
+    for name, mutate in mutations(rng).items():
+        originals = rng.sample(texts, QUERIES)
+        timings, similarities, found = [], [], 0
+        for original in originals:
+            query = mutate(original)
+            started = time.perf_counter()
+            match = index.query(query)
+            timings.append((time.perf_counter() - started) * 1e6)
+            if match is not None and match.text == original:
+                found += 1
+                similarities.append(match.similarity)
+        rows.append({
+            "query": name, "found": f"{found / QUERIES:.1%}",
+            "similarity_p50": f"{percentile(similarities, 50):.2f}",
+            f">={threshold}": f"{sum(1 for s in similarities if s >= threshold) / QUERIES:.1%}",
+            "p50_us": f"{percentile(timings, 50):.1f}", "p99_us": f"{percentile(timings, 99):.1f}",
+        })
+
+    timings, false_hits = [], 0
+    for _ in range(QUERIES):
+        query = random_text(rng)
+        started = time.perf_counter()
+        match = index.query(query)
+        timings.append((time.perf_counter() - started) * 1e6)
+        false_hits += match is not None and match.similarity >= threshold
+    rows.append({
+        "query": "unrelated", "found": "-", "similarity_p50": "-",
+        f">={threshold}": f"{false_hits / QUERIES:.1%}",
+        "p50_us": f"{percentile(timings, 50):.1f}", "p99_us": f"{percentile(timings, 99):.1f}",
+    })
+    print_table(f"lookup: {QUERIES} queries each", rows)
+
+    timings = []
+    for _ in range(QUERIES):
+        text = random_text(rng)
+        started = time.perf_counter()
+        index.add(text, "LABEL")
+        timings.append((time.perf_counter() - started) * 1e6)
+    print_table("incremental add (on save)", [{
+        "adds": QUERIES, "p50_us": f"{percentile(timings, 50):.1f}", "p99_us": f"{percentile(timings, 99):.1f}",
+    }])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+天气响应缓存基准
+
+用模拟时钟回放24小时的天气查询：300个城市按Zipf分布访问(少数大城市占大多数请求)，
+70%查实时天气、30%查预报。上游替身每整点发布实时天气、每3小时发布预报，reporttime为发布时刻。
+对比：
+- no cache: 原实现，每次请求都访问高德
+- fixed TTL 10min: 固定10分钟过期，不看发布时间
+- report-aligned: WeatherCache，按reporttime对齐过期，过期后先返回旧数据并后台刷新
+统计上游调用次数、需要同步等待上游的请求比例，以及返回的数据落后于最新发布的比例。
+
+用法: python -m benchmarks.bench_weather_cache [每秒请求数]
+"""
+
+import asyncio
+import random
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import setup_env, print_table
+
+CITIES = 300
+ZIPF_EXPONENT = 1.1
+LIVE_SHARE = 0.7
+DURATION = 24 * 3600
+START = datetime(2026, 10, 18, 0, 20).timestamp()
+
+
+class Clock:
+    """模拟时钟"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def published_at(now: float, interval: int) -> float:
+    """当前最新一次发布的时刻(按本地整点对齐)"""
+    local = datetime.fromtimestamp(now)
+    midnight = datetime(local.year, local.month, local.day).timestamp()
+    return midnight + (now - midnight) // interval * interval
+
+
+def make_response(adcode: str, extensions: str, report_time: float) -> Dict[str, Any]:
+    """构造高德天气接口响应"""
+    text = datetime.fromtimestamp(report_time).strftime("%Y-%m-%d %H:%M:%S")
+    if extensions == "base":
+        return {"status": "1", "lives": [{"adcode": adcode, "weather": "晴", "reporttime": text}]}
+    return {"status": "1", "forecasts": [{"adcode": adcode, "reporttime": text, "casts": []}]}
+
+
+async def replay(cache: Optional[Any], rate: float, seed: int = 11) -> Dict[str, Any]:
+    """按固定速率回放查询，返回统计"""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** ZIPF_EXPONENT) for rank in range(1, CITIES + 1)]
+    cities = [str(110000 + rank) for rank in range(CITIES)]
+    clock = Clock(START)
+    if cache is not None:
+        cache._clock = clock
+    upstream_calls = 0
+    waited = 0
+    outdated = 0
+
+    async def loader(adcode: str, extensions: str) -> Dict[str, Any]:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0)
+        interval = 3600 if extensions == "base" else 3 * 3600
+        return make_response(adcode, extensions, published_at(clock.now, interval))
+
+    requests = int(DURATION * rate)
+    for index in range(requests):
+        clock.now = START + index / rate
+        adcode = rng.choices(cities, weights)[0]
+        extensions = "base" if rng.random() < LIVE_SHARE else "all"
+        calls_before = upstream_calls
+        if cache is None:
+            data = await loader(adcode, extensions)
+        else:
+            data = await cache.get((adcode, extensions), lambda: loader(adcode, extensions))
+        # 本次请求触发了前台加载(后台刷新的调用发生在返回之后)
+        if upstream_calls > calls_before:
+            waited += 1
+        items = data.get("lives") or data.get("forecasts")
+        report_time = datetime.strptime(items[0]["reporttime"], "%Y-%m-%d %H:%M:%S").timestamp()
+        interval = 3600 if extensions == "base" else 3 * 3600
+        if report_time < published_at(clock.now, interval):
+            outdated += 1
+        # 让后台刷新任务执行完
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    return {
+        "requests": requests,
+        "upstream_calls": upstream_calls,
+        "calls_saved": f"{1 - upstream_calls / requests:.1%}",
+        "waited_on_upstream": f"{waited / requests:.2%}",
+        "served_outdated": f"{outdated / requests:.2%}",
+    }
+
+
+async def run(rate: float) -> None:
+    from app.adapters.api.weather_cache import WeatherCache
+
+    rows: List[Dict[str, Any]] = []
+    variants = [
+        ("no cache", None),
+        ("fixed TTL 10min", WeatherCache(live_interval=0, forecast_interval=0, min_ttl=600, stale_ttl=0)),
+        ("report-aligned + stale-while-revalidate", WeatherCache()),
+    ]
+    for name, cache in variants:
+        rows.append({"cache": name, **await replay(cache, rate)})
+        if cache is not None:
+            print(f"{name}: {cache.stats()}")
+    print_table(f"24h of weather lookups at {rate:g} req/s, {CITIES} Zipf-distributed cities", rows)
+
+
+def main(rate: float) -> None:
+    setup_env()
+    asyncio.run(run(rate))
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
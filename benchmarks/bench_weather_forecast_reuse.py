@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多日预报复用基准
+
+把workloads生成的多轮会话中的天气查询(今天、明天、后天及"那明天呢"之类的追问)
+在模拟的一天(07:00-23:00)内回放给WeatherAPI，每个会话按Zipf分布分配到300个城市之一。
+上游替身每整点发布实时天气、每3小时发布4天预报。对比：
+- no cache: 原实现，每次查询都访问高德
+- per-kind cache: 按(城市, 实时/预报)缓存，今天总是查实时天气
+- forecast reuse: 今天的查询在实时天气未缓存而同城预报已缓存时，直接取预报中的当天
+统计上游调用次数(实时/预报)。
+
+用法: python -m benchmarks.bench_weather_forecast_reuse [会话数]
+"""
+
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import setup_env, print_table
+from benchmarks.workloads import generate_sessions
+
+CITIES = 300
+ZIPF_EXPONENT = 1.1
+DAY_START_HOUR = 7
+DAY_HOURS = 16
+
+# 天气相关的话语 -> 日期描述
+WEATHER_DATES = {
+    "北京天气怎么样": "今天",
+    "明天上海天气": "明天",
+    "那明天呢": "明天",
+    "后天呢": "后天",
+}
+
+
+class StubClient:
+    """高德接口替身，按模拟时钟生成响应并统计调用"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = {"base": 0, "all": 0}
+
+    async def get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        extensions = params["extensions"]
+        self.calls[extensions] += 1
+        await asyncio.sleep(0)
+        now = datetime.fromtimestamp(self.clock())
+        if extensions == "base":
+            report = now.replace(minute=0, second=0, microsecond=0)
+            return {"status": "1", "lives": [{
+                "city": params["city"], "weather": "晴", "temperature": "21", "winddirection": "东",
+                "windpower": "≤3", "humidity": "50", "reporttime": report.strftime("%Y-%m-%d %H:%M:%S")
+            }]}
+        report = now.replace(hour=now.hour // 3 * 3, minute=0, second=0, microsecond=0)
+        today = datetime.now().date()
+        return {"status": "1", "forecasts": [{
+            "city": params["city"], "reporttime": report.strftime("%Y-%m-%d %H:%M:%S"),
+            "casts": [{
+                "date": (today + timedelta(days=offset)).strftime("%Y-%m-%d"), "dayweather": "晴",
+                "daytemp": "25", "nighttemp": "15", "daywind": "东", "daypower": "≤3"
+            } for offset in range(4)]
+        }]}
+
+
+def build_queries(sessions: int, seed: int = 5) -> List[Tuple[float, str, str]]:
+    """从多轮会话中提取天气查询，返回(距开始的秒数, 城市, 日期描述)，按时间排序"""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** ZIPF_EXPONENT) for rank in range(1, CITIES + 1)]
+    cities = [f"测试{chr(0x4e00 + rank)}市" for rank in range(CITIES)]
+    queries = []
+    for turns in generate_sessions(sessions):
+        city = rng.choices(cities, weights)[0]
+        started = rng.uniform(0, DAY_HOURS * 3600 - 600)
+        for index, (text, _) in enumerate(turns):
+            if text in WEATHER_DATES:
+                queries.append((started + index * 20, city, WEATHER_DATES[text]))
+    queries.sort()
+    return queries
+
+
+async def replay(queries: List[Tuple[float, str, str]], cached: bool, reuse: bool) -> Dict[str, Any]:
+    """回放查询，返回上游调用统计"""
+    from app.adapters.api.weather_api import WeatherAPI
+    from app.adapters.api.weather_cache import WeatherCache
+
+    today = datetime.now().date()
+    day_start = datetime(today.year, today.month, today.day, DAY_START_HOUR).timestamp()
+    now = [day_start]
+    clock = lambda: now[0]
+    client = StubClient(clock)
+    cache = WeatherCache(maxsize=512 if cached else 0, clock=clock)
+    api = WeatherAPI(client=client, cache=cache)
+    api.city_code_cache = {f"测试{chr(0x4e00 + rank)}市": str(110000 + rank) for rank in range(CITIES)}
+
+    from_forecast = 0
+    for offset, city, date in queries:
+        now[0] = day_start + offset
+        # 原实现今天总是查实时天气，用"现在"让今天的查询走实时天气
+        result = await api.get_weather(city, date if reuse or date != "今天" else "现在")
+        assert result["success"], result
+        if date == "今天" and result["data"]["is_forecast"]:
+            from_forecast += 1
+        await asyncio.sleep(0)
+
+    calls = client.calls["base"] + client.calls["all"]
+    return {
+        "queries": len(queries),
+        "upstream_calls": calls,
+        "live_calls": client.calls["base"],
+        "forecast_calls": client.calls["all"],
+        "calls_per_query": f"{calls / len(queries):.3f}",
+        "today_from_forecast": from_forecast,
+    }
+
+
+async def run(sessions: int) -> None:
+    queries = build_queries(sessions)
+    today = sum(1 for _, _, date in queries if date == "今天")
+    rows = []
+    for name, cached, reuse in (("no cache", False, False), ("per-kind cache", True, False),
+                                ("forecast reuse", True, True)):
+        rows.append({"strategy": name, **await replay(queries, cached, reuse)})
+    print_table(f"{len(queries)} weather queries ({today} for today) from {sessions} sessions, "
+                f"{CITIES} Zipf-distributed cities over {DAY_HOURS}h", rows)
+
+
+def main(sessions: int) -> None:
+    setup_env(AMAP_API_KEY="bench-key", LOG_LEVEL="ERROR")
+    asyncio.run(run(sessions))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
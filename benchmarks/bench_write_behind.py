@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+意图记录异步批量写入基准
+
+并发客户端调用IntentService.recognize_intent，语句都由规则策略识别(不调用大模型)且互不相同，
+每个请求都会保存一条意图记录。对比：
+- inline: 请求路径上直接写数据库(原实现)
+- write_behind: WriteBehindIntentRepository攒批后用多行upsert写入
+每条语句执行前sleep一段时间模拟访问PostgreSQL的网络往返。
+rows/s为每秒落库的记录数，按全部记录落库(write_behind包括最后一次flush)所用时间计算；
+语句互不相同，每个请求写入一行，落库行数与请求数不一致时报错。
+
+用法: python -m benchmarks.bench_write_behind [并发数] [每客户端请求数] [往返毫秒]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+from benchmarks.common import setup_env, percentile, print_table, BENCH_DIR
+
+
+async def run_mode(mode: str, clients: int, requests_per_client: int, round_trip_ms: float) -> dict:
+    db_path = os.path.join(BENCH_DIR, f"write_behind_{mode}.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from sqlalchemy import event, func, select
+    from app.config import settings
+    from app.adapters.repository.sqlite_repository import SQLiteIntentRepository, IntentRecord
+    from app.adapters.repository.write_behind_repository import WriteBehindIntentRepository
+    from app.service.intent_service import IntentService
+
+    settings.DATABASE_URL = os.environ["DATABASE_URL"]
+    database = SQLiteIntentRepository()
+
+    @event.listens_for(database.engine, "before_cursor_execute")
+    def simulate_round_trip(*args):
+        time.sleep(round_trip_ms / 1000)
+
+    repository = database
+    if mode == "write_behind":
+        repository = WriteBehindIntentRepository(
+            database,
+            batch_size=settings.INTENT_WRITE_BATCH_SIZE,
+            flush_interval=settings.INTENT_WRITE_FLUSH_INTERVAL_MS / 1000,
+            max_pending=settings.INTENT_WRITE_QUEUE_SIZE
+        )
+    service = IntentService(intent_repository=repository)
+
+    latencies: List[float] = []
+
+    async def client(index: int) -> None:
+        for number in range(requests_per_client):
+            started = time.perf_counter()
+            # 编号放在句尾，规则"结束...录音"照常命中，不会落到大模型
+            await service.recognize_intent(f"结束录音{index}-{number}", session_id=f"bench-{index}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    if mode == "write_behind":
+        await repository.flush()
+    elapsed = time.perf_counter() - started
+
+    with database.engine.connect() as conn:
+        persisted = conn.execute(select(func.count()).select_from(IntentRecord)).scalar()
+    await service.close()
+    if persisted != len(latencies):
+        raise SystemExit(f"{mode}: {len(latencies)}个请求只落库{persisted}行，请检查语句是否都由规则识别")
+
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "rows": persisted,
+        "rows_per_s": f"{persisted / elapsed:.0f}",
+        "p50_ms": f"{percentile(latencies, 50):.1f}",
+        "p99_ms": f"{percentile(latencies, 99):.1f}",
+    }
+
+
+async def main(clients: int, requests_per_client: int, round_trip_ms: float) -> None:
+    setup_env(INTENT_CACHE_MAX_SIZE="0")
+    rows = [
+        await run_mode(mode, clients, requests_per_client, round_trip_ms)
+        for mode in ("inline", "write_behind")
+    ]
+    print_table(
+        f"intent persistence, {clients} clients x {requests_per_client} requests, "
+        f"{round_trip_ms}ms simulated DB round trip", rows
+    )
+
+
+if __name__ == "__main__":
+    client_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    round_trip = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    asyncio.run(main(client_count, per_client, round_trip))
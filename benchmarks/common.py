@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基准测试公共工具
+
+在项目根目录以 python -m benchmarks.<脚本名> 运行。基准脚本在导入app之前调用setup_env，把日志、数据库等指向临时目录，
+避免污染项目目录；外部依赖(千问、高德)用本地aiohttp替身服务代替。
+"""
+
+import os
+import ssl
+import subprocess
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+BENCH_DIR = os.path.join(tempfile.gettempdir(), "voice_service_bench")
+
+
+def setup_env(**overrides: str) -> None:
+    """设置基准测试环境变量，必须在导入app之前调用
+    
+    Args:
+        **overrides: 需要覆盖的环境变量
+    """
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    defaults = {
+        "LOG_DIR": os.path.join(BENCH_DIR, "logs"),
+        "LOG_LEVEL": "WARNING",
+        "DATABASE_URL": f"sqlite:///{os.path.join(BENCH_DIR, 'bench.db')}",
+        "DASHSCOPE_API_KEY": "bench-key",
+        "SESSION_SNAPSHOT_PATH": os.path.join(BENCH_DIR, "dialogue_sessions.snap"),
+    }
+    defaults.update(overrides)
+    for key, value in defaults.items():
+        os.environ[key] = value
+
+
+def percentile(values: List[float], p: float) -> float:
+    """计算百分位数(最近秩法)
+    
+    Args:
+        values (List[float]): 样本
+        p (float): 百分位，0-100
+        
+    Returns:
+        float: 百分位数值
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def self_signed_ssl_context() -> ssl.SSLContext:
+    """生成自签名证书(需要openssl命令)并返回服务端SSL上下文，用于HTTPS替身服务
+    
+    Returns:
+        ssl.SSLContext: 服务端SSL上下文
+    """
+    cert = os.path.join(BENCH_DIR, "stub_cert.pem")
+    key = os.path.join(BENCH_DIR, "stub_key.pem")
+    if not (os.path.exists(cert) and os.path.exists(key)):
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "30",
+             "-subj", "/CN=127.0.0.1", "-keyout", key, "-out", cert],
+            check=True, capture_output=True
+        )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+async def start_stub_server(
+    routes: Dict[Tuple[str, str], Callable[[web.Request], Awaitable[web.StreamResponse]]],
+    ssl_context: Optional[ssl.SSLContext] = None
+) -> Tuple[web.AppRunner, str]:
+    """启动本地替身HTTP服务
+    
+    Args:
+        routes: {(method, path): handler}
+        ssl_context: 提供时以HTTPS提供服务
+        
+    Returns:
+        Tuple[web.AppRunner, str]: 服务runner和基础地址
+    """
+    stub_app = web.Application()
+    for (method, path), handler in routes.items():
+        stub_app.router.add_route(method, path, handler)
+    runner = web.AppRunner(stub_app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=ssl_context)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"{'https' if ssl_context else 'http'}://127.0.0.1:{port}"
+
+
+def print_table(title: str, rows: List[Dict[str, Any]]) -> None:
+    """以对齐表格打印结果
+    
+    Args:
+        title (str): 标题
+        rows (List[Dict[str, Any]]): 行数据
+    """
+    print(f"\n== {title} ==")
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    widths = [max(len(str(h)), *(len(str(r[h])) for r in rows)) for h in headers]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(row[h]).ljust(w) for h, w in zip(headers, widths)))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程内的Redis协议替身服务
+
+实现会话存储用到的命令(PING、GET、SET [EX]、DEL、RPUSH、LRANGE、LTRIM、EXPIRE)，支持过期时间，
+可以设置每次往返的模拟网络延迟。用于在没有Redis的环境中验证和测量RedisDialogueContextStore。
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode("utf-8")
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode("utf-8")
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(item) for item in value)
+    raise TypeError(type(value))
+
+
+class RespStubServer:
+    """单进程内存实现的RESP服务"""
+
+    def __init__(self, latency: float = 0.0):
+        """初始化
+
+        Args:
+            latency (float, optional): 每批请求回复前的模拟网络延迟(秒). 默认为0.
+        """
+        self.latency = latency
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.round_trips = 0
+        self.commands = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> str:
+        """启动服务
+
+        Returns:
+            str: 连接地址
+        """
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def stop(self) -> None:
+        """停止服务"""
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                commands = [await self._read_command(reader)]
+                # 同一批到达的命令(流水线)视为一次往返；StreamReader没有公开接口判断缓冲区是否还有数据
+                while reader._buffer:
+                    commands.append(await self._read_command(reader))
+                self.round_trips += 1
+                self.commands += len(commands)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(b"".join(_encode_reply(self._execute(command)) for command in commands))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> List[bytes]:
+        header = await reader.readexactly(1)
+        count = int((await reader.readline())[:-2])
+        assert header == b"*"
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _alive(self, key: bytes) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _execute(self, args: List[bytes]) -> Any:
+        name, args = args[0].upper().decode(), args[1:]
+        if name == "PING":
+            return "PONG"
+        if name in ("AUTH", "SELECT"):
+            return "OK"
+        if name == "GET":
+            return self.data.get(args[0]) if self._alive(args[0]) else None
+        if name == "SET":
+            self.data[args[0]] = args[1]
+            self.expires.pop(args[0], None)
+            if len(args) >= 4 and args[2].upper() == b"EX":
+                self.expires[args[0]] = time.time() + int(args[3])
+            return "OK"
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                if self._alive(key):
+                    del self.data[key]
+                    self.expires.pop(key, None)
+                    removed += 1
+            return removed
+        if name == "RPUSH":
+            if not self._alive(args[0]):
+                self.data[args[0]] = []
+            self.data[args[0]].extend(args[1:])
+            return len(self.data[args[0]])
+        if name in ("LRANGE", "LTRIM"):
+            values = self.data.get(args[0], []) if self._alive(args[0]) else []
+            start, stop = int(args[1]), int(args[2])
+            length = len(values)
+            start = max(0, start + length if start < 0 else start)
+            stop = stop + length if stop < 0 else min(stop, length - 1)
+            selected = values[start:stop + 1]
+            if name == "LRANGE":
+                return selected
+            self.data[args[0]] = selected
+            return "OK"
+        if name == "EXPIRE":
+            if not self._alive(args[0]):
+                return 0
+            self.expires[args[0]] = time.time() + int(args[1])
+            return 1
+        return Exception(f"unknown command '{name}'")
+
+
+async def start_resp_stub(latency: float = 0.0) -> Tuple[RespStubServer, str]:
+    """启动替身服务
+
+    Args:
+        latency (float, optional): 每次往返的模拟网络延迟(秒). 默认为0.
+
+    Returns:
+        Tuple[RespStubServer, str]: 服务实例和连接地址
+    """
+    server = RespStubServer(latency)
+    return server, await server.start()
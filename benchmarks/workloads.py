@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基准测试用的合成对话负载
+
+按真实设备对话的常见形态生成多轮会话：独立指令穿插在对话中，
+部分追问(如"那明天呢"、"把它关掉")的意图取决于上一轮。
+随机数种子固定，保证每次生成的负载一致。
+"""
+
+import random
+from typing import List, Optional, Tuple
+
+# (文本, 意图标签)
+STANDALONE_UTTERANCES: List[Tuple[str, str]] = [
+    ("暂停音乐", "PAUSE_MUSIC"),
+    ("播放音乐", "PLAY_MUSIC"),
+    ("放首歌听听", "PLAY_MUSIC"),
+    ("停止录音", "STOPRECORDING"),
+    ("开始录音", "STARTRECORDING"),
+    ("打开客厅的灯", "CONTROL_DEVICE_ON"),
+    ("关闭空调", "CONTROL_DEVICE_OFF"),
+    ("现在几点了", "QUERY_TIME"),
+    ("北京天气怎么样", "QUERY_WEATHER"),
+    ("明天上海天气", "QUERY_WEATHER"),
+    ("提醒我明天上午开会", "SET_REMINDER"),
+    ("讲个笑话", "CHAT"),
+    ("你好", "CHAT"),
+]
+
+# 上一轮意图 -> 可能的追问及其意图
+FOLLOW_UPS = {
+    "QUERY_WEATHER": [("那明天呢", "QUERY_WEATHER"), ("后天呢", "QUERY_WEATHER")],
+    "SET_REMINDER": [("那后天呢", "SET_REMINDER"), ("算了不用了", "CHAT")],
+    "CONTROL_DEVICE_ON": [("把它关掉", "CONTROL_DEVICE_OFF"), ("卧室的也打开", "CONTROL_DEVICE_ON")],
+    "CONTROL_DEVICE_OFF": [("再打开它", "CONTROL_DEVICE_ON")],
+    "PLAY_MUSIC": [("再来一首", "PLAY_MUSIC"), ("这个不好听", "PLAY_MUSIC")],
+    "CHAT": [("好的", "CHAT"), ("是的", "CHAT")],
+}
+
+ASSISTANT_REPLIES = {
+    "QUERY_WEATHER": "今天晴，温度25°C",
+    "SET_REMINDER": "已为您设置提醒",
+    "CONTROL_DEVICE_ON": "设备已开启",
+    "CONTROL_DEVICE_OFF": "设备已关闭",
+    "PLAY_MUSIC": "正在播放音乐",
+    "PAUSE_MUSIC": "音乐已暂停",
+    "STARTRECORDING": "录音已开始",
+    "STOPRECORDING": "录音已停止",
+    "QUERY_TIME": "查询成功",
+    "CHAT": "很高兴与您聊天。",
+}
+
+
+def generate_sessions(
+    count: int,
+    min_turns: int = 3,
+    max_turns: int = 8,
+    follow_up_rate: float = 0.35,
+    seed: int = 20250603
+) -> List[List[Tuple[str, str]]]:
+    """生成多轮会话
+    
+    Args:
+        count (int): 会话数
+        min_turns (int, optional): 每个会话最少轮数. 默认为3.
+        max_turns (int, optional): 每个会话最多轮数. 默认为8.
+        follow_up_rate (float, optional): 追问出现的概率. 默认为0.35.
+        seed (int, optional): 随机数种子. 默认为20250603.
+        
+    Returns:
+        List[List[Tuple[str, str]]]: 会话列表，每个会话为(文本, 意图标签)序列
+    """
+    rng = random.Random(seed)
+    sessions = []
+    for _ in range(count):
+        turns: List[Tuple[str, str]] = []
+        previous: Optional[str] = None
+        for _ in range(rng.randint(min_turns, max_turns)):
+            if previous in FOLLOW_UPS and rng.random() < follow_up_rate:
+                turn = rng.choice(FOLLOW_UPS[previous])
+            else:
+                turn = rng.choice(STANDALONE_UTTERANCES)
+            turns.append(turn)
+            previous = turn[1]
+        sessions.append(turns)
+    return sessions
+
+
+# 带标注的语料，用于评估规则覆盖率：(文本, 期望意图)。
+# 含疑问、否定、指代或需要生成回复的句子也在其中，规则不应抢答
+LABELLED_CORPUS: List[Tuple[str, str]] = [
+    # 播放音乐
+    ("播放音乐", "PLAY_MUSIC"), ("放首歌听听", "PLAY_MUSIC"), ("来点音乐", "PLAY_MUSIC"),
+    ("我想听歌", "PLAY_MUSIC"), ("放一首周杰伦的歌", "PLAY_MUSIC"), ("播放陈奕迅的歌", "PLAY_MUSIC"),
+    ("听音乐", "PLAY_MUSIC"), ("来首歌", "PLAY_MUSIC"), ("继续播放", "PLAY_MUSIC"),
+    ("给我放点轻音乐", "PLAY_MUSIC"), ("播放歌曲", "PLAY_MUSIC"), ("我想听一首邓紫棋的歌", "PLAY_MUSIC"),
+    ("随便放点歌", "PLAY_MUSIC"), ("再来一首", "PLAY_MUSIC"), ("换一首歌", "PLAY_MUSIC"),
+    # 暂停音乐
+    ("暂停音乐", "PAUSE_MUSIC"), ("暂停", "PAUSE_MUSIC"), ("暂停播放", "PAUSE_MUSIC"),
+    ("停止播放音乐", "PAUSE_MUSIC"), ("音乐先暂停", "PAUSE_MUSIC"), ("关掉音乐", "PAUSE_MUSIC"),
+    ("歌停一下", "PAUSE_MUSIC"), ("别放歌了", "PAUSE_MUSIC"), ("先暂停一下", "PAUSE_MUSIC"),
+    ("音乐太吵了", "PAUSE_MUSIC"),
+    # 打开设备
+    ("打开客厅的灯", "CONTROL_DEVICE_ON"), ("开灯", "CONTROL_DEVICE_ON"), ("打开空调", "CONTROL_DEVICE_ON"),
+    ("把卧室的灯打开", "CONTROL_DEVICE_ON"), ("帮我开一下电视", "CONTROL_DEVICE_ON"), ("启动扫地机器人", "CONTROL_DEVICE_ON"),
+    ("打开加湿器", "CONTROL_DEVICE_ON"), ("开启空气净化器", "CONTROL_DEVICE_ON"), ("把窗帘打开", "CONTROL_DEVICE_ON"),
+    ("厨房灯打开", "CONTROL_DEVICE_ON"), ("请打开书房的台灯", "CONTROL_DEVICE_ON"), ("开一下风扇", "CONTROL_DEVICE_ON"),
+    ("打开热水器", "CONTROL_DEVICE_ON"), ("把客厅空调开开", "CONTROL_DEVICE_ON"), ("开电视", "CONTROL_DEVICE_ON"),
+    ("卧室的也打开", "CONTROL_DEVICE_ON"), ("再打开它", "CONTROL_DEVICE_ON"), ("有点热", "CONTROL_DEVICE_ON"),
+    # 关闭设备
+    ("关闭空调", "CONTROL_DEVICE_OFF"), ("关灯", "CONTROL_DEVICE_OFF"), ("把卧室的灯关了", "CONTROL_DEVICE_OFF"),
+    ("关掉电视", "CONTROL_DEVICE_OFF"), ("把风扇关掉", "CONTROL_DEVICE_OFF"), ("客厅灯关一下", "CONTROL_DEVICE_OFF"),
+    ("关闭加湿器", "CONTROL_DEVICE_OFF"), ("帮我关上窗帘", "CONTROL_DEVICE_OFF"), ("关一下热水器", "CONTROL_DEVICE_OFF"),
+    ("把扫地机器人关了", "CONTROL_DEVICE_OFF"), ("关闭卧室空调", "CONTROL_DEVICE_OFF"), ("电视关掉", "CONTROL_DEVICE_OFF"),
+    ("把它关掉", "CONTROL_DEVICE_OFF"), ("全部关掉", "CONTROL_DEVICE_OFF"),
+    # 天气
+    ("北京天气怎么样", "QUERY_WEATHER"), ("明天上海天气", "QUERY_WEATHER"), ("今天天气怎么样", "QUERY_WEATHER"),
+    ("后天杭州的天气", "QUERY_WEATHER"), ("查一下深圳明天的天气", "QUERY_WEATHER"), ("周五成都天气如何", "QUERY_WEATHER"),
+    ("大后天西安天气", "QUERY_WEATHER"), ("星期天南京天气预报", "QUERY_WEATHER"), ("天气预报", "QUERY_WEATHER"),
+    ("现在外面天气怎么样", "QUERY_WEATHER"), ("广州今天天气", "QUERY_WEATHER"), ("武汉的天气情况", "QUERY_WEATHER"),
+    ("明天会下雨吗", "QUERY_WEATHER"), ("后天北京会下雨吗", "QUERY_WEATHER"), ("上海现在温度多少", "QUERY_WEATHER"),
+    ("那明天呢", "QUERY_WEATHER"), ("后天呢", "QUERY_WEATHER"), ("要不要带伞", "QUERY_WEATHER"),
+    # 时间
+    ("现在几点了", "QUERY_TIME"), ("几点了", "QUERY_TIME"), ("现在几点", "QUERY_TIME"),
+    ("现在是什么时间", "QUERY_TIME"), ("报时", "QUERY_TIME"), ("今天几号", "QUERY_TIME"),
+    ("今天星期几", "QUERY_TIME"), ("现在时间", "QUERY_TIME"), ("告诉我现在几点", "QUERY_TIME"),
+    ("今天是几月几号", "QUERY_TIME"),
+    # 提醒
+    ("提醒我明天上午开会", "SET_REMINDER"), ("十分钟后提醒我关火", "SET_REMINDER"), ("明天早上八点提醒我起床", "SET_REMINDER"),
+    ("提醒我下午三点取快递", "SET_REMINDER"), ("设个闹钟", "SET_REMINDER"), ("帮我设置一个提醒", "SET_REMINDER"),
+    ("提醒我喝水", "SET_REMINDER"), ("晚上九点提醒我吃药", "SET_REMINDER"), ("定一个闹钟", "SET_REMINDER"),
+    ("半小时后提醒我出门", "SET_REMINDER"), ("周六提醒我去健身", "SET_REMINDER"), ("明天七点叫我起床", "SET_REMINDER"),
+    ("那后天呢", "SET_REMINDER"),
+    # 开始录音
+    ("开始录音", "STARTRECORDING"), ("录音", "STARTRECORDING"), ("开始第二段录音", "STARTRECORDING"),
+    ("帮我录音", "STARTRECORDING"), ("打开录音", "STARTRECORDING"), ("启动语音备忘录", "STARTRECORDING"),
+    ("我要录音", "STARTRECORDING"), ("继续录音", "STARTRECORDING"), ("不要停止录音", "STARTRECORDING"),
+    ("怎么停止录音了？目前应该录音呀", "STARTRECORDING"),
+    # 停止录音
+    ("停止录音", "STOPRECORDING"), ("结束录音", "STOPRECORDING"), ("录音结束", "STOPRECORDING"),
+    ("别录音了", "STOPRECORDING"), ("不要录音", "STOPRECORDING"), ("结束第二段录音", "STOPRECORDING"),
+    ("关掉录音", "STOPRECORDING"), ("暂停录音", "STOPRECORDING"), ("录音停一下", "STOPRECORDING"),
+    ("不想录音了", "STOPRECORDING"), ("怎么开始录音了？目前不应该录音呀", "STOPRECORDING"),
+    ("不应该录音", "STOPRECORDING"),
+    # 闲聊
+    ("你好", "CHAT"), ("讲个笑话", "CHAT"), ("谢谢", "CHAT"), ("你叫什么名字", "CHAT"),
+    ("今天心情不太好", "CHAT"), ("你能做什么", "CHAT"), ("好的", "CHAT"), ("是的", "CHAT"),
+    ("算了不用了", "CHAT"), ("晚安", "CHAT"), ("给我讲个故事", "CHAT"), ("你喜欢什么音乐", "CHAT"),
+    ("天气真好适合出去玩", "CHAT"), ("录音功能怎么用", "CHAT"), ("空调开关在哪", "CHAT"),
+    ("为什么要关灯", "CHAT"), ("这个不好听", "PLAY_MUSIC"),
+    # 未知
+    ("帮我订一张去北京的机票", "UNKNOWN"), ("把客厅的空调调高两度", "UNKNOWN"), ("翻译一下hello", "UNKNOWN"),
+    ("一加一等于几", "UNKNOWN"), ("明天几点开会", "UNKNOWN"),
+]